@@ -4,12 +4,30 @@ namespace OPNsense\Reticulum\Api;
 
 use OPNsense\Base\ApiMutableModelControllerBase;
 use OPNsense\Core\Config;
+use OPNsense\Reticulum\Reticulum;
 
 class RnsdController extends ApiMutableModelControllerBase
 {
     protected static $internalModelName = 'Reticulum';
     protected static $internalModelClass = 'OPNsense\Reticulum\Reticulum';
 
+    /**
+     * Maximum rows accepted by importInterfacesAction() in one request
+     */
+    const IMPORT_MAX_ROWS = 4096;
+
+    /**
+     * Status snapshot the collector rewrites every interval, and the age
+     * after which it no longer describes the running rnsd
+     */
+    const STATUS_SNAPSHOT = '/var/run/reticulum/status.json';
+    const STATUS_MAX_AGE = 30;
+
+    /**
+     * Runtime columns of searchInterfaces that sort numerically
+     */
+    const NUMERIC_COLUMNS = ['tx_rate', 'rx_rate', 'clients', 'held_announces'];
+
     /**
      * Flatten getNodes()-style option metadata to scalar values.
      *
@@ -97,16 +115,114 @@ class RnsdController extends ApiMutableModelControllerBase
     }
 
     /**
-     * GET api/reticulum/rnsd/searchInterfaces
-     * Paginated search of interface ArrayField
+     * GET|POST api/reticulum/rnsd/searchInterfaces
+     * Paginated search of the configured interfaces joined with their live
+     * state from the collector's status snapshot:
+     *   status          up, down, disabled, or unknown (no fresh snapshot)
+     *   tx_rate/rx_rate bytes/sec over the last collector interval
+     *   clients         connected clients (server-type interfaces)
+     *   held_announces  announces held back by ingress control
+     * Runtime values are null when unknown. Search (searchPhrase), the
+     * optional status filter and sorting on any column run here, over the
+     * whole list, before the page is cut; the snapshot is read once per call.
      */
     public function searchInterfacesAction()
     {
-        return $this->searchBase(
-            'interfaces.interface',
-            ['name', 'type', 'enabled', 'mode'],
-            'name'
-        );
+        $live = $this->liveInterfaces();
+        $phrase = trim((string)$this->request->get('searchPhrase', 'string', ''));
+        $status = (string)$this->request->get('status', 'string', '');
+        $rows = [];
+        foreach ($this->getModel()->interfaces->interface->iterateItems() as $uuid => $iface) {
+            $row = [
+                'uuid' => $uuid,
+                'name' => (string)$iface->name,
+                'type' => (string)$iface->type,
+                'enabled' => (string)$iface->enabled,
+                'mode' => (string)$iface->mode,
+                'status' => 'unknown',
+                'tx_rate' => null,
+                'rx_rate' => null,
+                'clients' => null,
+                'held_announces' => null,
+            ];
+            if ($row['enabled'] !== '1') {
+                $row['status'] = 'disabled';
+            } elseif ($live !== null) {
+                $stats = $live[$row['name']] ?? null;
+                $row['status'] = ($stats['status'] ?? 'down') === 'up' ? 'up' : 'down';
+                foreach (self::NUMERIC_COLUMNS as $column) {
+                    $row[$column] = $stats[$column] ?? null;
+                }
+            }
+            if ($status !== '' && $row['status'] !== $status) {
+                continue;
+            }
+            if ($phrase !== '' && stripos("{$row['name']} {$row['type']} {$row['mode']} {$row['status']}", $phrase) === false) {
+                continue;
+            }
+            $rows[] = $row;
+        }
+        return $this->gridPage($rows, 'name');
+    }
+
+    /**
+     * Interfaces of the collector snapshot keyed by name, or null when the
+     * snapshot is missing, stale, or rnsd could not be reached.
+     */
+    private function liveInterfaces()
+    {
+        $path = self::STATUS_SNAPSHOT;
+        if (!is_file($path) || time() - filemtime($path) > self::STATUS_MAX_AGE) {
+            return null;
+        }
+        $snapshot = json_decode(file_get_contents($path), true);
+        if (!is_array($snapshot) || isset($snapshot['error']) || !is_array($snapshot['interfaces'] ?? null)) {
+            return null;
+        }
+        $live = [];
+        foreach ($snapshot['interfaces'] as $iface) {
+            if (is_array($iface) && isset($iface['name'])) {
+                $live[$iface['name']] = $iface;
+            }
+        }
+        return $live;
+    }
+
+    /**
+     * Sort and paginate grid rows per the bootgrid request (sort[column],
+     * current, rowCount; rowCount -1 returns every row). Numeric columns
+     * sort numerically with unknown values last; ties keep name order.
+     */
+    private function gridPage(array $rows, $defaultSort)
+    {
+        $sort = $this->request->get('sort');
+        $column = $defaultSort;
+        $descending = false;
+        if (is_array($sort) && !empty($sort)) {
+            $column = (string)array_keys($sort)[0];
+            $descending = strtolower((string)reset($sort)) === 'desc';
+        }
+        if (!empty($rows) && array_key_exists($column, $rows[0])) {
+            $numeric = in_array($column, self::NUMERIC_COLUMNS, true);
+            usort($rows, function ($a, $b) use ($column, $descending, $numeric) {
+                if ($a[$column] === null || $b[$column] === null) {
+                    $cmp = ($a[$column] === null) <=> ($b[$column] === null);
+                    return $cmp !== 0 ? $cmp : strnatcasecmp($a['name'], $b['name']);
+                }
+                $cmp = $numeric ? $a[$column] <=> $b[$column] : strnatcasecmp($a[$column], $b[$column]);
+                $cmp = $descending ? -$cmp : $cmp;
+                return $cmp !== 0 ? $cmp : strnatcasecmp($a['name'], $b['name']);
+            });
+        }
+        $total = count($rows);
+        $rowCount = (int)$this->request->get('rowCount', 'int', -1);
+        $current = max(1, (int)$this->request->get('current', 'int', 1));
+        if ($rowCount > 0) {
+            $rows = array_slice($rows, ($current - 1) * $rowCount, $rowCount);
+        } else {
+            $current = 1;
+        }
+        return ['total' => $total, 'rowCount' => $rowCount, 'current' => $current, 'rows' => $rows];
     }
 
     /**
@@ -145,6 +261,268 @@ class RnsdController extends ApiMutableModelControllerBase
         return $this->delBase('interfaces.interface', $uuid);
     }
 
+    /**
+     * GET api/reticulum/rnsd/checkInterfaceName?name=...&uuid=...
+     * Whether an interface name is free, ignoring the record being edited
+     * (uuid, optional). Lets the interface dialog flag a conflict while the
+     * user types without downloading every interface:
+     *   {"available": true}
+     *   {"available": false, "message": "..."}
+     * Messages match the ones performValidation() reports on save.
+     */
+    public function checkInterfaceNameAction()
+    {
+        $name = trim((string)$this->request->get('name', 'string', ''));
+        $uuid = (string)$this->request->get('uuid', 'string', '');
+        if ($name === '') {
+            return ['available' => true];
+        }
+        $mdl = $this->getModel();
+        if ($name === 'Instance Interconnect' && (int)(string)$mdl->general->transport_instances > 1) {
+            return ['available' => false,
+                'message' => "Interface name 'Instance Interconnect' is reserved for the transport instance interconnect"];
+        }
+        foreach ($mdl->interfaces->interface->iterateItems() as $key => $iface) {
+            if ($key !== $uuid && (string)$iface->name === $name) {
+                return ['available' => false,
+                    'message' => "Interface name '{$name}' is already used by another interface"];
+            }
+        }
+        return ['available' => true];
+    }
+
+    /**
+     * GET api/reticulum/rnsd/exportInterfaces[/csv]
+     * All interfaces as {"interfaces": [{field: value, ...}]}, or as a CSV
+     * download with one column per interface field when called with /csv.
+     * Values are the stored keys (e.g. mode "full", enabled "1"), so the
+     * output can be fed back to importInterfaces unchanged.
+     */
+    public function exportInterfacesAction($format = 'json')
+    {
+        $rows = [];
+        foreach ($this->getModel()->interfaces->interface->iterateItems() as $iface) {
+            $rows[] = $this->interfaceRow($iface);
+        }
+        if ($format !== 'csv') {
+            return ['interfaces' => $rows];
+        }
+        $fields = $this->interfaceFields();
+        $fh = fopen('php://temp', 'r+');
+        fputcsv($fh, $fields);
+        foreach ($rows as $row) {
+            fputcsv($fh, array_map(function ($field) use ($row) {
+                return $row[$field] ?? '';
+            }, $fields));
+        }
+        rewind($fh);
+        $csv = stream_get_contents($fh);
+        fclose($fh);
+        $this->response->setContentType('text/csv', 'UTF-8');
+        $this->response->setHeader('Content-Disposition', 'attachment; filename="reticulum-interfaces.csv"');
+        $this->response->setContent($csv);
+    }
+
+    /**
+     * POST api/reticulum/rnsd/importInterfaces
+     * Bulk add/update interfaces in one transaction.
+     *
+     * Accepts {"interfaces": [{...}, ...]} (the exportInterfaces JSON shape),
+     * or {"format": "json"|"csv", "data": "<file contents>"} as uploaded by the
+     * GUI. CSV needs a header row of field names; empty cells are left out, so
+     * new rows get the field default and updated rows keep the current value.
+     * A row whose name matches an existing interface updates it, every other
+     * row is added.
+     *
+     * Unlike one addInterface call per row (each running the full cross-record
+     * validation and rewriting config.xml), all rows are applied to the model
+     * in memory, performValidation() runs once over the result, and config.xml
+     * is written once. Any error rejects the whole batch:
+     *   {"result": "failed", "errors": [{"row": 3, "field": "target_host", "message": "..."}]}
+     * row is the 1-based position in the batch (CSV: data line, header excluded),
+     * or null for errors not tied to an imported row.
+     */
+    public function importInterfacesAction()
+    {
+        if (!$this->request->isPost()) {
+            return ['result' => 'error', 'message' => 'POST required'];
+        }
+        $rows = $this->importRows();
+        if (is_string($rows)) {
+            return ['result' => 'failed', 'errors' => [['row' => null, 'field' => null, 'message' => $rows]]];
+        }
+
+        $mdl = $this->getModel();
+        $fields = array_flip($this->interfaceFields());
+        $existing = [];
+        foreach ($mdl->interfaces->interface->iterateItems() as $uuid => $iface) {
+            $existing[(string)$iface->name] = $uuid;
+        }
+
+        $errors = [];
+        $rowByUuid = [];
+        $namesSeen = [];
+        $added = 0;
+        $updated = 0;
+        foreach ($rows as $index => $row) {
+            $rowNo = $index + 1;
+            if (!is_array($row)) {
+                $errors[] = ['row' => $rowNo, 'field' => null, 'message' => 'Row is not an object'];
+                continue;
+            }
+            $row = $this->flattenOptionValues($row);
+            unset($row['id'], $row['uuid']);
+            $unknown = array_diff(array_keys($row), array_keys($fields));
+            if (!empty($unknown)) {
+                $errors[] = ['row' => $rowNo, 'field' => null,
+                    'message' => 'Unknown field(s): ' . implode(', ', $unknown)];
+                continue;
+            }
+            $name = (string)($row['name'] ?? '');
+            if ($name !== '' && isset($namesSeen[$name])) {
+                $errors[] = ['row' => $rowNo, 'field' => 'name',
+                    'message' => "Interface name '{$name}' appears more than once in the import (row {$namesSeen[$name]})"];
+                continue;
+            }
+            if ($name !== '') {
+                $namesSeen[$name] = $rowNo;
+            }
+            if ($name !== '' && isset($existing[$name])) {
+                $uuid = $existing[$name];
+                $node = $mdl->getNodeByReference("interfaces.interface.{$uuid}");
+                $updated++;
+            } else {
+                $node = $mdl->interfaces->interface->Add();
+                $uuid = $node->getAttributes()['uuid'];
+                $added++;
+            }
+            // JSON clients may send true/false or numbers; the model stores strings
+            $node->setNodes(array_map(function ($value) {
+                return is_bool($value) ? ($value ? '1' : '0') : (string)$value;
+            }, $row));
+            $rowByUuid[$uuid] = $rowNo;
+        }
+
+        // One validation pass over the whole resulting model
+        foreach ($mdl->performValidation() as $msg) {
+            $path = explode('.', $msg->getField());
+            if (count($path) >= 4 && $path[0] === 'interfaces' && isset($rowByUuid[$path[2]])) {
+                $errors[] = ['row' => $rowByUuid[$path[2]], 'field' => $path[3], 'message' => $msg->getMessage()];
+            } else {
+                $errors[] = ['row' => null, 'field' => $msg->getField(), 'message' => $msg->getMessage()];
+            }
+        }
+        if (!empty($errors)) {
+            usort($errors, function ($a, $b) {
+                return ($a['row'] ?? 0) <=> ($b['row'] ?? 0);
+            });
+            return ['result' => 'failed', 'errors' => $errors];
+        }
+
+        $mdl->serializeToConfig();
+        Config::getInstance()->save();
+        return ['result' => 'saved', 'added' => $added, 'updated' => $updated];
+    }
+
+    /**
+     * Rows of an import request, or an error message string.
+     */
+    private function importRows()
+    {
+        $rows = $this->request->getPost('interfaces');
+        if ($rows === null) {
+            $format = (string)($this->request->getPost('format') ?? 'json');
+            $data = (string)($this->request->getPost('data') ?? '');
+            if (trim($data) === '') {
+                return 'No interfaces to import';
+            }
+            if ($format === 'csv') {
+                $rows = $this->parseCsv($data);
+            } elseif ($format === 'json') {
+                $rows = json_decode($data, true);
+                if (is_array($rows) && isset($rows['interfaces'])) {
+                    $rows = $rows['interfaces'];
+                }
+                if (!is_array($rows)) {
+                    return 'Invalid JSON: ' . json_last_error_msg();
+                }
+            } else {
+                return "Unsupported format '{$format}' (expected json or csv)";
+            }
+        }
+        if (!is_array($rows) || empty($rows)) {
+            return is_string($rows) ? $rows : 'No interfaces to import';
+        }
+        if (count($rows) > self::IMPORT_MAX_ROWS) {
+            return 'Too many interfaces in one import (maximum ' . self::IMPORT_MAX_ROWS . ')';
+        }
+        return array_values($rows);
+    }
+
+    /**
+     * CSV with a header row to a list of field => value rows (empty cells
+     * omitted), or an error message string.
+     */
+    private function parseCsv($data)
+    {
+        $fh = fopen('php://temp', 'r+');
+        fwrite($fh, $data);
+        rewind($fh);
+        $header = fgetcsv($fh);
+        if (empty($header) || $header === [null]) {
+            fclose($fh);
+            return 'CSV has no header row';
+        }
+        // Tolerate a UTF-8 BOM from spreadsheet exports
+        $header[0] = preg_replace('/^\xEF\xBB\xBF/', '', $header[0]);
+        $header = array_map('trim', $header);
+        $rows = [];
+        $line = 1;
+        while (($cells = fgetcsv($fh)) !== false) {
+            $line++;
+            if ($cells === [null]) {
+                continue;
+            }
+            if (count($cells) > count($header)) {
+                fclose($fh);
+                return "CSV line {$line} has more columns than the header";
+            }
+            $row = [];
+            foreach ($cells as $i => $value) {
+                if ($value !== '') {
+                    $row[$header[$i]] = $value;
+                }
+            }
+            $rows[] = $row;
+        }
+        fclose($fh);
+        return $rows;
+    }
+
+    /**
+     * Stored field values of one interface record, keyed by field name.
+     */
+    private function interfaceRow($iface)
+    {
+        $row = [];
+        foreach ($iface->iterateItems() as $key => $field) {
+            if ($key !== 'id') {
+                $row[$key] = (string)$field;
+            }
+        }
+        return $row;
+    }
+
+    /**
+     * Interface field names in model order (from a throwaway record, so the
+     * CSV header is complete even with no interfaces configured).
+     */
+    private function interfaceFields()
+    {
+        $template = (new Reticulum())->interfaces->interface->Add();
+        return array_keys($this->interfaceRow($template));
+    }
+
     /**
      * POST api/reticulum/rnsd/toggleInterface/{uuid}
      * Toggle interface enabled state
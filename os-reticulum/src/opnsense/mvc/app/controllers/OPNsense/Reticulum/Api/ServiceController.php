@@ -4,9 +4,17 @@ namespace OPNsense\Reticulum\Api;
 
 use OPNsense\Base\ApiControllerBase;
 use OPNsense\Core\Backend;
+use OPNsense\Reticulum\Reticulum;
 
 class ServiceController extends ApiControllerBase
 {
+    // Daemon status kept by the process watcher (procwatch.py): rewritten on
+    // every start/exit, touched every 10 s while the watcher runs.
+    const PROCS_FILE = '/var/run/reticulum/procs.json';
+    const PROCS_MAX_AGE = 30;
+
+    private $procs = null;
+
     // ==================== Standard service endpoints ====================
     // These are required by the OPNsense core updateServiceControlUI() function,
     // which calls GET /api/{module}/service/status and POST start/stop/restart.
@@ -16,20 +24,13 @@ class ServiceController extends ApiControllerBase
     /**
      * GET api/reticulum/service/status
      * Standard OPNsense service status endpoint for updateServiceControlUI().
-     * Returns rnsd (primary service) status.
+     * Returns rnsd (primary service) status: "degraded" when the process is
+     * alive but the liveness watchdog reports it unresponsive over RPC.
      */
     public function statusAction()
     {
-        $pidfile = '/var/run/rnsd.pid';
-        if (!file_exists($pidfile)) {
-            return ['status' => 'stopped'];
-        }
-        $pid = trim(file_get_contents($pidfile));
-        if (!ctype_digit($pid)) {
-            return ['status' => 'stopped'];
-        }
-        exec("ps -p $pid -o pid= 2>/dev/null", $out, $code);
-        return ['status' => $code === 0 ? 'running' : 'stopped'];
+        $result = ['status' => $this->daemonStatus('rnsd', '/var/run/rnsd.pid')];
+        return $this->withLiveness($result);
     }
 
     /**
@@ -117,23 +118,138 @@ class ServiceController extends ApiControllerBase
 
     /**
      * GET api/reticulum/service/rnsdStatus
-     * Uses pgrep -F (pidfile) because rnsd runs as a Python process and
-     * its ps name is the interpreter, not "rnsd".
+     * Answered from the process watcher's status file (no process spawn);
+     * "pid", "started" and "last_exit" come from the watcher when it runs.
+     * With several transport instances, "status" stays the state of instance 0
+     * (the one hosting the interconnect) and "instances" lists every instance,
+     * with "running" counting the live ones.
+     * With the liveness watchdog enabled, "liveness" carries its latest report
+     * (state, consecutive failures, RPC latency percentiles) and a live but
+     * unresponsive instance reports "degraded" instead of "running".
      */
     public function rnsdStatusAction()
     {
-        $pidfile = '/var/run/rnsd.pid';
+        $result = array_merge(
+            ['status' => $this->daemonStatus('rnsd', '/var/run/rnsd.pid')],
+            $this->processInfo('rnsd')
+        );
+        $count = max(1, (int)(string)(new Reticulum())->general->transport_instances);
+        if ($count > 1) {
+            $result['instances'] = [['instance' => 0, 'status' => $result['status']]];
+            for ($n = 1; $n < $count; $n++) {
+                $result['instances'][] = [
+                    'instance' => $n,
+                    'status' => $this->daemonStatus("rnsd-{$n}", "/var/run/rnsd-{$n}.pid")
+                ];
+            }
+            $result['running'] = count(array_filter($result['instances'], function ($instance) {
+                return $instance['status'] === 'running';
+            }));
+        }
+        return $this->withLiveness($result);
+    }
+
+    /**
+     * The process watcher's status file, or [] when it is missing or stale
+     * (watcher not running). Read at most once per request.
+     */
+    private function procs()
+    {
+        if ($this->procs === null) {
+            $this->procs = [];
+            $path = self::PROCS_FILE;
+            if (is_file($path) && time() - filemtime($path) <= self::PROCS_MAX_AGE) {
+                $data = json_decode(file_get_contents($path), true);
+                $this->procs = is_array($data) ? $data : [];
+            }
+        }
+        return $this->procs;
+    }
+
+    /**
+     * "running" or "stopped" for a daemon (rnsd, rnsd-N, lxmd): from the
+     * process watcher, or from the pidfile while the watcher is not running.
+     * A supervised daemon in restart backoff or a crash loop is stopped.
+     */
+    private function daemonStatus($service, $pidfile)
+    {
+        $procs = $this->procs();
+        if (isset($procs[$service]['state'])) {
+            return $procs[$service]['state'] === 'running' ? 'running' : 'stopped';
+        }
+        return $this->pidfileStatus($pidfile);
+    }
+
+    /**
+     * pid, start time and last exit of a daemon as seen by the watcher.
+     */
+    private function processInfo($service)
+    {
+        $procs = $this->procs();
+        if (!isset($procs[$service]) || !is_array($procs[$service])) {
+            return [];
+        }
+        return [
+            'pid' => $procs[$service]['pid'] ?? null,
+            'started' => $procs[$service]['started'] ?? null,
+            'last_exit' => $procs[$service]['last_exit'] ?? null,
+        ];
+    }
+
+    /**
+     * "running" when the pidfile names a live process, else "stopped".
+     */
+    private function pidfileStatus($pidfile)
+    {
         if (!file_exists($pidfile)) {
-            return ['status' => 'stopped'];
+            return 'stopped';
         }
         $pid = trim(file_get_contents($pidfile));
         if (!ctype_digit($pid)) {
-            return ['status' => 'stopped'];
+            return 'stopped';
+        }
+        // Signal 0 only checks existence. PHP runs as www and the daemons as
+        // reticulum, so EPERM (1) also means the process exists.
+        return posix_kill((int)$pid, 0) || posix_get_last_error() === 1 ? 'running' : 'stopped';
+    }
+
+    /**
+     * Add the liveness watchdog report to an rnsd status result and downgrade
+     * running instances the watchdog marked degraded. The top-level status
+     * follows instance 0, as in rnsd_status.sh; other instances are only
+     * downgraded in the instance list. The report is written by the collector
+     * every interval; a stale one (watchdog or collector off) is ignored so a
+     * stopped collector cannot pin the status.
+     */
+    private function withLiveness($result)
+    {
+        $path = '/var/run/reticulum/liveness.json';
+        if (!is_file($path) || time() - filemtime($path) > 30) {
+            return $result;
+        }
+        $liveness = json_decode(file_get_contents($path), true);
+        if (!is_array($liveness) || !isset($liveness['instances']) || !is_array($liveness['instances'])) {
+            return $result;
+        }
+        $result['liveness'] = $liveness;
+        $degraded = [];
+        foreach ($liveness['instances'] as $instance) {
+            if (($instance['state'] ?? '') === 'degraded') {
+                $degraded[(int)$instance['instance']] = true;
+            }
         }
-        // Use ps -p instead of kill -0: ps can check any process regardless of
-        // ownership (PHP runs as www, rnsd runs as reticulum — kill -0 returns EPERM).
-        exec("ps -p $pid -o pid= 2>/dev/null", $out, $code);
-        return ['status' => $code === 0 ? 'running' : 'stopped'];
+        if ($result['status'] === 'running' && isset($degraded[0])) {
+            $result['status'] = 'degraded';
+        }
+        if (isset($result['instances'])) {
+            foreach ($result['instances'] as &$instance) {
+                if ($instance['status'] === 'running' && isset($degraded[$instance['instance']])) {
+                    $instance['status'] = 'degraded';
+                }
+            }
+            unset($instance);
+        }
+        return $result;
     }
 
     // ==================== lxmd ====================
@@ -147,10 +263,8 @@ class ServiceController extends ApiControllerBase
         if ($this->request->isPost()) {
             $backend = new Backend();
 
-            // Check rnsd is running first (use ps -p: PHP runs as www, rnsd as reticulum)
-            $rnsdPid = file_exists('/var/run/rnsd.pid') ? trim(file_get_contents('/var/run/rnsd.pid')) : '';
-            exec("ps -p $rnsdPid -o pid= 2>/dev/null", $chk, $rnsdCode);
-            if (!ctype_digit($rnsdPid) || $rnsdCode !== 0) {
+            // Check rnsd is running first
+            if ($this->daemonStatus('rnsd', '/var/run/rnsd.pid') !== 'running') {
                 return [
                     'result' => 'error',
                     'message' => 'Cannot start lxmd: rnsd is not running. Start rnsd first.'
@@ -185,10 +299,8 @@ class ServiceController extends ApiControllerBase
         if ($this->request->isPost()) {
             $backend = new Backend();
 
-            // Check rnsd is running first (use ps -p: PHP runs as www, rnsd as reticulum)
-            $rnsdPid = file_exists('/var/run/rnsd.pid') ? trim(file_get_contents('/var/run/rnsd.pid')) : '';
-            exec("ps -p $rnsdPid -o pid= 2>/dev/null", $chk, $rnsdCode);
-            if (!ctype_digit($rnsdPid) || $rnsdCode !== 0) {
+            // Check rnsd is running first
+            if ($this->daemonStatus('rnsd', '/var/run/rnsd.pid') !== 'running') {
                 return [
                     'result' => 'error',
                     'message' => 'Cannot restart lxmd: rnsd is not running. Start rnsd first.'
@@ -203,37 +315,41 @@ class ServiceController extends ApiControllerBase
 
     /**
      * GET api/reticulum/service/lxmdStatus
-     * Uses pgrep -F (pidfile) because lxmd runs as a Python process and
-     * its ps name is the interpreter, not "lxmd".
+     * Answered from the process watcher's status file (no process spawn);
+     * "pid", "started" and "last_exit" come from the watcher when it runs.
      */
     public function lxmdStatusAction()
     {
-        $pidfile = '/var/run/lxmd.pid';
-        if (!file_exists($pidfile)) {
-            return ['status' => 'stopped'];
-        }
-        $pid = trim(file_get_contents($pidfile));
-        if (!ctype_digit($pid)) {
-            return ['status' => 'stopped'];
-        }
-        // Use ps -p instead of kill -0: ps can check any process regardless of
-        // ownership (PHP runs as www, lxmd runs as reticulum — kill -0 returns EPERM).
-        exec("ps -p $pid -o pid= 2>/dev/null", $out, $code);
-        return ['status' => $code === 0 ? 'running' : 'stopped'];
+        return array_merge(
+            ['status' => $this->daemonStatus('lxmd', '/var/run/lxmd.pid')],
+            $this->processInfo('lxmd')
+        );
     }
 
     // ==================== Shared ====================
 
     /**
      * POST api/reticulum/service/reconfigure
-     * Regenerate config files + conditional restart
+     * Regenerate config files and restart only the running daemons whose
+     * rendered config changed. Reports the changed/restarted/failed services.
      */
     public function reconfigureAction()
     {
         if ($this->request->isPost()) {
             $backend = new Backend();
-            $result = trim($backend->configdRun('reticulum reconfigure'));
-            return ['result' => $result];
+            $response = trim($backend->configdRun('reticulum reconfigure'));
+            // The script's report is its last output line
+            $lines = explode("\n", $response);
+            $report = json_decode(end($lines), true);
+            if (!is_array($report)) {
+                return ['result' => $response !== '' ? $response : 'error'];
+            }
+            return [
+                'result' => empty($report['failed']) ? 'OK' : 'failed',
+                'changed' => $report['changed'] ?? [],
+                'restarted' => $report['restarted'] ?? [],
+                'failed' => $report['failed'] ?? [],
+            ];
         }
         return ['result' => 'error', 'message' => 'POST required'];
     }
@@ -252,7 +368,7 @@ class ServiceController extends ApiControllerBase
 
     /**
      * GET api/reticulum/service/info
-     * Returns version info and node identity
+     * Returns version info, node identity and rnsd uptime
      */
     public function infoAction()
     {
@@ -262,34 +378,132 @@ class ServiceController extends ApiControllerBase
         return $data ?: [
             'rns_version' => 'unknown',
             'lxmf_version' => 'unknown',
-            'node_identity' => ''
+            'node_identity' => '',
+            'uptime' => ''
+        ];
+    }
+
+    /**
+     * GET api/reticulum/service/dashboard
+     * Aggregated widget snapshot: rnsd/lxmd status, versions, identity and
+     * interface stats from one backend collection pass.
+     */
+    public function dashboardAction()
+    {
+        $backend = new Backend();
+        $response = trim($backend->configdRun('reticulum dashboard'));
+        $data = json_decode($response, true);
+        return $data ?: [
+            'rnsd' => ['status' => 'error'],
+            'lxmd' => ['status' => 'error'],
+            'info' => ['rns_version' => 'unknown', 'lxmf_version' => 'unknown', 'node_identity' => ''],
+            'rnstatus' => ['error' => 'Could not parse dashboard output', 'interfaces' => []],
         ];
     }
 
+    /**
+     * GET api/reticulum/service/supervision
+     * Supervisor state per daemon: restarts, last exit code, last crash time
+     * and whether it is waiting in backoff or flagged as a crash loop.
+     */
+    public function supervisionAction()
+    {
+        $backend = new Backend();
+        $response = trim($backend->configdRun('reticulum supervision'));
+        $data = json_decode($response, true);
+        return is_array($data) ? $data : ['rnsd' => [], 'lxmd' => []];
+    }
+
+    /**
+     * GET api/reticulum/service/importtime
+     * Diagnostics: import-time profile (total and slowest imports) of the
+     * rnsd, lxmd and rnstatus entry points and the collector, for tracking
+     * cold-start cost across RNS/LXMF upgrades. Takes a few seconds.
+     */
+    public function importtimeAction()
+    {
+        $backend = new Backend();
+        $response = trim($backend->configdRun('reticulum importtime'));
+        $data = json_decode($response, true);
+        return is_array($data) ? $data : ['error' => 'Could not parse importtime output', 'targets' => []];
+    }
+
+    /**
+     * GET api/reticulum/service/traffic
+     * Per-interface TX/RX throughput series (bytes/sec) from the collector's
+     * ring buffers. tier selects the resolution: 1m (3 h), 5m (24 h), 1h (7 d).
+     */
+    public function trafficAction()
+    {
+        $tier = $this->request->get('tier', 'string', '1m');
+        if (!in_array($tier, ['1m', '5m', '1h'], true)) {
+            $tier = '1m';
+        }
+        $backend = new Backend();
+        $response = trim($backend->configdpRun('reticulum traffic', [$tier]));
+        $data = json_decode($response, true);
+        return $data ?: ['tier' => $tier, 'interfaces' => []];
+    }
+
+    /**
+     * GET api/reticulum/service/metrics
+     * OpenMetrics exposition for Prometheus (rnsd/lxmd up, per-interface
+     * counters and announce queues, process RSS/CPU, message store size).
+     * Served from the text the collector renders on every sample.
+     */
+    public function metricsAction()
+    {
+        $backend = new Backend();
+        $metrics = $backend->configdRun('reticulum metrics');
+        if (strpos($metrics, '# EOF') === false) {
+            $metrics = "# EOF\n";
+        }
+        $this->response->setContentType('application/openmetrics-text; version=1.0.0; charset=utf-8');
+        $this->response->setContent($metrics);
+    }
+
+    /**
+     * GET api/reticulum/service/stream
+     * Server-Sent Events: a full `state` event, then only changes as the
+     * collector sees them (`service`, `interface`, and `counters` at the
+     * configured interval). The stream ends after a few minutes; EventSource
+     * reconnects with Last-Event-ID (or ?last_id=) and is sent only the
+     * events it missed.
+     * configdStream() exists from OPNsense 24.7 on; older versions answer
+     * 204, which closes the EventSource so the pages keep polling.
+     */
+    public function streamAction()
+    {
+        if (!method_exists($this, 'configdStream')) {
+            $this->response->setStatusCode(204, 'No Content');
+            return;
+        }
+        $lastId = (string)$this->request->getHeader('Last-Event-ID');
+        if ($lastId === '') {
+            $lastId = (string)$this->request->get('last_id', 'string', '');
+        }
+        return $this->configdStream(
+            'reticulum events',
+            [ctype_digit($lastId) ? $lastId : 'new'],
+            ['Content-Type: text/event-stream', 'Cache-Control: no-cache', 'X-Accel-Buffering: no']
+        );
+    }
+
     /**
      * GET api/reticulum/service/rnsdInfo
-     * Returns rnsd version, node identity, and uptime for the GUI runtime info row
+     * Returns rnsd version, node identity, and uptime for the GUI runtime info row.
+     * The info action answers all three from a single status query.
      */
     public function rnsdInfoAction()
     {
         $backend = new Backend();
-
-        // Get version + identity from info script
         $infoRaw = trim($backend->configdRun('reticulum info'));
         $info = json_decode($infoRaw, true) ?: [];
 
-        // Get uptime from rnstatus (only available when running)
-        $uptime = '';
-        $rnstatusRaw = trim($backend->configdRun('reticulum rnstatus'));
-        $rnstatus = json_decode($rnstatusRaw, true);
-        if (isset($rnstatus['uptime'])) {
-            $uptime = $rnstatus['uptime'];
-        }
-
         return [
             'version'  => $info['rns_version'] ?? 'unknown',
             'identity' => $info['node_identity'] ?? '',
-            'uptime'   => $uptime,
+            'uptime'   => $info['uptime'] ?? '',
         ];
     }
 
@@ -318,7 +532,7 @@ class ServiceController extends ApiControllerBase
         $lines = $this->request->get('lines', 'int', 200);
         $lines = min(max($lines, 10), 500);
         $backend = new Backend();
-        $result = trim($backend->configdRun('reticulum logs rnsd', [$lines]));
+        $result = trim($backend->configdpRun('reticulum logs rnsd', [$lines]));
         return ['logs' => explode("\n", $result)];
     }
 
@@ -331,7 +545,98 @@ class ServiceController extends ApiControllerBase
         $lines = $this->request->get('lines', 'int', 200);
         $lines = min(max($lines, 10), 500);
         $backend = new Backend();
-        $result = trim($backend->configdRun('reticulum logs lxmd', [$lines]));
+        $result = trim($backend->configdpRun('reticulum logs lxmd', [$lines]));
         return ['logs' => explode("\n", $result)];
     }
+
+    /**
+     * GET api/reticulum/service/logsTail
+     * Incremental, filtered log tail. Without a cursor returns the last N
+     * lines matching level/search (scanning back through the log and its
+     * rotated files); with the cursor from a previous response returns only
+     * matching lines appended since, following newsyslog rotation.
+     * reset=true means the lines replace the client's view instead of
+     * extending it.
+     */
+    public function logsTailAction()
+    {
+        $service = $this->request->get('service', 'string', 'rnsd');
+        if (!in_array($service, ['rnsd', 'lxmd'], true)) {
+            return ['lines' => [], 'cursor' => '', 'reset' => true];
+        }
+        $lines = $this->request->get('lines', 'int', 200);
+        $lines = min(max($lines, 10), 500);
+        $cursor = $this->request->get('cursor', 'string', '');
+        if (!preg_match('/^\d+:\d+(:\d+)?$/', $cursor)) {
+            $cursor = '';
+        }
+        $level = (string)$this->request->get('level', 'string', '');
+        if (!preg_match('/^[0-7]$/', $level)) {
+            $level = '-';
+        }
+        // Read unfiltered (the string filter would mangle regex syntax) and
+        // passed hex-encoded so any characters survive the configd command
+        // line; length-capped to keep regexes cheap.
+        $search = substr((string)$this->request->get('search', null, ''), 0, 200);
+        $mode = (int)$this->request->get('regex', 'int', 0) === 1 ? 'regex' : 'text';
+
+        if ($cursor !== '') {
+            // Idle poll: if the live log still has the cursor's inode and
+            // the size it had when the cursor was issued, nothing was
+            // appended (not even to a partial last line held back behind the
+            // offset), so answer from a stat() without a configd round trip.
+            // Older two-field cursors only carry the offset. (www can stat
+            // the log but not read it — reading goes through configd.)
+            $parts = explode(':', $cursor);
+            $seen = $parts[2] ?? $parts[1];
+            clearstatcache();
+            $st = @stat("/var/log/reticulum/{$service}.log");
+            if ($st !== false && (string)$st['ino'] === $parts[0] && (string)$st['size'] === $seen) {
+                return ['lines' => [], 'cursor' => $cursor, 'reset' => false, 'scanned' => 0, 'partial' => false];
+            }
+        }
+
+        $backend = new Backend();
+        $response = trim($backend->configdpRun('reticulum logtail', [
+            $service, $lines, $cursor !== '' ? $cursor : '-', $level,
+            $search !== '' ? bin2hex($search) : '-', $mode
+        ]));
+        $data = json_decode($response, true);
+        return $data ?: ['lines' => [], 'cursor' => '', 'reset' => true];
+    }
+
+    /**
+     * GET api/reticulum/service/logsSearch
+     * Full-text search over the indexed rnsd/lxmd logs, including rotated
+     * and compressed archives. Filters: service (rnsd|lxmd|all), search
+     * text, maximum level, since/until (epoch seconds). Results are newest
+     * first and paged; has_more tells the client to offer the next page.
+     */
+    public function logsSearchAction()
+    {
+        $service = $this->request->get('service', 'string', 'all');
+        if (!in_array($service, ['rnsd', 'lxmd', 'all'], true)) {
+            $service = 'all';
+        }
+        $search = substr((string)$this->request->get('search', null, ''), 0, 200);
+        $level = (string)$this->request->get('level', 'string', '');
+        if (!preg_match('/^[0-7]$/', $level)) {
+            $level = '-';
+        }
+        $bounds = [];
+        foreach (['since', 'until'] as $key) {
+            $value = (string)$this->request->get($key, 'string', '');
+            $bounds[$key] = preg_match('/^\d{1,12}$/', $value) ? $value : '-';
+        }
+        $page = max((int)$this->request->get('page', 'int', 1), 1);
+        $limit = min(max((int)$this->request->get('limit', 'int', 50), 1), 200);
+
+        $backend = new Backend();
+        $response = trim($backend->configdpRun('reticulum logsearch', [
+            $service, $search !== '' ? bin2hex($search) : '-', $level,
+            $bounds['since'], $bounds['until'], $page, $limit
+        ]));
+        $data = json_decode($response, true);
+        return $data ?: ['rows' => [], 'page' => $page, 'limit' => $limit, 'has_more' => false];
+    }
 }
@@ -37,7 +37,65 @@ class Reticulum extends BaseModel
             ));
         }
 
-        // ── Interface type-specific required fields ──
+        // ── Transport instances ──
+        // Instances 1..N-1 take the ports interconnect_port+1 .. interconnect_port+2(N-1)
+        // for their shared instance / control ports, and forward to instance 0 over
+        // the interconnect, which only happens with transport enabled.
+        $instances = max(1, (int)(string)$this->general->transport_instances);
+        $interconnectPorts = [];
+        if ($instances > 1) {
+            $base = (int)(string)$this->general->interconnect_port;
+            if (empty((string)$this->general->interconnect_port)) {
+                $messages->appendMessage(new Message(
+                    "An interconnect port is required with more than one transport instance",
+                    "general.interconnect_port"
+                ));
+            } elseif ($base + 2 * ($instances - 1) > 65535) {
+                $messages->appendMessage(new Message(
+                    "Interconnect port leaves no room for the instance ports (needs " .
+                    (2 * ($instances - 1)) . " ports above it)",
+                    "general.interconnect_port"
+                ));
+            } else {
+                $interconnectPorts = range($base, $base + 2 * ($instances - 1));
+                if (in_array((int)$sip, $interconnectPorts, true) || in_array((int)$icp, $interconnectPorts, true)) {
+                    $messages->appendMessage(new Message(
+                        "Interconnect port range {$base}-" . end($interconnectPorts) .
+                        " overlaps the shared instance or instance control port",
+                        "general.interconnect_port"
+                    ));
+                }
+            }
+            if ((string)$this->general->enable_transport !== '1') {
+                $messages->appendMessage(new Message(
+                    "Transport must be enabled to forward between transport instances",
+                    "general.enable_transport"
+                ));
+            }
+        }
+
+        // ── Interface records ──
+        // Records are only re-checked when they changed, or when a general setting
+        // they are checked against did (or a full validation was requested), so
+        // saving the general or LXMF sections does not re-validate every interface.
+        $checkAll = $validateFullModel
+            || $this->general->transport_instances->isFieldChanged()
+            || $this->general->interconnect_port->isFieldChanged();
+        $this->validateInterfaces($messages, $instances, $interconnectPorts, $checkAll);
+
+        return $messages;
+    }
+
+    /**
+     * Validate interface records in a single indexed pass.
+     *
+     * Every record is indexed by name, TCP listen endpoint and serial device so
+     * that changed records are checked for collisions against all of them;
+     * per-record checks and collision messages are limited to records in scope
+     * (changed ones, or all of them with $checkAll).
+     */
+    private function validateInterfaces($messages, $instances, array $interconnectPorts, $checkAll)
+    {
         // The XML model shares one ArrayField for all 12 interface types, so type-specific
         // required fields cannot be declared Required=Y in the XML. Enforce them here so
         // the template never renders an empty value (e.g. "frequency = ") that would cause
@@ -52,12 +110,45 @@ class Reticulum extends BaseModel
             'AX25KISSInterface'   => ['port', 'callsign'],
             'PipeInterface'       => ['command'],
         ];
+        $tcpServerTypes = ['TCPServerInterface' => true, 'BackboneInterface' => true];
+        $serialTypes = ['RNodeInterface' => true, 'RNodeMultiInterface' => true, 'SerialInterface' => true,
+                        'KISSInterface' => true, 'AX25KISSInterface' => true];
+        $interconnectPorts = array_flip($interconnectPorts);
+        $loopbackIps = ['0.0.0.0' => true, '127.0.0.1' => true, '::' => true, '::1' => true, '' => true];
+
+        // Collision indexes: key => [uuid, ...] in record order.
+        // Duplicate names produce INI section collisions (last wins, silently dropping one),
+        // so names cover all interfaces regardless of enabled state. Duplicate TCP listen
+        // endpoints cause bind failures and duplicate serial ports device contention, which
+        // only enabled interfaces can cause.
+        $names = [];
+        $listenEndpoints = [];
+        $serialPorts = [];
+        $inScope = [];
+
         foreach ($this->interfaces->interface->iterateItems() as $uuid => $iface) {
+            $ifName = (string)$iface->name;
             $ifType = (string)$iface->type;
-            if (!isset($requiredByType[$ifType])) {
+            $enabled = (string)$iface->enabled === '1';
+            $listenPort = (string)$iface->listen_port;
+            $devPort = (string)$iface->port;
+
+            if ($ifName !== '') {
+                $names[$ifName][] = $uuid;
+            }
+            if ($enabled && isset($tcpServerTypes[$ifType]) && $listenPort !== '') {
+                $listenEndpoints[(string)$iface->listen_ip . ':' . $listenPort][] = $uuid;
+            }
+            if ($enabled && isset($serialTypes[$ifType]) && $devPort !== '') {
+                $serialPorts[$devPort][] = $uuid;
+            }
+
+            if (!$checkAll && !$this->recordChanged($iface)) {
                 continue;
             }
-            foreach ($requiredByType[$ifType] as $field) {
+            $inScope[$uuid] = true;
+
+            foreach ($requiredByType[$ifType] ?? [] as $field) {
                 if (empty((string)$iface->$field)) {
                     $messages->appendMessage(new Message(
                         "Field '{$field}' is required for interface type {$ifType}",
@@ -65,71 +156,84 @@ class Reticulum extends BaseModel
                     ));
                 }
             }
-        }
-
-        // ── Interface cross-record uniqueness checks ──
-        // Duplicate names produce INI section collisions (last wins, silently dropping one).
-        // Duplicate TCP listen endpoints cause bind failures at runtime.
-        // Duplicate serial ports cause device contention failures.
-        $namesSeen = [];
-        $tcpListenSeen = [];
-        $serialPortSeen = [];
-        $tcpServerTypes = ['TCPServerInterface', 'BackboneInterface'];
-        $serialTypes = ['RNodeInterface', 'RNodeMultiInterface', 'SerialInterface', 'KISSInterface', 'AX25KISSInterface'];
-
-        foreach ($this->interfaces->interface->iterateItems() as $uuid => $iface) {
-            $ifName = (string)$iface->name;
-            $ifType = (string)$iface->type;
-            $ifEnabled = (string)$iface->enabled;
 
-            // 1. Interface name uniqueness (all interfaces, regardless of enabled state,
-            //    because names become INI section headers in the config file)
-            if (!empty($ifName)) {
-                if (isset($namesSeen[$ifName])) {
-                    $messages->appendMessage(new Message(
-                        "Interface name '{$ifName}' is already used by another interface",
-                        "interfaces.interface.{$uuid}.name"
-                    ));
-                }
-                $namesSeen[$ifName] = true;
+            // The interconnect section is generated under this name
+            if ($instances > 1 && $ifName === 'Instance Interconnect') {
+                $messages->appendMessage(new Message(
+                    "Interface name 'Instance Interconnect' is reserved for the transport instance interconnect",
+                    "interfaces.interface.{$uuid}.name"
+                ));
             }
 
             // Skip disabled interfaces for resource-contention checks
-            if ($ifEnabled !== '1') {
+            if (!$enabled) {
                 continue;
             }
 
-            // 2. TCP listen IP+port uniqueness (enabled TCPServer/Backbone only)
-            if (in_array($ifType, $tcpServerTypes, true)) {
-                $listenIp = (string)$iface->listen_ip;
-                $listenPort = (string)$iface->listen_port;
-                if (!empty($listenPort)) {
-                    $key = $listenIp . ':' . $listenPort;
-                    if (isset($tcpListenSeen[$key])) {
-                        $messages->appendMessage(new Message(
-                            "Another enabled interface is already listening on {$key}",
-                            "interfaces.interface.{$uuid}.listen_port"
-                        ));
-                    }
-                    $tcpListenSeen[$key] = true;
-                }
+            // Assigned transport instance must be one of the configured instances
+            if ((int)(string)$iface->instance >= $instances) {
+                $messages->appendMessage(new Message(
+                    "Interface is assigned to instance {$iface->instance} but only {$instances} transport instance(s) are configured",
+                    "interfaces.interface.{$uuid}.instance"
+                ));
+            }
+
+            if (isset($tcpServerTypes[$ifType]) && isset($interconnectPorts[(int)$listenPort])
+                && isset($loopbackIps[(string)$iface->listen_ip])) {
+                $messages->appendMessage(new Message(
+                    "Port {$listenPort} is used by the transport instance interconnect",
+                    "interfaces.interface.{$uuid}.listen_port"
+                ));
             }
+        }
 
-            // 3. Serial port device uniqueness (enabled serial/radio types only)
-            if (in_array($ifType, $serialTypes, true)) {
-                $devPort = (string)$iface->port;
-                if (!empty($devPort)) {
-                    if (isset($serialPortSeen[$devPort])) {
-                        $messages->appendMessage(new Message(
-                            "Another enabled interface is already using device {$devPort}",
-                            "interfaces.interface.{$uuid}.port"
-                        ));
-                    }
-                    $serialPortSeen[$devPort] = true;
+        if (empty($inScope)) {
+            return;
+        }
+        $this->reportCollisions($messages, $names, $inScope, 'name',
+            "Interface name '%s' is already used by another interface");
+        $this->reportCollisions($messages, $listenEndpoints, $inScope, 'listen_port',
+            "Another enabled interface is already listening on %s");
+        $this->reportCollisions($messages, $serialPorts, $inScope, 'port',
+            "Another enabled interface is already using device %s");
+    }
+
+    /**
+     * Report in-scope records that share an index key with another record.
+     * When every holder of a key is in scope the first one keeps it (as with a
+     * full validation); otherwise each in-scope holder is reported, so a
+     * changed record colliding with an unchanged one is always flagged.
+     */
+    private function reportCollisions($messages, array $index, array $inScope, $field, $message)
+    {
+        foreach ($index as $key => $uuids) {
+            if (count($uuids) < 2) {
+                continue;
+            }
+            $allInScope = count(array_intersect_key(array_flip($uuids), $inScope)) === count($uuids);
+            foreach (array_slice($uuids, $allInScope ? 1 : 0) as $uuid) {
+                if (isset($inScope[$uuid])) {
+                    $messages->appendMessage(new Message(
+                        sprintf($message, $key),
+                        "interfaces.interface.{$uuid}.{$field}"
+                    ));
                 }
             }
         }
+    }
 
-        return $messages;
+    /**
+     * True when any field of an interface record was added or modified since
+     * the model was loaded (the same check BaseModel uses to pick the fields
+     * it validates).
+     */
+    private function recordChanged($iface)
+    {
+        foreach ($iface->iterateItems() as $field) {
+            if ($field->isFieldChanged()) {
+                return true;
+            }
+        }
+        return false;
     }
 }
@@ -0,0 +1,281 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Reticulum status collector.
+
+Long-lived companion process to rnsd (started by /usr/local/etc/rc.d/
+reticulum_collector). It polls the rnsd shared-instance RPC channel on a
+fixed schedule and atomically rewrites a JSON snapshot, so the configd
+`reticulum rnstatus` action only has to cat a small file instead of
+cold-starting rnstatus for every HTTP request. With several rnsd transport
+instances every instance is polled and the results merged (see
+instances.py). When --rrd is given, each
+sample also feeds the per-interface throughput series (see tsdb.py); when
+--metrics is given, each sample is also rendered as OpenMetrics text (see
+metrics.py) so Prometheus scrapes never touch rnsd. When --log-index is
+given, the rnsd/lxmd logs are fed into a full-text index every
+LOG_INDEX_INTERVAL seconds (see logindex.py). When --watchdog is given,
+the queries use a tight timeout and feed the RPC liveness watchdog, whose
+report (state, consecutive failures, latency percentiles) is written to
+that path (see watchdog.py). When --events is given, each sample is
+diffed against the previous one and the changes (service/interface state,
+counters every --events-counters seconds) are appended to the journal
+behind the status event stream (see events.py).
+
+Usage:
+    collector.py [--config DIR] [--snapshot PATH] [--interval SECONDS] [--rrd DIR]
+                 [--metrics PATH] [--lxmf-config DIR] [--log-index PATH]
+                 [--watchdog PATH [--watchdog-failures N] [--watchdog-restart]]
+                 [--events PATH [--events-counters SECONDS]]
+    collector.py --once      # query once and print the snapshot to stdout
+"""
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import sys
+import tempfile
+import time
+
+import events
+import instances
+import logindex
+import metrics
+import rnsrpc
+import tsdb
+import watchdog
+
+DEFAULT_SNAPSHOT = "/var/run/reticulum/status.json"
+DEFAULT_INTERVAL = 5
+PRUNE_INTERVAL = 3600
+# Walking the LXMF message store is the one non-trivial cost per sample
+STORE_INTERVAL = 60
+LOG_INDEX_INTERVAL = 15
+
+
+def write_atomic(path: str, payload):
+    """
+    Write payload to path via a same-directory temp file + rename. Dicts are
+    serialised as JSON, strings are written as-is.
+    """
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(prefix=".status.", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            if isinstance(payload, str):
+                fh.write(payload)
+            else:
+                json.dump(payload, fh, separators=(",", ":"))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class Collector:
+    """Polls rnsd and maintains the on-disk status snapshot."""
+
+    def __init__(self, config_dir: str, snapshot_path: str, interval: float,
+                 quiet: bool = False, rrd_dir: str = None, metrics_path: str = None,
+                 lxmf_config: str = metrics.LXMF_CONFIG_DIR, log_index: str = None,
+                 liveness_path: str = None, watchdog_failures: int = watchdog.DEFAULT_FAILURES,
+                 watchdog_restart: bool = False, events_path: str = None,
+                 events_counters: float = events.DEFAULT_COUNTER_INTERVAL):
+        self.config_dir = config_dir
+        self.clients = {}          # RpcClient per transport instance config dir
+        self.snapshot_path = snapshot_path
+        self.interval = max(1.0, float(interval))
+        self.traffic = tsdb.TrafficStore(rrd_dir) if rrd_dir else None
+        self.metrics_path = metrics_path
+        self.store_path = metrics.message_store_path(lxmf_config)
+        self._running = True
+        self._reachable = None
+        self._last_prune = 0.0
+        self._store = None
+        self._last_store = 0.0
+        self.log_index_path = log_index
+        self.log_index = None
+        self._last_index = 0.0
+        self.quiet = quiet
+        self.liveness_path = liveness_path
+        self.watchdog = watchdog.Watchdog(watchdog_failures, watchdog_restart,
+                                          log=self._log) if liveness_path else None
+        self.rpc_timeout = self.watchdog.timeout if self.watchdog else rnsrpc.DEFAULT_TIMEOUT
+        self._report = {}
+        self.events_path = events_path
+        self.events = events.EventFeed(events_path, events_counters) if events_path else None
+
+    def collect(self) -> dict:
+        """Take one sample. Never raises for an unreachable rnsd."""
+        try:
+            results = instances.query(self.config_dir, self.clients, self.rpc_timeout)
+            if self.watchdog is not None:
+                self._update_watchdog(results)
+            snapshot = instances.merge_results(results)
+            reachable = True
+            if self.traffic is not None:
+                self._record_traffic(snapshot)
+        except rnsrpc.RpcError as exc:
+            snapshot = rnsrpc.unreachable()
+            reachable = False
+            reason = str(exc)
+        if reachable != self._reachable:
+            # Log transitions only — a stopped rnsd must not flood the log
+            # with one line per interval.
+            if reachable:
+                self._log("rnsd reachable, collecting status")
+            else:
+                self._log(f"{reason}; will keep retrying")
+            self._reachable = reachable
+        return snapshot
+
+    def _record_traffic(self, snapshot: dict):
+        try:
+            self.traffic.update(snapshot)
+            now = time.time()
+            if now - self._last_prune > PRUNE_INTERVAL:
+                self.traffic.prune(now)
+                self._last_prune = now
+        except OSError as exc:
+            # Series storage problems must never stop status collection.
+            self._log(f"cannot update traffic series: {exc}")
+
+    def _update_watchdog(self, results: list):
+        try:
+            self._report = self.watchdog.observe(results)
+            write_atomic(self.liveness_path, self._report)
+        except OSError as exc:
+            self._log(f"cannot write liveness report: {exc}")
+
+    def _write_metrics(self, snapshot: dict):
+        now = time.monotonic()
+        if not self._last_store or now - self._last_store >= STORE_INTERVAL:
+            self._store = metrics.message_store_usage(self.store_path)
+            self._last_store = now
+        text = metrics.render(snapshot, metrics.process_stats(), self._store)
+        write_atomic(self.metrics_path, text)
+
+    def _update_log_index(self):
+        now = time.monotonic()
+        if self._last_index and now - self._last_index < LOG_INDEX_INTERVAL:
+            return
+        self._last_index = now
+        try:
+            if self.log_index is None:
+                self.log_index = logindex.LogIndex(self.log_index_path)
+            self.log_index.update()
+        except (OSError, sqlite3.Error) as exc:
+            # Indexing problems must never stop status collection.
+            self._log(f"cannot update log index: {exc}")
+
+    def _update_events(self, snapshot: dict):
+        try:
+            self.events.update(snapshot, events.service_states(self._report))
+        except OSError as exc:
+            # A broken event journal only costs the GUI its push updates.
+            self._log(f"cannot update event journal: {exc}")
+
+    def tick(self):
+        """Take one sample and rewrite the snapshot (and metrics, if enabled)."""
+        snapshot = self.collect()
+        try:
+            write_atomic(self.snapshot_path, snapshot)
+            if self.metrics_path:
+                self._write_metrics(snapshot)
+        except OSError as exc:
+            self._log(f"cannot write snapshot: {exc}")
+        if self.events is not None:
+            self._update_events(snapshot)
+        if self.log_index_path:
+            self._update_log_index()
+
+    def stop(self, *_args):
+        self._running = False
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self._log(f"started (interval {self.interval:g}s, snapshot {self.snapshot_path})")
+        while self._running:
+            started = time.monotonic()
+            self.tick()
+            # Sleep in short slices so SIGTERM is honoured promptly.
+            deadline = started + self.interval
+            while self._running and time.monotonic() < deadline:
+                time.sleep(min(0.5, max(0.0, deadline - time.monotonic())))
+        if self.traffic is not None:
+            try:
+                self.traffic.flush()
+            except OSError:
+                pass
+        if self.log_index is not None:
+            self.log_index.close()
+        for path in (self.snapshot_path, self.metrics_path, self.liveness_path,
+                     self.events_path):
+            try:
+                if path:
+                    os.unlink(path)
+            except OSError:
+                pass
+        self._log("stopped")
+
+    def _log(self, message: str):
+        if self.quiet:
+            return
+        print(f"{time.strftime('[%Y-%m-%d %H:%M:%S]')} [collector] {message}", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum status collector")
+    parser.add_argument("--config", default=rnsrpc.DEFAULT_CONFIG_DIR,
+                        help="rnsd config directory")
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT,
+                        help="snapshot file to maintain")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help="seconds between samples")
+    parser.add_argument("--rrd", default=None,
+                        help="directory for per-interface traffic series")
+    parser.add_argument("--metrics", default=None,
+                        help="OpenMetrics text file to maintain")
+    parser.add_argument("--lxmf-config", default=metrics.LXMF_CONFIG_DIR,
+                        help="lxmd config directory (message store size)")
+    parser.add_argument("--log-index", default=None,
+                        help="SQLite full-text index of the rnsd/lxmd logs to maintain")
+    parser.add_argument("--watchdog", default=None,
+                        help="RPC liveness report to maintain (enables the watchdog)")
+    parser.add_argument("--watchdog-failures", type=int, default=watchdog.DEFAULT_FAILURES,
+                        help="consecutive failed queries before rnsd is degraded")
+    parser.add_argument("--watchdog-restart", action="store_true",
+                        help="kill a degraded supervised rnsd so its supervisor restarts it")
+    parser.add_argument("--events", default=None,
+                        help="status change journal to maintain (feeds the event stream)")
+    parser.add_argument("--events-counters", type=float,
+                        default=events.DEFAULT_COUNTER_INTERVAL,
+                        help="seconds between traffic counter events")
+    parser.add_argument("--once", action="store_true",
+                        help="print a single snapshot to stdout and exit")
+    args = parser.parse_args(argv)
+
+    collector = Collector(args.config, args.snapshot, args.interval, quiet=args.once,
+                          rrd_dir=None if args.once else args.rrd,
+                          metrics_path=None if args.once else args.metrics,
+                          lxmf_config=args.lxmf_config,
+                          log_index=None if args.once else args.log_index,
+                          liveness_path=None if args.once else args.watchdog,
+                          watchdog_failures=args.watchdog_failures,
+                          watchdog_restart=args.watchdog_restart,
+                          events_path=None if args.once else args.events,
+                          events_counters=args.events_counters)
+    if args.once:
+        print(json.dumps(collector.collect(), separators=(",", ":")))
+        return 0
+    collector.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
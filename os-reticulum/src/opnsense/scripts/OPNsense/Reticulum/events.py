@@ -0,0 +1,295 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Status change feed behind the Server-Sent Events stream.
+
+The collector diffs every sample against the previous one (EventFeed) and
+appends only what changed to a small JSON-lines journal:
+
+  service    rnsd/lxmd state changes ({"rnsd": "degraded"})
+  interface  interfaces that came up, went down, changed or vanished
+             ({"interfaces": [{...full interface..., "status": "up"}, ...]},
+             vanished ones as {"name": ..., "status": "removed"})
+  counters   traffic counters of the interfaces whose counters moved, at
+             most once per counter interval (--events-counters)
+
+Each journal line is {"id": N, "event": ..., "data": {...}}; ids are
+millisecond timestamps and strictly increasing, so they double as SSE
+event ids. The journal is trimmed to the newest KEEP_EVENTS lines via
+rename once it grows past MAX_BYTES.
+
+`events.py stream [LAST_ID]` (the configd `reticulum events` action) turns
+the journal into an SSE response: a full `state` event first (unless the
+client resumes with a Last-Event-ID that is still covered by the journal,
+in which case the missed events are replayed instead), then new events as
+the collector appends them, with keep-alive comments in between. The
+stream ends after STREAM_SECONDS; EventSource reconnects transparently and
+resumes from its last id.
+
+Usage:
+    events.py stream [LAST_ID|new]    # SSE stream (configd)
+    events.py state                   # current state as JSON
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import runtime
+
+DEFAULT_PATH = "/var/run/reticulum/events.jsonl"
+DEFAULT_COUNTER_INTERVAL = 15
+MAX_BYTES = 256 * 1024
+KEEP_EVENTS = 500
+STREAM_SECONDS = 300
+KEEPALIVE = 15
+POLL_INTERVAL = 0.5
+RETRY_MS = 3000
+# Interface fields whose change is an `interface` event; counters and
+# rates go out as `counters` events at their own cadence
+INTERFACE_KEYS = ("status", "type", "mode", "ifac_netname", "instance")
+COUNTER_KEYS = ("tx_bytes", "rx_bytes", "tx_rate", "rx_rate", "clients", "held_announces")
+
+
+def service_states(report: dict = None, procs: dict = None) -> dict:
+    """
+    rnsd/lxmd state as shown by the dashboard: running, stopped, or (rnsd)
+    degraded when the liveness watchdog has given up on instance 0. Read
+    from the process watcher's status file like the status endpoints.
+    """
+    procs = runtime.process_states() if procs is None else procs
+    states = {name: runtime.service_status(name, procs) for name in runtime.PIDFILES}
+    degraded = {entry.get("instance") for entry in (report or {}).get("instances", [])
+                if entry.get("state") == "degraded"}
+    if states["rnsd"] == "running" and 0 in degraded:
+        states["rnsd"] = "degraded"
+    return states
+
+
+def read_events(path: str) -> list:
+    """All journal entries, oldest first ([] if there is no journal)."""
+    events = []
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(event, dict) and isinstance(event.get("id"), int):
+                    events.append(event)
+    except OSError:
+        pass
+    return events
+
+
+class EventFeed:
+    """Turns successive collector samples into delta events on disk."""
+
+    def __init__(self, path: str = DEFAULT_PATH,
+                 counter_interval: float = DEFAULT_COUNTER_INTERVAL):
+        self.path = path
+        self.counter_interval = max(1.0, float(counter_interval))
+        self._services = {}
+        self._interfaces = None      # name -> INTERFACE_KEYS tuple; None before the first sample
+        self._counters = {}          # name -> COUNTER_KEYS tuple at the last counters event
+        self._last_counters = 0.0
+        existing = read_events(path)
+        self._last_id = existing[-1]["id"] if existing else 0
+
+    def update(self, snapshot: dict, services: dict, now: float = None) -> list:
+        """Diff one sample against the previous one; append and return its events."""
+        now = time.time() if now is None else now
+        events = []
+        changed = {name: state for name, state in services.items()
+                   if self._services.get(name) != state}
+        self._services = dict(services)
+        if changed:
+            events.append(("service", changed))
+        # An unreachable rnsd says nothing about its interfaces: the service
+        # event already tells clients, and the next good sample is diffed
+        # against the last known interface state.
+        if "error" not in snapshot:
+            current = {iface["name"]: iface for iface in snapshot.get("interfaces", [])
+                       if iface.get("name")}
+            interfaces = self._diff_interfaces(current)
+            if interfaces:
+                events.append(("interface", {"interfaces": interfaces}))
+            if now - self._last_counters >= self.counter_interval:
+                counters = self._diff_counters(snapshot, current)
+                self._last_counters = now
+                if counters:
+                    events.append(("counters", counters))
+        return self._append(events, now)
+
+    def _diff_interfaces(self, current: dict) -> list:
+        previous = self._interfaces or {}
+        self._interfaces = {name: tuple(iface.get(key) for key in INTERFACE_KEYS)
+                            for name, iface in current.items()}
+        changes = [dict(iface) for name, iface in current.items()
+                   if previous.get(name) != self._interfaces[name]]
+        changes += [{"name": name, "status": "removed"}
+                    for name in previous if name not in current]
+        return changes
+
+    def _diff_counters(self, snapshot: dict, current: dict) -> dict:
+        moved = {}
+        counters = {}
+        for name, iface in current.items():
+            values = tuple(iface.get(key) for key in COUNTER_KEYS)
+            counters[name] = values
+            if self._counters.get(name) != values:
+                moved[name] = dict(zip(COUNTER_KEYS, values))
+        self._counters = counters
+        if not moved:
+            return {}
+        return {"interfaces": moved, "tx_bytes": snapshot.get("tx_bytes", 0),
+                "rx_bytes": snapshot.get("rx_bytes", 0)}
+
+    def _append(self, events: list, now: float) -> list:
+        entries = []
+        for event, data in events:
+            self._last_id = max(self._last_id + 1, int(now * 1000))
+            entries.append({"id": self._last_id, "event": event, "data": data})
+        if not entries:
+            return entries
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "a", encoding="utf-8") as fh:
+            for entry in entries:
+                fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            size = fh.tell()
+        if size > MAX_BYTES:
+            self._trim()
+        return entries
+
+    def _trim(self):
+        """Keep the newest KEEP_EVENTS lines; the rename tells tailing readers to reopen."""
+        kept = read_events(self.path)[-KEEP_EVENTS:]
+        fd, tmp_path = tempfile.mkstemp(prefix=".events.", dir=os.path.dirname(self.path) or ".")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                for entry in kept:
+                    fh.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+
+def current_state() -> dict:
+    """Payload of the initial `state` event: everything a client renders."""
+    report = runtime.liveness()
+    services = service_states(report)
+    status = (runtime.load_status() if services["rnsd"] != "stopped"
+              else {"error": "rnsd not running", "interfaces": []})
+    return {"services": services, "rnstatus": status}
+
+
+def frame(event: str, data, event_id: int = None) -> str:
+    """One SSE frame."""
+    lines = [f"id: {event_id}"] if event_id is not None else []
+    lines += [f"event: {event}", "data: " + json.dumps(data, separators=(",", ":"))]
+    return "\n".join(lines) + "\n\n"
+
+
+class _Tail:
+    """Reads journal entries newer than the last one it returned."""
+
+    def __init__(self, path: str, last_id: int):
+        self.path = path
+        self.last_id = last_id
+        self._fh = None
+        self._inode = None
+        self._partial = ""
+
+    def read(self) -> list:
+        try:
+            inode = os.stat(self.path).st_ino
+        except OSError:
+            return []
+        if inode != self._inode:
+            # First read, or the journal was trimmed/recreated: start over
+            # and rely on the ids to skip what was already sent.
+            self.close()
+            try:
+                self._fh = open(self.path, encoding="utf-8")
+            except OSError:
+                return []
+            self._inode = inode
+        entries = []
+        chunk = self._partial + self._fh.read()
+        lines = chunk.split("\n")
+        self._partial = lines.pop()
+        for line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict) and isinstance(entry.get("id"), int) \
+                    and entry["id"] > self.last_id:
+                entries.append(entry)
+                self.last_id = entry["id"]
+        return entries
+
+    def close(self):
+        if self._fh is not None:
+            self._fh.close()
+        self._fh = None
+        self._partial = ""
+
+
+def stream(path: str = DEFAULT_PATH, last_id: int = None, seconds: float = STREAM_SECONDS,
+           out=None, state=current_state, clock=time.monotonic, sleep=time.sleep):
+    """Write an SSE stream of the journal to out until seconds pass or the client goes away."""
+    out = out or sys.stdout
+    journal = read_events(path)
+    newest = journal[-1]["id"] if journal else 0
+    # Resume only if nothing after last_id can have been trimmed away
+    resume = last_id is not None and bool(journal) and last_id >= journal[0]["id"]
+    tail = _Tail(path, last_id if resume else newest)
+    try:
+        out.write(f"retry: {RETRY_MS}\n\n")
+        if not resume:
+            out.write(frame("state", state(), newest or None))
+        out.flush()
+        deadline = clock() + seconds
+        quiet_since = clock()
+        while clock() < deadline:
+            entries = tail.read()
+            for entry in entries:
+                out.write(frame(entry.get("event", "message"), entry.get("data"), entry["id"]))
+            if entries:
+                quiet_since = clock()
+            elif clock() - quiet_since >= KEEPALIVE:
+                out.write(": keep-alive\n\n")
+                quiet_since = clock()
+            out.flush()
+            sleep(POLL_INTERVAL)
+    except BrokenPipeError:
+        pass
+    finally:
+        tail.close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum status change stream")
+    parser.add_argument("command", choices=["stream", "state"])
+    parser.add_argument("last_id", nargs="?", default="",
+                        help="Last-Event-ID the client resumes from")
+    parser.add_argument("--journal", default=DEFAULT_PATH, help="event journal")
+    args = parser.parse_args(argv)
+
+    if args.command == "state":
+        print(json.dumps(current_state(), separators=(",", ":")))
+        return 0
+    stream(args.journal, int(args.last_id) if args.last_id.isdigit() else None)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Import-time profile of the Reticulum entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh venv
+interpreter for each target and reports the total import time and the
+slowest imports, so cold-start regressions across RNS/LXMF upgrades can be
+measured. Only the import is timed; no daemon or CLI main() runs.
+
+    rnsd       RNS.Utilities.rnsd       (rnsd console script)
+    lxmd       LXMF.Utilities.lxmd      (lxmd console script)
+    rnstatus   RNS.Utilities.rnstatus   (rnstatus console script)
+    collector  collector                (rnstatus.sh one-shot query)
+
+The interpreter runs with -B so the profile never writes bytecode: it
+shows what the reticulum user sees, including missing __pycache__.
+
+Usage:
+    importtime.py [--target NAME ...] [--top N]
+
+Prints {"targets": {name: {"module", "total_ms", "wall_ms", "imports",
+"slowest": [{"module", "self_ms", "cumulative_ms"}, ...]}}}, slowest by
+self time; a target that fails to import also carries "error".
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+PYTHON = "/usr/local/reticulum-venv/bin/python3.11"
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGETS = {
+    "rnsd": "RNS.Utilities.rnsd",
+    "lxmd": "LXMF.Utilities.lxmd",
+    "rnstatus": "RNS.Utilities.rnstatus",
+    "collector": "collector",
+}
+DEFAULT_TOP = 15
+TIMEOUT = 60
+
+
+def parse(stderr: str) -> list:
+    """
+    Rows of `-X importtime` output as (module, self_us, cumulative_us, depth).
+    Depth counts the two-space indent of the package column.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip(" ")
+        rows.append((stripped, int(fields[0]), int(fields[1]),
+                     (len(name) - len(stripped) - 1) // 2))
+    return rows
+
+
+def summarise(rows: list, module: str, top: int = DEFAULT_TOP) -> dict:
+    # The target's own row is its total; without it (failed import) fall
+    # back to the sum of all top-level imports.
+    total = next((cum for name, _self, cum, _depth in rows if name == module), None)
+    if total is None:
+        total = sum(cum for _name, _self, cum, depth in rows if depth == 0)
+    slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:top]
+    return {
+        "module": module,
+        "total_ms": round(total / 1000, 1),
+        "imports": len(rows),
+        "slowest": [{"module": name, "self_ms": round(self_us / 1000, 1),
+                     "cumulative_ms": round(cum / 1000, 1)}
+                    for name, self_us, cum, _depth in slowest],
+    }
+
+
+def profile(module: str, python: str = None, top: int = DEFAULT_TOP) -> dict:
+    env = dict(os.environ, PYTHONPATH=SCRIPTS_DIR)
+    started = time.monotonic()
+    try:
+        proc = subprocess.run([python or PYTHON, "-B", "-X", "importtime", "-c", f"import {module}"],
+                              capture_output=True, text=True, timeout=TIMEOUT, env=env)
+    except (OSError, subprocess.SubprocessError) as exc:
+        return {"module": module, "error": str(exc)}
+    result = summarise(parse(proc.stderr), module, top)
+    result["wall_ms"] = round((time.monotonic() - started) * 1000, 1)
+    if proc.returncode != 0:
+        lines = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        result["error"] = lines[-1] if lines else f"exit code {proc.returncode}"
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import-time profile of Reticulum entry points")
+    parser.add_argument("--target", action="append", choices=sorted(TARGETS),
+                        help="target to profile (repeatable; default all)")
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP)
+    args = parser.parse_args(argv)
+
+    names = args.target or list(TARGETS)
+    top = max(args.top, 1)
+    print(json.dumps({"targets": {name: profile(TARGETS[name], top=top) for name in names}},
+                     separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+"""
+Extra rnsd transport instances.
+
+rnsd is a single Python process, so with general.transport_instances > 1
+the plugin runs one rnsd per instance to spread packet forwarding over
+several cores. Instance 0 is the regular rnsd in the main config dir; each
+extra instance N has its own config dir, pidfile and supervisor state:
+
+    config      <config dir>/instance-N/config
+    pidfile     /var/run/rnsd-N.pid
+    supervisor  <state dir>/rnsd-N.json
+    log         /var/log/reticulum/rnsd-N.log
+
+Instance 0 listens on the "Instance Interconnect" TCPServerInterface at
+127.0.0.1:interconnect_port and every other instance connects to it, so
+transport forwards between interfaces of different instances.
+
+The templates render a config for every possible instance; unused ones
+contain only a comment, so the configured instances are the consecutive
+instance-N dirs whose config has a [reticulum] section.
+
+This module finds those instances and merges their status into the single
+rnstatus snapshot the GUI, the collector and the metrics consume.
+"""
+import os
+import time
+
+import rnsrpc
+
+MAX_INSTANCES = 4
+INTERCONNECT = "Instance Interconnect"
+PIDFILE = "/var/run/rnsd.pid"
+
+
+def service_name(number: int) -> str:
+    """rc.d / supervisor name of an instance: rnsd, rnsd-1, rnsd-2, ..."""
+    return "rnsd" if number == 0 else f"rnsd-{number}"
+
+
+def pidfile(number: int) -> str:
+    return PIDFILE if number == 0 else f"/var/run/{service_name(number)}.pid"
+
+
+def config_dirs(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR) -> list:
+    """Config dir of every configured instance, indexed by instance number."""
+    dirs = [config_dir]
+    for number in range(1, MAX_INSTANCES):
+        path = os.path.join(config_dir, f"instance-{number}")
+        if not rnsrpc.read_reticulum_section(os.path.join(path, "config")):
+            break
+        dirs.append(path)
+    return dirs
+
+
+def merge(snapshots: list) -> dict:
+    """
+    Merge normalised per-instance snapshots (index = instance number) into
+    one rnstatus snapshot.
+
+    A single instance is returned unchanged. Otherwise interfaces are
+    concatenated and tagged with their instance, byte counters and RSS are
+    summed, identity and uptime come from the first reachable instance
+    (normally 0), and "instances" lists each instance's own state. The
+    interconnect client of instances 1..N is left out of the interface list:
+    instance 0 already reports the link, and the duplicate name would mix
+    two counters in one traffic series.
+    """
+    if len(snapshots) == 1:
+        return snapshots[0]
+    reachable = [snap for snap in snapshots if "error" not in snap]
+    if not reachable:
+        return dict(snapshots[0], instances=[
+            {"instance": number, "error": snap["error"]} for number, snap in enumerate(snapshots)
+        ])
+
+    merged = dict(reachable[0], interfaces=[], tx_bytes=0, rx_bytes=0, rss=None, instances=[])
+    for number, snap in enumerate(snapshots):
+        entry = {"instance": number}
+        if "error" in snap:
+            entry["error"] = snap["error"]
+            merged["instances"].append(entry)
+            continue
+        interfaces = [dict(iface, instance=number) for iface in snap.get("interfaces", [])
+                      if number == 0 or iface.get("name") != INTERCONNECT]
+        merged["interfaces"] += interfaces
+        merged["tx_bytes"] += snap.get("tx_bytes", 0)
+        merged["rx_bytes"] += snap.get("rx_bytes", 0)
+        if snap.get("rss") is not None:
+            merged["rss"] = (merged["rss"] or 0) + snap["rss"]
+        entry.update(identity=snap.get("identity", ""), uptime=snap.get("uptime", ""),
+                     interfaces=len(interfaces))
+        merged["instances"].append(entry)
+    merged["collected_at"] = max(snap.get("collected_at", 0) for snap in snapshots)
+    return merged
+
+
+def query(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR, clients: dict = None,
+          timeout: float = rnsrpc.DEFAULT_TIMEOUT) -> list:
+    """
+    Query every configured instance once. Returns one (snapshot, seconds,
+    error) tuple per instance: the normalised snapshot (or the unreachable
+    payload), the RPC round-trip time and the RpcError, if any. `clients`
+    caches one RpcClient per config dir between calls.
+    """
+    clients = {} if clients is None else clients
+    results = []
+    for path in config_dirs(config_dir):
+        if path not in clients:
+            clients[path] = rnsrpc.RpcClient(path, timeout)
+        started = time.monotonic()
+        try:
+            stats = clients[path].interface_stats()
+        except rnsrpc.RpcError as exc:
+            results.append((rnsrpc.unreachable(str(exc)), time.monotonic() - started, exc))
+            continue
+        results.append((rnsrpc.normalise_stats(stats), time.monotonic() - started, None))
+    return results
+
+
+def collect(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR, clients: dict = None) -> dict:
+    """
+    Query every configured instance and return the merged snapshot. Raises
+    rnsrpc.RpcError only when no instance can be reached.
+    """
+    return merge_results(query(config_dir, clients))
+
+
+def merge_results(results: list) -> dict:
+    """merge() for query() results; raises the first error if every instance failed."""
+    errors = [error for _snap, _seconds, error in results if error is not None]
+    if len(errors) == len(results):
+        raise errors[0]
+    return merge([snap for snap, _seconds, _error in results])
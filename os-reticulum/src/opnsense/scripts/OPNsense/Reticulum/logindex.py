@@ -0,0 +1,379 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+SQLite full-text index over the rnsd and lxmd logs, including rotated archives.
+
+The collector calls LogIndex.update() periodically. Each pass reads a
+bounded amount of new log data, parses RNS lines ("[YYYY-mm-dd HH:MM:SS]
+[Level] message") into (timestamp, level, message) rows and adds them to an
+FTS5 index, so searches over weeks of logs answer in milliseconds instead
+of scanning text files.
+
+Files are tracked by a fingerprint of their first line rather than by name
+or inode: when newsyslog renames rnsd.log to rnsd.log.0 indexing continues
+at the stored offset, and when .0 is later gzipped to .1.gz the already
+complete source is recognised and skipped. Archives that were never seen
+(e.g. on first start) are stream-decompressed and indexed once. Sources
+whose files have been expired by newsyslog are dropped from the index, so
+it never covers more than the live log plus the retained archives.
+
+Usage:
+    logindex.py search [--service S] [--query HEX] [--level N] [--since TS]
+                       [--until TS] [--page N] [--limit N] [--db PATH]
+    logindex.py update [--db PATH]     # one indexing pass (normally done by the collector)
+"""
+import argparse
+import bz2
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import sqlite3
+import sys
+import time
+import zlib
+
+import logtail
+
+DEFAULT_DB = "/var/db/reticulum/logindex.db"
+# Bytes of log data consumed per update() call; the initial catch-up over
+# all archives is spread across several collector passes. A single line
+# longer than this is skipped rather than indexed.
+PASS_BUDGET = 4 * 1024 * 1024
+FINGERPRINT_BYTES = 512
+MAX_LIMIT = 200
+ARCHIVE_OPENERS = {
+    "": open,
+    ".gz": gzip.open,
+    ".bz2": bz2.open,
+    ".xz": lzma.open,
+}
+DECOMPRESS_ERRORS = (OSError, EOFError, zlib.error, lzma.LZMAError)
+LINE_RE = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]\s+\[(\w+)\]\s*(.*)$")
+LEVEL_LABELS = ("Critical", "Error", "Warning", "Notice", "Info", "Verbose", "Debug", "Extra")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    service TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    offset INTEGER NOT NULL DEFAULT 0,
+    complete INTEGER NOT NULL DEFAULT 0,
+    UNIQUE (service, fingerprint)
+);
+CREATE TABLE IF NOT EXISTS lines (
+    id INTEGER PRIMARY KEY,
+    source_id INTEGER NOT NULL,
+    service TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    level INTEGER,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS lines_ts ON lines (ts);
+CREATE INDEX IF NOT EXISTS lines_source ON lines (source_id);
+"""
+
+# External-content FTS5 table kept in sync with `lines` by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS lines_fts
+    USING fts5(message, content='lines', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS lines_ai AFTER INSERT ON lines BEGIN
+    INSERT INTO lines_fts (rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS lines_ad AFTER DELETE ON lines BEGIN
+    INSERT INTO lines_fts (lines_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+"""
+
+
+def fts_query(text: str) -> str:
+    """
+    Turn free text into an FTS5 query: every word becomes a quoted phrase
+    (so operators and punctuation are literal), words are AND-ed, and a
+    trailing * keeps its prefix-match meaning.
+    """
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*") if prefix else word
+        terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def parse_line(line: str, previous: tuple):
+    """
+    Return (ts, level, message) for a log line. Untagged continuation lines
+    (tracebacks) inherit the timestamp and level of the preceding entry.
+    """
+    match = LINE_RE.match(line)
+    if match is None:
+        return previous[0], previous[1], line
+    try:
+        ts = int(time.mktime(time.strptime(match.group(1), "%Y-%m-%d %H:%M:%S")))
+    except ValueError:
+        ts = previous[0]
+    return ts, logtail.LEVEL_NAMES.get(match.group(2).lower()), match.group(3)
+
+
+def _fingerprint(path: str, opener) -> str:
+    """
+    Hash of the first line (at most FINGERPRINT_BYTES of it), or None while
+    the file has no complete line.
+    """
+    with opener(path, "rb") as fh:
+        head = fh.read(FINGERPRINT_BYTES)
+    cut = head.find(b"\n")
+    if cut < 0:
+        if len(head) < FINGERPRINT_BYTES:
+            return None
+        cut = len(head)
+    return hashlib.sha1(head[:cut]).hexdigest()[:16]
+
+
+class LogIndex:
+    """Incrementally maintained FTS index of the Reticulum service logs."""
+
+    def __init__(self, path: str = DEFAULT_DB, log_dir: str = None, readonly: bool = False):
+        self.path = path
+        self.log_dir = log_dir or logtail.LOG_DIR
+        if readonly:
+            # Searches run as root via configd: never create or migrate the
+            # database (root-owned -wal/-shm files would lock out the
+            # collector, which writes as the reticulum user). Without a -wal
+            # file the collector is not running and everything is in the main
+            # file, so open it immutable to avoid creating a -shm file.
+            uri = f"file:{path}?mode=ro"
+            if not os.path.exists(path + "-wal"):
+                uri += "&immutable=1"
+            self.db = sqlite3.connect(uri, uri=True, timeout=5)
+            self.fts = self.db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'lines_fts'"
+            ).fetchone() is not None
+            return
+        self.db = sqlite3.connect(path, timeout=5)
+        # WAL lets configd searches read while the collector writes
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(SCHEMA)
+        try:
+            self.db.executescript(FTS_SCHEMA)
+            self.fts = True
+        except sqlite3.OperationalError:
+            # SQLite built without FTS5: searches fall back to LIKE
+            self.fts = False
+        self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+    def _candidates(self, service: str):
+        """(path, opener, archived) for every log file of a service, oldest first."""
+        base = os.path.join(self.log_dir, f"{service}.log")
+        files = []
+        for index in reversed(range(logtail.ROTATIONS)):
+            for suffix, opener in ARCHIVE_OPENERS.items():
+                path = f"{base}.{index}{suffix}"
+                if os.path.exists(path):
+                    files.append((path, opener, True))
+        if os.path.exists(base):
+            files.append((base, open, False))
+        return files
+
+    def _source(self, service: str, fingerprint: str):
+        self.db.execute(
+            "INSERT OR IGNORE INTO sources (service, fingerprint) VALUES (?, ?)",
+            (service, fingerprint),
+        )
+        return self.db.execute(
+            "SELECT id, offset, complete FROM sources WHERE service = ? AND fingerprint = ?",
+            (service, fingerprint),
+        ).fetchone()
+
+    def update(self, budget: int = None) -> int:
+        """Run one indexing pass. Returns the number of log bytes consumed."""
+        budget = budget or PASS_BUDGET
+        pending = []
+        seen = set()
+        for service in logtail.SERVICES:
+            for path, opener, archived in self._candidates(service):
+                try:
+                    fingerprint = _fingerprint(path, opener)
+                except DECOMPRESS_ERRORS:
+                    continue
+                if fingerprint is None:
+                    continue
+                source_id, offset, complete = self._source(service, fingerprint)
+                seen.add(source_id)
+                if not complete:
+                    pending.append((service, path, opener, archived, source_id, offset))
+        self._prune(seen)
+
+        used = 0
+        for service, path, opener, archived, source_id, offset in pending:
+            if used >= budget:
+                break
+            try:
+                used += self._consume(service, path, opener, archived, source_id,
+                                      offset, budget - used, whole_pass=not used)
+            except DECOMPRESS_ERRORS:
+                # Unreadable or corrupt archive: skip it on later passes too
+                self.db.execute("UPDATE sources SET complete = 1 WHERE id = ?", (source_id,))
+        self.db.commit()
+        return used
+
+    def _consume(self, service, path, opener, archived, source_id, offset, budget,
+                 whole_pass=False) -> int:
+        with opener(path, "rb") as fh:
+            inside = False
+            if offset:
+                # Not at a line start: inside a line too long to index (below)
+                fh.seek(offset - 1)
+                inside = fh.read(1) != b"\n"
+            data = fh.read(budget)
+            at_eof = not fh.read(1)
+        start = 0
+        if inside:
+            # Skip the rest of it; all of data if its newline is still ahead
+            start = data.find(b"\n") + 1 or len(data)
+        if archived and at_eof:
+            # Archives no longer grow: index a missing final newline too
+            end = len(data)
+        else:
+            end = max(data.rfind(b"\n") + 1, start)
+        if not end and whole_pass and len(data) == budget:
+            # One line longer than a whole pass would hold the offset in
+            # place for good: skip it, as logtail.read_from skips to the
+            # next line boundary when its read bound is exceeded.
+            start = end = len(data)
+        if end > start:
+            previous = self.db.execute(
+                "SELECT ts, level FROM lines WHERE source_id = ? ORDER BY id DESC LIMIT 1",
+                (source_id,),
+            ).fetchone() or (0, None)
+            rows = []
+            for raw in data[start:end].split(b"\n"):
+                line = raw.decode("utf-8", "replace").rstrip("\r")
+                if not line.strip():
+                    continue
+                previous = parse_line(line, previous)
+                rows.append((source_id, service) + previous)
+            self.db.executemany(
+                "INSERT INTO lines (source_id, service, ts, level, message) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+        self.db.execute(
+            "UPDATE sources SET offset = ?, complete = ? WHERE id = ?",
+            (offset + end, int(archived and at_eof and end == len(data)), source_id),
+        )
+        return end
+
+    def _prune(self, seen: set):
+        """Drop sources (and their lines) whose files newsyslog has expired."""
+        stale = [row[0] for row in self.db.execute("SELECT id FROM sources")
+                 if row[0] not in seen]
+        for source_id in stale:
+            self.db.execute("DELETE FROM lines WHERE source_id = ?", (source_id,))
+            self.db.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+
+    def search(self, query: str = None, service: str = None, level: int = None,
+               since: int = None, until: int = None, page: int = 1,
+               limit: int = 50) -> dict:
+        """Newest-first paged search by text, service, maximum level and time range."""
+        limit = min(max(int(limit), 1), MAX_LIMIT)
+        page = max(int(page), 1)
+        clauses, params = [], []
+        if query and query.strip():
+            if self.fts:
+                clauses.append("id IN (SELECT rowid FROM lines_fts WHERE lines_fts MATCH ?)")
+                params.append(fts_query(query))
+            else:
+                for word in query.split():
+                    escaped = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                    clauses.append("message LIKE ? ESCAPE '\\'")
+                    params.append(f"%{escaped}%")
+        if service:
+            clauses.append("service = ?")
+            params.append(service)
+        if level is not None:
+            clauses.append("level <= ?")
+            params.append(int(level))
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(int(since))
+        if until is not None:
+            clauses.append("ts <= ?")
+            params.append(int(until))
+        where = " AND ".join(clauses) or "1"
+        rows = self.db.execute(
+            f"SELECT service, ts, level, message FROM lines WHERE {where} "
+            "ORDER BY ts DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit + 1, (page - 1) * limit],
+        ).fetchall()
+        return {
+            "rows": [{
+                "service": svc,
+                "ts": ts,
+                "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts)),
+                "level": lvl,
+                "level_name": LEVEL_LABELS[lvl] if lvl is not None else "",
+                "message": message,
+            } for svc, ts, lvl, message in rows[:limit]],
+            "page": page,
+            "limit": limit,
+            "has_more": len(rows) > limit,
+        }
+
+
+def _empty(page: int, limit: int, error: str = None) -> dict:
+    result = {"rows": [], "page": page, "limit": limit, "has_more": False}
+    if error:
+        result["error"] = error
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum log index")
+    parser.add_argument("command", choices=["search", "update"])
+    parser.add_argument("--db", default=DEFAULT_DB)
+    parser.add_argument("--service", choices=list(logtail.SERVICES) + ["all"], default="all")
+    parser.add_argument("--query", default="-", help='hex-encoded UTF-8 text, "-" for none')
+    parser.add_argument("--level", default="-", help='maximum severity 0-7, "-" for all')
+    parser.add_argument("--since", default="-", help='epoch seconds, "-" for unbounded')
+    parser.add_argument("--until", default="-", help='epoch seconds, "-" for unbounded')
+    parser.add_argument("--page", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    if args.command == "update":
+        index = LogIndex(args.db)
+        print(json.dumps({"consumed": index.update()}))
+        index.close()
+        return 0
+
+    if not os.path.exists(args.db):
+        print(json.dumps(_empty(args.page, args.limit, "log index not built yet")))
+        return 0
+    try:
+        query = bytes.fromhex(args.query).decode("utf-8") if args.query != "-" else None
+    except ValueError:
+        query = None
+    try:
+        index = LogIndex(args.db, readonly=True)
+        result = index.search(
+            query=query,
+            service=None if args.service == "all" else args.service,
+            level=int(args.level) if args.level.isdigit() else None,
+            since=int(args.since) if args.since.isdigit() else None,
+            until=int(args.until) if args.until.isdigit() else None,
+            page=args.page,
+            limit=args.limit,
+        )
+        index.close()
+    except sqlite3.Error as exc:
+        result = _empty(args.page, args.limit, f"log index unavailable: {exc}")
+    print(json.dumps(result, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Incremental, filtered log tailing with an opaque byte-offset cursor.
+
+The log viewer polls every few seconds. Instead of re-sending the last N
+lines on every poll, each response carries a cursor
+("<inode>:<offset>:<size>") and the next request only reads what was
+appended after it. Only complete lines are returned; a partially written
+last line stays behind the cursor offset until its newline arrives. size
+is the log size the response saw, so the API can answer an idle poll from
+a stat() even while such a partial line is pending (the offset alone would
+never match the size). Two-field cursors from older pages are accepted.
+
+newsyslog rotation (see newsyslog.conf.d/reticulum.conf) renames
+<service>.log to <service>.log.0 and creates a fresh file, so a cursor whose
+inode no longer matches the live log is first drained from the rotated file
+(when its inode still matches) and then continues at offset 0 of the new
+one. A live log shorter than the cursor offset was truncated in place and
+is re-read from its tail.
+
+Severity and keyword/regex filters are applied here rather than in the
+browser: a request without cursor walks the log backwards in chunks
+(continuing into the rotated .0-.4 files) until it has N matching lines or
+has scanned SCAN_BUDGET bytes, so rare messages are found far beyond the
+last N lines while only matching lines are transferred.
+
+Usage:
+    logtail.py <rnsd|lxmd> [lines] [cursor|-] [level|-] [hex pattern|-] [text|regex]
+
+The pattern is hex-encoded UTF-8 so arbitrary search text survives the
+configd command line unchanged.
+
+Output (JSON):
+    {"lines": [...], "cursor": "<inode>:<offset>:<size>", "reset": bool,
+     "scanned": bytes, "partial": bool}
+    reset=true means the lines replace, rather than extend, the client view;
+    partial=true means the scan budget ran out before N matches were found.
+"""
+import argparse
+import json
+import os
+import re
+import signal
+import sys
+
+LOG_DIR = "/var/log/reticulum"
+SERVICES = ("rnsd", "lxmd")
+DEFAULT_LINES = 200
+MAX_LINES = 500
+# Upper bound on bytes read per incremental request, so a burst of debug
+# logging cannot produce an unbounded response.
+MAX_READ = 256 * 1024
+# Upper bound on bytes examined by a backward (initial / filtered) scan
+SCAN_BUDGET = 8 * 1024 * 1024
+# Rotated files kept by newsyslog (count column of reticulum.conf)
+ROTATIONS = 5
+CHUNK = 64 * 1024
+# User regexes run over up to SCAN_BUDGET bytes: cap their length, refuse
+# nested quantifiers such as (a+)+ and abandon a scan after REGEX_SECONDS
+MAX_PATTERN = 200
+REGEX_SECONDS = 2.0
+NESTED_QUANTIFIER = re.compile(r"(?<!\\)[*+?}]\)+[*+{]")
+
+# RNS writes "[Notice]"-style level names; numeric "[3]" tags are accepted too
+LEVEL_NAMES = {
+    "critical": 0, "error": 1, "warning": 2, "notice": 3,
+    "info": 4, "verbose": 5, "debug": 6, "extra": 7, "extreme": 7,
+}
+LEVEL_TAG = re.compile(r"\[([0-9]|[A-Za-z]+)\]")
+
+
+def line_level(line: str):
+    """Severity of a log line, or None for untagged (continuation) lines."""
+    # Only the line prefix is inspected so bracketed message text is ignored
+    for tag in LEVEL_TAG.findall(line[:80]):
+        if tag.isdigit():
+            return int(tag)
+        level = LEVEL_NAMES.get(tag.lower())
+        if level is not None:
+            return level
+    return None
+
+
+class LineFilter:
+    """
+    Severity / keyword predicate. Lines at or above the selected severity
+    (numerically <= level) pass; untagged lines such as tracebacks always
+    pass the level test. The keyword is a case-insensitive substring, or a
+    case-insensitive regular expression when regex=True (re.error is left
+    to the caller, and is also raised for over-long patterns and nested
+    quantifiers).
+    """
+
+    def __init__(self, level: int = None, pattern: str = None, regex: bool = False):
+        self.level = level
+        self._search = None
+        if pattern and regex:
+            if len(pattern) > MAX_PATTERN:
+                raise re.error(f"longer than {MAX_PATTERN} characters")
+            if NESTED_QUANTIFIER.search(pattern):
+                raise re.error("nested quantifiers are not allowed")
+            self._search = re.compile(pattern, re.IGNORECASE).search
+        elif pattern:
+            needle = pattern.lower()
+            self._search = lambda line: needle in line.lower()
+
+    def __call__(self, line: str) -> bool:
+        if self.level is not None:
+            level = line_level(line)
+            if level is not None and level > self.level:
+                return False
+        return self._search is None or bool(self._search(line))
+
+
+ALL_LINES = LineFilter()
+
+
+def parse_cursor(cursor: str):
+    """Return (inode, offset) for a well-formed cursor, otherwise None."""
+    parts = (cursor or "").split(":")
+    if len(parts) not in (2, 3) or not all(part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
+
+def format_cursor(inode: int, offset: int, size: int) -> str:
+    return f"{inode}:{offset}:{size}"
+
+
+def read_from(path: str, offset: int, size: int, max_bytes: int = None):
+    """
+    Read complete lines between offset and size. Returns (lines, offset
+    after the last newline consumed). When more than max_bytes are pending
+    the oldest data is skipped, starting at the next line boundary.
+    """
+    max_bytes = max_bytes or MAX_READ
+    with open(path, "rb") as fh:
+        skipped = size - offset > max_bytes
+        if skipped:
+            offset = size - max_bytes
+        fh.seek(offset)
+        data = fh.read(size - offset)
+    start = 0
+    if skipped:
+        start = data.find(b"\n") + 1
+        if start == 0:
+            return [], offset
+    end = data.rfind(b"\n")
+    if end < start:
+        return [], offset + start
+    return data[start:end].decode("utf-8", "replace").split("\n"), offset + end + 1
+
+
+def _complete_end(fh, size: int) -> int:
+    """Offset just past the last newline; anything after it is still being written."""
+    start = max(0, size - CHUNK)
+    fh.seek(start)
+    cut = fh.read(size - start).rfind(b"\n")
+    return start + cut + 1 if cut >= 0 else start
+
+
+def scan_back(path: str, size: int, count: int, line_filter: LineFilter = ALL_LINES,
+              budget: int = None):
+    """
+    Walk a file backwards from `size` in CHUNK reads, collecting up to
+    `count` lines accepted by line_filter. Returns (lines oldest first,
+    offset after the last complete line, bytes scanned, reached start).
+    """
+    budget = budget or SCAN_BUDGET
+    matches = []
+    with open(path, "rb") as fh:
+        end = _complete_end(fh, size)
+        # Start before the final newline, so every block + carry ends with
+        # the last byte of a complete line and no trailing empty piece has
+        # to be dropped (whatever byte a chunk boundary falls on).
+        position = max(0, end - 1)
+        scanned = end - position
+        carry = b""
+        while position > 0 and len(matches) < count and scanned < budget:
+            step = min(CHUNK, position, budget - scanned)
+            position -= step
+            fh.seek(position)
+            lines = (fh.read(step) + carry).split(b"\n")
+            scanned += step
+            # The first piece may be cut mid-line; it is completed next round
+            carry = lines.pop(0) if position > 0 else b""
+            for raw in reversed(lines):
+                line = raw.decode("utf-8", "replace")
+                if line_filter(line):
+                    matches.append(line)
+                    if len(matches) >= count:
+                        break
+    matches.reverse()
+    return matches, end, scanned, position == 0
+
+
+def history(path: str, size: int, count: int, line_filter: LineFilter = ALL_LINES):
+    """
+    Last `count` matching lines of the live log, continuing into rotated
+    files while the scan budget allows. Returns (lines, end offset of the
+    live log, bytes scanned, partial).
+    """
+    lines, end, scanned, complete = scan_back(path, size, count, line_filter)
+    for index in range(ROTATIONS):
+        remaining = SCAN_BUDGET - scanned
+        if len(lines) >= count or not complete or remaining <= 0:
+            break
+        rotated = f"{path}.{index}"
+        try:
+            rotated_size = os.stat(rotated).st_size
+        except OSError:
+            break
+        older, _, used, complete = scan_back(rotated, rotated_size, count - len(lines),
+                                             line_filter, remaining)
+        scanned += used
+        lines = older + lines
+    return lines, end, scanned, len(lines) < count and not complete
+
+
+def follow(service: str, count: int = DEFAULT_LINES, cursor: str = None,
+           log_dir: str = None, line_filter: LineFilter = ALL_LINES) -> dict:
+    """Return the (matching) lines appended since `cursor` plus the new cursor."""
+    path = os.path.join(log_dir or LOG_DIR, f"{service}.log")
+    try:
+        st = os.stat(path)
+    except OSError:
+        return {"lines": [], "cursor": "", "reset": True, "scanned": 0, "partial": False}
+
+    position = parse_cursor(cursor)
+    if position is None or (position[0] == st.st_ino and position[1] > st.st_size):
+        # No (valid) cursor, or the log was truncated in place: start over
+        # from the tail.
+        lines, offset, scanned, partial = history(path, st.st_size, count, line_filter)
+        return {"lines": lines, "cursor": format_cursor(st.st_ino, offset, st.st_size),
+                "reset": True, "scanned": scanned, "partial": partial}
+
+    inode, offset = position
+    lines = []
+    if inode != st.st_ino:
+        # Rotated since the last poll: drain the remainder of the old file
+        # if newsyslog has left it uncompressed as <service>.log.0.
+        rotated = path + ".0"
+        try:
+            rst = os.stat(rotated)
+            if rst.st_ino == inode and offset <= rst.st_size:
+                lines, _ = read_from(rotated, offset, rst.st_size)
+        except OSError:
+            pass
+        offset = 0
+
+    scanned = st.st_size - offset
+    new_lines, offset = read_from(path, offset, st.st_size)
+    lines = [line for line in lines + new_lines if line_filter(line)][-count:]
+    return {"lines": lines, "cursor": format_cursor(st.st_ino, offset, st.st_size),
+            "reset": False, "scanned": scanned, "partial": False}
+
+
+class RegexTimeout(Exception):
+    """A regex scan ran past REGEX_SECONDS."""
+
+
+def _regex_timeout(*_args):
+    raise RegexTimeout()
+
+
+def follow_limited(service: str, count: int, cursor: str, line_filter: LineFilter,
+                   seconds: float = None) -> dict:
+    """
+    follow() with a wall-clock limit, for user-supplied regexes. The re
+    engine checks for signals while matching, so SIGALRM interrupts even a
+    backtracking search.
+    """
+    previous = signal.signal(signal.SIGALRM, _regex_timeout)
+    signal.setitimer(signal.ITIMER_REAL, seconds or REGEX_SECONDS)
+    try:
+        return follow(service, count, cursor, line_filter=line_filter)
+    except RegexTimeout:
+        return {"lines": [], "cursor": "", "reset": True, "scanned": 0, "partial": True,
+                "error": "regular expression took too long"}
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Incremental Reticulum log tail")
+    parser.add_argument("service", choices=SERVICES)
+    parser.add_argument("lines", nargs="?", type=int, default=DEFAULT_LINES)
+    parser.add_argument("cursor", nargs="?", default="-",
+                        help='cursor from the previous response, "-" for none')
+    parser.add_argument("level", nargs="?", default="-",
+                        help='maximum severity 0-7, "-" for all')
+    parser.add_argument("pattern", nargs="?", default="-",
+                        help='hex-encoded UTF-8 search text, "-" for none')
+    parser.add_argument("mode", nargs="?", choices=["text", "regex"], default="text")
+    args = parser.parse_args(argv)
+
+    count = min(max(args.lines, 1), MAX_LINES)
+    cursor = None if args.cursor == "-" else args.cursor
+    level = int(args.level) if args.level.isdigit() else None
+    pattern = None
+    if args.pattern != "-":
+        try:
+            pattern = bytes.fromhex(args.pattern).decode("utf-8")
+        except ValueError:
+            pattern = None
+    try:
+        line_filter = LineFilter(level, pattern, args.mode == "regex")
+    except re.error as exc:
+        print(json.dumps({"lines": [], "cursor": "", "reset": True,
+                          "error": f"invalid regular expression: {exc}"}))
+        return 0
+    if args.mode == "regex" and pattern:
+        result = follow_limited(args.service, count, cursor, line_filter)
+    else:
+        result = follow(args.service, count, cursor, line_filter=line_filter)
+    print(json.dumps(result, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,24 @@
 #!/bin/sh
 
 PIDFILE="/var/run/lxmd.pid"
-if [ -f "$PIDFILE" ]; then
-    PID=$(cat "$PIDFILE")
-    if [ -n "$PID" ] && ps -p "$PID" -o pid= >/dev/null 2>&1; then
-        echo '{"status":"running"}'
-        exit 0
-    fi
+# Kept by the process watcher (procwatch.py): rewritten on change, touched every 10 s
+PROCS="/var/run/reticulum/procs.json"
+MAX_AGE=30
+
+if [ -f "$PROCS" ] && [ $(( $(date +%s) - $(stat -f %m "$PROCS") )) -le "$MAX_AGE" ]; then
+    STATE=$(sed -n 's/.*"lxmd":{"state":"\([a-z]*\)".*/\1/p' "$PROCS")
+else
+    # Watcher not running: check the pidfile (configd runs as root, so kill -0 works)
+    STATE="stopped"
+    PID=$(cat "$PIDFILE" 2>/dev/null)
+    case "$PID" in
+        ''|*[!0-9]*) ;;
+        *) kill -0 "$PID" 2>/dev/null && STATE="running" ;;
+    esac
+fi
+
+if [ "$STATE" = "running" ]; then
+    echo '{"status":"running"}'
+    exit 0
 fi
 echo '{"status":"stopped"}'
@@ -0,0 +1,204 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+OpenMetrics exposition for rnsd and lxmd.
+
+The collector renders this text on every sample and keeps it next to the
+status snapshot (/var/run/reticulum/metrics.prom), so a Prometheus scrape of
+api/reticulum/service/metrics only reads a small file. Run directly, this
+script renders the same text from a live status query; metrics.sh uses that
+as the fallback when the collector is not running.
+
+Exposed families:
+    reticulum_up{service}                              service process alive
+    reticulum_rnsd_reachable                           RPC channel answered
+    reticulum_transport_uptime_seconds
+    reticulum_interface_up{interface,type,mode}
+    reticulum_interface_transmit_bytes_total{interface}
+    reticulum_interface_receive_bytes_total{interface}
+    reticulum_interface_announce_queue{interface}
+    reticulum_interface_held_announces{interface}
+    reticulum_process_resident_memory_bytes{service}
+    reticulum_process_cpu_seconds_total{service}
+    reticulum_lxmf_message_store_bytes
+    reticulum_lxmf_message_store_messages
+    reticulum_status_collected_timestamp_seconds
+
+Usage:
+    metrics.py [--config DIR] [--lxmf-config DIR]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+import rnsrpc
+import runtime
+
+DEFAULT_METRICS = "/var/run/reticulum/metrics.prom"
+LXMF_CONFIG_DIR = "/usr/local/etc/lxmf"
+
+
+def message_store_path(lxmf_config_dir: str = LXMF_CONFIG_DIR) -> str:
+    # lxmd keeps its router storage in <config>/storage/lxmf
+    return os.path.join(lxmf_config_dir, "storage", "lxmf", "messagestore")
+
+
+def message_store_usage(path: str) -> dict:
+    """Return {"bytes", "messages"} for the message store, None if absent."""
+    total = count = 0
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                        count += 1
+                except OSError:
+                    continue
+    except OSError:
+        return None
+    return {"bytes": total, "messages": count}
+
+
+def parse_cputime(text: str) -> float:
+    """Parse ps(1) accumulated CPU time ("[dd-][hh:]mm:ss[.ss]") into seconds."""
+    days = 0
+    if "-" in text:
+        day_part, text = text.split("-", 1)
+        days = int(day_part)
+    seconds = 0.0
+    for part in text.split(":"):
+        seconds = seconds * 60 + float(part)
+    return days * 86400 + seconds
+
+
+def process_stats(pidfiles: dict = None) -> dict:
+    """
+    Return {service: {"up", "rss", "cpu"}} for every pidfile. A single ps(1)
+    call covers all services; rss is bytes, cpu is accumulated seconds.
+    """
+    pidfiles = pidfiles or runtime.PIDFILES
+    pids = {}
+    for name, path in pidfiles.items():
+        try:
+            with open(path, encoding="ascii") as fh:
+                pids[int(fh.read().strip())] = name
+        except (OSError, ValueError):
+            continue
+    stats = {name: {"up": False, "rss": None, "cpu": None} for name in pidfiles}
+    if not pids:
+        return stats
+    try:
+        out = subprocess.run(
+            ["ps", "-o", "pid=,rss=,time=", "-p", ",".join(str(p) for p in pids)],
+            capture_output=True, text=True, timeout=5,
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return stats
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) != 3 or not fields[0].isdigit():
+            continue
+        name = pids.get(int(fields[0]))
+        if name is None:
+            continue
+        try:
+            stats[name] = {
+                "up": True,
+                "rss": int(fields[1]) * 1024,
+                "cpu": parse_cputime(fields[2]),
+            }
+        except ValueError:
+            stats[name]["up"] = True
+    return stats
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(val)}"' for key, val in labels.items()) + "}"
+
+
+def _family(lines: list, name: str, kind: str, help_text: str, samples: list):
+    samples = [(labels, value) for labels, value in samples if value is not None]
+    if not samples:
+        return
+    lines.append(f"# TYPE {name} {kind}")
+    lines.append(f"# HELP {name} {help_text}")
+    suffix = "_total" if kind == "counter" else ""
+    for labels, value in samples:
+        if isinstance(value, bool):
+            value = int(value)
+        lines.append(f"{name}{suffix}{_labels(labels)} {value}")
+
+
+def render(status: dict, processes: dict, store: dict = None) -> str:
+    """Render a status snapshot plus process/store stats as OpenMetrics text."""
+    lines = []
+    _family(lines, "reticulum_up", "gauge", "Whether the service process is running.",
+            [({"service": name}, stats["up"]) for name, stats in processes.items()])
+    _family(lines, "reticulum_rnsd_reachable", "gauge",
+            "Whether the rnsd shared-instance RPC answered the last status query.",
+            [({}, "error" not in status)])
+    _family(lines, "reticulum_transport_uptime_seconds", "gauge",
+            "Seconds since the rnsd transport instance started.",
+            [({}, status.get("uptime_seconds"))])
+
+    interfaces = status.get("interfaces", [])
+    _family(lines, "reticulum_interface_up", "gauge", "Whether the interface is up.",
+            [({"interface": i["name"], "type": i.get("type", ""), "mode": i.get("mode", "")},
+              i.get("status") == "up") for i in interfaces])
+    _family(lines, "reticulum_interface_transmit_bytes", "counter",
+            "Bytes transmitted on the interface since rnsd started.",
+            [({"interface": i["name"]}, i.get("tx_bytes")) for i in interfaces])
+    _family(lines, "reticulum_interface_receive_bytes", "counter",
+            "Bytes received on the interface since rnsd started.",
+            [({"interface": i["name"]}, i.get("rx_bytes")) for i in interfaces])
+    _family(lines, "reticulum_interface_announce_queue", "gauge",
+            "Announces queued for transmission on the interface.",
+            [({"interface": i["name"]}, i.get("announce_queue")) for i in interfaces])
+    _family(lines, "reticulum_interface_held_announces", "gauge",
+            "Announces held back by ingress control on the interface.",
+            [({"interface": i["name"]}, i.get("held_announces")) for i in interfaces])
+
+    _family(lines, "reticulum_process_resident_memory_bytes", "gauge",
+            "Resident set size of the service process.",
+            [({"service": name}, stats["rss"]) for name, stats in processes.items()])
+    _family(lines, "reticulum_process_cpu_seconds", "counter",
+            "CPU time consumed by the service process.",
+            [({"service": name}, stats["cpu"]) for name, stats in processes.items()])
+
+    if store is not None:
+        _family(lines, "reticulum_lxmf_message_store_bytes", "gauge",
+                "Size of the lxmd message store.", [({}, store["bytes"])])
+        _family(lines, "reticulum_lxmf_message_store_messages", "gauge",
+                "Messages held in the lxmd message store.", [({}, store["messages"])])
+    _family(lines, "reticulum_status_collected_timestamp_seconds", "gauge",
+            "When the status these metrics were rendered from was collected.",
+            [({}, status.get("collected_at"))])
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum OpenMetrics exposition")
+    parser.add_argument("--config", default=rnsrpc.DEFAULT_CONFIG_DIR,
+                        help="rnsd config directory")
+    parser.add_argument("--lxmf-config", default=LXMF_CONFIG_DIR,
+                        help="lxmd config directory")
+    args = parser.parse_args(argv)
+
+    processes = process_stats()
+    status = (runtime.load_status(args.config) if processes["rnsd"]["up"]
+              else rnsrpc.unreachable())
+    store = message_store_usage(message_store_path(args.lxmf_config))
+    sys.stdout.write(render(status, processes, store))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
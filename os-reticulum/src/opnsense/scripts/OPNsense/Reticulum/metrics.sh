@@ -0,0 +1,22 @@
+#!/bin/sh
+
+VENV="/usr/local/reticulum-venv"
+CONFIG="/usr/local/etc/reticulum"
+METRICS="/var/run/reticulum/metrics.prom"
+EXPORTER="/usr/local/opnsense/scripts/OPNsense/Reticulum/metrics.py"
+
+# Serve the OpenMetrics text the collector renders on every sample, so a
+# Prometheus scrape costs one small file read. A file older than MAX_AGE
+# means the collector is not running; render from a live query instead.
+MAX_AGE=30
+if [ -f "${METRICS}" ]; then
+    NOW=$(date +%s)
+    MTIME=$(stat -f %m "${METRICS}" 2>/dev/null || echo 0)
+    if [ $((NOW - MTIME)) -le ${MAX_AGE} ]; then
+        cat "${METRICS}"
+        exit 0
+    fi
+fi
+
+timeout 10 "${VENV}/bin/python3.11" "${EXPORTER}" --config "${CONFIG}" 2>/dev/null \
+    || echo '# EOF'
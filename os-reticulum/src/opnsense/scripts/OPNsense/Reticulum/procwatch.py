@@ -0,0 +1,284 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Reticulum process watcher.
+
+Long-lived companion to rnsd and lxmd (started by /usr/local/etc/rc.d/
+reticulum_procwatch) that keeps a compact daemon status file, so the
+service status endpoints and the configd status scripts answer with a
+single file read instead of reading the pidfile and spawning ps(1) on
+every request.
+
+The watcher reads the rnsd (every possible transport instance) and lxmd
+pidfiles and registers a kqueue EVFILT_PROC/NOTE_EXIT filter on each live
+PID, so an exit is seen the moment it happens, together with its wait
+status. An EVFILT_VNODE filter on the pidfile directory picks up starts and
+stops (pidfiles created or removed); the pidfiles are re-read every RESCAN
+seconds as well, which also covers a stale pidfile rewritten in place.
+Without kqueue (non-BSD development hosts) the pidfiles are simply
+re-read every RESCAN seconds.
+
+Under supervise.py (<svc>_supervise="YES", the default) the pidfile names
+the supervisor, which stays alive while the daemon itself is in restart
+backoff or a crash loop. For those services the supervisor's state file is
+read as well (and its directory watched): its backoff/crashloop state is
+reported instead of running, and pid, started and last_exit describe the
+supervised daemon rather than the supervisor. A state file older than the
+pidfile is left over from an earlier supervised run and ignored.
+
+The status file is rewritten atomically only when a state changes:
+
+    {"rnsd": {"state": "running", "pid": 1234, "started": 1700000000,
+              "last_exit": {"code": -9, "at": 1699999990}},
+     "rnsd-1": {...}, "lxmd": {...}, "updated_at": 1700000000}
+
+state is running, stopped, backoff or crashloop (the last two only for a
+supervised daemon). started is the pidfile mtime (written by daemon(8) when
+it starts the process), or the supervised daemon's start time; last_exit is the last exit the watcher saw (code negative for a
+signal, as in supervise.py; None when the process was already gone when it
+was noticed). Between changes the file mtime is refreshed every HEARTBEAT
+seconds, so readers can tell a live watcher from a stale file.
+
+Usage:
+    procwatch.py [--status PATH]
+    procwatch.py --once      # print the current status to stdout and exit
+"""
+import argparse
+import json
+import os
+import select
+import signal
+import sys
+import tempfile
+import time
+
+import instances
+import readiness
+import supervise
+
+DEFAULT_STATUS = "/var/run/reticulum/procs.json"
+PIDFILES = dict(
+    [(instances.service_name(n), instances.pidfile(n)) for n in range(instances.MAX_INSTANCES)]
+    + [("lxmd", "/var/run/lxmd.pid")]
+)
+RESCAN = 2.0
+HEARTBEAT = 10.0
+# Supervisor states in which the daemon itself is not running
+SUPERVISOR_DOWN = ("backoff", "crashloop")
+
+
+def exit_code(status: int) -> int:
+    """Exit code from a wait status; negative signal number when signalled."""
+    try:
+        return os.waitstatus_to_exitcode(status)
+    except ValueError:
+        return status
+
+
+class ProcWatch:
+    """Tracks the daemons named by PIDFILES and maintains the status file."""
+
+    def __init__(self, status_path: str = DEFAULT_STATUS, pidfiles: dict = None,
+                 quiet: bool = False, supervise_dir: str = None):
+        self.status_path = status_path
+        self.pidfiles = dict(pidfiles or PIDFILES)
+        self.quiet = quiet
+        self.supervise_dir = supervise_dir or supervise.STATE_DIR
+        self.services = {name: {"state": "stopped", "pid": None, "started": None, "last_exit": None}
+                         for name in self.pidfiles}
+        # Live PID named by each pidfile (the supervisor when supervised)
+        self._pids = dict.fromkeys(self.pidfiles)
+        self._running = True
+
+    def scan(self, now: float = None) -> bool:
+        """Re-read every pidfile and supervisor state; True if any state changed."""
+        now = time.time() if now is None else now
+        changed = False
+        for name, pidfile in self.pidfiles.items():
+            entry = self.services[name]
+            previous = dict(entry)
+            pid = readiness.read_pid(pidfile)
+            if pid is not None and not readiness.pid_alive(pid):
+                pid = None
+            if self._pids[name] is not None and self._pids[name] != pid:
+                # Gone (or replaced) without a NOTE_EXIT: no kqueue, or it
+                # exited before the filter was registered. Status unknown.
+                entry["last_exit"] = {"code": None, "at": int(now)}
+            self._pids[name] = pid
+            if pid is None:
+                entry.update(state="stopped", pid=None, started=None)
+            else:
+                entry.update(state="running", pid=pid, started=self._mtime(pidfile))
+                self._supervised(name, entry)
+            changed |= entry != previous
+        return changed
+
+    def _supervised(self, name: str, entry: dict):
+        """Report the supervised daemon instead of a live supervisor."""
+        state = supervise.read_state(name, self.supervise_dir)
+        if not state or (state.get("updated_at") or 0) < (entry["started"] or 0):
+            # Unsupervised, or left over from an earlier supervised run
+            return
+        if state.get("state") in SUPERVISOR_DOWN:
+            entry.update(state=state["state"], pid=None, started=None)
+        elif state.get("state") == "running" and isinstance(state.get("pid"), int):
+            entry.update(pid=state["pid"], started=state.get("started_at") or entry["started"])
+        crashed = state.get("last_crash")
+        if isinstance(crashed, int) and crashed > (entry["last_exit"] or {}).get("at", 0):
+            entry["last_exit"] = {"code": state.get("last_exit_code"), "at": crashed}
+
+    def exited(self, pid: int, status: int, now: float = None) -> bool:
+        """Record a NOTE_EXIT; True if it concerned a watched daemon (or its supervisor)."""
+        now = time.time() if now is None else now
+        for name, watched in self._pids.items():
+            if watched == pid:
+                self._pids[name] = None
+                self.services[name].update(state="stopped", pid=None, started=None,
+                                           last_exit={"code": exit_code(status), "at": int(now)})
+                return True
+        return False
+
+    def status(self, now: float = None) -> dict:
+        now = time.time() if now is None else now
+        return dict(self.services, updated_at=int(now))
+
+    def write(self):
+        """Replace the status file via a same-directory temp file + rename."""
+        fd, tmp_path = tempfile.mkstemp(prefix=".procs.",
+                                        dir=os.path.dirname(self.status_path) or ".")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(self.status(), fh, separators=(",", ":"))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.status_path)
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+
+    def heartbeat(self):
+        try:
+            os.utime(self.status_path)
+        except OSError:
+            self.write()
+
+    @staticmethod
+    def _mtime(path: str):
+        try:
+            return int(os.stat(path).st_mtime)
+        except OSError:
+            return None
+
+    def stop(self, *_args):
+        self._running = False
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        kq = select.kqueue() if hasattr(select, "kqueue") else None
+        self._log(f"started ({'kqueue' if kq else 'polling'}, status {self.status_path})")
+        dir_fds = self._watch_dirs(kq) if kq else []
+        watched = set()
+        last_write = 0.0
+        while self._running:
+            changed = self.scan()
+            if kq is not None:
+                changed |= self._watch_pids(kq, watched)
+            now = time.monotonic()
+            try:
+                if changed or not last_write:
+                    self.write()
+                    last_write = now
+                elif now - last_write >= HEARTBEAT:
+                    self.heartbeat()
+                    last_write = now
+            except OSError as exc:
+                self._log(f"cannot write status: {exc}")
+            if kq is None:
+                self._sleep(RESCAN)
+                continue
+            try:
+                events = kq.control(None, 16, RESCAN)
+            except InterruptedError:
+                continue
+            exits = [ev for ev in events
+                     if ev.filter == select.KQ_FILTER_PROC and ev.fflags & select.KQ_NOTE_EXIT]
+            for ev in exits:
+                watched.discard(ev.ident)
+                if self.exited(ev.ident, ev.data):
+                    try:
+                        self.write()
+                        last_write = time.monotonic()
+                    except OSError as exc:
+                        self._log(f"cannot write status: {exc}")
+        for fd in dir_fds:
+            os.close(fd)
+        if kq is not None:
+            kq.close()
+        try:
+            os.unlink(self.status_path)
+        except OSError:
+            pass
+        self._log("stopped")
+
+    def _watch_dirs(self, kq) -> list:
+        fds = []
+        # Pidfiles created/removed, supervisor state files replaced
+        directories = {os.path.dirname(p) for p in self.pidfiles.values()} | {self.supervise_dir}
+        for directory in sorted(directories):
+            try:
+                fd = os.open(directory, os.O_RDONLY)
+            except OSError:
+                continue
+            kq.control([select.kevent(fd, select.KQ_FILTER_VNODE,
+                                      select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+                                      select.KQ_NOTE_WRITE)], 0, 0)
+            fds.append(fd)
+        return fds
+
+    def _watch_pids(self, kq, watched: set) -> bool:
+        """Register NOTE_EXIT for newly seen PIDs; True if one was already gone."""
+        changed = False
+        for pid in list(self._pids.values()):
+            if pid is None or pid in watched:
+                continue
+            try:
+                kq.control([select.kevent(pid, select.KQ_FILTER_PROC,
+                                          select.KQ_EV_ADD | select.KQ_EV_ONESHOT,
+                                          select.KQ_NOTE_EXIT)], 0, 0)
+                watched.add(pid)
+            except ProcessLookupError:
+                # Exited between the pidfile read and the registration
+                changed |= self.scan()
+        return changed
+
+    def _sleep(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while self._running and time.monotonic() < deadline:
+            time.sleep(min(0.5, max(0.0, deadline - time.monotonic())))
+
+    def _log(self, message: str):
+        if self.quiet:
+            return
+        print(f"{time.strftime('[%Y-%m-%d %H:%M:%S]')} [procwatch] {message}", flush=True)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum process watcher")
+    parser.add_argument("--status", default=DEFAULT_STATUS, help="status file to maintain")
+    parser.add_argument("--once", action="store_true",
+                        help="print the current status to stdout and exit")
+    args = parser.parse_args(argv)
+
+    watcher = ProcWatch(args.status, quiet=args.once)
+    if args.once:
+        watcher.scan()
+        print(json.dumps(watcher.status(), separators=(",", ":")))
+        return 0
+    watcher.run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Readiness probe used by the rc.d scripts after daemon(8).
+
+Instead of sleeping a fixed time and checking that the PID exists, the
+probe polls until the daemon is actually usable and returns as soon as it
+is, or fails as soon as the process dies:
+
+  rnsd  ready when the shared instance port on 127.0.0.1 accepts
+        connections and the instance control port answers an authenticated
+        interface_stats RPC query (a bare connect would make rnsd log a
+        failed RPC handshake). rnsd binds the RPC listener after its
+        interfaces are up, so this also covers interface start-up.
+  lxmd  ready when a process of the lxmd process tree holds a connection to
+        rnsd's shared instance port, i.e. lxmd has attached to rnsd.
+  procwatch, collector
+        ready when the process watcher / status collector has written its
+        status file (--status-file: procs.json / the rnstatus snapshot)
+        since the probe started.
+
+With share_instance disabled there is no port to probe; the daemon counts
+as ready once it has stayed alive for STANDALONE_GRACE seconds.
+
+When the daemon runs under supervise.py the pidfile names the supervisor,
+which outlives a crashing daemon; --supervisor-state points at its state
+file so a crash during start-up still fails the probe early.
+
+Usage:
+    readiness.py <rnsd|lxmd> --pidfile PATH [--config DIR] [--timeout SECONDS]
+                 [--supervisor-state FILE]
+    readiness.py <procwatch|collector> --pidfile PATH --status-file FILE [--timeout SECONDS]
+
+Prints "<service> ready in 0.84s (PID n)" and exits 0, or prints the
+reason and exits 1 (process exited) or 2 (deadline passed while running).
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import rnsrpc
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_SHARED_PORT = 37428
+POLL_INTERVAL = 0.1
+STANDALONE_GRACE = 1.0
+# Companion daemons that signal readiness by writing their status file
+STATUS_FILE_SERVICES = ("procwatch", "collector")
+
+READY, EXITED, TIMEOUT = 0, 1, 2
+
+
+def instance_ports(config_dir: str):
+    """(shared instance port, control port) from the rnsd config, or None if not shared."""
+    section = rnsrpc.read_reticulum_section(os.path.join(config_dir, "config"))
+    if section.get("share_instance", "True").lower() in ("false", "no", "0"):
+        return None
+    shared = section.get("shared_instance_port", "")
+    control = section.get("instance_control_port", "")
+    return (int(shared) if shared.isdigit() else DEFAULT_SHARED_PORT,
+            int(control) if control.isdigit() else rnsrpc.DEFAULT_CONTROL_PORT)
+
+
+def port_accepts(port: int, host: str = "127.0.0.1") -> bool:
+    try:
+        with socket.create_connection((host, port), timeout=POLL_INTERVAL * 5):
+            return True
+    except OSError:
+        return False
+
+
+def rpc_answers(client: rnsrpc.RpcClient) -> bool:
+    """True when the control port completes a real interface_stats query."""
+    try:
+        client.interface_stats()
+    except rnsrpc.RpcError:
+        # Includes RpcUnavailable: no transport identity written yet
+        return False
+    return True
+
+
+def read_pid(pidfile: str):
+    try:
+        with open(pidfile, encoding="ascii") as fh:
+            pid = fh.read().strip()
+    except OSError:
+        return None
+    return int(pid) if pid.isdigit() else None
+
+
+def pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Running as another user (the daemons run as reticulum)
+        return True
+    return True
+
+
+def process_tree(pid: int) -> set:
+    """pid plus all of its descendants (the pidfile holds daemon(8)'s sh child)."""
+    try:
+        out = subprocess.run(["ps", "-ax", "-o", "pid=,ppid="], capture_output=True,
+                             text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return {pid}
+    children = {}
+    for line in out.splitlines():
+        fields = line.split()
+        if len(fields) == 2 and fields[0].isdigit() and fields[1].isdigit():
+            children.setdefault(int(fields[1]), []).append(int(fields[0]))
+    tree, todo = set(), [pid]
+    while todo:
+        current = todo.pop()
+        if current not in tree:
+            tree.add(current)
+            todo.extend(children.get(current, []))
+    return tree
+
+
+def connected_pids(port: int) -> set:
+    """PIDs holding a TCP connection to 127.0.0.1:port (FreeBSD sockstat)."""
+    try:
+        out = subprocess.run(["sockstat", "-4", "-c", "-q", "-P", "tcp", "-p", str(port)],
+                             capture_output=True, text=True, timeout=5).stdout
+    except (OSError, subprocess.SubprocessError):
+        return set()
+    pids = set()
+    for line in out.splitlines():
+        # USER COMMAND PID FD PROTO LOCAL FOREIGN
+        fields = line.split()
+        if len(fields) >= 7 and fields[2].isdigit() and fields[6].endswith(f":{port}"):
+            pids.add(int(fields[2]))
+    return pids
+
+
+def written_since(path: str, since: float) -> bool:
+    """True when path exists and was modified at or after `since` (whole seconds)."""
+    try:
+        return os.stat(path).st_mtime >= int(since)
+    except OSError:
+        return False
+
+
+def crashed_since(state_file: str, since: float) -> bool:
+    """True when the supervisor recorded a daemon exit at or after `since`."""
+    try:
+        with open(state_file, encoding="utf-8") as fh:
+            state = json.load(fh)
+    except (OSError, ValueError):
+        return False
+    last_crash = state.get("last_crash") if isinstance(state, dict) else None
+    return isinstance(last_crash, int) and last_crash >= int(since)
+
+
+def probe(service: str, ports, pid: int, client: rnsrpc.RpcClient = None) -> bool:
+    """One readiness check for a running daemon (client: rnsd's control port)."""
+    if ports is None:
+        return True
+    shared, _control = ports
+    if service == "rnsd":
+        return port_accepts(shared) and rpc_answers(client)
+    return bool(connected_pids(shared) & process_tree(pid))
+
+
+def wait_ready(service: str, pidfile: str, config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR,
+               timeout: float = DEFAULT_TIMEOUT, supervisor_state: str = None,
+               status_file: str = None):
+    """
+    Poll until the daemon is ready, has exited, or the deadline passes.
+    Returns (state, seconds elapsed, pid).
+    """
+    wall_start = time.time()
+    started = time.monotonic()
+    deadline = started + timeout
+    ports = instance_ports(config_dir) if service not in STATUS_FILE_SERVICES else None
+    client = rnsrpc.RpcClient(config_dir, timeout=POLL_INTERVAL * 5) if service == "rnsd" else None
+    pid = None
+    while True:
+        elapsed = time.monotonic() - started
+        # daemon(8) writes the pidfile after forking; allow for that too
+        pid = pid or read_pid(pidfile)
+        if pid is not None:
+            if not pid_alive(pid):
+                return EXITED, elapsed, pid
+            if supervisor_state and crashed_since(supervisor_state, wall_start):
+                return EXITED, elapsed, pid
+            if status_file:
+                if written_since(status_file, wall_start):
+                    return READY, elapsed, pid
+            elif ports is None:
+                if elapsed >= min(STANDALONE_GRACE, timeout):
+                    return READY, elapsed, pid
+            elif probe(service, ports, pid, client):
+                return READY, elapsed, pid
+        elif elapsed > min(timeout, 5.0):
+            # No pidfile at all: daemon(8) failed before forking the child
+            return EXITED, elapsed, None
+        if time.monotonic() >= deadline:
+            return TIMEOUT, elapsed, pid
+        time.sleep(POLL_INTERVAL)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Wait for rnsd/lxmd to become ready")
+    parser.add_argument("service", choices=["rnsd", "lxmd", *STATUS_FILE_SERVICES])
+    parser.add_argument("--pidfile", required=True)
+    parser.add_argument("--config", default=rnsrpc.DEFAULT_CONFIG_DIR,
+                        help="rnsd config directory (shared instance ports)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--supervisor-state", default=None,
+                        help="supervise.py state file when the daemon is supervised")
+    parser.add_argument("--status-file", default=None,
+                        help="file the daemon writes once it is running (procwatch, collector)")
+    args = parser.parse_args(argv)
+    if args.service in STATUS_FILE_SERVICES and not args.status_file:
+        parser.error(f"{args.service} requires --status-file")
+
+    state, elapsed, pid = wait_ready(args.service, args.pidfile, args.config,
+                                     max(args.timeout, POLL_INTERVAL), args.supervisor_state,
+                                     args.status_file)
+    if state == READY:
+        print(f"{args.service} ready in {elapsed:.2f}s (PID: {pid})")
+    elif state == EXITED:
+        print(f"{args.service} exited after {elapsed:.2f}s")
+    else:
+        print(f"{args.service} not ready after {elapsed:.2f}s (still running, PID: {pid})")
+    return state
+
+
+if __name__ == "__main__":
+    sys.exit(main())
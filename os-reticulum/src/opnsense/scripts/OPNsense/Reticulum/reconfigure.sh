@@ -1,9 +1,50 @@
 #!/bin/sh
+#
+# Render the Reticulum templates and restart only the daemons whose rendered
+# inputs changed. Restarting rnsd drops every link and forces path
+# rediscovery, so e.g. an LXMF display name change must only bounce lxmd.
+#
+# Prints one JSON line for the API:
+#   {"changed":["lxmd"],"restarted":["lxmd"],"failed":[]}
 
 SVC_USER="reticulum"
 
+# Rendered targets per daemon (see templates/OPNsense/Reticulum/+TARGETS)
+RNSD_FILES="/usr/local/etc/reticulum/config /etc/rc.conf.d/rnsd"
+# Extra transport instances (rnsd restarts them all together)
+RNSD_FILES="${RNSD_FILES} /usr/local/etc/reticulum/instance-1/config /usr/local/etc/reticulum/instance-2/config /usr/local/etc/reticulum/instance-3/config"
+LXMD_FILES="/usr/local/etc/lxmf/config /usr/local/etc/lxmf/allowed /usr/local/etc/lxmf/ignored /etc/rc.conf.d/lxmd"
+
+# Combined digest of a set of files; a missing file hashes as "absent" so
+# creating or removing a target also counts as a change.
+files_hash()
+{
+    for _f in "$@"; do
+        if [ -f "${_f}" ]; then
+            sha256 -q "${_f}"
+        else
+            echo "absent"
+        fi
+    done | sha256 -q
+}
+
+# Space-separated service names as a JSON array
+json_list()
+{
+    _out=""
+    for _w in $1; do
+        _out="${_out:+${_out},}\"${_w}\""
+    done
+    echo "[${_out}]"
+}
+
+# shellcheck disable=SC2086
+RNSD_BEFORE=$(files_hash ${RNSD_FILES})
+# shellcheck disable=SC2086
+LXMD_BEFORE=$(files_hash ${LXMD_FILES})
+
 # Regenerate config files from templates
-configctl template reload OPNsense/Reticulum
+configctl template reload OPNsense/Reticulum >/dev/null
 
 # Fix ownership and permissions of generated config files (template reload runs as root)
 # Recursive chown covers config files, storage/, interfaces/, identity keys, etc.
@@ -11,24 +52,52 @@ chown -R "${SVC_USER}:${SVC_USER}" /usr/local/etc/reticulum 2>/dev/null || true
 chmod 700 /usr/local/etc/reticulum
 # chmod 640: owner (reticulum) can read/write; group can read; world cannot (X-703/X-704)
 chmod 640 /usr/local/etc/reticulum/config 2>/dev/null || true
+for _dir in /usr/local/etc/reticulum/instance-*; do
+    [ -d "${_dir}" ] || continue
+    chmod 700 "${_dir}"
+    chmod 640 "${_dir}/config" 2>/dev/null || true
+done
 chown -R "${SVC_USER}:${SVC_USER}" /usr/local/etc/lxmf 2>/dev/null || true
 chmod 700 /usr/local/etc/lxmf
 chmod 640 /usr/local/etc/lxmf/config 2>/dev/null || true
 chmod 640 /usr/local/etc/lxmf/allowed 2>/dev/null || true
 chmod 640 /usr/local/etc/lxmf/ignored 2>/dev/null || true
 
-# Conditionally restart rnsd if enabled and running
-if service rnsd enabled 2>/dev/null; then
-    if service rnsd status >/dev/null 2>&1; then
-        service rnsd restart
+CHANGED=""
+RESTARTED=""
+FAILED=""
+
+# shellcheck disable=SC2086
+[ "$(files_hash ${RNSD_FILES})" != "${RNSD_BEFORE}" ] && CHANGED="${CHANGED} rnsd"
+# shellcheck disable=SC2086
+[ "$(files_hash ${LXMD_FILES})" != "${LXMD_BEFORE}" ] && CHANGED="${CHANGED} lxmd"
+
+# Restart a daemon only if its rendered inputs changed and it is enabled and
+# running; a stopped daemon picks up the new config on its next start.
+# lxmd is a shared-instance client of rnsd and reconnects by itself when
+# rnsd restarts, so an rnsd-only change leaves lxmd alone.
+for _svc in ${CHANGED}; do
+    service "${_svc}" enabled 2>/dev/null || continue
+    service "${_svc}" status >/dev/null 2>&1 || continue
+    if service "${_svc}" restart >/dev/null 2>&1; then
+        RESTARTED="${RESTARTED} ${_svc}"
+    else
+        FAILED="${FAILED} ${_svc}"
     fi
-fi
+done
 
-# Conditionally restart lxmd if enabled and running
-if service lxmd enabled 2>/dev/null; then
-    if service lxmd status >/dev/null 2>&1; then
-        service lxmd restart
+# Keep the status collector and the process watcher in step with the rnsd
+# enable flag. They only read the rendered config and the pidfiles, so a
+# running one never needs a restart here.
+for _svc in reticulum_collector reticulum_procwatch; do
+    if service "${_svc}" enabled 2>/dev/null; then
+        if ! service "${_svc}" status >/dev/null 2>&1; then
+            service "${_svc}" start >/dev/null 2>&1
+        fi
+    else
+        service "${_svc}" onestop >/dev/null 2>&1 || true
     fi
-fi
+done
 
+echo "{\"changed\":$(json_list "${CHANGED}"),\"restarted\":$(json_list "${RESTARTED}"),\"failed\":$(json_list "${FAILED}")}"
 exit 0
@@ -1,11 +1,38 @@
 #!/bin/sh
 
 PIDFILE="/var/run/rnsd.pid"
-if [ -f "$PIDFILE" ]; then
-    PID=$(cat "$PIDFILE")
-    if [ -n "$PID" ] && ps -p "$PID" -o pid= >/dev/null 2>&1; then
-        echo '{"status":"running"}'
+# Kept by the process watcher (procwatch.py): rewritten on change, touched every 10 s
+PROCS="/var/run/reticulum/procs.json"
+# Written by the collector's RPC liveness watchdog every interval (compact JSON)
+LIVENESS="/var/run/reticulum/liveness.json"
+MAX_AGE=30
+
+# Only a fresh file counts: a stopped watcher or collector must not pin the state
+fresh() {
+    [ -f "$1" ] && [ $(( $(date +%s) - $(stat -f %m "$1") )) -le "$MAX_AGE" ]
+}
+
+if fresh "$PROCS"; then
+    STATE=$(sed -n 's/.*"rnsd":{"state":"\([a-z]*\)".*/\1/p' "$PROCS")
+else
+    # Watcher not running: check the pidfile (configd runs as root, so kill -0 works)
+    STATE="stopped"
+    PID=$(cat "$PIDFILE" 2>/dev/null)
+    case "$PID" in
+        ''|*[!0-9]*) ;;
+        *) kill -0 "$PID" 2>/dev/null && STATE="running" ;;
+    esac
+fi
+
+if [ "$STATE" = "running" ]; then
+    # A live PID that no longer answers RPC is degraded, not running. Like
+    # service/status, this follows instance 0 (rnsd); a degraded extra
+    # transport instance shows in rnsdStatus's instance list instead.
+    if fresh "$LIVENESS" && grep -q '"instance":0,"service":"rnsd","state":"degraded"' "$LIVENESS"; then
+        echo '{"status":"degraded"}'
         exit 0
     fi
+    echo '{"status":"running"}'
+    exit 0
 fi
 echo '{"status":"stopped"}'
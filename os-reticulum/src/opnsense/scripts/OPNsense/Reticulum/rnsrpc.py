@@ -0,0 +1,249 @@
+"""
+Minimal client for the rnsd shared-instance RPC channel.
+
+rnsd exposes its runtime state (interface statistics, path table, etc.) to
+local programs over a multiprocessing.connection listener bound to
+127.0.0.1:instance_control_port. This is the same channel rnstatus uses, but
+talking to it directly avoids importing RNS (several hundred milliseconds of
+interpreter and module start-up on a small firewall CPU) and can never turn
+the caller into a standalone Reticulum instance when rnsd is down.
+
+Only the Python standard library is used, so this module runs under the
+plugin venv as well as the base python3.11 interpreter.
+"""
+import hashlib
+import multiprocessing.connection
+import os
+import re
+import socket
+import struct
+import time
+
+DEFAULT_CONFIG_DIR = "/usr/local/etc/reticulum"
+DEFAULT_CONTROL_PORT = 37429
+DEFAULT_TIMEOUT = 2.0
+
+# RNS.Interfaces.Interface mode constants -> Reticulum.xml <mode> option keys
+INTERFACE_MODES = {
+    0x01: "full",
+    0x02: "point_to_point",
+    0x03: "access_point",
+    0x04: "roaming",
+    0x05: "boundary",
+    0x06: "gateway",
+}
+
+
+class RpcError(Exception):
+    """rnsd could not be reached or returned an unusable response."""
+
+
+class RpcUnavailable(RpcError):
+    """
+    The RPC channel cannot be used with the current config (sharing off,
+    transport identity not written yet), whatever state rnsd is in.
+    """
+
+
+def read_reticulum_section(config_path: str) -> dict:
+    """
+    Return the key/value pairs of the [reticulum] section of an rnsd config.
+
+    The config is ConfigObj syntax; only the flat top-level section is
+    needed here, so a line parser is sufficient and keeps configobj out of
+    the dependency set. Missing files yield an empty dict.
+    """
+    values = {}
+    try:
+        with open(config_path, encoding="utf-8") as fh:
+            in_section = False
+            for raw in fh:
+                line = raw.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("["):
+                    in_section = line == "[reticulum]"
+                    continue
+                if in_section and "=" in line:
+                    key, _, value = line.partition("=")
+                    values[key.strip()] = value.strip()
+    except OSError:
+        pass
+    return values
+
+
+class RpcClient:
+    """
+    Authenticated client for rnsd's instance control port.
+
+    Address and authkey are resolved once and cached; they are re-read only
+    when the rendered config changes (e.g. after a reconfigure), so repeated
+    queries cost one localhost TCP handshake each.
+    """
+
+    def __init__(self, config_dir: str = DEFAULT_CONFIG_DIR, timeout: float = DEFAULT_TIMEOUT):
+        self.config_dir = config_dir
+        self.timeout = timeout
+        self._config_mtime = None
+        self._address = None
+        self._authkey = None
+
+    @property
+    def config_path(self) -> str:
+        return os.path.join(self.config_dir, "config")
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.config_path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._config_mtime and self._authkey is not None:
+            return
+        section = read_reticulum_section(self.config_path)
+        if section.get("share_instance", "True").lower() in ("false", "no", "0"):
+            raise RpcUnavailable("share_instance is disabled")
+        port = section.get("instance_control_port", "")
+        self._address = ("127.0.0.1", int(port) if port.isdigit() else DEFAULT_CONTROL_PORT)
+        self._authkey = self._resolve_authkey(section.get("rpc_key", ""))
+        self._config_mtime = mtime
+
+    def _resolve_authkey(self, rpc_key: str) -> bytes:
+        # Mirrors RNS.Reticulum: an explicit rpc_key wins, otherwise the key is
+        # the SHA-256 of the transport identity's private key bytes.
+        if re.fullmatch(r"[0-9a-fA-F]+", rpc_key or "") and len(rpc_key) % 2 == 0:
+            return bytes.fromhex(rpc_key)
+        identity_path = os.path.join(self.config_dir, "storage", "transport_identity")
+        try:
+            with open(identity_path, "rb") as fh:
+                return hashlib.sha256(fh.read()).digest()
+        except OSError as exc:
+            raise RpcUnavailable(f"cannot read transport identity: {exc.strerror}") from exc
+
+    def _connect(self):
+        """
+        multiprocessing.connection.Client() with every step bounded by the
+        timeout. Client() switches its socket to blocking mode before
+        connecting, so a wedged rnsd that accepts but never answers would
+        hang the caller forever; Connection reads the fd with os.read, so the
+        bound is SO_RCVTIMEO/SO_SNDTIMEO on the fd itself.
+        """
+        sock = socket.create_connection(self._address, timeout=self.timeout)
+        seconds = int(self.timeout)
+        timeval = struct.pack("ll", seconds, int((self.timeout - seconds) * 1e6))
+        sock.setblocking(True)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVTIMEO, timeval)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDTIMEO, timeval)
+        conn = multiprocessing.connection.Connection(sock.detach())
+        try:
+            # Same handshake order as Client()
+            multiprocessing.connection.answer_challenge(conn, self._authkey)
+            multiprocessing.connection.deliver_challenge(conn, self._authkey)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def query(self, path: str):
+        """Issue a single {"get": path} RPC call and return the response."""
+        self._load()
+        try:
+            conn = self._connect()
+            try:
+                conn.send({"get": path})
+                return conn.recv()
+            finally:
+                conn.close()
+        except BlockingIOError as exc:
+            # SO_RCVTIMEO/SO_SNDTIMEO expired: rnsd accepted but did not answer
+            raise RpcError(f"rnsd not responding within {self.timeout:g}s") from exc
+        except (OSError, EOFError, multiprocessing.AuthenticationError) as exc:
+            # A stale authkey (identity regenerated) surfaces as an auth
+            # failure; drop the cache so the next call re-reads it.
+            self._authkey = None
+            raise RpcError(f"rnsd not reachable: {exc}") from exc
+
+    def interface_stats(self) -> dict:
+        stats = self.query("interface_stats")
+        if not isinstance(stats, dict):
+            raise RpcError("unexpected interface_stats response")
+        return stats
+
+
+def _hex(value) -> str:
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    return str(value) if value is not None else ""
+
+
+def _interface_type(ifstat: dict) -> str:
+    if ifstat.get("type"):
+        return str(ifstat["type"])
+    # Older RNS releases only expose "TCPServerInterface[name/ip:port]"
+    name = str(ifstat.get("name", ""))
+    return name.split("[", 1)[0] if "[" in name else ""
+
+
+def format_uptime(seconds) -> str:
+    """Render seconds as a compact human-readable duration ("3d 4h 12m")."""
+    if seconds is None:
+        return ""
+    seconds = int(seconds)
+    days, rem = divmod(seconds, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+    parts = []
+    if days:
+        parts.append(f"{days}d")
+    if hours:
+        parts.append(f"{hours}h")
+    if minutes:
+        parts.append(f"{minutes}m")
+    if not parts:
+        parts.append(f"{secs}s")
+    return " ".join(parts)
+
+
+def normalise_stats(stats: dict, now: float = None) -> dict:
+    """
+    Convert a raw interface_stats RPC response into the shape documented for
+    the rnstatus API (docs/phase6-widgets.md): string up/down status,
+    tx_bytes/rx_bytes counters, hex identity, and a printable uptime.
+    """
+    interfaces = []
+    for ifstat in stats.get("interfaces", []) or []:
+        mode = ifstat.get("mode")
+        interfaces.append({
+            "name": ifstat.get("short_name") or ifstat.get("name") or "",
+            "type": _interface_type(ifstat),
+            "status": "up" if ifstat.get("status") else "down",
+            "mode": INTERFACE_MODES.get(mode, str(mode) if mode is not None else ""),
+            "tx_bytes": int(ifstat.get("txb") or 0),
+            "rx_bytes": int(ifstat.get("rxb") or 0),
+            "bitrate": ifstat.get("bitrate"),
+            "clients": ifstat.get("clients"),
+            "held_announces": int(ifstat.get("held_announces") or 0),
+            "announce_queue": int(ifstat.get("announce_queue") or 0),
+            "ifac_netname": ifstat.get("ifac_netname") or "",
+        })
+
+    uptime_seconds = stats.get("transport_uptime")
+    return {
+        "transport_enabled": stats.get("transport_id") is not None,
+        "identity": _hex(stats.get("transport_id")),
+        "uptime": format_uptime(uptime_seconds),
+        "uptime_seconds": int(uptime_seconds) if uptime_seconds is not None else None,
+        "rss": stats.get("rss"),
+        "tx_bytes": int(stats.get("txb") or 0),
+        "rx_bytes": int(stats.get("rxb") or 0),
+        "interfaces": interfaces,
+        "collected_at": int(now if now is not None else time.time()),
+    }
+
+
+def unreachable(reason: str = "rnsd not reachable", now: float = None) -> dict:
+    """Snapshot payload used when rnsd cannot be queried."""
+    return {
+        "error": reason,
+        "interfaces": [],
+        "collected_at": int(now if now is not None else time.time()),
+    }
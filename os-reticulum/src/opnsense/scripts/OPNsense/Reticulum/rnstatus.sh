@@ -2,6 +2,22 @@
 
 VENV="/usr/local/reticulum-venv"
 CONFIG="/usr/local/etc/reticulum"
+SNAPSHOT="/var/run/reticulum/status.json"
+COLLECTOR="/usr/local/opnsense/scripts/OPNsense/Reticulum/collector.py"
 
-# 5 second timeout
-timeout 5 "${VENV}/bin/rnstatus" --config "${CONFIG}" --json 2>/dev/null || echo '{"error":"rnsd not reachable","interfaces":[]}'
+# Serve the collector snapshot when it is fresh. The collector refreshes it
+# every few seconds; anything older than MAX_AGE means the collector is not
+# running, so fall through to a one-shot query instead of serving stale data.
+MAX_AGE=30
+if [ -f "${SNAPSHOT}" ]; then
+    NOW=$(date +%s)
+    MTIME=$(stat -f %m "${SNAPSHOT}" 2>/dev/null || echo 0)
+    if [ $((NOW - MTIME)) -le ${MAX_AGE} ]; then
+        cat "${SNAPSHOT}"
+        exit 0
+    fi
+fi
+
+# One-shot RPC query (stdlib only, no RNS import), 5 second timeout
+timeout 5 "${VENV}/bin/python3.11" "${COLLECTOR}" --once --config "${CONFIG}" 2>/dev/null \
+    || echo '{"error":"rnsd not reachable","interfaces":[]}'
@@ -0,0 +1,229 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Aggregated runtime state for the Reticulum GUI.
+
+Collects service state, installed versions and rnsd status in a single pass
+so the API can answer one configd call instead of several. Interface stats
+come from the collector snapshot when it is fresh, otherwise from a single
+direct RPC query.
+
+Usage:
+    runtime.py dashboard     # service states + versions + identity + rnstatus + sparklines
+                             # (rnsd.instances lists each transport instance when there are several,
+                             # rnsd.liveness carries the RPC liveness watchdog report)
+    runtime.py info          # versions + node identity + uptime
+    runtime.py supervision   # supervisor restart counters for rnsd and lxmd
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import instances
+import procwatch
+import rnsrpc
+import supervise
+import tsdb
+import watchdog
+
+SNAPSHOT = "/var/run/reticulum/status.json"
+SNAPSHOT_MAX_AGE = 30
+PKG_VERSIONS = "/var/db/reticulum/.pkg-versions"
+RRD_DIR = tsdb.DEFAULT_DIR
+SPARKLINE_POINTS = 30
+SUPERVISE_DIR = supervise.STATE_DIR
+LIVENESS = watchdog.DEFAULT_PATH
+PROCS = procwatch.DEFAULT_STATUS
+# The watcher touches its file every 10 s; an older one means it is not running
+PROCS_MAX_AGE = 30
+PIDFILES = {
+    "rnsd": "/var/run/rnsd.pid",
+    "lxmd": "/var/run/lxmd.pid",
+}
+
+
+def process_states(path: str = None) -> dict:
+    """
+    The process watcher's status file (procwatch.py), or {} when it is
+    missing or stale (watcher not running).
+    """
+    path = path or PROCS
+    try:
+        if time.time() - os.stat(path).st_mtime > PROCS_MAX_AGE:
+            return {}
+        with open(path, encoding="utf-8") as fh:
+            procs = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return procs if isinstance(procs, dict) else {}
+
+
+def service_status(name: str, procs: dict = None, pidfile: str = None) -> str:
+    """
+    "running" or "stopped" for a daemon (rnsd, rnsd-N, lxmd) from the process
+    watcher, as the status endpoints report it (a supervised daemon in
+    backoff or a crash loop is stopped). The pidfile is only probed while
+    the watcher is not running.
+    """
+    procs = process_states() if procs is None else procs
+    entry = procs.get(name)
+    if isinstance(entry, dict) and "state" in entry:
+        return "running" if entry["state"] == "running" else "stopped"
+    return pidfile_status(pidfile or PIDFILES[name])
+
+
+def pidfile_status(pidfile: str) -> str:
+    try:
+        with open(pidfile, encoding="ascii") as fh:
+            pid = int(fh.read().strip())
+        # configd runs as root, so signal 0 works across users (no EPERM).
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return "stopped"
+    return "running"
+
+
+def read_versions(path: str = None) -> dict:
+    """Parse the rns=/lxmf= version record written by pkg-install."""
+    path = path or PKG_VERSIONS
+    versions = {"rns": "unknown", "lxmf": "unknown"}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            for line in fh:
+                key, sep, value = line.strip().partition("=")
+                if sep and key in versions:
+                    versions[key] = value
+    except OSError:
+        pass
+    return versions
+
+
+def load_status(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR,
+                snapshot: str = None,
+                max_age: float = SNAPSHOT_MAX_AGE) -> dict:
+    """Return the collector snapshot if fresh, else query rnsd once."""
+    snapshot = snapshot or SNAPSHOT
+    try:
+        if time.time() - os.stat(snapshot).st_mtime <= max_age:
+            with open(snapshot, encoding="utf-8") as fh:
+                return json.load(fh)
+    except (OSError, ValueError):
+        pass
+    try:
+        return instances.collect(config_dir)
+    except rnsrpc.RpcError:
+        return rnsrpc.unreachable()
+
+
+def _info(status: dict) -> dict:
+    versions = read_versions()
+    return {
+        "rns_version": versions["rns"],
+        "lxmf_version": versions["lxmf"],
+        "node_identity": status.get("identity", ""),
+        "uptime": status.get("uptime", ""),
+    }
+
+
+def _rnsd_status(config_dir: str, rnsd: str) -> dict:
+    # Skip the status query entirely when rnsd is down — there is nothing
+    # to connect to and the RPC timeout would only delay the response.
+    return load_status(config_dir) if rnsd == "running" else rnsrpc.unreachable()
+
+
+def info(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR) -> dict:
+    """Versions, node identity and uptime from a single status query."""
+    return _info(_rnsd_status(config_dir, service_status("rnsd")))
+
+
+def supervision() -> dict:
+    """
+    Supervisor state per service: restart counters, last exit code and
+    crash time, and whether it is in backoff or a crash loop ({} if the
+    service has never run supervised).
+    """
+    return {name: supervise.read_state(name, SUPERVISE_DIR) for name in PIDFILES}
+
+
+def liveness(path: str = None) -> dict:
+    """
+    Latest RPC liveness watchdog report, or {} when the watchdog is off or
+    its report is stale (the collector rewrites it every interval).
+    """
+    path = path or LIVENESS
+    try:
+        if time.time() - os.stat(path).st_mtime > SNAPSHOT_MAX_AGE:
+            return {}
+        with open(path, encoding="utf-8") as fh:
+            report = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return report if isinstance(report, dict) else {}
+
+
+def _degraded(report: dict) -> set:
+    """Instance numbers the watchdog has marked degraded."""
+    return {entry.get("instance") for entry in report.get("instances", [])
+            if entry.get("state") == "degraded"}
+
+
+def transport_instances(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR, procs: dict = None) -> list:
+    """Service and supervisor state of each configured rnsd transport instance."""
+    procs = process_states() if procs is None else procs
+    return [
+        {"instance": number,
+         "status": service_status(instances.service_name(number), procs, instances.pidfile(number)),
+         "supervisor": supervise.read_state(instances.service_name(number), SUPERVISE_DIR)}
+        for number in range(len(instances.config_dirs(config_dir)))
+    ]
+
+
+def dashboard(config_dir: str = rnsrpc.DEFAULT_CONFIG_DIR) -> dict:
+    procs = process_states()
+    rnsd = service_status("rnsd", procs)
+    status = _rnsd_status(config_dir, rnsd)
+    supervisor = supervision()
+    rnsd_state = {"status": rnsd, "supervisor": supervisor["rnsd"]}
+    transport = transport_instances(config_dir, procs)
+    report = liveness()
+    if report:
+        # A live PID that stopped answering RPC is not "running"
+        degraded = _degraded(report)
+        for entry in transport:
+            if entry["status"] == "running" and entry["instance"] in degraded:
+                entry["status"] = "degraded"
+        if rnsd == "running" and 0 in degraded:
+            rnsd_state["status"] = "degraded"
+        rnsd_state["liveness"] = report
+    if len(transport) > 1:
+        rnsd_state["instances"] = transport
+    return {
+        "rnsd": rnsd_state,
+        "lxmd": {"status": service_status("lxmd", procs), "supervisor": supervisor["lxmd"]},
+        "info": _info(status),
+        "rnstatus": status,
+        # Last 30 minutes of 1-minute throughput per interface for sparklines
+        "traffic": tsdb.read_series(RRD_DIR, "1m", SPARKLINE_POINTS)["interfaces"],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum runtime state")
+    parser.add_argument("command", choices=["dashboard", "info", "supervision"])
+    parser.add_argument("--config", default=rnsrpc.DEFAULT_CONFIG_DIR,
+                        help="rnsd config directory")
+    args = parser.parse_args(argv)
+
+    if args.command == "dashboard":
+        result = dashboard(args.config)
+    elif args.command == "supervision":
+        result = supervision()
+    else:
+        result = info(args.config)
+    print(json.dumps(result, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
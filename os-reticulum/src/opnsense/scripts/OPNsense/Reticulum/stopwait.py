@@ -0,0 +1,209 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Graceful stop for the rnsd, lxmd and status collector rc.d scripts.
+
+A bare kill followed by removing the pidfile lets `onerestart` start a new
+rnsd while the old one still holds the shared instance port and the
+TCPServerInterface listen sockets, which then fails to bind. Instead:
+
+  1. SIGTERM the daemon's process tree (daemon(8)'s sh child and rnsd/lxmd)
+  2. wait up to --timeout seconds for every process to exit
+  3. escalate to SIGKILL for whatever is left, and wait KILL_WAIT seconds
+  4. for rnsd, wait until its listen ports can be bound again
+
+The collector needs no port check, but a restart must not overlap the old
+collector, or both would write the snapshot, metrics and log index.
+
+How long the stop took and which signal finished it is printed and
+recorded in <STATE_DIR>/<service>.stop.json.
+
+`ports-free` runs step 4 alone; rnsd's start_precmd uses it so start never
+proceeds while another process still holds one of rnsd's ports.
+
+Usage:
+    stopwait.py stop <rnsd|lxmd|collector> --pidfile PATH [--config DIR] [--timeout SECONDS]
+    stopwait.py ports-free [--config DIR] [--timeout SECONDS]
+
+Exit status: 0 stopped / ports free, 1 process survived SIGKILL,
+2 ports still in use after the deadline.
+"""
+import argparse
+import errno
+import json
+import os
+import signal
+import socket
+import sys
+import time
+
+import readiness
+import rnsrpc
+
+STATE_DIR = "/var/run/reticulum"
+DEFAULT_TIMEOUT = 10.0
+KILL_WAIT = 3.0
+PORT_WAIT = 5.0
+POLL_INTERVAL = 0.1
+
+# Interface types whose rendered config carries listen_ip/listen_port
+LISTEN_TYPES = {
+    "TCPServerInterface": socket.SOCK_STREAM,
+    "BackboneInterface": socket.SOCK_STREAM,
+    "UDPInterface": socket.SOCK_DGRAM,
+}
+
+
+def listen_ports(config_dir: str) -> list:
+    """
+    (host, port, socket type) of everything rnsd binds: the shared instance
+    and control ports plus the listen sockets of server/UDP interfaces.
+    """
+    ports = []
+    shared = readiness.instance_ports(config_dir)
+    if shared is not None:
+        ports += [("127.0.0.1", port, socket.SOCK_STREAM) for port in shared]
+    sections = []
+    try:
+        with open(os.path.join(config_dir, "config"), encoding="utf-8") as fh:
+            for raw in fh:
+                line = raw.strip()
+                if line.startswith("[[") and line.endswith("]]"):
+                    sections.append({})
+                elif sections and "=" in line and not line.startswith("#"):
+                    key, _, value = line.partition("=")
+                    sections[-1][key.strip()] = value.strip()
+    except OSError:
+        pass
+    for section in sections:
+        kind = LISTEN_TYPES.get(section.get("type"))
+        port = section.get("listen_port", "")
+        if kind is not None and port.isdigit():
+            ports.append((section.get("listen_ip") or "0.0.0.0", int(port), kind))
+    return ports
+
+
+def port_in_use(host: str, port: int, kind: int = socket.SOCK_STREAM) -> bool:
+    """
+    True when binding host:port fails with EADDRINUSE. SO_REUSEADDR is set
+    for TCP exactly as rnsd's listeners do, so sockets lingering in
+    TIME_WAIT do not count as busy.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    with socket.socket(family, kind) as sock:
+        if kind == socket.SOCK_STREAM:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        try:
+            sock.bind((host, port))
+        except OSError as exc:
+            # Anything but "in use" (e.g. an address not configured on this
+            # host) is rnsd's problem to report, not a reason to wait.
+            return exc.errno == errno.EADDRINUSE
+    return False
+
+
+def wait_ports_free(ports: list, timeout: float = PORT_WAIT) -> list:
+    """Poll until every port can be bound; returns the ones still busy."""
+    deadline = time.monotonic() + timeout
+    while True:
+        busy = [p for p in ports if port_in_use(*p)]
+        if not busy or time.monotonic() >= deadline:
+            return busy
+        time.sleep(POLL_INTERVAL)
+
+
+def _signal_all(pids, signum):
+    for pid in pids:
+        try:
+            os.kill(pid, signum)
+        except OSError:
+            pass
+
+
+def _wait_exit(pids, timeout: float) -> set:
+    """Wait for the processes to exit; returns the survivors."""
+    deadline = time.monotonic() + timeout
+    while True:
+        alive = {pid for pid in pids if readiness.pid_alive(pid)}
+        if not alive or time.monotonic() >= deadline:
+            return alive
+        time.sleep(POLL_INTERVAL)
+
+
+def stop(pidfile: str, timeout: float = DEFAULT_TIMEOUT):
+    """
+    Terminate the process tree behind pidfile. Returns (seconds, signal
+    name that ended it or None if nothing was running, survivors).
+    """
+    started = time.monotonic()
+    pid = readiness.read_pid(pidfile)
+    if pid is None or not readiness.pid_alive(pid):
+        return 0.0, None, set()
+    tree = readiness.process_tree(pid)
+    # Root first: under supervise.py the supervisor must see the stop
+    # request before it sees the daemon exit, or it would restart it.
+    _signal_all([pid] + sorted(tree - {pid}), signal.SIGTERM)
+    alive = _wait_exit(tree, timeout)
+    used = "SIGTERM"
+    if alive:
+        _signal_all(alive, signal.SIGKILL)
+        alive = _wait_exit(alive, KILL_WAIT)
+        used = "SIGKILL"
+    return time.monotonic() - started, used, alive
+
+
+def record(service: str, seconds: float, used: str, state_dir: str = None):
+    """Persist the last stop duration for status pages; best effort."""
+    path = os.path.join(state_dir or STATE_DIR, f"{service}.stop.json")
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"seconds": round(seconds, 3), "signal": used,
+                       "stopped_at": int(time.time())}, fh)
+    except OSError:
+        pass
+
+
+def _describe(ports) -> str:
+    return ", ".join(
+        f"{host}:{port}/{'udp' if kind == socket.SOCK_DGRAM else 'tcp'}"
+        for host, port, kind in ports
+    )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Stop rnsd/lxmd and wait for exit")
+    parser.add_argument("command", choices=["stop", "ports-free"])
+    parser.add_argument("service", nargs="?", choices=["rnsd", "lxmd", "collector"],
+                        default="rnsd")
+    parser.add_argument("--pidfile")
+    parser.add_argument("--config", default=rnsrpc.DEFAULT_CONFIG_DIR,
+                        help="rnsd config directory (listen ports)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    if args.command == "stop":
+        if not args.pidfile:
+            parser.error("stop requires --pidfile")
+        seconds, used, alive = stop(args.pidfile, max(args.timeout, 0.0))
+        if alive:
+            print(f"{args.service} did not exit after SIGKILL "
+                  f"(PID: {' '.join(map(str, sorted(alive)))})")
+            return 1
+        if used is None:
+            print(f"{args.service} was not running")
+        else:
+            record(args.service, seconds, used)
+            print(f"{args.service} stopped in {seconds:.2f}s ({used})")
+        if args.service != "rnsd":
+            return 0
+
+    wait = PORT_WAIT if args.command == "stop" else args.timeout
+    busy = wait_ports_free(listen_ports(args.config), wait)
+    if busy:
+        print(f"ports still in use: {_describe(busy)}")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Crash-restart supervisor for rnsd and lxmd.
+
+With <svc>_supervise="YES" the rc.d scripts run this under daemon(8)
+instead of the daemon itself. The supervisor starts the daemon (output
+appended to its log), and when the daemon exits without being asked to
+it restarts it after an exponential backoff:
+
+    BACKOFF_BASE, 2x, 4x, ... capped at BACKOFF_MAX seconds
+
+The backoff resets once a run has lasted STABLE_AFTER seconds. More than
+CRASH_LOOP_LIMIT exits within CRASH_LOOP_WINDOW seconds is a crash loop:
+the state says so and restarts only happen every BACKOFF_MAX seconds, so
+a daemon that cannot start does not burn CPU in a tight respawn loop.
+
+SIGTERM/SIGINT (rc.d stop) is forwarded to the daemon, and the
+supervisor exits once the daemon is gone, without restarting it.
+
+State is kept in <state dir>/<service>.json (counters persist across
+supervisor restarts and reboots):
+    {"service", "state": running|backoff|crashloop|stopped, "pid",
+     "started_at", "restarts", "consecutive_crashes", "last_exit_code",
+     "last_crash", "next_restart_at", "updated_at"}
+last_exit_code is negative for a signal, as in subprocess.
+
+Usage:
+    supervise.py <rnsd|lxmd|rnsd-N> --log FILE [--state-dir DIR] -- COMMAND [ARGS...]
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+STATE_DIR = "/var/db/reticulum/supervise"
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+STABLE_AFTER = 120.0
+CRASH_LOOP_LIMIT = 5
+CRASH_LOOP_WINDOW = 600.0
+SLEEP_STEP = 0.5
+
+COUNTERS = ("restarts", "last_exit_code", "last_crash")
+
+
+def state_path(service: str, state_dir: str = None) -> str:
+    return os.path.join(state_dir or STATE_DIR, f"{service}.json")
+
+
+def read_state(service: str, state_dir: str = None) -> dict:
+    """Last recorded supervisor state, or {} when never supervised."""
+    try:
+        with open(state_path(service, state_dir), encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def backoff_delay(consecutive: int) -> float:
+    """Delay before restart number `consecutive` (1-based) of a crash streak."""
+    return min(BACKOFF_BASE * 2 ** max(consecutive - 1, 0), BACKOFF_MAX)
+
+
+class Supervisor:
+    """Runs one daemon and restarts it with backoff when it exits."""
+
+    def __init__(self, service: str, command: list, log_path: str, state_dir: str = None):
+        self.service = service
+        self.command = command
+        self.log_path = log_path
+        self.path = state_path(service, state_dir)
+        previous = read_state(service, state_dir)
+        self.state = {"service": service, "state": "stopped", "pid": None,
+                      "started_at": None, "restarts": 0, "consecutive_crashes": 0,
+                      "last_exit_code": None, "last_crash": None,
+                      "next_restart_at": None, "updated_at": None}
+        self.state.update({key: previous[key] for key in COUNTERS if key in previous})
+        self.crashes = []          # monotonic times of recent unexpected exits
+        self.child = None
+        self.stopping = False
+
+    def _save(self, **changes):
+        self.state.update(changes, updated_at=int(time.time()))
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                json.dump(self.state, fh, separators=(",", ":"))
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _log(self, level: str, message: str):
+        # RNS log line format, so the log viewer's level filter applies
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        try:
+            with open(self.log_path, "a", encoding="utf-8") as fh:
+                fh.write(f"[{stamp}] [{level}] supervise: {message}\n")
+        except OSError:
+            pass
+
+    def stop(self, *_args):
+        self.stopping = True
+        if self.child is not None and self.child.poll() is None:
+            try:
+                self.child.terminate()
+            except OSError:
+                pass
+
+    def _sleep(self, seconds: float):
+        deadline = time.monotonic() + seconds
+        while not self.stopping and time.monotonic() < deadline:
+            time.sleep(min(SLEEP_STEP, max(deadline - time.monotonic(), 0)))
+
+    def run_once(self) -> int:
+        """Start the daemon, wait for it to exit, return its exit code."""
+        with open(self.log_path, "ab") as log:
+            self.child = subprocess.Popen(self.command, stdout=log, stderr=log,
+                                          stdin=subprocess.DEVNULL)
+        if self.stopping:
+            # stop() ran before the child existed
+            self.child.terminate()
+        self._save(state="running", pid=self.child.pid, started_at=int(time.time()),
+                   next_restart_at=None)
+        code = self.child.wait()
+        self.child = None
+        return code
+
+    def on_exit(self, code: int, ran_for: float) -> float:
+        """Record an unexpected exit; returns the delay before the next start."""
+        now = time.monotonic()
+        if ran_for >= STABLE_AFTER:
+            self.state["consecutive_crashes"] = 0
+        self.crashes = [t for t in self.crashes if now - t < CRASH_LOOP_WINDOW] + [now]
+        consecutive = self.state["consecutive_crashes"] + 1
+        crash_loop = len(self.crashes) > CRASH_LOOP_LIMIT
+        delay = BACKOFF_MAX if crash_loop else backoff_delay(consecutive)
+        self._save(state="crashloop" if crash_loop else "backoff", pid=None,
+                   consecutive_crashes=consecutive, last_exit_code=code,
+                   last_crash=int(time.time()),
+                   next_restart_at=int(time.time() + delay))
+        self._log("Error", f"{self.service} exited with code {code} after {ran_for:.0f}s; "
+                           f"restarting in {delay:.0f}s"
+                           + (" (crash loop)" if crash_loop else ""))
+        return delay
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        first = True
+        while not self.stopping:
+            if not first:
+                self.state["restarts"] += 1
+            first = False
+            started = time.monotonic()
+            code = self.run_once()
+            if self.stopping:
+                break
+            self._sleep(self.on_exit(code, time.monotonic() - started))
+        self._save(state="stopped", pid=None, next_restart_at=None)
+        return 0
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Everything after "--" is the daemon command line, options included
+    split = argv.index("--") if "--" in argv else len(argv)
+    parser = argparse.ArgumentParser(description="Supervise rnsd/lxmd with restart backoff")
+    # rnsd-1 .. rnsd-3 are the extra rnsd transport instances (instances.py)
+    parser.add_argument("service", choices=["rnsd", "lxmd", "rnsd-1", "rnsd-2", "rnsd-3"])
+    parser.add_argument("--log", required=True, help="file the daemon's output is appended to")
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    args = parser.parse_args(argv[:split])
+    command = argv[split + 1:]
+    if not command:
+        parser.error("missing daemon command after --")
+    return Supervisor(args.service, command, args.log, args.state_dir).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Fixed-size on-disk time series for per-interface TX/RX throughput.
+
+RRD-style storage without an external database: every interface gets one
+preallocated file holding three ring buffers (tiers) of averaged bytes/sec
+samples. A slot's position is derived from its bucket timestamp, so writes
+are in-place pwrite()s of 24 bytes and the file never grows. Slots older
+than a tier's span are simply ignored on read.
+
+    tier  step    slots  span
+    1m    60 s    180    3 h
+    5m    300 s   288    24 h
+    1h    3600 s  168    7 d
+
+The collector feeds TrafficStore with cumulative counters from each
+snapshot; this module turns counter deltas into rates and consolidates
+them into every tier independently.
+
+Usage:
+    tsdb.py [--tier 1m|5m|1h] [--points N] [--dir DIR]
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+
+DEFAULT_DIR = "/var/db/reticulum/rrd"
+TIERS = (
+    ("1m", 60, 180),
+    ("5m", 300, 288),
+    ("1h", 3600, 168),
+)
+TIER_NAMES = tuple(name for name, _step, _slots in TIERS)
+MAX_SERIES = 256
+# Interfaces absent from this many consecutive samples (5 min at the
+# collector's 5 s interval) are forgotten: spawned "Client on ..." and
+# renamed interfaces must not accumulate state
+EVICT_AFTER = 60
+
+MAGIC = b"RTS1"
+HEADER = struct.Struct("<4sHH64s")   # magic, version, reserved, interface name
+SLOT = struct.Struct("<qdd")         # bucket start (epoch s), tx B/s, rx B/s
+SUFFIX = ".rts"
+
+
+def _tier_offsets():
+    offsets = {}
+    offset = HEADER.size
+    for name, step, slots in TIERS:
+        offsets[name] = (offset, step, slots)
+        offset += slots * SLOT.size
+    return offsets, offset
+
+
+TIER_OFFSETS, FILE_SIZE = _tier_offsets()
+
+
+def series_filename(name: str) -> str:
+    """Stable, filesystem-safe file name for an interface name."""
+    return hashlib.sha1(name.encode("utf-8")).hexdigest()[:16] + SUFFIX
+
+
+class Series:
+    """One interface's ring-buffer file plus in-memory bucket accumulators."""
+
+    def __init__(self, path: str, name: str):
+        self.path = path
+        self.name = name
+        # tier -> [bucket_start, tx_bytes, rx_bytes, seconds]
+        self._buckets = {}
+        if not os.path.exists(path) or os.path.getsize(path) != FILE_SIZE:
+            self._create()
+
+    def _create(self):
+        encoded = self.name.encode("utf-8")[:64]
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(HEADER.pack(MAGIC, 1, 0, encoded))
+            fh.write(b"\0" * (FILE_SIZE - HEADER.size))
+        os.replace(tmp_path, self.path)
+
+    def add(self, now: float, tx_bytes: int, rx_bytes: int, seconds: float):
+        """Account a counter delta that ended at `now` into every tier."""
+        for tier, (_offset, step, _slots) in TIER_OFFSETS.items():
+            start = int(now) - int(now) % step
+            bucket = self._buckets.get(tier)
+            if bucket is not None and bucket[0] != start:
+                self._write(tier, bucket)
+                bucket = None
+            if bucket is None:
+                bucket = self._buckets[tier] = [start, 0, 0, 0.0]
+            bucket[1] += tx_bytes
+            bucket[2] += rx_bytes
+            bucket[3] += seconds
+
+    def flush(self):
+        """Persist in-progress buckets (used on shutdown)."""
+        for tier, bucket in self._buckets.items():
+            self._write(tier, bucket)
+
+    def _write(self, tier: str, bucket: list):
+        start, tx, rx, seconds = bucket
+        if seconds <= 0:
+            return
+        offset, step, slots = TIER_OFFSETS[tier]
+        position = offset + ((start // step) % slots) * SLOT.size
+        fd = os.open(self.path, os.O_WRONLY)
+        try:
+            os.pwrite(fd, SLOT.pack(start, tx / seconds, rx / seconds), position)
+        finally:
+            os.close(fd)
+
+
+class TrafficStore:
+    """
+    Turns successive cumulative counters into rates and feeds the series
+    files. State is kept only for interfaces seen within the last
+    EVICT_AFTER samples, and both open series and files are capped at
+    MAX_SERIES: a new interface takes over the slot (and file) of the least
+    recently seen one. Files of interfaces that have not been updated for
+    longer than the longest tier span are pruned.
+    """
+
+    def __init__(self, directory: str = DEFAULT_DIR, max_series: int = MAX_SERIES,
+                 evict_after: int = EVICT_AFTER):
+        self.directory = directory
+        self.max_series = max_series
+        self.evict_after = evict_after
+        self._series = {}
+        self._last = {}
+        self._seen = {}      # name -> sample number it was last present in
+        self._samples = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def update(self, snapshot: dict, now: float = None):
+        """
+        Feed one collector snapshot. Each interface dict gains tx_rate and
+        rx_rate (bytes/sec since the previous sample, None on the first
+        sample or after a counter reset).
+        """
+        now = time.time() if now is None else now
+        self._samples += 1
+        for iface in snapshot.get("interfaces", []):
+            name = iface.get("name")
+            if not name:
+                continue
+            self._seen[name] = self._samples
+            tx, rx = int(iface.get("tx_bytes") or 0), int(iface.get("rx_bytes") or 0)
+            iface["tx_rate"] = iface["rx_rate"] = None
+            last = self._last.get(name)
+            self._last[name] = (now, tx, rx)
+            if last is None:
+                continue
+            seconds = now - last[0]
+            dtx, drx = tx - last[1], rx - last[2]
+            # Negative deltas mean rnsd restarted and counters reset:
+            # re-prime instead of recording a bogus spike.
+            if seconds <= 0 or dtx < 0 or drx < 0:
+                continue
+            iface["tx_rate"] = round(dtx / seconds, 1)
+            iface["rx_rate"] = round(drx / seconds, 1)
+            series = self._get_series(name)
+            if series is not None:
+                series.add(now, dtx, drx, seconds)
+        self._evict()
+
+    def _evict(self):
+        """Forget interfaces missing from the last evict_after samples."""
+        for name, seen in list(self._seen.items()):
+            if self._samples - seen >= self.evict_after:
+                self._forget(name)
+
+    def _forget(self, name: str):
+        del self._seen[name]
+        self._last.pop(name, None)
+        series = self._series.pop(name, None)
+        if series is not None:
+            series.flush()
+
+    def _get_series(self, name: str):
+        series = self._series.get(name)
+        if series is None:
+            if len(self._series) >= self.max_series:
+                # Only interfaces absent from the current sample give way
+                idle = [n for n in self._series if self._seen.get(n) != self._samples]
+                if not idle:
+                    return None
+                self._forget(min(idle, key=lambda n: self._seen.get(n, 0)))
+            path = os.path.join(self.directory, series_filename(name))
+            if not os.path.exists(path):
+                self._reclaim()
+            series = Series(path, name)
+            self._series[name] = series
+        return series
+
+    def _reclaim(self):
+        """Delete the oldest closed files so a new one keeps the count within max_series."""
+        live = {s.path for s in self._series.values()}
+        closed = sorted(
+            (entry.stat().st_mtime, entry.path) for entry in os.scandir(self.directory)
+            if entry.name.endswith(SUFFIX) and entry.path not in live
+        )
+        excess = len(live) + len(closed) + 1 - self.max_series
+        for _mtime, path in closed[:max(0, excess)]:
+            os.unlink(path)
+
+    def flush(self):
+        for series in self._series.values():
+            series.flush()
+
+    def prune(self, now: float = None):
+        """Delete series files untouched for longer than the longest tier span."""
+        now = time.time() if now is None else now
+        max_span = max(step * slots for _name, step, slots in TIERS)
+        live = {s.path for s in self._series.values()}
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(SUFFIX) or entry.path in live:
+                continue
+            if now - entry.stat().st_mtime > max_span:
+                os.unlink(entry.path)
+
+
+def read_series(directory: str = DEFAULT_DIR, tier: str = "1m",
+                points: int = None, now: float = None) -> dict:
+    """
+    Return {"tier", "step", "interfaces": {name: {"t": [], "tx": [], "rx": []}}}
+    with samples in ascending time order, limited to the tier span and
+    optionally to the last `points` samples.
+    """
+    offset, step, slots = TIER_OFFSETS[tier]
+    now = time.time() if now is None else now
+    oldest = now - step * slots
+    result = {"tier": tier, "step": step, "interfaces": {}}
+    try:
+        entries = [e for e in os.scandir(directory) if e.name.endswith(SUFFIX)]
+    except OSError:
+        return result
+    for entry in entries:
+        try:
+            with open(entry.path, "rb") as fh:
+                magic, _version, _reserved, raw_name = HEADER.unpack(fh.read(HEADER.size))
+                if magic != MAGIC:
+                    continue
+                fh.seek(offset)
+                block = fh.read(slots * SLOT.size)
+        except (OSError, struct.error):
+            continue
+        samples = sorted(
+            s for s in SLOT.iter_unpack(block) if s[0] > 0 and s[0] >= oldest
+        )
+        if points:
+            samples = samples[-points:]
+        name = raw_name.rstrip(b"\0").decode("utf-8", "replace")
+        result["interfaces"][name] = {
+            "t": [s[0] for s in samples],
+            "tx": [round(s[1], 1) for s in samples],
+            "rx": [round(s[2], 1) for s in samples],
+        }
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum interface traffic series")
+    parser.add_argument("--tier", choices=TIER_NAMES, default="1m")
+    parser.add_argument("--points", type=int, default=0,
+                        help="return only the last N samples per interface")
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    args = parser.parse_args(argv)
+    print(json.dumps(read_series(args.dir, args.tier, args.points or None),
+                     separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+#!/usr/local/reticulum-venv/bin/python3.11
+"""
+Install fingerprint for the Reticulum virtualenv.
+
+pkg-install records a fingerprint after installing rns/lxmf and checks it
+on the next (re)install, so a plugin-only upgrade does not touch the venv:
+
+    {"pins": {"rns": "1.1.4", "lxmf": "0.9.3", "pyserial": "3.5"},  # versions.env
+     "python": "3.11.9",
+     "dists": {"rns": {"version": "1.1.4", "manifest": "<sha256>"}, ...}}
+
+A distribution's manifest hash covers the path and recorded hash of every
+file in its RECORD. `check` additionally verifies each file against its
+RECORD hash, so a deleted or modified file counts as drift even when the
+versions still match.
+
+Must run under the venv interpreter to see the venv's distributions.
+
+Usage:
+    venvstate.py check  --fingerprint FILE --rns TAG --lxmf TAG --pyserial VERSION
+    venvstate.py record --fingerprint FILE --rns TAG --lxmf TAG --pyserial VERSION
+
+check exits 0 when nothing changed, 3 and prints the drifted distribution
+names when only those need reinstalling, 1 when a full install is needed.
+"""
+import argparse
+import base64
+import hashlib
+import json
+import os
+import platform
+import sys
+from importlib import metadata
+
+DISTS = ("rns", "lxmf", "pyserial")
+UNCHANGED, FULL, DRIFT = 0, 1, 3
+
+
+def _distribution(name: str, path=None):
+    dists = metadata.distributions() if path is None else metadata.distributions(path=path)
+    for dist in dists:
+        if (dist.metadata["Name"] or "").lower() == name:
+            return dist
+    return None
+
+
+def _hashed_files(dist) -> list:
+    # RECORD entries without a hash (RECORD itself, INSTALLER, bytecode)
+    # are expected to change and are left out.
+    return sorted((str(f), f.hash.value) for f in dist.files or () if f.hash is not None)
+
+
+def manifest_hash(dist) -> str:
+    digest = hashlib.sha256()
+    for path, recorded in _hashed_files(dist):
+        digest.update(f"{path}\0{recorded}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def files_intact(dist) -> bool:
+    """True when every hashed RECORD file exists with the recorded content."""
+    for package_path in dist.files or ():
+        if package_path.hash is None:
+            continue
+        try:
+            with open(package_path.locate(), "rb") as fh:
+                actual = hashlib.new(package_path.hash.mode, fh.read()).digest()
+        except (OSError, ValueError):
+            return False
+        encoded = base64.urlsafe_b64encode(actual).rstrip(b"=").decode("ascii")
+        if encoded != package_path.hash.value:
+            return False
+    return True
+
+
+def fingerprint(pins: dict, path=None) -> dict:
+    dists = {}
+    for name in DISTS:
+        dist = _distribution(name, path)
+        if dist is not None:
+            dists[name] = {"version": dist.version, "manifest": manifest_hash(dist)}
+    return {"pins": pins, "python": platform.python_version(), "dists": dists}
+
+
+def read_fingerprint(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, ValueError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def check(recorded: dict, pins: dict, path=None):
+    """
+    Compare the venv against a recorded fingerprint. Returns (UNCHANGED, []),
+    (DRIFT, [names to reinstall]) or (FULL, []).
+    """
+    if not recorded or recorded.get("pins") != pins \
+            or recorded.get("python") != platform.python_version():
+        return FULL, []
+    expected = recorded.get("dists") or {}
+    if set(expected) != set(DISTS):
+        return FULL, []
+    drifted = []
+    for name in DISTS:
+        dist = _distribution(name, path)
+        if dist is None or dist.version != expected[name].get("version") \
+                or manifest_hash(dist) != expected[name].get("manifest") \
+                or not files_intact(dist):
+            drifted.append(name)
+    return (DRIFT, drifted) if drifted else (UNCHANGED, [])
+
+
+def record(fingerprint_path: str, pins: dict, path=None) -> dict:
+    data = fingerprint(pins, path)
+    tmp_path = fingerprint_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as fh:
+        json.dump(data, fh, indent=1, sort_keys=True)
+    os.replace(tmp_path, fingerprint_path)
+    return data
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reticulum venv install fingerprint")
+    parser.add_argument("command", choices=["check", "record"])
+    parser.add_argument("--fingerprint", required=True)
+    parser.add_argument("--rns", required=True, help="RNS_TAG from versions.env")
+    parser.add_argument("--lxmf", required=True, help="LXMF_TAG from versions.env")
+    parser.add_argument("--pyserial", required=True, help="PYSERIAL_VERSION from versions.env")
+    args = parser.parse_args(argv)
+    pins = {"rns": args.rns, "lxmf": args.lxmf, "pyserial": args.pyserial}
+
+    if args.command == "record":
+        record(args.fingerprint, pins)
+        return 0
+    state, drifted = check(read_fingerprint(args.fingerprint), pins)
+    if drifted:
+        print(" ".join(drifted))
+    return state
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,154 @@
+"""
+rnsd liveness watchdog.
+
+A live pidfile only proves the rnsd process exists: an rnsd wedged on a
+lock or a blocking interface keeps its PID while answering nothing. The
+collector already queries every transport instance over the shared-instance
+RPC channel each interval; with --watchdog it does so with a tight timeout
+and feeds each result to a Watchdog, which tracks per instance:
+
+    ok          the last query was answered
+    failing     1 .. threshold-1 consecutive failed queries
+    degraded    threshold consecutive failures while the process is alive
+    restarting  killed by the watchdog, within RESTART_GRACE of the kill
+    stopped     no live process behind the pidfile (not a hang)
+    unknown     the RPC channel cannot be used with this config
+                (rnsrpc.RpcUnavailable, e.g. share_instance disabled)
+
+With restart enabled, a degraded instance that runs under supervise.py is
+sent SIGKILL (a hung interpreter may never run its SIGTERM handler) and the
+supervisor restarts it with its usual backoff. Unsupervised instances are
+only reported: killing them would leave rnsd down.
+
+The report is written to the liveness file with each instance's "state"
+right after its number and service, so shell consumers can match one
+instance without parsing JSON:
+    {"state", "updated_at", "threshold", "timeout", "restart",
+     "latency_ms": {"p50", "p90", "p99", "max", "samples"},
+     "instances": [{"instance", "service", "state", "consecutive_failures",
+                    "last_ok", "last_error", "restarts", "latency_ms"}]}
+Latency percentiles cover the last WINDOW answered queries; failed queries
+are counted, not timed.
+"""
+import collections
+import math
+import os
+import signal
+import time
+
+import instances
+import readiness
+import rnsrpc
+import supervise
+
+DEFAULT_PATH = "/var/run/reticulum/liveness.json"
+DEFAULT_FAILURES = 3
+RPC_TIMEOUT = 1.0
+WINDOW = 120
+RESTART_GRACE = 60.0
+# Most severe first: the overall state is the first one any instance is in
+STATES = ("degraded", "restarting", "failing", "ok", "stopped", "unknown")
+
+
+def percentiles(samples) -> dict:
+    """Nearest-rank p50/p90/p99 and max of latency samples in milliseconds."""
+    ordered = sorted(samples)
+    if not ordered:
+        return {"p50": None, "p90": None, "p99": None, "max": None, "samples": 0}
+
+    def rank(pct):
+        return round(ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)], 1)
+
+    return {"p50": rank(50), "p90": rank(90), "p99": rank(99),
+            "max": round(ordered[-1], 1), "samples": len(ordered)}
+
+
+class Watchdog:
+    """Tracks RPC liveness of every rnsd transport instance."""
+
+    def __init__(self, failures: int = DEFAULT_FAILURES, restart: bool = False,
+                 timeout: float = None, state_dir: str = None, log=None):
+        self.threshold = max(1, int(failures))
+        self.restart = restart
+        self.timeout = timeout or RPC_TIMEOUT
+        self.state_dir = state_dir
+        self.log = log or (lambda message: None)
+        self.tracked = {}
+
+    def _track(self, number: int) -> dict:
+        if number not in self.tracked:
+            self.tracked[number] = {
+                "samples": collections.deque(maxlen=WINDOW), "state": "unknown",
+                "consecutive_failures": 0, "last_ok": None, "last_error": None,
+                "restarts": 0, "grace_until": 0.0,
+            }
+        return self.tracked[number]
+
+    def observe(self, results: list, now: float = None) -> dict:
+        """Record one instances.query() round and return the report."""
+        now = time.time() if now is None else now
+        for number, (_snap, seconds, error) in enumerate(results):
+            self._observe(number, seconds, error, now)
+        for number in [n for n in self.tracked if n >= len(results)]:
+            del self.tracked[number]
+        return self.report(now)
+
+    def _observe(self, number: int, seconds: float, error, now: float):
+        track = self._track(number)
+        if error is None:
+            track["samples"].append(seconds * 1000)
+            track.update(state="ok", consecutive_failures=0, last_ok=int(now), grace_until=0.0)
+            return
+        track["last_error"] = str(error)
+        pid = readiness.read_pid(instances.pidfile(number))
+        if isinstance(error, rnsrpc.RpcUnavailable):
+            track.update(state="unknown", consecutive_failures=0)
+        elif now < track["grace_until"]:
+            track["state"] = "restarting"
+        elif pid is None or not readiness.pid_alive(pid):
+            track.update(state="stopped", consecutive_failures=0)
+        else:
+            track["consecutive_failures"] += 1
+            if track["consecutive_failures"] < self.threshold:
+                track["state"] = "failing"
+                return
+            if track["state"] != "degraded":
+                self.log(f"{instances.service_name(number)} degraded: "
+                         f"{track['consecutive_failures']} consecutive RPC failures ({error})")
+            track["state"] = "degraded"
+            if self.restart:
+                self._restart(number, track, now)
+
+    def _restart(self, number: int, track: dict, now: float):
+        service = instances.service_name(number)
+        state = supervise.read_state(service, self.state_dir)
+        pid = state.get("pid")
+        if state.get("state") != "running" or not pid:
+            self.log(f"{service} is not supervised; not restarting it")
+            return
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except OSError as exc:
+            self.log(f"cannot restart {service} (PID {pid}): {exc}")
+            return
+        self.log(f"killed unresponsive {service} (PID {pid}); the supervisor restarts it")
+        track.update(state="restarting", consecutive_failures=0, grace_until=now + RESTART_GRACE)
+        track["restarts"] += 1
+
+    def report(self, now: float = None) -> dict:
+        now = time.time() if now is None else now
+        entries = [
+            {"instance": number, "service": instances.service_name(number),
+             "state": track["state"], "consecutive_failures": track["consecutive_failures"],
+             "last_ok": track["last_ok"], "last_error": track["last_error"],
+             "restarts": track["restarts"], "latency_ms": percentiles(track["samples"])}
+            for number, track in sorted(self.tracked.items())
+        ]
+        present = {entry["state"] for entry in entries}
+        return {
+            "state": next((state for state in STATES if state in present), "unknown"),
+            "updated_at": int(now), "threshold": self.threshold, "timeout": self.timeout,
+            "restart": self.restart,
+            "latency_ms": percentiles([s for track in self.tracked.values() for s in track["samples"]]),
+            "instances": entries,
+        }
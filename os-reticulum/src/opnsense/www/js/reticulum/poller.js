@@ -0,0 +1,251 @@
+/**
+ * Reticulum shared polling scheduler
+ *
+ * One scheduler for every periodic refresh on the Reticulum pages and the
+ * dashboard widget, so a forgotten browser tab costs (almost) no API calls:
+ *
+ * - Polling pauses while the page is hidden (Page Visibility API); when it
+ *   becomes visible again every task runs at once, then resumes its interval.
+ * - A task runs again only after its previous run settled (no setInterval
+ *   pile-up behind a slow configd). A run whose promise rejects backs the
+ *   task off exponentially (interval x 2^failures, capped at MAX_BACKOFF);
+ *   the first success restores the normal interval.
+ * - fetch() de-duplicates concurrent GETs of the same URL and parameters:
+ *   callers share the in-flight request.
+ * - connect() opens an optional push channel (EventSource). Tasks that name
+ *   push events stop polling while the channel is open (or slow down to
+ *   options.pushInterval) and are fed its events instead. While the browser
+ *   reconnects a dropped channel (resuming from the last event id) they
+ *   poll again; if it gives up the channel is reopened with backoff.
+ *
+ * Loaded as a classic script by the Volt pages
+ * (<script src="/ui/js/reticulum/poller.js">) and as a side-effect import by
+ * the dashboard widget; both share the single window.ReticulumPoller.
+ *
+ * Usage:
+ *   var task = ReticulumPoller.add(10000, function() {
+ *       return ReticulumPoller.fetch('/api/reticulum/service/rnsdStatus').then(render);
+ *   });
+ *   task.trigger();   // run now (e.g. after a user action), then reschedule
+ *   task.stop();
+ */
+(function (root) {
+    'use strict';
+
+    if (root.ReticulumPoller) {
+        return;
+    }
+
+    var MAX_BACKOFF = 300000;   // ms; a failing endpoint is still retried every 5 min
+    var tasks = [];
+    var inflight = {};
+    var channel = {url: null, source: null, open: false, failures: 0, timer: null, events: {}, lastId: ''};
+
+    function hidden() {
+        return typeof document !== 'undefined' && document.visibilityState === 'hidden';
+    }
+
+    function backoff(interval, failures) {
+        return failures ? Math.min(interval * Math.pow(2, failures), MAX_BACKOFF) : interval;
+    }
+
+    function pushed(task) {
+        return task.events.length > 0 && channel.open;
+    }
+
+    /**
+     * A task is idle (not polled) while the page is hidden, while it was
+     * stopped, or while the push channel delivers its events (unless it
+     * keeps a slow pushInterval refresh).
+     */
+    function idle(task) {
+        return task.stopped || hidden() || (pushed(task) && !task.pushInterval);
+    }
+
+    function interval(task) {
+        return backoff(pushed(task) ? task.pushInterval : task.interval, task.failures);
+    }
+
+    function schedule(task, delay) {
+        clearTimeout(task.timer);
+        task.timer = null;
+        if (!idle(task)) {
+            task.timer = setTimeout(function () { run(task); }, delay);
+        }
+    }
+
+    function settle(task, ok) {
+        task.running = false;
+        task.failures = ok ? 0 : task.failures + 1;
+        schedule(task, interval(task));
+    }
+
+    function run(task) {
+        clearTimeout(task.timer);
+        task.timer = null;
+        if (task.running || idle(task)) {
+            return;
+        }
+        task.running = true;
+        var result;
+        try {
+            result = task.fn();
+        } catch (err) {
+            settle(task, false);
+            return;
+        }
+        if (result && typeof result.then === 'function') {
+            result.then(function () { settle(task, true); }, function () { settle(task, false); });
+        } else {
+            settle(task, true);
+        }
+    }
+
+    /**
+     * Register a periodic task. fn may return a promise (or jQuery
+     * deferred); a rejection counts as an error for backoff. The first run
+     * happens immediately unless options.delay is given.
+     *
+     * options.event         push event name (or array of names) that
+     *                       replaces polling while connected
+     * options.onPush        handler(payload, eventName) for those events
+     * options.pushInterval  keep polling this slowly while connected
+     */
+    function add(every, fn, options) {
+        options = options || {};
+        var task = {
+            interval: every, fn: fn, events: [].concat(options.event || []),
+            onPush: options.onPush || null, pushInterval: options.pushInterval || 0,
+            timer: null, running: false, failures: 0, stopped: false
+        };
+        tasks.push(task);
+        task.events.forEach(listen);
+        schedule(task, options.delay === undefined ? 0 : options.delay);
+        return {
+            trigger: function () { run(task); },
+            stop: function () { remove(task); }
+        };
+    }
+
+    function remove(task) {
+        task.stopped = true;
+        clearTimeout(task.timer);
+        tasks = tasks.filter(function (t) { return t !== task; });
+    }
+
+    /**
+     * GET url (with optional query data) as JSON, resolving with the parsed
+     * body. Concurrent calls with the same url and data share one request.
+     */
+    function fetch(url, data) {
+        var key = url + '?' + (data ? $.param(data) : '');
+        if (!inflight[key]) {
+            inflight[key] = new Promise(function (resolve, reject) {
+                $.ajax({url: url, type: 'GET', dataType: 'json', data: data || {}})
+                    .done(function (body) { resolve(body); })
+                    .fail(function (xhr, status) { reject(new Error(status || 'request failed')); })
+                    .always(function () { delete inflight[key]; });
+            });
+        }
+        return inflight[key];
+    }
+
+    // ── Push channel ────────────────────────────────────────────────────
+
+    function listen(event) {
+        if (channel.source && !channel.events[event]) {
+            channel.source.addEventListener(event, dispatch);
+        }
+        channel.events[event] = true;
+    }
+
+    function dispatch(e) {
+        var payload;
+        try {
+            payload = JSON.parse(e.data);
+        } catch (err) {
+            return;
+        }
+        if (e.lastEventId) {
+            channel.lastId = e.lastEventId;
+        }
+        tasks.forEach(function (task) {
+            if (task.onPush && task.events.indexOf(e.type) !== -1) {
+                task.onPush(payload, e.type);
+            }
+        });
+    }
+
+    function pushTasks(fn) {
+        tasks.forEach(function (task) { if (task.events.length) { fn(task); } });
+    }
+
+    function openChannel() {
+        clearTimeout(channel.timer);
+        if (!channel.url || channel.source || hidden() || typeof EventSource === 'undefined') {
+            return;
+        }
+        // A channel we reopen ourselves resumes like the browser would
+        var url = channel.url;
+        if (channel.lastId) {
+            url += (url.indexOf('?') === -1 ? '?' : '&') + 'last_id=' + encodeURIComponent(channel.lastId);
+        }
+        var source = new EventSource(url);
+        channel.source = source;
+        Object.keys(channel.events).forEach(function (event) {
+            source.addEventListener(event, dispatch);
+        });
+        source.onopen = function () {
+            channel.open = true;
+            channel.failures = 0;
+            // Push-fed tasks stop polling (or drop to their pushInterval)
+            pushTasks(function (task) { schedule(task, interval(task)); });
+        };
+        source.onerror = function () {
+            // Poll until the channel is back. The browser reconnects by
+            // itself (with Last-Event-ID) unless it closed the source.
+            channel.open = false;
+            pushTasks(function (task) { if (!task.running && !task.timer) { schedule(task, task.interval); } });
+            if (source.readyState === 2) {   // EventSource.CLOSED
+                closeChannel();
+                channel.failures++;
+                channel.timer = setTimeout(openChannel, backoff(5000, channel.failures));
+            }
+        };
+    }
+
+    function closeChannel() {
+        clearTimeout(channel.timer);
+        if (channel.source) {
+            channel.source.close();
+        }
+        channel.source = null;
+        channel.open = false;
+    }
+
+    /**
+     * Use an EventSource at url as the push channel for tasks that name
+     * push events. Safe to call from several pages; the first URL wins.
+     */
+    function connect(url) {
+        if (!channel.url) {
+            channel.url = url;
+            openChannel();
+        }
+    }
+
+    if (typeof document !== 'undefined') {
+        document.addEventListener('visibilitychange', function () {
+            if (hidden()) {
+                tasks.forEach(function (task) { clearTimeout(task.timer); task.timer = null; });
+                closeChannel();
+            } else {
+                // Everything on screen is stale: refresh now, then resume
+                tasks.forEach(function (task) { task.failures = 0; run(task); });
+                openChannel();
+            }
+        });
+    }
+
+    root.ReticulumPoller = {add: add, fetch: fetch, connect: connect, MAX_BACKOFF: MAX_BACKOFF};
+})(typeof window !== 'undefined' ? window : this);
@@ -3,7 +3,8 @@
  *
  * Health banner: service status, interface count, aggregate traffic.
  * Detail section: versions, node identity.
- * Interface table: name, up/down status, per-interface TX/RX.
+ * Interface table: name, up/down status, per-interface TX/RX with a
+ * 30-minute throughput sparkline.
  *
  * Extends BaseTableWidget (OPNsense 24.x widget framework).
  *
@@ -16,14 +17,19 @@
  */
 
 import BaseTableWidget from "./BaseTableWidget.js";
+// Defines window.ReticulumPoller (shared with the Reticulum pages)
+import "../reticulum/poller.js";
 
 export default class Reticulum extends BaseTableWidget {
 
     constructor() {
         super();
-        this.tickTimeout = 15; // seconds between automatic refreshes
+        this.tickTimeout = 15; // seconds between automatic refreshes (see onMarkupRendered)
         this._isDegraded = false; // tracks rnsd stopped state for resize coordination
         this._lastWidth = 9999;   // tracks last known width for degraded-state coordination
+        this._rows = new Map();   // interface name -> cached row (see _updateInterfaces)
+        this._html = {};          // selector -> last HTML set by _setHtml
+        this._data = null;        // last dashboard snapshot, patched by stream events
     }
 
     getMarkup() {
@@ -117,12 +123,32 @@ export default class Reticulum extends BaseTableWidget {
         return $container;
     }
 
+    /**
+     * Refreshes run on the shared ReticulumPoller rather than the dashboard
+     * tick: they pause while the dashboard tab is hidden and back off while
+     * the API fails, and a Reticulum page open in the same tab shares the
+     * in-flight requests. While the status stream is connected, state
+     * changes and counters are pushed (see _applyEvent) and the full
+     * snapshot is only refreshed once a minute.
+     */
     onMarkupRendered() {
-        this._fetchAll();
+        this._task = ReticulumPoller.add(this.tickTimeout * 1000, () => this._fetchAll(), {
+            event: ['state', 'service', 'interface', 'counters'],
+            onPush: (payload, event) => this._applyEvent(event, payload),
+            pushInterval: 60000
+        });
+        ReticulumPoller.connect('/api/reticulum/service/stream');
     }
 
     onWidgetTick() {
-        this._fetchAll();
+        // Scheduled by ReticulumPoller (see onMarkupRendered)
+    }
+
+    onWidgetClose() {
+        if (this._task) {
+            this._task.stop();
+            this._task = null;
+        }
     }
 
     /**
@@ -181,43 +207,117 @@ export default class Reticulum extends BaseTableWidget {
     // ── Private methods ─────────────────────────────────────────────────────
 
     /**
-     * Fire all four API calls in parallel. Each updates its own DOM region
-     * independently so a slow or failing endpoint does not block others.
-     * rnsd stopped state is coordinated after status is known.
+     * Fetch the aggregated dashboard snapshot in a single API call. The
+     * backend gathers service states, versions, identity and interface
+     * stats in one collection pass; each section still updates its own DOM
+     * region so a partial response (e.g. rnsd unreachable) degrades cleanly.
      */
     _fetchAll() {
-        let rnsdRunning = false;
-
-        ajaxCall('/api/reticulum/service/rnsdStatus', {}, (data, status) => {
-            rnsdRunning = (status === 'success' && data && data.status === 'running');
-            this._setServiceStatus('#ret-rnsd-status', '#ret-compact-rnsd', rnsdRunning ? 'running' : (data && data.status || 'error'));
-            this._applyDegradedState(!rnsdRunning);
-        });
-
-        ajaxCall('/api/reticulum/service/lxmdStatus', {}, (data, status) => {
-            let s = (status === 'success' && data && data.status) ? data.status : 'error';
-            this._setServiceStatus('#ret-lxmd-status', '#ret-compact-lxmd', s);
-        });
-
-        ajaxCall('/api/reticulum/service/info', {}, (data, status) => {
-            if (status === 'success' && data) {
-                this._updateInfo(data);
-            } else {
-                $('#ret-version').html('<span class="text-danger">Unavailable</span>');
-                $('#ret-identity').html('<span class="text-danger">Unavailable</span>');
+        return ReticulumPoller.fetch('/api/reticulum/service/dashboard').then(
+            (data) => {
+                this._data = data;
+                this._render(data);
+            },
+            (err) => {
+                this._data = null;
+                this._render(null);
+                throw err;
             }
-        });
+        );
+    }
 
-        ajaxCall('/api/reticulum/service/rnstatus', {}, (data, status) => {
-            if (status === 'success' && data && !data.error) {
-                this._updateInterfaces(data);
-                this._updateTransportBadge(data);
-            } else {
-                $('#ret-iface-list').html('<tr><td colspan="3" class="text-muted">No interface data available</td></tr>');
-                $('#ret-ifcount').html('&ndash;');
-                $('#ret-traffic').html('&ndash;');
+    /**
+     * Patch the last dashboard snapshot with one status stream event and
+     * re-render it. Events carry only what changed; when rnsd comes back,
+     * or the snapshot has nothing to patch, a full refresh is fetched
+     * instead.
+     */
+    _applyEvent(event, payload) {
+        let data = this._data;
+        if (!data) {
+            return;
+        }
+        if (event === 'state' || event === 'service') {
+            let services = (event === 'state' ? payload.services : payload) || {};
+            let wasStopped = !data.rnsd || data.rnsd.status !== 'running';
+            ['rnsd', 'lxmd'].forEach((name) => {
+                if (services[name]) {
+                    data[name] = Object.assign({}, data[name], {status: services[name]});
+                }
+            });
+            if (event === 'state' && payload.rnstatus) {
+                data.rnstatus = payload.rnstatus;
+            } else if (wasStopped && services.rnsd === 'running') {
+                this._task.trigger();
+                return;
             }
-        });
+        } else {
+            let rnstatus = data.rnstatus;
+            if (!rnstatus || rnstatus.error || !Array.isArray(rnstatus.interfaces)) {
+                this._task.trigger();
+                return;
+            }
+            if (event === 'interface') {
+                (payload.interfaces || []).forEach((change) => {
+                    let index = rnstatus.interfaces.findIndex((iface) => iface.name === change.name);
+                    if (change.status === 'removed') {
+                        if (index !== -1) {
+                            rnstatus.interfaces.splice(index, 1);
+                        }
+                    } else if (index === -1) {
+                        rnstatus.interfaces.push(change);
+                    } else {
+                        rnstatus.interfaces[index] = Object.assign({}, rnstatus.interfaces[index], change);
+                    }
+                });
+            } else if (event === 'counters') {
+                Object.entries(payload.interfaces || {}).forEach(([name, counters]) => {
+                    let iface = rnstatus.interfaces.find((entry) => entry.name === name);
+                    if (iface) {
+                        Object.assign(iface, counters);
+                    }
+                });
+                rnstatus.tx_bytes = payload.tx_bytes;
+                rnstatus.rx_bytes = payload.rx_bytes;
+            }
+        }
+        this._render(data);
+    }
+
+    /**
+     * Render a dashboard snapshot; null renders the unavailable state.
+     */
+    _render(data) {
+        let ok = !!data;
+
+        let rnsdStatus = (ok && data.rnsd && data.rnsd.status) ? data.rnsd.status : 'error';
+        let rnsdRunning = rnsdStatus === 'running';
+        this._setServiceStatus('#ret-rnsd-status', '#ret-compact-rnsd', rnsdStatus);
+        this._updateSupervisor('#ret-rnsd-status', ok && data.rnsd ? data.rnsd.supervisor : null);
+        this._updateInstances('#ret-rnsd-status', ok && data.rnsd ? data.rnsd.instances : null);
+        this._updateLiveness('#ret-rnsd-status', ok && data.rnsd ? data.rnsd.liveness : null);
+        this._applyDegradedState(!rnsdRunning);
+
+        let lxmdStatus = (ok && data.lxmd && data.lxmd.status) ? data.lxmd.status : 'error';
+        this._setServiceStatus('#ret-lxmd-status', '#ret-compact-lxmd', lxmdStatus);
+        this._updateSupervisor('#ret-lxmd-status', ok && data.lxmd ? data.lxmd.supervisor : null);
+
+        if (ok && data.info) {
+            this._updateInfo(data.info);
+        } else {
+            $('#ret-version').html('<span class="text-danger">Unavailable</span>');
+            $('#ret-identity').html('<span class="text-danger">Unavailable</span>');
+        }
+
+        let rnstatus = ok ? data.rnstatus : null;
+        if (rnstatus && !rnstatus.error) {
+            this._updateInterfaces(rnstatus, (ok && data.traffic) || {});
+            this._updateTransportBadge(rnstatus);
+        } else {
+            this._showIfacePlaceholder('No interface data available');
+            this._setHtml('#ret-ifcount', '&ndash;');
+            this._setHtml('#ret-traffic', '&ndash;');
+        }
     }
 
     /**
@@ -261,6 +361,8 @@ export default class Reticulum extends BaseTableWidget {
                 iconClass = 'text-success'; label = 'Running'; break;
             case 'stopped':
                 iconClass = 'text-danger';  label = 'Stopped'; break;
+            case 'degraded':
+                iconClass = 'text-warning'; label = 'Degraded'; break;
             default:
                 iconClass = 'text-warning'; label = 'Unknown';
         }
@@ -269,6 +371,97 @@ export default class Reticulum extends BaseTableWidget {
         $(compactSel).find('i').attr('class', `fa fa-circle ${iconClass}`);
     }
 
+    /**
+     * Append the supervisor restart count to a service status row, with a
+     * warning when the daemon is waiting in restart backoff or has been
+     * flagged as crash-looping. Nothing is shown for unsupervised services
+     * or when no restart has happened yet.
+     */
+    _updateSupervisor(detailSel, sup) {
+        let $el = $(detailSel);
+        $el.find('.ret-supervisor-badge').remove();
+        if (!sup || !sup.state) {
+            return;
+        }
+        let restarts = parseInt(sup.restarts, 10) || 0;
+        let title = [`Restarts: ${restarts}`];
+        if (sup.last_exit_code !== null && sup.last_exit_code !== undefined) {
+            title.push(`Last exit code: ${parseInt(sup.last_exit_code, 10)}`);
+        }
+        if (sup.last_crash) {
+            title.push(`Last crash: ${new Date(sup.last_crash * 1000).toLocaleString()}`);
+        }
+        let badge;
+        if (sup.state === 'crashloop') {
+            badge = `<span class="text-danger"><i class="fa fa-exclamation-triangle"></i> Crash loop</span>`;
+        } else if (sup.state === 'backoff') {
+            badge = `<span class="text-warning"><i class="fa fa-refresh"></i> Restarting</span>`;
+        } else if (restarts > 0) {
+            badge = `<span class="text-muted">${restarts} restart${restarts === 1 ? '' : 's'}</span>`;
+        } else {
+            return;
+        }
+        $el.append(` <small class="ret-supervisor-badge" title="${this.htmlEncode(title.join(', '))}">${badge}</small>`);
+    }
+
+    /**
+     * Append the running/configured count of rnsd transport instances to the
+     * Transport Node row, as a warning when any instance is down. Only
+     * present when more than one instance is configured.
+     */
+    _updateInstances(detailSel, instances) {
+        let $el = $(detailSel);
+        $el.find('.ret-instances-badge').remove();
+        if (!Array.isArray(instances) || instances.length < 2) {
+            return;
+        }
+        let running = instances.filter(inst => inst.status === 'running').length;
+        let title = instances.map(inst => {
+            let state = inst.status;
+            if (inst.supervisor && inst.supervisor.state === 'crashloop') {
+                state += ' (crash loop)';
+            }
+            return `Instance ${parseInt(inst.instance, 10)}: ${state}`;
+        });
+        let cls = running === instances.length ? 'text-muted' : 'text-warning';
+        $el.append(` <small class="ret-instances-badge ${cls}" title="${this.htmlEncode(title.join(', '))}">` +
+                   `${running}/${instances.length} instances</small>`);
+    }
+
+    /**
+     * Append the RPC liveness latency (p90 over the watchdog window) to the
+     * Transport Node row, with the full percentiles in the title. Failing
+     * or degraded liveness shows the consecutive failure count instead.
+     * Nothing is shown when the watchdog is disabled.
+     */
+    _updateLiveness(detailSel, liveness) {
+        let $el = $(detailSel);
+        $el.find('.ret-liveness-badge').remove();
+        if (!liveness || !liveness.state || !liveness.latency_ms) {
+            return;
+        }
+        let lat = liveness.latency_ms;
+        let title = [`RPC liveness: ${liveness.state}`];
+        if (lat.samples) {
+            title.push(`p50 ${lat.p50} ms, p90 ${lat.p90} ms, p99 ${lat.p99} ms, max ${lat.max} ms ` +
+                       `(${parseInt(lat.samples, 10)} samples)`);
+        }
+        let failures = Math.max(0, ...(liveness.instances || []).map(
+            inst => parseInt(inst.consecutive_failures, 10) || 0));
+        let badge;
+        if (liveness.state === 'degraded' || liveness.state === 'failing') {
+            let cls = liveness.state === 'degraded' ? 'text-danger' : 'text-warning';
+            badge = `<span class="${cls}">${failures} failed RPC ${failures === 1 ? 'query' : 'queries'}</span>`;
+        } else if (liveness.state === 'restarting') {
+            badge = `<span class="text-warning"><i class="fa fa-refresh"></i> Restarting (unresponsive)</span>`;
+        } else if (lat.samples) {
+            badge = `<span class="text-muted">RPC ${parseFloat(lat.p90)} ms</span>`;
+        } else {
+            return;
+        }
+        $el.append(` <small class="ret-liveness-badge" title="${this.htmlEncode(title.join(', '))}">${badge}</small>`);
+    }
+
     /**
      * Append "(Transport)" indicator to the Transport Node row when enabled.
      * Called after rnstatus data is received.
@@ -312,30 +505,46 @@ export default class Reticulum extends BaseTableWidget {
     }
 
     /**
-     * Rebuild the interface table and health banner aggregates from rnstatus.
+     * Patch the interface table and health banner aggregates from rnstatus.
+     *
+     * Rows are cached by interface name and updated in place: a cell is only
+     * rewritten when the values it is rendered from changed, so a steady
+     * tick touches the traffic cells of busy interfaces and nothing else.
+     * Rows of vanished interfaces are removed and the DOM order follows the
+     * rnstatus order.
      *
      * - Counts up/down interfaces for the summary row.
      * - Sums tx_bytes/rx_bytes for aggregate traffic display.
      * - Renders per-row TX/RX using formatBytes().
+     * - Draws a TX/RX throughput sparkline when traffic series are available.
      * - Interface type is set as a title attribute on <tr> for hover detail.
      * - ifac_netname is shown as secondary text under the interface name.
+     *
+     * @param {object} data     rnstatus section of the dashboard snapshot
+     * @param {object} traffic  {name: {t: [], tx: [], rx: []}} bytes/sec series
      */
-    _updateInterfaces(data) {
-        let $tbody = $('#ret-iface-list');
-        $tbody.empty();
-
+    _updateInterfaces(data, traffic = {}) {
         let interfaces = data.interfaces || [];
 
         if (interfaces.length === 0) {
-            $tbody.html('<tr><td colspan="3" class="text-muted">No interfaces configured</td></tr>');
-            $('#ret-ifcount').html('0 configured');
-            $('#ret-traffic').html('&ndash;');
+            this._showIfacePlaceholder('No interfaces configured');
+            this._setHtml('#ret-ifcount', '0 configured');
+            this._setHtml('#ret-traffic', '&ndash;');
             return;
         }
 
+        let tbody = document.getElementById('ret-iface-list');
+        if (this._rows.size === 0) {
+            // Drop the Loading / placeholder row
+            tbody.textContent = '';
+            delete this._html['#ret-iface-list'];
+        }
+
         let upCount  = 0;
         let totalTx  = 0;
         let totalRx  = 0;
+        let seen = new Set();
+        let prev = null;
 
         interfaces.forEach((iface) => {
             let isUp = iface.status === 'up';
@@ -346,46 +555,146 @@ export default class Reticulum extends BaseTableWidget {
             totalTx += tx;
             totalRx += rx;
 
-            let name = this.htmlEncode(iface.name || '—');
-            // ifac_netname shown as secondary line under name when present
-            let nameHtml = name;
-            if (iface.ifac_netname) {
-                nameHtml += `<br><small class="text-muted">${this.htmlEncode(iface.ifac_netname)}</small>`;
+            let key = iface.name || '';
+            while (seen.has(key)) {
+                key += '\u0000';
             }
+            seen.add(key);
 
-            let statusIcon = isUp
-                ? '<i class="fa fa-circle text-success"></i>'
-                : '<i class="fa fa-circle text-danger"></i>';
+            let row = this._rows.get(key);
+            if (!row) {
+                row = this._createIfaceRow();
+                this._rows.set(key, row);
+            }
 
-            // TX/RX: muted when both are zero (uninformative regardless of status)
-            let trafficClass = (tx === 0 && rx === 0) ? 'text-muted' : '';
-            let trafficText  = `${this._formatBytes(tx)} / ${this._formatBytes(rx)}`;
+            // Keep DOM order in step with rnstatus; a no-op when unchanged
+            let expected = prev ? prev.nextSibling : tbody.firstChild;
+            if (row.tr !== expected) {
+                tbody.insertBefore(row.tr, expected);
+            }
+            prev = row.tr;
 
             // Type stripped of "Interface" suffix, set as row hover title
             let shortType = (iface.type || '').replace(/Interface$/, '');
+            if (row.type !== shortType) {
+                row.type = shortType;
+                row.tr.title = shortType;
+            }
 
-            $tbody.append(`
-                <tr title="${this.htmlEncode(shortType)}">
-                    <td>${nameHtml}</td>
-                    <td class="text-center">${statusIcon}</td>
-                    <td class="ret-col-traffic ${trafficClass}">${trafficText}</td>
-                </tr>
-            `);
+            let nameKey = `${iface.name}\u0000${iface.ifac_netname || ''}`;
+            if (row.nameKey !== nameKey) {
+                row.nameKey = nameKey;
+                let nameHtml = this.htmlEncode(iface.name || '—');
+                // ifac_netname shown as secondary line under name when present
+                if (iface.ifac_netname) {
+                    nameHtml += `<br><small class="text-muted">${this.htmlEncode(iface.ifac_netname)}</small>`;
+                }
+                row.name.innerHTML = nameHtml;
+            }
+
+            if (row.up !== isUp) {
+                row.up = isUp;
+                row.status.innerHTML = isUp
+                    ? '<i class="fa fa-circle text-success"></i>'
+                    : '<i class="fa fa-circle text-danger"></i>';
+            }
+
+            let series = traffic[iface.name];
+            let hasSeries = !!(series && series.t && series.t.length > 1);
+            let trafficKey = `${tx}/${rx}/` + (hasSeries ? `${series.t.length}@${series.t[series.t.length - 1]}` : '');
+            if (row.trafficKey !== trafficKey) {
+                row.trafficKey = trafficKey;
+                let trafficText = `${this._formatBytes(tx)} / ${this._formatBytes(rx)}`;
+                if (hasSeries) {
+                    trafficText += `<br>${this._sparkline(series.tx, series.rx)}`;
+                }
+                row.traffic.innerHTML = trafficText;
+                // TX/RX: muted when both are zero (uninformative regardless of status)
+                row.traffic.classList.toggle('text-muted', tx === 0 && rx === 0);
+            }
         });
 
+        for (let [key, row] of this._rows) {
+            if (!seen.has(key)) {
+                row.tr.remove();
+                this._rows.delete(key);
+            }
+        }
+
         // Interface count summary
         let countClass = upCount < interfaces.length ? 'text-warning' : '';
         let warning    = upCount < interfaces.length ? ' <i class="fa fa-exclamation-triangle text-warning"></i>' : '';
-        $('#ret-ifcount').html(
+        this._setHtml('#ret-ifcount',
             `<span class="${countClass}">${upCount} / ${interfaces.length} up</span>${warning}`
         );
 
         // Aggregate traffic
-        $('#ret-traffic').html(
+        this._setHtml('#ret-traffic',
             `${this._formatBytes(totalTx)} / ${this._formatBytes(totalRx)}`
         );
     }
 
+    /**
+     * Build an empty cached interface row. The traffic cell carries
+     * ret-col-traffic so onWidgetResize hides it with the header.
+     */
+    _createIfaceRow() {
+        let tr = document.createElement('tr');
+        let name = tr.insertCell();
+        let status = tr.insertCell();
+        let traffic = tr.insertCell();
+        status.className = 'text-center';
+        traffic.className = 'ret-col-traffic';
+        if (this._lastWidth < 400) {
+            traffic.style.display = 'none';
+        }
+        return {tr, name, status, traffic, type: null, nameKey: null, up: null, trafficKey: null};
+    }
+
+    /**
+     * Replace the interface rows with a single message row and forget the
+     * row cache, so the next data tick rebuilds the table.
+     */
+    _showIfacePlaceholder(message) {
+        this._rows.clear();
+        this._setHtml('#ret-iface-list', `<tr><td colspan="3" class="text-muted">${message}</td></tr>`);
+    }
+
+    /**
+     * Set an element's HTML only when it differs from what was last set.
+     */
+    _setHtml(selector, html) {
+        if (this._html[selector] !== html) {
+            this._html[selector] = html;
+            $(selector).html(html);
+        }
+    }
+
+    /**
+     * Render TX (blue) and RX (green) bytes/sec series as a small inline SVG.
+     * Both lines share one vertical scale so their heights are comparable;
+     * the title shows the most recent rates.
+     * @param {number[]} tx  bytes/sec, oldest first
+     * @param {number[]} rx  bytes/sec, oldest first
+     * @returns {string}     SVG markup
+     */
+    _sparkline(tx, rx) {
+        const width = 80, height = 16;
+        let max = Math.max(1, ...tx, ...rx);
+        let points = (values) => values.map((v, i) => {
+            let x = (i / (values.length - 1)) * width;
+            let y = height - (v / max) * (height - 1) - 0.5;
+            return `${x.toFixed(1)},${y.toFixed(1)}`;
+        }).join(' ');
+        let title = `TX ${this._formatBytes(Math.round(tx[tx.length - 1]))}/s, ` +
+                    `RX ${this._formatBytes(Math.round(rx[rx.length - 1]))}/s`;
+        return `<svg class="ret-sparkline" width="${width}" height="${height}" viewBox="0 0 ${width} ${height}">` +
+               `<title>${title}</title>` +
+               `<polyline fill="none" stroke="#337ab7" stroke-width="1" points="${points(tx)}"/>` +
+               `<polyline fill="none" stroke="#5cb85c" stroke-width="1" points="${points(rx)}"/>` +
+               `</svg>`;
+    }
+
     /**
      * Format a byte count to a human-readable string.
      * @param {number} n  bytes
@@ -1,6 +1,6 @@
 """Playwright browser tests for the Log Viewer page.
 
-Covers tab navigation (PW-LOG-001–003), filter controls (PW-LOG-010–015),
+Covers tab navigation (PW-LOG-001–003), filter controls (PW-LOG-010–016),
 action buttons (PW-LOG-020–025), output states (PW-LOG-030–034),
 and download (PW-LOG-040–042).
 
@@ -69,7 +69,7 @@ def test_PW_LOG_003_tab_switch_triggers_fetch(authenticated_page, base_url):
 
 
 # ===========================================================================
-# Filter controls (PW-LOG-010–015)
+# Filter controls (PW-LOG-010–016)
 # ===========================================================================
 
 def test_PW_LOG_010_severity_filter_present(authenticated_page, base_url):
@@ -100,43 +100,26 @@ def test_PW_LOG_012_lines_select_present(authenticated_page, base_url):
     expect(lp.lines_select).to_have_value("200")
 
 
-def test_PW_LOG_013_severity_filter_filters_cached(
+def test_PW_LOG_013_severity_filter_queries_server(
     authenticated_page, base_url, ensure_rnsd_running
 ):
-    """Changing severity filters cached content without a new network request."""
+    """Changing severity re-queries logsTail with the level (server-side filtering)."""
     lp = _logs_page(authenticated_page, base_url)
 
-    # Wait for log content to appear
     lp.expect_log_output_visible()
     lp.page.wait_for_timeout(1000)
 
-    initial_count = lp.log_line_count()
-    if initial_count == 0:
-        pytest.skip("No log lines available to filter")
-
-    # Track network requests to the log API endpoint
-    request_count = {"value": 0}
-
-    def on_request(request):
-        if "log" in request.url.lower() and "api" in request.url.lower():
-            request_count["value"] += 1
-
-    lp.page.on("request", on_request)
-
-    # Change severity to a specific level — should filter client-side
     # Severity options use numeric values: 0=Critical, 1=Error, etc.
-    lp.set_severity_filter("1")
-    lp.page.wait_for_timeout(500)
+    with lp.page.expect_request(lambda r: "logsTail" in r.url) as req_info:
+        lp.set_severity_filter("1")
 
-    # The key assertion: no new network fetch was triggered
-    assert request_count["value"] == 0, (
-        f"Expected client-side filter but {request_count['value']} API requests fired"
+    body = (req_info.value.post_data or req_info.value.url).replace(" ", "")
+    assert '"level":"1"' in body or "level=1" in body, (
+        f"Severity not sent to the server: {body}"
     )
 
-    lp.page.remove_listener("request", on_request)
-
 
-def test_PW_LOG_014_keyword_filter_filters_cached(
+def test_PW_LOG_014_keyword_filter_filters_server_side(
     authenticated_page, base_url, ensure_rnsd_running
 ):
     """Typing a keyword reduces visible log lines to matching ones."""
@@ -149,9 +132,10 @@ def test_PW_LOG_014_keyword_filter_filters_cached(
     if initial_count == 0:
         pytest.skip("No log lines available to filter")
 
-    # Use a keyword very unlikely to match all lines
+    # Use a keyword very unlikely to match all lines. The search input is
+    # debounced (400 ms) before the server-side query fires.
     lp.set_keyword_filter("ZZZZUNLIKELYMATCH")
-    lp.page.wait_for_timeout(500)
+    lp.page.wait_for_timeout(2000)
 
     # When the keyword filter excludes all lines, the JS hides #log-output
     # entirely and shows #log-empty-filter instead.  Check for either:
@@ -193,6 +177,25 @@ def test_PW_LOG_015_lines_change_triggers_fetch(
     lp.page.remove_listener("request", on_request)
 
 
+def test_PW_LOG_016_archive_search_queries_index(
+    authenticated_page, base_url, ensure_rnsd_running
+):
+    """Including rotated archives switches the view to logsSearch."""
+    lp = _logs_page(authenticated_page, base_url)
+
+    lp.expect_log_output_visible()
+    lp.page.wait_for_timeout(1000)
+
+    with lp.page.expect_request(lambda r: "logsSearch" in r.url) as req_info:
+        lp.page.locator("#log-archives").check()
+
+    body = (req_info.value.post_data or req_info.value.url).replace(" ", "")
+    assert "rnsd" in body, f"Service not sent to the index search: {body}"
+    assert lp.page.locator("#log-regex").is_disabled(), (
+        "Regular expressions are not supported by the index and should be disabled"
+    )
+
+
 # ===========================================================================
 # Action buttons (PW-LOG-020–025)
 # ===========================================================================
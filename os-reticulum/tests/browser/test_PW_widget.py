@@ -2,11 +2,16 @@
 
 Covers widget presence (PW-WDG-001–009), status indicators (PW-WDG-050–053),
 degraded state (PW-WDG-016–017, 040–042), compact view (PW-WDG-018–020),
-responsive breakpoints (PW-WDG-030–033), and tick interval (PW-WDG-021).
+responsive breakpoints (PW-WDG-030–033), tick interval (PW-WDG-021), and
+incremental re-render budget (PW-WDG-060–061), hidden-tab polling
+(PW-WDG-062), and status stream patching (PW-WDG-063).
 
 Requires a live OPNsense VM — see conftest.py for env var requirements.
 """
 
+import json
+import re
+
 import pytest
 from playwright.sync_api import expect
 
@@ -283,6 +288,192 @@ def test_PW_WDG_021_tick_interval_refreshes(
     authenticated_page.remove_listener("request", on_request)
 
 
+# ===========================================================================
+# Incremental re-render budget, shared poller and status stream (PW-WDG-060–063)
+# ===========================================================================
+
+RENDER_INTERFACES = 200
+# One 60 Hz frame: a tick must not stall the dashboard, whatever the node size
+RENDER_BUDGET_MS = 16
+
+
+def _dashboard_payload(tick):
+    """Synthetic service/dashboard response: only if-0 moves traffic per tick."""
+    return {
+        "rnsd": {"status": "running"},
+        "lxmd": {"status": "stopped"},
+        "info": {"rns_version": "0.0.0", "lxmf_version": "", "node_identity": "ab" * 16},
+        "rnstatus": {
+            "transport_enabled": True,
+            "interfaces": [
+                {"name": f"PW-Render-{n}", "type": "TCPServerInterface", "status": "up",
+                 "tx_bytes": 1000 + (tick if n == 0 else 0), "rx_bytes": 2000}
+                for n in range(RENDER_INTERFACES)
+            ],
+        },
+        "traffic": {},
+    }
+
+
+# Wraps ReticulumPoller.fetch so the widget's render pass for each dashboard
+# response is timed, and counts DOM changes in the interface table.
+_INSTRUMENT = """
+() => {
+    window.__retRender = [];
+    window.__retMutations = {rows: 0, cells: 0};
+    const tbody = document.getElementById('ret-iface-list');
+    new MutationObserver((records) => {
+        for (const r of records) {
+            if (r.target === tbody) {
+                window.__retMutations.rows += r.addedNodes.length + r.removedNodes.length;
+            } else {
+                window.__retMutations.cells += 1;
+            }
+        }
+    }).observe(tbody, {childList: true, subtree: true, attributes: true, characterData: true});
+    const poller = window.ReticulumPoller;
+    const original = poller.fetch;
+    poller.fetch = function (url, data) {
+        const request = original.call(this, url, data);
+        if (String(url).indexOf('/api/reticulum/service/dashboard') === -1) {
+            return request;
+        }
+        return {
+            then(onData, onError) {
+                return request.then(function (body) {
+                    const started = performance.now();
+                    const result = onData(body);
+                    window.__retRender.push(performance.now() - started);
+                    return result;
+                }, onError);
+            }
+        };
+    };
+}
+"""
+
+
+@pytest.fixture
+def rendered_widget(authenticated_page, base_url):
+    """
+    Dashboard with a mocked 200-interface node, instrumented after the first
+    render. The status stream is refused so the widget keeps polling.
+    """
+    tick = {"value": 0}
+
+    def fulfil(route):
+        tick["value"] += 1
+        route.fulfill(status=200, content_type="application/json",
+                      body=json.dumps(_dashboard_payload(tick["value"])))
+
+    authenticated_page.route("**/api/reticulum/service/stream*", lambda route: route.abort())
+    authenticated_page.route("**/api/reticulum/service/dashboard", fulfil)
+    dp = _dashboard_page(authenticated_page, base_url)
+    expect(dp.iface_list.locator("tr")).to_have_count(RENDER_INTERFACES)
+    authenticated_page.evaluate(_INSTRUMENT)
+    yield dp
+    authenticated_page.unroute("**/api/reticulum/service/dashboard")
+    authenticated_page.unroute("**/api/reticulum/service/stream*")
+
+
+def _wait_for_tick(page):
+    page.wait_for_function("() => window.__retRender.length > 0", timeout=20000)
+    return page.evaluate("() => ({render: window.__retRender, mutations: window.__retMutations})")
+
+
+def test_PW_WDG_060_tick_patches_changed_cells_only(authenticated_page, rendered_widget):
+    """A tick where one interface moved traffic rewrites that row's traffic cell only."""
+    result = _wait_for_tick(authenticated_page)
+
+    assert result["mutations"]["rows"] == 0, "interface rows were rebuilt on a steady tick"
+    # innerHTML of one traffic cell (childList on the td) and its class toggle
+    assert 0 < result["mutations"]["cells"] <= 4, result["mutations"]
+    row = rendered_widget.iface_list.locator("tr").first
+    expect(row.locator("td").first).to_have_text("PW-Render-0")
+
+
+def test_PW_WDG_061_tick_render_budget(authenticated_page, rendered_widget):
+    """Re-rendering a 200-interface node on a tick fits in one frame."""
+    result = _wait_for_tick(authenticated_page)
+
+    elapsed = max(result["render"])
+    assert elapsed <= RENDER_BUDGET_MS, (
+        f"widget tick took {elapsed:.1f} ms for {RENDER_INTERFACES} interfaces "
+        f"(budget {RENDER_BUDGET_MS} ms)"
+    )
+
+
+def test_PW_WDG_062_hidden_tab_stops_polling(authenticated_page, base_url, ensure_rnsd_running):
+    """While the dashboard tab is hidden the widget sends no requests; showing it refreshes at once."""
+    dp = _dashboard_page(authenticated_page, base_url)
+    dp.expect_widget_visible()
+
+    requests = []
+    authenticated_page.on("request", lambda r: requests.append(r.url)
+                          if "/api/reticulum/service/dashboard" in r.url else None)
+    set_visibility = """
+        (state) => {
+            Object.defineProperty(document, 'visibilityState', {value: state, configurable: true});
+            document.dispatchEvent(new Event('visibilitychange'));
+        }
+    """
+    authenticated_page.evaluate(set_visibility, "hidden")
+    authenticated_page.wait_for_timeout(16000)
+    assert requests == [], f"hidden tab still polled: {requests}"
+
+    authenticated_page.evaluate(set_visibility, "visible")
+    authenticated_page.wait_for_timeout(2000)
+    assert len(requests) >= 1, "no refresh when the tab became visible again"
+
+
+def _sse(event, data, event_id):
+    return f"id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def test_PW_WDG_063_stream_events_patch_widget(authenticated_page, base_url):
+    """Pushed interface and counters events update the widget without a dashboard refresh."""
+    dashboard = []
+
+    def fulfil(route):
+        dashboard.append(route.request.url)
+        route.fulfill(status=200, content_type="application/json",
+                      body=json.dumps(_dashboard_payload(0)))
+
+    body = (
+        "retry: 60000\n\n"
+        + _sse("interface", {"interfaces": [
+            {"name": "PW-Render-0", "type": "TCPServerInterface", "status": "down"},
+            {"name": "PW-Render-1", "status": "removed"},
+        ]}, 1)
+        + _sse("counters", {"interfaces": {"PW-Render-2": {"tx_bytes": 5 * 1024 * 1024}},
+                            "tx_bytes": 0, "rx_bytes": 0}, 2)
+    )
+    rendered = {"value": False}
+
+    def stream(route):
+        # Events only patch a rendered snapshot: refuse the channel until the
+        # widget has rendered; the poller reopens it after its backoff (10 s).
+        if not rendered["value"]:
+            route.abort()
+            return
+        route.fulfill(status=200, content_type="text/event-stream", body=body)
+
+    authenticated_page.route("**/api/reticulum/service/dashboard", fulfil)
+    authenticated_page.route("**/api/reticulum/service/stream*", stream)
+    try:
+        dp = _dashboard_page(authenticated_page, base_url)
+        rows = dp.iface_list.locator("tr")
+        expect(rows).to_have_count(RENDER_INTERFACES)
+        rendered["value"] = True
+        expect(rows).to_have_count(RENDER_INTERFACES - 1, timeout=20000)
+        expect(rows.first.locator("i.fa-circle")).to_have_class(re.compile("text-danger"))
+        expect(rows.nth(1)).to_contain_text("5.0 MB")
+        assert len(dashboard) == 1, f"pushed events triggered dashboard refreshes: {dashboard}"
+    finally:
+        authenticated_page.unroute("**/api/reticulum/service/dashboard")
+        authenticated_page.unroute("**/api/reticulum/service/stream*")
+
+
 # ===========================================================================
 # Tests requiring stopped rnsd — placed at END of file
 # ===========================================================================
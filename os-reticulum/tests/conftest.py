@@ -15,22 +15,26 @@ render_template   — A callable fixture (template_name, context) -> str that
                     with an arbitrary context dict. Lower-level than render_rnsd
                     et al.; useful for security and edge-case tests.
 
-render_rnsd       — Renders reticulum_config.j2 with optional general/interfaces.
+render_rnsd       — Renders reticulum_config.j2 with optional general/interfaces,
+                    or reticulum_instance_N.j2 when instance=N is given.
 render_lxmf       — Renders lxmf_config.j2 with optional general/lxmf.
 render_rc_rnsd    — Renders rc.conf.d_rnsd.j2 with optional general.
 render_rc_lxmd    — Renders rc.conf.d_lxmd.j2 with optional general/lxmf.
+render_rc_collector — Renders rc.conf.d_reticulum_collector.j2 with optional general.
+render_rc_procwatch — Renders rc.conf.d_reticulum_procwatch.j2 with optional general.
 render_allowed    — Renders lxmf_allowed.j2 with optional lxmf.
 """
 import os
 import xml.etree.ElementTree as ET
 import pytest
-from jinja2 import Environment, FileSystemLoader, BaseLoader
+from jinja2 import Environment, FileSystemLoader
 
 
-TEMPLATES_DIR = os.path.abspath(os.path.join(
+TEMPLATES_ROOT = os.path.abspath(os.path.join(
     os.path.dirname(__file__),
-    "..", "src", "opnsense", "service", "templates", "OPNsense", "Reticulum"
+    "..", "src", "opnsense", "service", "templates"
 ))
+TEMPLATES_DIR = os.path.join(TEMPLATES_ROOT, "OPNsense", "Reticulum")
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
 REFERENCE_DIR = os.path.join(os.path.dirname(__file__), "reference")
 
@@ -50,7 +54,9 @@ def load_template(name: str) -> str:
 def render(template_name: str, context: dict) -> str:
     """Render a Jinja2 template with the given OPNsense-style context dict."""
     src = load_template(template_name)
-    env = Environment(loader=BaseLoader(), keep_trailing_newline=True)
+    # Rooted like configd's template engine, so includes use full names
+    # ('OPNsense/Reticulum/reticulum_config.j2')
+    env = Environment(loader=FileSystemLoader(TEMPLATES_ROOT), keep_trailing_newline=True)
     tmpl = env.from_string(src)
     return tmpl.render(**context)
 
@@ -74,7 +80,7 @@ def jinja2_env():
             output = tmpl.render(**ctx)
     """
     return Environment(
-        loader=FileSystemLoader(TEMPLATES_DIR),
+        loader=FileSystemLoader([TEMPLATES_DIR, TEMPLATES_ROOT]),
         keep_trailing_newline=True,
     )
 
@@ -134,6 +140,12 @@ def make_ctx(general=None, interfaces=None, lxmf=None) -> dict:
         "rpc_key": "",
         "loglevel": "4",
         "logfile": "",
+        "transport_instances": "1",
+        "interconnect_port": "37430",
+        "watchdog_enabled": "1",
+        "watchdog_failures": "3",
+        "watchdog_restart": "0",
+        "stream_counter_interval": "15",
     }
     base_lxmf = {
         "enabled": "0",
@@ -182,8 +194,10 @@ def make_ctx(general=None, interfaces=None, lxmf=None) -> dict:
 
 @pytest.fixture
 def render_rnsd():
-    def _render(general=None, interfaces=None):
+    def _render(general=None, interfaces=None, instance=None):
         ctx = make_ctx(general=general, interfaces=interfaces)
+        if instance:
+            return render(f"reticulum_instance_{instance}.j2", ctx)
         return render("reticulum_config.j2", ctx)
     return _render
 
@@ -212,6 +226,22 @@ def render_rc_lxmd():
     return _render
 
 
+@pytest.fixture
+def render_rc_collector():
+    def _render(general=None):
+        ctx = make_ctx(general=general)
+        return render("rc.conf.d_reticulum_collector.j2", ctx)
+    return _render
+
+
+@pytest.fixture
+def render_rc_procwatch():
+    def _render(general=None):
+        ctx = make_ctx(general=general)
+        return render("rc.conf.d_reticulum_procwatch.j2", ctx)
+    return _render
+
+
 @pytest.fixture
 def render_allowed():
     def _render(lxmf=None):
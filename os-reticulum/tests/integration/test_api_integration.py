@@ -1,5 +1,5 @@
 """
-API Integration Tests — A-301 through A-309
+API Integration Tests — A-301 through A-330
 
 Requires a live OPNsense VM with the os-reticulum plugin installed.
 
@@ -8,10 +8,15 @@ Environment variables:
   OPNSENSE_API_KEY    — OPNsense API key (used as HTTP Basic auth username)
   OPNSENSE_API_SECRET — OPNsense API secret (used as HTTP Basic auth password)
 
+  RETICULUM_BENCHMARK — set to 1 to run the A-326 validation scaling benchmark
+                        (seeds 1,024 interfaces, then removes them)
+
 Run with:
   pytest tests/integration/ -m integration -v
 """
+import json
 import os
+import statistics
 import time
 
 import pytest
@@ -65,8 +70,7 @@ def enable_services(api):
     # Reconfigure to regenerate rc.conf.d and config files
     r = _post(api, "service/reconfigure")
     assert r.status_code == 200, f"Reconfigure failed: {r.text[:200]}"
-    # configd runs reconfigure asynchronously (type:script);
-    # wait for it to finish generating config files
+    # Give freshly enabled services' rc.conf.d changes time to settle
     time.sleep(5)
     yield
     # Teardown: stop services and disable to leave a clean state
@@ -497,7 +501,7 @@ class TestA310StandardServiceEndpoints:
         assert r.status_code == 200
         data = r.json()
         assert "status" in data
-        assert data["status"] in ("running", "stopped")
+        assert data["status"] in ("running", "stopped", "degraded")
 
     def test_a310b_start_and_status_running(self, api):
         """A-310b: POST service/start → GET service/status reports running."""
@@ -1271,3 +1275,474 @@ class TestA315LxmfFieldCoverage:
             f"control_allowed hash should be accepted: {r.json()}"
         # Clean up
         _post(api, "lxmd/set", {"lxmf": {"control_allowed": ""}})
+
+
+# ---------------------------------------------------------------------------
+# A-316: Aggregated dashboard snapshot
+# ---------------------------------------------------------------------------
+
+@pytest.mark.timeout(60)
+class TestA316Dashboard:
+    """A-316: service/dashboard returns every widget section in one response."""
+
+    def test_a316a_dashboard_has_all_sections(self, api):
+        """A-316a: dashboard contains rnsd, lxmd, info and rnstatus sections."""
+        r = _get(api, "service/dashboard")
+        assert r.status_code == 200
+        data = r.json()
+        for key in ("rnsd", "lxmd", "info", "rnstatus"):
+            assert key in data, f"Missing {key}, got keys: {list(data.keys())}"
+
+    def test_a316b_dashboard_status_matches_rnsd_status(self, api):
+        """A-316b: dashboard rnsd.status agrees with the rnsdStatus endpoint."""
+        single = _get(api, "service/rnsdStatus").json()["status"]
+        data = _get(api, "service/dashboard").json()
+        assert data["rnsd"]["status"] == single
+
+    def test_a316c_dashboard_info_shape(self, api):
+        """A-316c: dashboard info mirrors the service/info field names."""
+        info = _get(api, "service/dashboard").json()["info"]
+        assert isinstance(info["rns_version"], str)
+        assert isinstance(info["lxmf_version"], str)
+        assert isinstance(info["node_identity"], str)
+
+    def test_a316d_dashboard_rnstatus_shape(self, api):
+        """A-316d: rnstatus section has an interfaces list (or an error key)."""
+        rnstatus = _get(api, "service/dashboard").json()["rnstatus"]
+        assert "interfaces" in rnstatus
+        assert isinstance(rnstatus["interfaces"], list)
+
+
+class TestA317Metrics:
+    """A-317: service/metrics returns an OpenMetrics exposition."""
+
+    def test_a317a_metrics_content_type_and_eof(self, api):
+        """A-317a: metrics is served as OpenMetrics text terminated by # EOF."""
+        r = _get(api, "service/metrics")
+        assert r.status_code == 200
+        assert r.headers["Content-Type"].startswith("application/openmetrics-text")
+        assert r.text.rstrip("\n").endswith("# EOF")
+
+    def test_a317b_metrics_service_state_matches_status(self, api):
+        """A-317b: reticulum_up for rnsd agrees with the rnsdStatus endpoint."""
+        running = _get(api, "service/rnsdStatus").json()["status"] == "running"
+        text = _get(api, "service/metrics").text
+        assert f'reticulum_up{{service="rnsd"}} {int(running)}' in text
+
+
+class TestA318LogsTail:
+    """A-318: service/logsTail returns a cursor and follows it incrementally."""
+
+    def test_a318a_initial_request_returns_cursor(self, api):
+        """A-318a: a request without cursor returns lines, cursor and reset=true."""
+        r = _get_with_params(api, "service/logsTail", {"service": "rnsd", "lines": 10})
+        assert r.status_code == 200
+        data = r.json()
+        assert isinstance(data["lines"], list)
+        assert data["reset"] is True
+        assert len(data["lines"]) <= 10
+
+    def test_a318b_cursor_poll_is_incremental(self, api):
+        """A-318b: polling with the returned cursor does not resend old lines."""
+        first = _get_with_params(api, "service/logsTail", {"service": "rnsd"}).json()
+        if not first["cursor"]:
+            pytest.skip("rnsd log does not exist yet")
+        data = _get_with_params(api, "service/logsTail",
+                                {"service": "rnsd", "cursor": first["cursor"]}).json()
+        assert data["reset"] is False
+        assert isinstance(data["lines"], list)
+
+    def test_a318c_unknown_service_rejected(self, api):
+        """A-318c: only rnsd and lxmd logs can be tailed."""
+        data = _get_with_params(api, "service/logsTail", {"service": "../../etc/passwd"}).json()
+        assert data == {"lines": [], "cursor": "", "reset": True}
+
+
+class TestA319LogsSearch:
+    """A-319: service/logsSearch returns paged rows from the log index."""
+
+    def test_a319a_page_shape(self, api):
+        """A-319a: a search returns rows, page, limit and has_more."""
+        r = _get_with_params(api, "service/logsSearch", {"service": "all", "limit": 5})
+        assert r.status_code == 200
+        data = r.json()
+        assert isinstance(data["rows"], list)
+        assert len(data["rows"]) <= 5
+        assert data["page"] == 1
+        assert isinstance(data["has_more"], bool)
+        for row in data["rows"]:
+            assert row["service"] in ("rnsd", "lxmd")
+            assert isinstance(row["ts"], int)
+
+    def test_a319b_rows_are_newest_first(self, api):
+        """A-319b: rows are ordered by timestamp, newest first."""
+        rows = _get_with_params(api, "service/logsSearch", {"limit": 50}).json()["rows"]
+        stamps = [row["ts"] for row in rows]
+        assert stamps == sorted(stamps, reverse=True)
+
+    def test_a319c_operators_are_literal(self, api):
+        """A-319c: FTS syntax in the search text is not an error."""
+        r = _get_with_params(api, "service/logsSearch",
+                             {"search": 'NEAR( "quoted OR * -x', "level": 3})
+        assert r.status_code == 200
+        assert "unavailable" not in r.json().get("error", "")
+
+
+class TestA320SelectiveReconfigure:
+    """A-320: reconfigure reports which daemons it restarted."""
+
+    def test_a320a_report_shape(self, api):
+        """A-320a: the response lists changed, restarted and failed services."""
+        data = _post(api, "service/reconfigure").json()
+        for key in ("changed", "restarted", "failed"):
+            assert isinstance(data[key], list), f"missing {key}: {data}"
+            assert set(data[key]) <= {"rnsd", "lxmd"}
+
+    def test_a320b_unchanged_config_restarts_nothing(self, api):
+        """A-320b: a second reconfigure without model changes restarts nothing."""
+        _post(api, "service/reconfigure")
+        data = _post(api, "service/reconfigure").json()
+        assert data["changed"] == []
+        assert data["restarted"] == []
+        assert data["result"] == "OK"
+
+
+class TestA321Supervision:
+    """A-321: supervisor restart counters are exposed to the GUI."""
+
+    def test_a321a_supervision_shape(self, api):
+        """A-321a: supervision returns a state object per daemon."""
+        data = _get(api, "service/supervision").json()
+        assert set(data) >= {"rnsd", "lxmd"}
+        rnsd = data["rnsd"]
+        if rnsd:
+            assert rnsd["state"] in ("running", "backoff", "crashloop", "stopped")
+            assert isinstance(rnsd["restarts"], int)
+
+    def test_a321b_dashboard_carries_supervisor(self, api):
+        """A-321b: the dashboard snapshot embeds the same counters."""
+        data = _get(api, "service/dashboard").json()
+        assert "supervisor" in data["rnsd"]
+        assert "supervisor" in data["lxmd"]
+
+
+class TestA322ImportTime:
+    """A-322: import-time diagnostics for the Reticulum entry points."""
+
+    def test_a322a_profile_shape(self, api):
+        """A-322a: every entry point is profiled with a total and the slowest imports."""
+        r = api.get(f"{_BASE}/service/importtime", timeout=120)
+        assert r.status_code == 200
+        targets = r.json()["targets"]
+        assert set(targets) == {"rnsd", "lxmd", "rnstatus", "collector"}
+        for name in ("rnsd", "rnstatus", "collector"):
+            assert "error" not in targets[name], f"{name}: {targets[name]}"
+            assert targets[name]["total_ms"] > 0
+            assert targets[name]["slowest"]
+
+
+class TestA323TransportInstances:
+    """A-323: multi-instance rnsd settings and aggregated status."""
+
+    def test_a323a_rejects_instances_without_transport(self, api):
+        """A-323a: more than one transport instance requires transport mode."""
+        r = _post(api, "rnsd/set", {
+            "general": {"transport_instances": "2", "enable_transport": "0"}
+        })
+        assert r.status_code == 200
+        assert "transport" in r.text.lower()
+        assert r.json().get("result") != "saved"
+
+    def test_a323b_rejects_out_of_range_count(self, api):
+        """A-323b: transport_instances is limited to 1-4."""
+        r = _post(api, "rnsd/set", {"general": {"transport_instances": "5"}})
+        assert r.json().get("result") != "saved"
+
+    def test_a323c_status_shape(self, api):
+        """A-323c: rnsdStatus lists per-instance states only with several instances."""
+        data = _get(api, "service/rnsdStatus").json()
+        assert data["status"] in ("running", "stopped", "degraded")
+        if "instances" in data:
+            assert data["instances"][0]["instance"] == 0
+            # "running" counts live processes, responsive or not
+            assert data["running"] == sum(1 for i in data["instances"]
+                                          if i["status"] in ("running", "degraded"))
+
+
+class TestA324LivenessWatchdog:
+    """A-324: RPC liveness watchdog settings and status report."""
+
+    def test_a324a_failure_threshold_range(self, api):
+        """A-324a: watchdog_failures is limited to 1-60."""
+        r = _post(api, "rnsd/set", {"general": {"watchdog_failures": "0"}})
+        assert r.json().get("result") != "saved"
+
+    def test_a324b_liveness_report_shape(self, api):
+        """A-324b: rnsdStatus carries latency percentiles when the watchdog reports."""
+        data = _get(api, "service/rnsdStatus").json()
+        if "liveness" not in data:
+            pytest.skip("watchdog disabled or collector not running")
+        liveness = data["liveness"]
+        assert liveness["state"] in ("ok", "failing", "degraded", "restarting", "stopped", "unknown")
+        assert set(liveness["latency_ms"]) == {"p50", "p90", "p99", "max", "samples"}
+        assert liveness["instances"][0]["service"] == "rnsd"
+        if data["status"] == "degraded":
+            assert liveness["instances"][0]["state"] == "degraded"
+
+    def test_a324c_standard_status_agrees(self, api):
+        """A-324c: service/status and rnsdStatus report the same rnsd state."""
+        assert _get(api, "service/status").json()["status"] == \
+            _get(api, "service/rnsdStatus").json()["status"]
+
+
+class TestA325BulkInterfaces:
+    """A-325: bulk interface import/export in one validation pass and one save."""
+
+    NAMES = [f"CI Bulk {n}" for n in range(3)]
+
+    @pytest.fixture
+    def cleanup(self, api):
+        yield
+        rows = _get_with_params(api, "rnsd/searchInterfaces", {"rowCount": -1}).json().get("rows", [])
+        for row in rows:
+            if row.get("name", "").startswith("CI Bulk"):
+                _post(api, f"rnsd/delInterface/{row['uuid']}")
+
+    def _rows(self):
+        return [{"name": name, "type": "TCPClientInterface",
+                 "target_host": f"10.99.0.{n + 1}", "target_port": "4242"}
+                for n, name in enumerate(self.NAMES)]
+
+    def test_a325a_import_json(self, api, cleanup):
+        """A-325a: a JSON batch is added in one request."""
+        r = _post(api, "rnsd/importInterfaces", {"interfaces": self._rows()})
+        assert r.json() == {"result": "saved", "added": 3, "updated": 0}
+        exported = {row["name"]: row for row in _get(api, "rnsd/exportInterfaces").json()["interfaces"]}
+        assert exported["CI Bulk 2"]["target_host"] == "10.99.0.3"
+        assert "id" not in exported["CI Bulk 2"]
+
+    def test_a325b_per_row_errors_reject_batch(self, api, cleanup):
+        """A-325b: one bad row reports its row number and nothing is saved."""
+        rows = self._rows()
+        del rows[1]["target_host"]
+        rows[2]["bogus"] = "x"
+        data = _post(api, "rnsd/importInterfaces", {"interfaces": rows}).json()
+        assert data["result"] == "failed"
+        assert {(e["row"], e["field"]) for e in data["errors"]} >= {(2, "target_host"), (3, None)}
+        names = [row["name"] for row in _get(api, "rnsd/exportInterfaces").json()["interfaces"]]
+        assert not any(name.startswith("CI Bulk") for name in names)
+
+    def test_a325c_csv_round_trip_updates_by_name(self, api, cleanup):
+        """A-325c: CSV export re-imported updates the existing interfaces."""
+        _post(api, "rnsd/importInterfaces", {"interfaces": self._rows()})
+        r = _get(api, "rnsd/exportInterfaces/csv")
+        assert r.headers["Content-Type"].startswith("text/csv")
+        assert r.text.splitlines()[0].startswith("enabled,name,type")
+        data = _post(api, "rnsd/importInterfaces", {"format": "csv", "data": r.text}).json()
+        assert data["result"] == "saved"
+        assert data["added"] == 0 and data["updated"] >= 3
+
+
+def bulk_interface_rows(count, prefix="CI Bench"):
+    """Benchmark fixture rows: enabled TCP servers on distinct loopback ports,
+    so every record takes part in the name and listen-endpoint indexes."""
+    return [{"name": f"{prefix} {n:04d}", "type": "TCPServerInterface", "enabled": "1",
+             "listen_ip": "127.0.0.1", "listen_port": str(41000 + n)}
+            for n in range(count)]
+
+
+@pytest.mark.skipif(os.environ.get("RETICULUM_BENCHMARK") != "1",
+                    reason="RETICULUM_BENCHMARK=1 not set (seeds 1,024 interfaces)")
+class TestA326ValidationScaling:
+    """A-326: save latency with 1,024 interfaces stays close to an empty interface list.
+
+    Saving general or LXMF settings skips the interface checks (no interface
+    record changed), and adding one interface checks only that record against
+    the name / listen endpoint indexes. What remains is serializing config.xml,
+    which grows linearly with the interface count but is not quadratic.
+    """
+
+    COUNT = 1024
+    RUNS = 5
+
+    def _median(self, fn):
+        samples = []
+        for _ in range(self.RUNS):
+            started = time.monotonic()
+            fn()
+            samples.append(time.monotonic() - started)
+        return statistics.median(samples)
+
+    def _timings(self, api):
+        general = _get(api, "rnsd/get").json()["general"]
+        loglevel = _extract_option_value(general["loglevel"]) or "4"
+        display_name = _get(api, "lxmd/get").json()["lxmf"]["display_name"]
+
+        def add_and_delete():
+            r = _post(api, "rnsd/addInterface", {"interface": {
+                "name": "CI Bench Probe", "type": "TCPClientInterface",
+                "target_host": "10.99.1.1", "target_port": "4242"}})
+            uuid = r.json().get("uuid")
+            assert uuid, r.text
+            _post(api, f"rnsd/delInterface/{uuid}")
+
+        return {
+            "general": self._median(lambda: _post(api, "rnsd/set", {"general": {"loglevel": loglevel}})),
+            "lxmf": self._median(lambda: _post(api, "lxmd/set", {"lxmf": {"display_name": display_name}})),
+            "interface": self._median(add_and_delete),
+        }
+
+    @pytest.fixture(scope="class")
+    def timings(self, api):
+        baseline = self._timings(api)
+        started = time.monotonic()
+        r = api.post(f"{_BASE}/rnsd/importInterfaces",
+                     json={"interfaces": bulk_interface_rows(self.COUNT)}, timeout=300)
+        import_seconds = time.monotonic() - started
+        try:
+            assert r.json().get("result") == "saved", r.text[:500]
+            seeded = self._timings(api)
+            print(f"\nA-326 baseline {baseline}, with {self.COUNT} interfaces {seeded}, "
+                  f"bulk import {import_seconds:.2f}s")
+            yield baseline, seeded, import_seconds
+        finally:
+            rows = _get_with_params(api, "rnsd/searchInterfaces", {"rowCount": -1}).json().get("rows", [])
+            for row in rows:
+                if row.get("name", "").startswith("CI Bench"):
+                    _post(api, f"rnsd/delInterface/{row['uuid']}")
+
+    @pytest.mark.parametrize("operation", ["general", "lxmf", "interface"])
+    def test_a326a_save_latency_flat(self, timings, operation):
+        """A-326a: saves with 1,024 interfaces stay within 3x (+0.5 s) of the baseline."""
+        baseline, seeded, _ = timings
+        assert seeded[operation] <= baseline[operation] * 3 + 0.5, \
+            f"{operation} save: {seeded[operation]:.2f}s vs {baseline[operation]:.2f}s baseline"
+
+    def test_a326b_bulk_import_single_save(self, timings):
+        """A-326b: importing 1,024 interfaces is one request, not 1,024 saves."""
+        _, _, import_seconds = timings
+        assert import_seconds < 60
+
+
+class TestA327InterfaceNameCheck:
+    """A-327: the interface dialog checks one name instead of listing every interface."""
+
+    def _check(self, api, name, uuid=""):
+        r = _get_with_params(api, "rnsd/checkInterfaceName", {"name": name, "uuid": uuid})
+        assert r.status_code == 200
+        return r.json()
+
+    def test_a327a_free_name(self, api):
+        """A-327a: an unused or empty name is available."""
+        assert self._check(api, "CI Unused Name 0x5f3a") == {"available": True}
+        assert self._check(api, "") == {"available": True}
+
+    def test_a327b_taken_name(self, api, test_interface_uuid):
+        """A-327b: an existing name is reported with the save-time message."""
+        data = self._check(api, "CI Test TCP")
+        assert data["available"] is False
+        assert "already used" in data["message"]
+
+    def test_a327c_own_name_excluded(self, api, test_interface_uuid):
+        """A-327c: the record being edited may keep its own name."""
+        assert self._check(api, "CI Test TCP", test_interface_uuid) == {"available": True}
+
+
+class TestA328InterfaceGridRuntime:
+    """A-328: the interfaces grid joins live status and sorts/filters server-side."""
+
+    RUNTIME = {"status", "tx_rate", "rx_rate", "clients", "held_announces"}
+
+    def test_a328a_rows_carry_runtime_columns(self, api, test_interface_uuid):
+        """A-328a: every row has the live columns; status is one of the known states."""
+        rows = _get_with_params(api, "rnsd/searchInterfaces", {"rowCount": -1}).json()["rows"]
+        assert rows
+        for row in rows:
+            assert self.RUNTIME <= set(row)
+            assert row["status"] in ("up", "down", "disabled", "unknown")
+
+    def test_a328b_numeric_sort_unknown_last(self, api, test_interface_uuid):
+        """A-328b: sorting by rate is numeric, descending, with unknown rates last."""
+        data = _get_with_params(api, "rnsd/searchInterfaces",
+                                {"rowCount": -1, "sort[tx_rate]": "desc"}).json()
+        rates = [row["tx_rate"] for row in data["rows"]]
+        known = [rate for rate in rates if rate is not None]
+        assert known == sorted(known, reverse=True)
+        assert rates == known + [None] * (len(rates) - len(known))
+
+    def test_a328c_status_filter_and_paging(self, api, test_interface_uuid):
+        """A-328c: the status filter applies before paging and to the total."""
+        data = _get_with_params(api, "rnsd/searchInterfaces",
+                                {"status": "disabled", "rowCount": 1, "current": 1}).json()
+        assert all(row["status"] == "disabled" for row in data["rows"])
+        assert len(data["rows"]) <= 1
+        everything = _get_with_params(api, "rnsd/searchInterfaces", {"rowCount": -1}).json()
+        assert data["total"] == sum(row["status"] == "disabled" for row in everything["rows"])
+
+
+class TestA329StatusStream:
+    """A-329: service/stream is a Server-Sent Events stream that starts with the full state."""
+
+    @staticmethod
+    def _first_frames(api, headers=None, count=2):
+        frames = []
+        with api.get(f"{_BASE}/service/stream", headers=headers or {},
+                     stream=True, timeout=30) as r:
+            if r.status_code == 204:
+                pytest.skip("OPNsense < 24.7: no configdStream, stream answers 204")
+            assert r.status_code == 200
+            assert r.headers["Content-Type"].startswith("text/event-stream")
+            block = {}
+            for line in r.iter_lines(decode_unicode=True):
+                if line:
+                    key, _sep, value = line.partition(": ")
+                    block[key] = value
+                    continue
+                frames.append(block)
+                block = {}
+                if len(frames) == count:
+                    break
+        return frames
+
+    def test_a329a_initial_state(self, api):
+        """A-329a: after the retry hint, the first event carries services and rnstatus."""
+        frames = self._first_frames(api)
+        assert "retry" in frames[0]
+        assert frames[1]["event"] == "state"
+        data = json.loads(frames[1]["data"])
+        assert set(data["services"]) == {"rnsd", "lxmd"}
+        assert "interfaces" in data["rnstatus"]
+
+    def test_a329b_resume_skips_state(self, api):
+        """A-329b: resuming with a current Last-Event-ID does not resend the state."""
+        state = self._first_frames(api)[1]
+        if "id" not in state:
+            pytest.skip("event journal is empty (collector not running)")
+        start = time.monotonic()
+        with api.get(f"{_BASE}/service/stream", headers={"Last-Event-ID": state["id"]},
+                     stream=True, timeout=30) as r:
+            for line in r.iter_lines(decode_unicode=True):
+                assert line != "event: state"
+                if time.monotonic() - start > 3:
+                    break
+
+
+class TestA330ProcessWatcher:
+    """A-330: status endpoints answer from the process watcher's status file."""
+
+    @pytest.mark.parametrize("endpoint", ["rnsdStatus", "lxmdStatus"])
+    def test_a330_process_details(self, api, endpoint):
+        """A-330: a running daemon reports its pid and start time."""
+        data = _get(api, f"service/{endpoint}").json()
+        if "pid" not in data:
+            pytest.skip("reticulum_procwatch not running")
+        assert set(data) >= {"status", "pid", "started", "last_exit"}
+        if data["status"] in ("running", "degraded"):
+            assert isinstance(data["pid"], int) and data["pid"] > 0
+            assert isinstance(data["started"], int)
+        else:
+            assert data["pid"] is None
+
+    def test_a330_status_agrees(self, api):
+        """A-330: service/status and service/rnsdStatus give the same rnsd state."""
+        assert _get(api, "service/status").json()["status"] == _get(api, "service/rnsdStatus").json()["status"]
@@ -197,12 +197,13 @@ class TestP801VersionsEnvFormat:
 
     def test_versions_env_contains_only_known_keys(self):
         """
-        The file should define exactly RNS_TAG and LXMF_TAG — no extra keys
-        that could indicate a stale or malformed file.
+        The file should define exactly RNS_TAG, LXMF_TAG and PYSERIAL_VERSION
+        (pinned for the wheelhouse) — no extra keys that could indicate a
+        stale or malformed file.
         """
         content = _read(VENDOR_VERSIONS_ENV)
         parsed = _parse_versions_env(content)
-        known_keys = {"RNS_TAG", "LXMF_TAG"}
+        known_keys = {"RNS_TAG", "LXMF_TAG", "PYSERIAL_VERSION"}
         extra_keys = set(parsed.keys()) - known_keys
         assert not extra_keys, (
             f"reticulum_project/versions.env has unexpected keys: {extra_keys}. "
@@ -0,0 +1,169 @@
+"""
+Packaging Tests — P-901 through P-905
+
+Offline wheelhouse: reticulum_project/build-wheelhouse.sh builds pinned
+rns/lxmf/pyserial wheels at package build time and packs them into one
+archive with a stable name, and pkg-install unpacks it and installs with pip
+--no-index instead of cloning and building from GitHub.
+
+These tests check the pieces fit together without building a package or
+needing network access.
+
+Test IDs:
+  P-901  pkg-plist lists one version-independent archive; make package creates it
+  P-902  pkg-install installs from the wheelhouse with --no-index
+  P-903  git / source build only on the fallback path without a wheelhouse
+  P-904  venv uses system site-packages (py311-cryptography)
+  P-905  build-wheelhouse.sh refuses to build without checked-out submodules
+  P-906  pkg-install skips venv work on a matching install fingerprint
+  P-907  pkg-install precompiles the venv bytecode
+
+Run with: pytest tests/packaging/ -m unit -v
+"""
+import os
+import re
+import subprocess
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+REPO_ROOT = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "..", )
+)
+
+BUILD_SCRIPT = os.path.join(REPO_ROOT, "reticulum_project", "build-wheelhouse.sh")
+PKG_INSTALL = os.path.join(REPO_ROOT, "os-reticulum", "pkg-install")
+PKG_PLIST = os.path.join(REPO_ROOT, "os-reticulum", "pkg-plist")
+GITIGNORE = os.path.join(REPO_ROOT, ".gitignore")
+MAKEFILE = os.path.join(REPO_ROOT, "os-reticulum", "Makefile")
+
+WHEELHOUSE_TAR = "/usr/local/share/os-reticulum/wheelhouse.tar"
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as fh:
+        return fh.read()
+
+
+class TestP901PkgPlistArchive:
+    """P-901: pkg-plist does not depend on the pinned versions or a prior build."""
+
+    def test_single_archive_entry(self):
+        lines = _read(PKG_PLIST).splitlines()
+        assert WHEELHOUSE_TAR in lines
+        # No per-version wheel names to edit on an RNS/LXMF bump
+        assert not [line for line in lines if ".whl" in line or "/wheelhouse/" in line]
+
+    def test_build_script_writes_archive(self):
+        content = _read(BUILD_SCRIPT)
+        assert "os-reticulum/src" + WHEELHOUSE_TAR in content
+        assert 'tar -cf "${DEST}.tmp" -C "${WORK}" .' in content
+
+    def test_make_package_provides_archive(self):
+        content = _read(MAKEFILE)
+        assert "WHEELHOUSE=\t${.CURDIR}/src" + WHEELHOUSE_TAR in content
+        assert "package: ${WHEELHOUSE}" in content
+        # The placeholder rule is after the include, so it is not the default target
+        assert content.index('.include "../../Mk/plugins.mk"') < content.index("${WHEELHOUSE}:")
+
+    def test_empty_archive_means_source_build(self, tmp_path):
+        archive = tmp_path / "wheelhouse.tar"
+        subprocess.run(["tar", "-cf", str(archive), "-T", "/dev/null"], check=True)
+        dest = tmp_path / "unpacked"
+        dest.mkdir()
+        subprocess.run(["tar", "-xf", str(archive), "-C", str(dest)], check=True)
+        assert not (dest / "requirements.txt").exists()
+
+    def test_build_output_not_committed(self):
+        assert "/os-reticulum/src" + WHEELHOUSE_TAR in _read(GITIGNORE)
+
+
+class TestP902OfflineInstall:
+    """P-902: A package with a wheelhouse installs without any index."""
+
+    def test_no_index_install(self):
+        content = _read(PKG_INSTALL)
+        assert f'WHEELHOUSE_TAR="{WHEELHOUSE_TAR}"' in content
+        unpack = content.find('tar -xf "${WHEELHOUSE_TAR}" -C "${WHEELHOUSE}"')
+        assert unpack != -1
+        assert unpack < content.find('if [ ! -f "${WHEELHOUSE}/requirements.txt" ]; then')
+        installs = re.findall(r'pip" install[^\n]*\\\n[^\n]*--no-index[^\n]*', content)
+        assert installs, "pkg-install must pip install --no-index from the wheelhouse"
+        assert all('--find-links "${WHEELHOUSE}"' in line for line in installs)
+        assert any('-r "${WHEELHOUSE}/requirements.txt"' in line for line in installs)
+
+
+class TestP903SourceFallback:
+    """P-903: git is only required when no wheelhouse is shipped."""
+
+    def test_git_check_guarded(self):
+        content = _read(PKG_INSTALL)
+        guard = content.find('if [ ! -f "${WHEELHOUSE}/requirements.txt" ]; then')
+        assert guard != -1
+        assert guard < content.find("check_dep git") < content.find("\nfi\n", guard)
+
+    def test_clone_only_in_else_branch(self):
+        content = _read(PKG_INSTALL)
+        branch = content.find('if [ -f "${WHEELHOUSE}/requirements.txt" ]; then')
+        otherwise = content.find("\nelse\n", branch)
+        assert branch != -1 and otherwise != -1
+        first_clone = content.find('clone_at_tag "https://')
+        first_upgrade = content.find("install --upgrade pip")
+        assert otherwise < first_clone
+        assert otherwise < first_upgrade
+
+
+class TestP904SystemSitePackages:
+    """P-904: cryptography comes from py311-cryptography, not a source build."""
+
+    def test_venv_flag(self):
+        content = _read(PKG_INSTALL)
+        assert 'python3.11 -m venv --system-site-packages "${VENV_PATH}"' in content
+        assert "--system-site-packages --upgrade" in content
+        assert "check_pkg py311-cryptography" in content
+
+
+class TestP905BuildScript:
+    """P-905: The build refuses to produce wheels from unpinned sources."""
+
+    def test_requires_submodules(self, tmp_path):
+        if os.path.isfile(os.path.join(REPO_ROOT, "reticulum_project", "rns-src", "setup.py")):
+            pytest.skip("submodules checked out; the guard is not reachable")
+        dest = tmp_path / "wheelhouse"
+        result = subprocess.run(["sh", BUILD_SCRIPT, str(dest)],
+                                capture_output=True, text=True, timeout=30)
+        assert result.returncode == 1
+        assert "rns-src is not checked out" in result.stderr
+        assert not dest.exists()
+
+
+class TestP906Fingerprint:
+    """P-906: Unchanged installs skip pip entirely; drift reinstalls only what drifted."""
+
+    def test_check_before_install(self):
+        content = _read(PKG_INSTALL)
+        check = content.find('check --fingerprint "${FINGERPRINT}"')
+        assert check != -1
+        assert check < content.find('if [ "${INSTALL}" = "none" ]; then') \
+            < content.find("install --upgrade pip")
+
+    def test_partial_reinstall_uses_wheelhouse(self):
+        content = _read(PKG_INSTALL)
+        assert "--force-reinstall --no-deps ${_reqs}" in content
+
+    def test_fingerprint_recorded_after_install(self):
+        content = _read(PKG_INSTALL)
+        assert content.find('record --fingerprint "${FINGERPRINT}"') > \
+            content.find("install --upgrade pip")
+        assert "/usr/local/opnsense/scripts/OPNsense/Reticulum/venvstate.py" in _read(PKG_PLIST)
+
+
+class TestP907Bytecode:
+    """P-907: The venv is compiled at install time, not by the first daemon start."""
+
+    def test_compileall(self):
+        content = _read(PKG_INSTALL)
+        assert '"${VENV_PATH}/bin/python3.11" -m compileall -q -j 0 "${VENV_PATH}/lib"' in content
+        # Runs on unchanged installs too (compileall skips up-to-date files)
+        assert content.find("-m compileall") < content.find('if [ "${INSTALL}" != "none" ]; then')
@@ -0,0 +1,241 @@
+"""
+Status Collector Tests — B-101 through B-106
+
+Exercises the configd-side status collector (collector.py) and its stdlib
+RPC client (rnsrpc.py) without a running rnsd. A multiprocessing Listener
+stands in for the rnsd instance control port so the real authentication and
+request/response path is covered.
+
+Test IDs:
+  B-101  [reticulum] section parsing from a rendered config
+  B-102  RPC authkey derivation (explicit rpc_key / transport identity hash)
+  B-103  interface_stats normalisation to the documented rnstatus shape
+  B-104  end-to-end query against a stub instance control listener
+  B-105  unreachable rnsd yields an error snapshot, never an exception
+  B-106  atomic snapshot write and --once CLI output
+
+Run with: pytest tests/scripts/test_collector.py -v
+"""
+import hashlib
+import json
+import multiprocessing.connection
+import os
+import sys
+import threading
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import collector  # noqa: E402
+import rnsrpc  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+RAW_STATS = {
+    "interfaces": [
+        {
+            "name": "TCPServerInterface[Backbone/0.0.0.0:4242]",
+            "short_name": "Backbone",
+            "status": True,
+            "mode": 0x01,
+            "txb": 1024,
+            "rxb": 2048,
+            "clients": 3,
+            "held_announces": 2,
+            "announce_queue": 1,
+            "ifac_netname": "mesh",
+        },
+        {
+            "name": "RNodeInterface[LoRa]",
+            "short_name": "LoRa",
+            "type": "RNodeInterface",
+            "status": False,
+            "mode": 0x04,
+        },
+    ],
+    "txb": 1024,
+    "rxb": 2048,
+    "transport_id": bytes.fromhex("a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4"),
+    "transport_uptime": 93784,
+    "rss": 52428800,
+}
+
+
+def _write_config(tmp_path, render_rnsd, general=None):
+    (tmp_path / "config").write_text(render_rnsd(general=general))
+    return str(tmp_path)
+
+
+@pytest.fixture
+def stub_rnsd(tmp_path):
+    """
+    Start a one-request-per-connection listener that mimics rnsd's RPC loop.
+    Yields (config_dir, port, calls) where calls records received requests.
+    """
+    authkey = bytes.fromhex("00112233445566778899aabbccddeeff")
+    listener = multiprocessing.connection.Listener(("127.0.0.1", 0), authkey=authkey)
+    port = listener.address[1]
+    calls = []
+
+    def serve():
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                return
+            try:
+                call = conn.recv()
+                calls.append(call)
+                conn.send(RAW_STATS if call == {"get": "interface_stats"} else None)
+            finally:
+                conn.close()
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    (tmp_path / "config").write_text(
+        "[reticulum]\n"
+        "  share_instance = True\n"
+        f"  instance_control_port = {port}\n"
+        f"  rpc_key = {authkey.hex()}\n"
+    )
+    yield str(tmp_path), port, calls
+    listener.close()
+
+
+class TestB101ConfigParsing:
+    """B-101: The collector reads ports and keys from the rendered rnsd config."""
+
+    def test_reads_control_port_from_template(self, tmp_path, render_rnsd):
+        config_dir = _write_config(tmp_path, render_rnsd, {"instance_control_port": "40001"})
+        section = rnsrpc.read_reticulum_section(os.path.join(config_dir, "config"))
+        assert section["instance_control_port"] == "40001"
+        assert section["share_instance"] == "True"
+
+    def test_ignores_interface_subsections(self, tmp_path):
+        (tmp_path / "config").write_text(
+            "[reticulum]\n  instance_control_port = 37429\n"
+            "[interfaces]\n  [[Srv]]\n  instance_control_port = 1\n"
+        )
+        section = rnsrpc.read_reticulum_section(str(tmp_path / "config"))
+        assert section["instance_control_port"] == "37429"
+
+    def test_missing_config_is_empty(self, tmp_path):
+        assert rnsrpc.read_reticulum_section(str(tmp_path / "absent")) == {}
+
+
+class TestB102AuthKey:
+    """B-102: authkey mirrors RNS.Reticulum's rpc_key resolution."""
+
+    def test_explicit_rpc_key_wins(self, tmp_path):
+        client = rnsrpc.RpcClient(str(tmp_path))
+        assert client._resolve_authkey("deadbeef" * 4) == bytes.fromhex("deadbeef" * 4)
+
+    def test_identity_hash_fallback(self, tmp_path):
+        (tmp_path / "storage").mkdir()
+        prv = bytes(range(64))
+        (tmp_path / "storage" / "transport_identity").write_bytes(prv)
+        client = rnsrpc.RpcClient(str(tmp_path))
+        assert client._resolve_authkey("") == hashlib.sha256(prv).digest()
+
+    def test_missing_identity_raises_rpc_error(self, tmp_path):
+        client = rnsrpc.RpcClient(str(tmp_path))
+        with pytest.raises(rnsrpc.RpcError):
+            client._resolve_authkey("")
+
+
+class TestB103Normalisation:
+    """B-103: Raw RPC stats map onto the documented rnstatus API shape."""
+
+    def test_top_level_fields(self):
+        data = rnsrpc.normalise_stats(RAW_STATS, now=1000)
+        assert data["transport_enabled"] is True
+        assert data["identity"] == "a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4"
+        assert data["uptime"] == "1d 2h 3m"
+        assert data["uptime_seconds"] == 93784
+        assert data["collected_at"] == 1000
+
+    def test_interface_fields(self):
+        up, down = rnsrpc.normalise_stats(RAW_STATS)["interfaces"]
+        assert up["name"] == "Backbone"
+        assert up["type"] == "TCPServerInterface"
+        assert up["status"] == "up"
+        assert up["mode"] == "full"
+        assert (up["tx_bytes"], up["rx_bytes"]) == (1024, 2048)
+        assert up["clients"] == 3
+        assert up["held_announces"] == 2
+        assert up["ifac_netname"] == "mesh"
+        assert down["status"] == "down"
+        assert down["mode"] == "roaming"
+        assert (down["tx_bytes"], down["rx_bytes"]) == (0, 0)
+
+    def test_transport_disabled(self):
+        data = rnsrpc.normalise_stats({"interfaces": []})
+        assert data["transport_enabled"] is False
+        assert data["identity"] == ""
+        assert data["uptime"] == ""
+
+    def test_output_is_json_serialisable(self):
+        json.dumps(rnsrpc.normalise_stats(RAW_STATS))
+
+
+class TestB104StubQuery:
+    """B-104: A real authenticated RPC round-trip against a stub listener."""
+
+    def test_interface_stats_round_trip(self, stub_rnsd):
+        config_dir, _port, calls = stub_rnsd
+        client = rnsrpc.RpcClient(config_dir)
+        assert client.interface_stats() == RAW_STATS
+        assert calls == [{"get": "interface_stats"}]
+
+    def test_client_reuses_resolved_settings(self, stub_rnsd):
+        config_dir, _port, calls = stub_rnsd
+        client = rnsrpc.RpcClient(config_dir)
+        client.interface_stats()
+        first_key = client._authkey
+        client.interface_stats()
+        assert client._authkey is first_key
+        assert len(calls) == 2
+
+
+class TestB105Unreachable:
+    """B-105: A stopped rnsd produces an error snapshot, not a crash."""
+
+    def test_closed_port(self, tmp_path):
+        (tmp_path / "config").write_text(
+            "[reticulum]\n  instance_control_port = 1\n  rpc_key = " + "ab" * 16 + "\n"
+        )
+        c = collector.Collector(str(tmp_path), str(tmp_path / "s.json"), 5, quiet=True)
+        snapshot = c.collect()
+        assert snapshot["error"] == "rnsd not reachable"
+        assert snapshot["interfaces"] == []
+
+    def test_share_instance_disabled(self, tmp_path, render_rnsd):
+        config_dir = _write_config(tmp_path, render_rnsd, {"share_instance": "0"})
+        client = rnsrpc.RpcClient(config_dir)
+        with pytest.raises(rnsrpc.RpcError, match="share_instance"):
+            client.interface_stats()
+
+
+class TestB106SnapshotOutput:
+    """B-106: Snapshot file handling and one-shot CLI mode."""
+
+    def test_write_atomic_replaces_file(self, tmp_path):
+        path = tmp_path / "status.json"
+        collector.write_atomic(str(path), {"a": 1})
+        collector.write_atomic(str(path), {"a": 2})
+        assert json.loads(path.read_text()) == {"a": 2}
+        assert [p.name for p in tmp_path.iterdir()] == ["status.json"]
+        assert oct(path.stat().st_mode & 0o777) == "0o644"
+
+    def test_once_prints_snapshot(self, stub_rnsd, capsys):
+        config_dir, _port, _calls = stub_rnsd
+        assert collector.main(["--once", "--config", config_dir]) == 0
+        data = json.loads(capsys.readouterr().out)
+        assert data["identity"] == "a1b2c3d4e5f6a1b2c3d4e5f6a1b2c3d4"
+        assert len(data["interfaces"]) == 2
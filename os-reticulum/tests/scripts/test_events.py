@@ -0,0 +1,343 @@
+"""
+Status Event Stream Tests — B-1401 through B-1406
+
+Covers events.py, which turns successive collector samples into delta
+events (service, interface, counters) in a JSON-lines journal and serves
+that journal as a Server-Sent Events stream, and the collector's --events
+journal. The stream is driven with a fake clock so keep-alives and the
+stream lifetime are checked without waiting.
+
+Test IDs:
+  B-1401  service states from the process watcher or pidfiles and the liveness report
+  B-1402  service and interface events only on change
+  B-1403  counters events at the configured cadence, changed interfaces only
+  B-1404  journal ids stay increasing across restarts and trimming
+  B-1405  stream: initial state, resume by Last-Event-ID, gaps, keep-alives
+  B-1406  collector appends to the journal with --events and removes it on stop
+
+Run with: pytest tests/scripts/test_events.py -v
+"""
+import io
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import collector  # noqa: E402
+import events  # noqa: E402
+import runtime  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+@pytest.fixture
+def pidfiles(tmp_path, monkeypatch):
+    """Point the rnsd/lxmd pidfiles at tmp_path; returns a writer for them."""
+    paths = {name: str(tmp_path / f"{name}.pid") for name in runtime.PIDFILES}
+    monkeypatch.setattr(runtime, "PIDFILES", paths)
+    monkeypatch.setattr(runtime, "PROCS", str(tmp_path / "procs.json"))
+
+    def write(name, pid):
+        with open(paths[name], "w", encoding="ascii") as fh:
+            fh.write(f"{pid}\n")
+    return write
+
+
+def _iface(name, status="up", tx=0, rx=0, **extra):
+    return dict({"name": name, "type": "TCPServerInterface", "status": status, "mode": "Full",
+                 "ifac_netname": "", "instance": 0, "tx_bytes": tx, "rx_bytes": rx,
+                 "tx_rate": None, "rx_rate": None, "clients": None, "held_announces": 0},
+                **extra)
+
+
+def _snapshot(*interfaces):
+    return {"interfaces": list(interfaces),
+            "tx_bytes": sum(i["tx_bytes"] for i in interfaces),
+            "rx_bytes": sum(i["rx_bytes"] for i in interfaces)}
+
+
+RUNNING = {"rnsd": "running", "lxmd": "running"}
+
+
+class TestB1401ServiceStates:
+    """B-1401: Service state matches what the dashboard shows."""
+
+    def test_running_and_stopped(self, pidfiles):
+        pidfiles("rnsd", os.getpid())
+        pidfiles("lxmd", _dead_pid())
+        assert events.service_states() == {"rnsd": "running", "lxmd": "stopped"}
+
+    def test_missing_pidfile_is_stopped(self, pidfiles):
+        assert events.service_states() == {"rnsd": "stopped", "lxmd": "stopped"}
+
+    def test_degraded_from_liveness_report(self, pidfiles):
+        pidfiles("rnsd", os.getpid())
+        report = {"instances": [{"instance": 0, "state": "degraded"}]}
+        assert events.service_states(report)["rnsd"] == "degraded"
+        other = {"instances": [{"instance": 1, "state": "degraded"}]}
+        assert events.service_states(other)["rnsd"] == "running"
+
+    def test_watcher_state_matches_status_endpoint(self, tmp_path, pidfiles):
+        # A live supervisor in the pidfile, but the daemon is in backoff
+        pidfiles("rnsd", os.getpid())
+        (tmp_path / "procs.json").write_text(json.dumps({
+            "rnsd": {"state": "backoff", "pid": None},
+            "lxmd": {"state": "running", "pid": 4242},
+        }))
+        assert events.service_states() == {"rnsd": "stopped", "lxmd": "running"}
+
+
+class TestB1402Deltas:
+    """B-1402: A steady node produces no events; changes produce exactly one each."""
+
+    def test_first_sample_is_baseline(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=60)
+        emitted = feed.update(_snapshot(_iface("a"), _iface("b")), RUNNING, now=100)
+        assert [e["event"] for e in emitted] == ["service", "interface", "counters"]
+        assert emitted[0]["data"] == RUNNING
+        assert [i["name"] for i in emitted[1]["data"]["interfaces"]] == ["a", "b"]
+
+    def test_steady_state_is_silent(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=60)
+        feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        assert feed.update(_snapshot(_iface("a")), RUNNING, now=105) == []
+
+    def test_interface_down_and_removed(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=60)
+        feed.update(_snapshot(_iface("a"), _iface("b")), RUNNING, now=100)
+        emitted = feed.update(_snapshot(_iface("a", status="down")), RUNNING, now=105)
+        assert [e["event"] for e in emitted] == ["interface"]
+        changes = {i["name"]: i for i in emitted[0]["data"]["interfaces"]}
+        assert changes["a"]["status"] == "down"
+        assert changes["a"]["type"] == "TCPServerInterface"
+        assert changes["b"] == {"name": "b", "status": "removed"}
+
+    def test_service_change_only(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=60)
+        feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        emitted = feed.update(_snapshot(_iface("a")), dict(RUNNING, lxmd="stopped"), now=105)
+        assert [(e["event"], e["data"]) for e in emitted] == [("service", {"lxmd": "stopped"})]
+
+    def test_unreachable_keeps_interface_state(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=60)
+        feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        stopped = dict(RUNNING, rnsd="stopped")
+        emitted = feed.update({"error": "rnsd not reachable", "interfaces": []}, stopped, now=105)
+        assert [e["event"] for e in emitted] == ["service"]
+        # Back with the same interfaces: only the service changes
+        emitted = feed.update(_snapshot(_iface("a")), RUNNING, now=110)
+        assert [e["event"] for e in emitted] == ["service"]
+
+
+class TestB1403Counters:
+    """B-1403: Counters go out at the configured cadence, for moved interfaces only."""
+
+    def test_cadence(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=15)
+        feed.update(_snapshot(_iface("a"), _iface("b")), RUNNING, now=100)
+        # Traffic moves every 5 s sample, counters are sent every 15 s
+        assert feed.update(_snapshot(_iface("a", tx=10), _iface("b")), RUNNING, now=105) == []
+        assert feed.update(_snapshot(_iface("a", tx=20), _iface("b")), RUNNING, now=110) == []
+        emitted = feed.update(_snapshot(_iface("a", tx=30, tx_rate=2.0), _iface("b")),
+                              RUNNING, now=115)
+        assert [e["event"] for e in emitted] == ["counters"]
+        data = emitted[0]["data"]
+        assert list(data["interfaces"]) == ["a"]
+        assert data["interfaces"]["a"]["tx_bytes"] == 30
+        assert data["interfaces"]["a"]["tx_rate"] == 2.0
+        assert data["tx_bytes"] == 30
+
+    def test_idle_node_sends_no_counters(self, tmp_path):
+        feed = events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=15)
+        feed.update(_snapshot(_iface("a", tx=5)), RUNNING, now=100)
+        assert feed.update(_snapshot(_iface("a", tx=5)), RUNNING, now=130) == []
+
+    def test_minimum_interval(self, tmp_path):
+        assert events.EventFeed(str(tmp_path / "e.jsonl"), counter_interval=0).counter_interval == 1.0
+
+
+class TestB1404Journal:
+    """B-1404: Journal ids are unique and increasing, also across restarts and trimming."""
+
+    def test_ids_increase_within_one_millisecond(self, tmp_path):
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        emitted = feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        ids = [e["id"] for e in emitted]
+        assert ids == sorted(set(ids))
+        assert ids[0] == 100000
+        assert [e["id"] for e in events.read_events(str(path))] == ids
+
+    def test_ids_survive_restart(self, tmp_path):
+        path = str(tmp_path / "e.jsonl")
+        first = events.EventFeed(path).update(_snapshot(_iface("a")), RUNNING, now=100)
+        # Clock went backwards between collector runs
+        second = events.EventFeed(path).update(_snapshot(), RUNNING, now=50)
+        assert second[0]["id"] > first[-1]["id"]
+
+    def test_trim_keeps_newest(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(events, "MAX_BYTES", 2048)
+        monkeypatch.setattr(events, "KEEP_EVENTS", 5)
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        last = None
+        for n in range(40):
+            state = "running" if n % 2 else "stopped"
+            last = feed.update(_snapshot(), {"rnsd": state, "lxmd": "stopped"}, now=100 + n)[-1]
+        kept = events.read_events(str(path))
+        assert path.stat().st_size <= 2048
+        assert kept[-1] == last
+        assert len(kept) < 40
+        assert oct(path.stat().st_mode & 0o777) == oct(0o644)
+
+
+class TestB1405Stream:
+    """B-1405: The SSE stream starts from state or resumes, then follows the journal."""
+
+    class Clock:
+        def __init__(self, on_sleep=None):
+            self.now = 0.0
+            self.on_sleep = on_sleep
+
+        def __call__(self):
+            return self.now
+
+        def sleep(self, seconds):
+            self.now += seconds
+            if self.on_sleep:
+                self.on_sleep(self.now)
+
+    @staticmethod
+    def _frames(text):
+        frames = []
+        for block in text.strip().split("\n\n"):
+            fields = {}
+            for line in block.split("\n"):
+                key, _sep, value = line.partition(": ")
+                fields[key] = value
+            frames.append(fields)
+        return frames
+
+    def _stream(self, path, last_id=None, seconds=2, on_sleep=None):
+        out = io.StringIO()
+        clock = self.Clock(on_sleep)
+        events.stream(str(path), last_id, seconds=seconds, out=out,
+                      state=lambda: {"services": RUNNING}, clock=clock, sleep=clock.sleep)
+        return self._frames(out.getvalue())
+
+    def test_initial_state_then_new_events(self, tmp_path):
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        baseline = feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        appended = []
+
+        def on_sleep(now):
+            if not appended and now >= 1:
+                appended.extend(feed.update(_snapshot(_iface("a", status="down")), RUNNING, now=105))
+
+        frames = self._stream(path, on_sleep=on_sleep)
+        assert frames[0] == {"retry": str(events.RETRY_MS)}
+        assert frames[1]["event"] == "state"
+        assert frames[1]["id"] == str(baseline[-1]["id"])
+        assert json.loads(frames[1]["data"]) == {"services": RUNNING}
+        assert [(f["event"], int(f["id"])) for f in frames[2:]] == \
+            [("interface", appended[0]["id"])]
+
+    def test_resume_replays_missed_events(self, tmp_path):
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        seen = feed.update(_snapshot(_iface("a")), RUNNING, now=100)[-1]["id"]
+        missed = feed.update(_snapshot(_iface("a", status="down")), RUNNING, now=105)
+        frames = self._stream(path, last_id=seen)
+        assert [f.get("event") for f in frames[1:]] == ["interface"]
+        assert frames[1]["id"] == str(missed[0]["id"])
+
+    def test_gap_sends_state(self, tmp_path):
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        feed.update(_snapshot(_iface("a")), RUNNING, now=100)
+        # The client's last id predates everything left in the journal
+        frames = self._stream(path, last_id=1)
+        assert [f.get("event") for f in frames[1:]] == ["state"]
+
+    def test_missing_journal_sends_state_without_id(self, tmp_path):
+        frames = self._stream(tmp_path / "none.jsonl", last_id=123)
+        assert frames[1]["event"] == "state"
+        assert "id" not in frames[1]
+
+    def test_keepalive_and_lifetime(self, tmp_path):
+        frames = self._stream(tmp_path / "e.jsonl", seconds=events.KEEPALIVE * 2 + 1)
+        assert frames.count({"": "keep-alive"}) == 2
+
+    def test_follows_trimmed_journal(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(events, "MAX_BYTES", 1024)
+        monkeypatch.setattr(events, "KEEP_EVENTS", 3)
+        path = tmp_path / "e.jsonl"
+        feed = events.EventFeed(str(path), counter_interval=60)
+        feed.update(_snapshot(), RUNNING, now=100)
+        sent = []
+
+        def on_sleep(now):
+            # Enough events per step to force a trim (inode swap) mid-stream
+            step = int(now * 2)
+            if step <= 20:
+                state = "running" if step % 2 else "stopped"
+                sent.extend(feed.update(_snapshot(), {"rnsd": state, "lxmd": "stopped"},
+                                        now=200 + step))
+
+        frames = self._stream(path, seconds=11, on_sleep=on_sleep)
+        streamed = [int(f["id"]) for f in frames if f.get("event") == "service"]
+        assert streamed == sorted(set(streamed))
+        assert streamed[-1] == sent[-1]["id"]
+
+    def test_client_gone(self, tmp_path):
+        class Closed(io.StringIO):
+            def flush(self):
+                raise BrokenPipeError()
+
+        clock = self.Clock()
+        events.stream(str(tmp_path / "e.jsonl"), None, seconds=5, out=Closed(),
+                      state=dict, clock=clock, sleep=clock.sleep)
+
+
+class TestB1406Collector:
+    """B-1406: The collector journals changes with --events and cleans up on stop."""
+
+    def test_journal(self, tmp_path, pidfiles):
+        pidfiles("rnsd", _dead_pid())
+        path = tmp_path / "events.jsonl"
+        c = collector.Collector(str(tmp_path), str(tmp_path / "s.json"), 5, quiet=True,
+                                events_path=str(path), events_counters=30)
+        assert c.events.counter_interval == 30
+        c.tick()
+        c.tick()
+        journal = events.read_events(str(path))
+        assert [(e["event"], e["data"]) for e in journal] == \
+            [("service", {"rnsd": "stopped", "lxmd": "stopped"})]
+
+    def test_disabled_by_default(self, tmp_path):
+        assert collector.Collector(str(tmp_path), str(tmp_path / "s.json"), 5,
+                                   quiet=True).events is None
+
+    def test_removed_on_stop(self, tmp_path, pidfiles, monkeypatch):
+        path = tmp_path / "events.jsonl"
+        c = collector.Collector(str(tmp_path), str(tmp_path / "s.json"), 0, quiet=True,
+                                events_path=str(path))
+        monkeypatch.setattr(collector.signal, "signal", lambda *_args: None)
+        monkeypatch.setattr(c, "tick", lambda: (c.events.update(_snapshot(), RUNNING), c.stop()))
+        c.run()
+        assert not path.exists()
@@ -0,0 +1,102 @@
+"""
+Import-Time Diagnostics Tests — B-1101 through B-1104
+
+Covers importtime.py, the diagnostics action that profiles the import cost
+of the rnsd/lxmd/rnstatus entry points. The test interpreter stands in for
+the venv Python and stdlib modules stand in for RNS/LXMF.
+
+Test IDs:
+  B-1101  `-X importtime` output parsed into module, self, cumulative, depth
+  B-1102  total taken from the target's own row; slowest sorted by self time
+  B-1103  real profile run; failed imports report the error
+  B-1104  CLI prints one JSON object keyed by target
+
+Run with: pytest tests/scripts/test_importtime.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import importtime  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       211 |        211 |   _io
+import time:       449 |       1180 | _frozen_importlib_external
+import time:      3000 |       3000 |       cryptography.hazmat
+import time:       900 |       3900 |     RNS.Cryptography
+import time:      1200 |       5100 |   RNS.Identity
+import time:       400 |       5500 | RNS
+Traceback (most recent call last):
+"""
+
+
+class TestB1101Parse:
+    """B-1101: Each importtime row keeps its nesting depth."""
+
+    def test_rows(self):
+        rows = importtime.parse(SAMPLE)
+        assert rows[0] == ("_io", 211, 211, 1)
+        assert rows[1] == ("_frozen_importlib_external", 449, 1180, 0)
+        assert rows[2] == ("cryptography.hazmat", 3000, 3000, 3)
+        assert len(rows) == 6
+
+
+class TestB1102Summary:
+    """B-1102: Totals and ranking."""
+
+    def test_target_row_is_total(self):
+        summary = importtime.summarise(importtime.parse(SAMPLE), "RNS", top=2)
+        assert summary["total_ms"] == 5.5
+        assert summary["imports"] == 6
+        assert [row["module"] for row in summary["slowest"]] == ["cryptography.hazmat", "RNS.Identity"]
+        assert summary["slowest"][0] == {"module": "cryptography.hazmat",
+                                         "self_ms": 3.0, "cumulative_ms": 3.0}
+
+    def test_missing_target_sums_top_level(self):
+        summary = importtime.summarise(importtime.parse(SAMPLE), "LXMF")
+        assert summary["total_ms"] == round((1180 + 5500) / 1000, 1)
+
+
+class TestB1103Profile:
+    """B-1103: A fresh interpreter is profiled without writing bytecode."""
+
+    def test_stdlib_module(self):
+        result = importtime.profile("json", python=sys.executable, top=5)
+        assert "error" not in result
+        assert result["module"] == "json"
+        assert result["total_ms"] > 0
+        assert result["wall_ms"] >= result["total_ms"]
+        assert 0 < len(result["slowest"]) <= 5
+
+    def test_failed_import(self):
+        result = importtime.profile("no_such_module_xyz", python=sys.executable)
+        assert "ModuleNotFoundError" in result["error"]
+
+    def test_missing_interpreter(self, tmp_path):
+        result = importtime.profile("json", python=str(tmp_path / "python3.11"))
+        assert "error" in result
+
+
+class TestB1104Cli:
+    """B-1104: configd gets a single JSON document."""
+
+    def test_json_output(self, monkeypatch, capsys):
+        monkeypatch.setattr(importtime, "PYTHON", sys.executable)
+        monkeypatch.setattr(importtime, "TARGETS", {"rnsd": "json", "rnstatus": "tsdb"})
+        assert importtime.main(["--top", "3"]) == 0
+        data = json.loads(capsys.readouterr().out)
+        assert set(data["targets"]) == {"rnsd", "rnstatus"}
+        # SCRIPTS_DIR is on the child's path, as for the collector target
+        assert "error" not in data["targets"]["rnstatus"]
+        assert len(data["targets"]["rnsd"]["slowest"]) <= 3
@@ -0,0 +1,167 @@
+"""
+Transport Instance Tests — B-1201 through B-1205
+
+Covers instances.py, which finds the configured rnsd transport instances
+and merges their status into one rnstatus snapshot, and the per-instance
+state runtime.py adds to the dashboard. Rendered configs are written to
+tmp_path; RPC clients are replaced by in-process stubs.
+
+Test IDs:
+  B-1201  configured instances are the consecutive instance-N dirs with a [reticulum] section
+  B-1202  per-instance service names and pidfiles
+  B-1203  merged snapshot: tagged interfaces, summed counters, no duplicate interconnect
+  B-1204  unreachable instances reported without hiding the reachable ones
+  B-1205  collect() queries every instance; dashboard lists instance states
+
+Run with: pytest tests/scripts/test_instances.py -v
+"""
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import instances  # noqa: E402
+import rnsrpc  # noqa: E402
+import runtime  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+def _config(path, body):
+    path.mkdir(parents=True, exist_ok=True)
+    (path / "config").write_text(body)
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    root = tmp_path / "reticulum"
+    _config(root, "[reticulum]\n  shared_instance_port = 37428\n")
+    _config(root / "instance-1", "[reticulum]\n  shared_instance_port = 37431\n")
+    _config(root / "instance-2", "[reticulum]\n  shared_instance_port = 37433\n")
+    _config(root / "instance-3", "# Transport instance 3 is not configured\n")
+    return root
+
+
+def _snap(names, tx=0, rx=0, identity="ab", rss=None, collected_at=100):
+    return {"transport_enabled": True, "identity": identity, "uptime": "1m",
+            "uptime_seconds": 60, "rss": rss, "tx_bytes": tx, "rx_bytes": rx,
+            "interfaces": [{"name": name, "status": "up", "tx_bytes": 1, "rx_bytes": 1}
+                           for name in names],
+            "collected_at": collected_at}
+
+
+class TestB1201ConfigDirs:
+    """B-1201: Stub configs of unused instances are not instances."""
+
+    def test_configured_dirs(self, config_dir):
+        assert instances.config_dirs(str(config_dir)) == [
+            str(config_dir), str(config_dir / "instance-1"), str(config_dir / "instance-2"),
+        ]
+
+    def test_single_instance(self, tmp_path):
+        assert instances.config_dirs(str(tmp_path)) == [str(tmp_path)]
+
+    def test_gap_ends_the_list(self, config_dir):
+        (config_dir / "instance-1" / "config").write_text("# not configured\n")
+        assert instances.config_dirs(str(config_dir)) == [str(config_dir)]
+
+
+class TestB1202Names:
+    """B-1202: Instance 0 keeps the plain rnsd names used everywhere else."""
+
+    def test_names(self):
+        assert instances.service_name(0) == "rnsd"
+        assert instances.pidfile(0) == "/var/run/rnsd.pid"
+        assert instances.service_name(2) == "rnsd-2"
+        assert instances.pidfile(2) == "/var/run/rnsd-2.pid"
+
+
+class TestB1203Merge:
+    """B-1203: One snapshot for the GUI, whatever the instance count."""
+
+    def test_single_snapshot_unchanged(self):
+        snap = _snap(["A"])
+        assert instances.merge([snap]) is snap
+
+    def test_merged(self):
+        merged = instances.merge([
+            _snap(["A", instances.INTERCONNECT], tx=10, rx=20, identity="aa", rss=100),
+            _snap(["B", instances.INTERCONNECT], tx=1, rx=2, identity="bb", rss=50, collected_at=105),
+        ])
+        assert [(i["name"], i["instance"]) for i in merged["interfaces"]] == \
+            [("A", 0), (instances.INTERCONNECT, 0), ("B", 1)]
+        assert (merged["tx_bytes"], merged["rx_bytes"], merged["rss"]) == (11, 22, 150)
+        assert merged["identity"] == "aa"
+        assert merged["collected_at"] == 105
+        assert merged["instances"] == [
+            {"instance": 0, "identity": "aa", "uptime": "1m", "interfaces": 2},
+            {"instance": 1, "identity": "bb", "uptime": "1m", "interfaces": 1},
+        ]
+
+
+class TestB1204Unreachable:
+    """B-1204: A down instance is listed, the others still report."""
+
+    def test_extra_instance_down(self):
+        merged = instances.merge([_snap(["A"]), rnsrpc.unreachable("refused")])
+        assert "error" not in merged
+        assert [i["name"] for i in merged["interfaces"]] == ["A"]
+        assert merged["instances"][1] == {"instance": 1, "error": "refused"}
+
+    def test_main_instance_down(self):
+        merged = instances.merge([rnsrpc.unreachable("refused"), _snap(["B"], identity="bb")])
+        assert merged["identity"] == "bb"
+        assert merged["instances"][0] == {"instance": 0, "error": "refused"}
+
+    def test_all_down(self):
+        merged = instances.merge([rnsrpc.unreachable("a"), rnsrpc.unreachable("b")])
+        assert merged["error"] == "a"
+        assert merged["interfaces"] == []
+        assert [i["error"] for i in merged["instances"]] == ["a", "b"]
+
+
+class _Client:
+    def __init__(self, stats):
+        self.stats = stats
+
+    def interface_stats(self):
+        if self.stats is None:
+            raise rnsrpc.RpcError("connection refused")
+        return self.stats
+
+
+class TestB1205Collect:
+    """B-1205: Every configured instance is queried once per collection."""
+
+    def test_collect(self, config_dir):
+        raw = {"interfaces": [{"short_name": "X", "status": True, "txb": 5, "rxb": 7}],
+               "txb": 5, "rxb": 7, "transport_id": b"\x01"}
+        clients = {str(config_dir): _Client(raw),
+                   str(config_dir / "instance-1"): _Client(raw),
+                   str(config_dir / "instance-2"): _Client(None)}
+        merged = instances.collect(str(config_dir), clients)
+        assert merged["tx_bytes"] == 10
+        assert [i["instance"] for i in merged["interfaces"]] == [0, 1]
+        assert merged["instances"][2]["error"] == "connection refused"
+
+    def test_all_unreachable_raises(self, config_dir):
+        clients = {path: _Client(None) for path in instances.config_dirs(str(config_dir))}
+        with pytest.raises(rnsrpc.RpcError):
+            instances.collect(str(config_dir), clients)
+
+    def test_dashboard_instances(self, config_dir, tmp_path, monkeypatch):
+        pid_1 = tmp_path / "rnsd-1.pid"
+        pid_1.write_text(f"{os.getpid()}\n")
+        monkeypatch.setattr(instances, "pidfile",
+                            lambda number: str(tmp_path / f"{instances.service_name(number)}.pid"))
+        monkeypatch.setattr(runtime, "SUPERVISE_DIR", str(tmp_path))
+        states = runtime.transport_instances(str(config_dir))
+        assert [(s["instance"], s["status"]) for s in states] == \
+            [(0, "stopped"), (1, "running"), (2, "stopped")]
+        assert states[0]["supervisor"] == {}
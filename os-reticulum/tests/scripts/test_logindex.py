@@ -0,0 +1,270 @@
+"""
+Log Index Tests — B-601 through B-607
+
+Covers logindex.py, the SQLite full-text index behind service/logsSearch.
+Logs and the database live under tmp_path; rotation is simulated the way
+newsyslog does it with the CZp flags (rename to <name>.0, create a fresh
+file, later gzip .0 into .1.gz).
+
+Test IDs:
+  B-601  line parsing: timestamp, level, continuation lines, FTS quoting
+  B-602  incremental indexing of a growing live log (partial lines held back, oversized skipped)
+  B-603  rotation and compression are followed without duplicates
+  B-604  unseen compressed archives are stream-indexed once
+  B-605  expired archives are pruned; corrupt archives are skipped
+  B-606  search by text, level, service and time range, newest first, paged
+  B-607  read-only search CLI and the collector's periodic update
+
+Run with: pytest tests/scripts/test_logindex.py -v
+"""
+import gzip
+import json
+import os
+import sys
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import collector  # noqa: E402
+import logindex  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+def _line(minute, level, message):
+    return f"[2024-05-01 10:{minute:02d}:00] [{level}] {message}\n"
+
+
+def _ts(minute):
+    return int(time.mktime(time.strptime(f"2024-05-01 10:{minute:02d}:00",
+                                         "%Y-%m-%d %H:%M:%S")))
+
+
+@pytest.fixture
+def index(tmp_path):
+    idx = logindex.LogIndex(str(tmp_path / "logindex.db"), log_dir=str(tmp_path))
+    yield idx
+    idx.close()
+
+
+def _messages(idx, **kwargs):
+    return [row["message"] for row in idx.search(limit=200, **kwargs)["rows"]]
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+class TestB601Parsing:
+    """B-601: RNS log lines become (ts, level, message) rows."""
+
+    def test_tagged_line(self):
+        ts, level, message = logindex.parse_line(
+            "[2024-05-01 10:05:00] [Warning]  Interface slow", (0, None))
+        assert (ts, level, message) == (_ts(5), 2, "Interface slow")
+
+    def test_continuation_inherits_previous(self):
+        previous = (_ts(3), 1)
+        assert logindex.parse_line("  File \"x.py\", line 3", previous) == \
+            (_ts(3), 1, "  File \"x.py\", line 3")
+
+    @pytest.mark.parametrize("text,expected", [
+        ("refused", '"refused"'),
+        ("tcp conn*", '"tcp" "conn"*'),
+        ('say "hi" OR NEAR(', '"say" """hi""" "OR" "NEAR("'),
+    ])
+    def test_fts_query_quotes_terms(self, text, expected):
+        assert logindex.fts_query(text) == expected
+
+
+class TestB602Incremental:
+    """B-602: Only new complete lines are indexed on each pass."""
+
+    def test_growing_log(self, tmp_path, index):
+        log = tmp_path / "rnsd.log"
+        log.write_text(_line(0, "Notice", "Started rnsd") + _line(1, "Error", "refused"))
+        index.update()
+        _append(log, _line(2, "Info", "connected") + "[2024-05-01 10:03:00] [Debug] half")
+        index.update()
+        assert _messages(index) == ["connected", "refused", "Started rnsd"]
+        _append(log, " written\n")
+        index.update()
+        index.update()
+        assert _messages(index)[0] == "half written"
+        assert len(_messages(index)) == 4
+
+    def test_pass_budget_spreads_catch_up(self, tmp_path, index):
+        (tmp_path / "rnsd.log").write_text(
+            "".join(_line(i, "Info", f"entry {i}") for i in range(50)))
+        consumed = index.update(budget=300)
+        assert 0 < consumed <= 300
+        while index.update(budget=300):
+            pass
+        assert len(_messages(index)) == 50
+
+    def test_line_longer_than_pass_budget_is_skipped(self, tmp_path, index):
+        log = tmp_path / "rnsd.log"
+        log.write_text(_line(0, "Notice", "before") + _line(1, "Error", "x" * 1000))
+        for _ in range(5):
+            index.update(budget=300)
+        _append(log, _line(2, "Info", "after"))
+        while index.update(budget=300):
+            pass
+        assert _messages(index) == ["after", "before"]
+
+    def test_oversized_line_still_being_written(self, tmp_path, index):
+        log = tmp_path / "rnsd.log"
+        log.write_text(_line(0, "Notice", "before") + "y" * 1000)
+        while index.update(budget=300):
+            pass
+        _append(log, "y" * 100 + "\n" + _line(1, "Info", "after"))
+        while index.update(budget=300):
+            pass
+        assert _messages(index) == ["after", "before"]
+
+    def test_oversized_first_line(self, tmp_path, index):
+        (tmp_path / "rnsd.log").write_text("z" * 2000 + "\n" + _line(0, "Info", "after"))
+        while index.update(budget=300):
+            pass
+        assert _messages(index) == ["after"]
+
+
+class TestB603Rotation:
+    """B-603: Renamed and compressed files are recognised, not re-indexed."""
+
+    def test_rotate_then_compress(self, tmp_path, index):
+        log = tmp_path / "rnsd.log"
+        log.write_text(_line(0, "Notice", "first") + _line(1, "Info", "second"))
+        index.update()
+        _append(log, _line(2, "Info", "before rotation"))
+        os.rename(log, str(log) + ".0")
+        log.write_text(_line(3, "Notice", "after rotation"))
+        index.update()
+        assert _messages(index) == ["after rotation", "before rotation", "second", "first"]
+
+        rotated = tmp_path / "rnsd.log.0"
+        with gzip.open(tmp_path / "rnsd.log.1.gz", "wb") as fh:
+            fh.write(rotated.read_bytes())
+        rotated.unlink()
+        index.update()
+        assert _messages(index) == ["after rotation", "before rotation", "second", "first"]
+
+
+class TestB604Archives:
+    """B-604: Archives present before the index existed are read once."""
+
+    def test_gzip_archive_indexed_once(self, tmp_path, index):
+        with gzip.open(tmp_path / "lxmd.log.2.gz", "wt") as fh:
+            fh.write(_line(0, "Error", "old delivery failed") + "no newline at end")
+        (tmp_path / "lxmd.log").write_text(_line(9, "Info", "current"))
+        index.update()
+        index.update()
+        assert _messages(index, service="lxmd") == ["current", "no newline at end",
+                                                    "old delivery failed"]
+
+
+class TestB605Prune:
+    """B-605: The index only covers files that still exist."""
+
+    def test_expired_archive_dropped(self, tmp_path, index):
+        (tmp_path / "rnsd.log.4").write_text(_line(0, "Info", "ancient"))
+        (tmp_path / "rnsd.log").write_text(_line(5, "Info", "recent"))
+        index.update()
+        (tmp_path / "rnsd.log.4").unlink()
+        index.update()
+        assert _messages(index) == ["recent"]
+        assert _messages(index, query="ancient") == []
+
+    def test_corrupt_archive_skipped(self, tmp_path, index):
+        (tmp_path / "rnsd.log.1.gz").write_bytes(b"\x1f\x8b\x08\x00garbage\n")
+        (tmp_path / "rnsd.log").write_text(_line(5, "Info", "recent"))
+        index.update()
+        assert _messages(index) == ["recent"]
+
+
+@pytest.fixture
+def populated(tmp_path, index):
+    (tmp_path / "rnsd.log").write_text(
+        _line(0, "Notice", "Started rnsd")
+        + _line(1, "Error", "TCPClientInterface[Backbone] connection refused")
+        + "Traceback (most recent call last):\n"
+        + _line(2, "Debug", "Path request for <a1b2>")
+        + _line(3, "Warning", "Interface Backbone is slow"))
+    (tmp_path / "lxmd.log").write_text(_line(4, "Error", "Delivery to <c3d4> failed"))
+    index.update()
+    return index
+
+
+class TestB606Search:
+    """B-606: Searches combine text, level, service and time range."""
+
+    def test_full_text(self, populated):
+        assert _messages(populated, query="backbone") == [
+            "Interface Backbone is slow",
+            "TCPClientInterface[Backbone] connection refused",
+        ]
+        assert _messages(populated, query="connect*") == [
+            "TCPClientInterface[Backbone] connection refused"]
+
+    def test_level_includes_continuations(self, populated):
+        assert _messages(populated, level=1, service="rnsd") == [
+            "Traceback (most recent call last):",
+            "TCPClientInterface[Backbone] connection refused",
+        ]
+
+    def test_time_range(self, populated):
+        assert _messages(populated, since=_ts(2), until=_ts(3)) == [
+            "Interface Backbone is slow", "Path request for <a1b2>"]
+
+    def test_paging(self, populated):
+        first = populated.search(page=1, limit=2)
+        second = populated.search(page=3, limit=2)
+        assert [row["message"] for row in first["rows"]] == [
+            "Delivery to <c3d4> failed", "Interface Backbone is slow"]
+        assert first["has_more"] is True
+        assert first["rows"][0]["level_name"] == "Error"
+        assert len(second["rows"]) == 2 and second["has_more"] is False
+
+    def test_like_fallback(self, populated):
+        populated.fts = False
+        assert _messages(populated, query="50%") == []
+        assert _messages(populated, query="a1b2") == ["Path request for <a1b2>"]
+
+
+class TestB607Cli:
+    """B-607: The configd search path and the collector integration."""
+
+    def test_search_cli_read_only(self, tmp_path, populated, capsys):
+        populated.close()
+        db = str(tmp_path / "logindex.db")
+        before = sorted(os.listdir(tmp_path))
+        logindex.main(["search", "--db", db, "--query", "refused".encode().hex(),
+                       "--service", "rnsd", "--level", "1"])
+        data = json.loads(capsys.readouterr().out)
+        assert [row["message"] for row in data["rows"]] == [
+            "TCPClientInterface[Backbone] connection refused"]
+        assert sorted(os.listdir(tmp_path)) == before
+
+    def test_search_cli_without_index(self, tmp_path, capsys):
+        logindex.main(["search", "--db", str(tmp_path / "absent.db")])
+        data = json.loads(capsys.readouterr().out)
+        assert data["rows"] == [] and "not built" in data["error"]
+
+    def test_collector_updates_index(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logindex.logtail, "LOG_DIR", str(tmp_path))
+        (tmp_path / "rnsd.log").write_text(_line(0, "Notice", "Started rnsd"))
+        db = tmp_path / "logindex.db"
+        c = collector.Collector(str(tmp_path), str(tmp_path / "status.json"), 5,
+                                quiet=True, log_index=str(db))
+        c.tick()
+        c.log_index.close()
+        index = logindex.LogIndex(str(db), log_dir=str(tmp_path))
+        assert _messages(index) == ["Started rnsd"]
+        index.close()
@@ -0,0 +1,312 @@
+"""
+Log Cursor and Filter Tests — B-501 through B-509
+
+Covers logtail.py, the byte-offset cursor behind service/logsTail. Log files
+are created under tmp_path; rotation is simulated the way newsyslog does it
+(rename to <name>.0, create a fresh file).
+
+Test IDs:
+  B-501  no cursor: last N complete lines (any chunk boundary) plus a cursor at their end
+  B-502  incremental read returns only appended lines; idle poll returns none
+  B-503  a partially written last line is held back; the cursor records the size seen
+  B-504  rotation: rotated remainder drained, then the new file from offset 0
+  B-505  truncation in place / malformed cursor restart from the tail
+  B-506  per-request read bound skips to a line boundary
+  B-507  severity detection (RNS level names, numeric tags, untagged lines)
+  B-508  keyword / regex filtering, applied to incremental reads too; risky regexes refused or timed out
+  B-509  backward scan beyond the last N lines, into rotated files, budgeted
+
+Run with: pytest tests/scripts/test_logtail.py -v
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import logtail  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "rnsd.log"
+    path.write_text("".join(f"line {i}\n" for i in range(1, 11)))
+    return path
+
+
+def _follow(tmp_path, cursor=None, count=200, line_filter=logtail.ALL_LINES):
+    return logtail.follow("rnsd", count, cursor, log_dir=str(tmp_path),
+                          line_filter=line_filter)
+
+
+def _append(path, text):
+    with open(path, "a", encoding="utf-8") as fh:
+        fh.write(text)
+
+
+class TestB501Initial:
+    """B-501: The first request returns the tail and a cursor."""
+
+    def test_tail_and_cursor(self, tmp_path, log):
+        data = _follow(tmp_path, count=3)
+        assert data["lines"] == ["line 8", "line 9", "line 10"]
+        assert data["reset"] is True
+        st = os.stat(log)
+        assert data["cursor"] == f"{st.st_ino}:{st.st_size}:{st.st_size}"
+
+    def test_tail_across_chunks(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logtail, "CHUNK", 16)
+        path = tmp_path / "rnsd.log"
+        path.write_text("".join(f"entry {i:03d}\n" for i in range(100)))
+        data = _follow(tmp_path, count=5)
+        assert data["lines"] == [f"entry {i:03d}" for i in range(95, 100)]
+
+    @pytest.mark.parametrize("offset", [-1, 0, 1])
+    def test_chunk_boundary_on_newline(self, tmp_path, monkeypatch, offset):
+        # Boundary just before, on and just after the newline of "line 2",
+        # both as the first block and deeper into the file
+        text = "".join(f"line {i}\n" for i in range(1, 3002))
+        path = tmp_path / "rnsd.log"
+        path.write_text(text)
+        newline = text.index("\n", text.index("line 2\n"))
+        for depth in (1, 7):
+            chunk = (len(text) - 1 - (newline + offset)) // depth
+            monkeypatch.setattr(logtail, "CHUNK", chunk)
+            lines, end, scanned, complete = logtail.scan_back(str(path), len(text), 5000)
+            assert lines == [f"line {i}" for i in range(1, 3002)]
+            assert (end, scanned, complete) == (len(text), len(text), True)
+
+    def test_chunk_sizes_keep_every_line(self, tmp_path, monkeypatch):
+        text = "a\n\nbb\nccc\n\n\ndddd\ne\n"
+        path = tmp_path / "rnsd.log"
+        path.write_text(text)
+        for chunk in range(1, len(text) + 2):
+            monkeypatch.setattr(logtail, "CHUNK", chunk)
+            lines = logtail.scan_back(str(path), len(text), 100)[0]
+            assert lines == text.split("\n")[:-1], chunk
+
+    def test_missing_log(self, tmp_path):
+        data = _follow(tmp_path)
+        assert (data["lines"], data["cursor"], data["reset"]) == ([], "", True)
+
+
+class TestB502Incremental:
+    """B-502: Only lines appended after the cursor are returned."""
+
+    def test_appended_lines(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        _append(log, "line 11\nline 12\n")
+        data = _follow(tmp_path, cursor)
+        assert data["lines"] == ["line 11", "line 12"]
+        assert data["reset"] is False
+
+    def test_idle_poll(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        data = _follow(tmp_path, cursor)
+        assert (data["lines"], data["cursor"], data["reset"]) == ([], cursor, False)
+        assert data["scanned"] == 0
+
+
+class TestB503PartialLine:
+    """B-503: An unterminated last line stays behind the cursor."""
+
+    def test_partial_line_held_back(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        _append(log, "line 11\nline 1")
+        data = _follow(tmp_path, cursor)
+        assert data["lines"] == ["line 11"]
+        _append(log, "2\n")
+        data = _follow(tmp_path, data["cursor"])
+        assert data["lines"] == ["line 12"]
+
+    def test_cursor_records_observed_size(self, tmp_path, log):
+        # The API's stat() shortcut compares the size, not the offset
+        cursor = _follow(tmp_path)["cursor"]
+        _append(log, "line 1")
+        data = _follow(tmp_path, cursor)
+        inode, offset, size = data["cursor"].split(":")
+        assert int(size) == os.stat(log).st_size == int(offset) + len("line 1")
+        idle = _follow(tmp_path, data["cursor"])
+        assert (idle["lines"], idle["cursor"]) == ([], data["cursor"])
+
+    def test_two_field_cursor_accepted(self, tmp_path, log):
+        st = os.stat(log)
+        _append(log, "line 11\n")
+        data = _follow(tmp_path, f"{st.st_ino}:{st.st_size}")
+        assert (data["lines"], data["reset"]) == (["line 11"], False)
+
+
+class TestB504Rotation:
+    """B-504: newsyslog rotation loses no lines and repeats none."""
+
+    def test_rotation_drains_old_file(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        _append(log, "line 11\n")
+        os.rename(log, str(log) + ".0")
+        log.write_text("fresh 1\nfresh 2\n")
+        data = _follow(tmp_path, cursor)
+        assert data["lines"] == ["line 11", "fresh 1", "fresh 2"]
+        assert data["reset"] is False
+        assert data["cursor"] == f"{os.stat(log).st_ino}:{os.stat(log).st_size}:{os.stat(log).st_size}"
+
+    def test_rotated_file_gone(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        os.unlink(log)
+        log.write_text("fresh 1\n")
+        data = _follow(tmp_path, cursor)
+        assert data["lines"] == ["fresh 1"]
+
+
+class TestB505Restart:
+    """B-505: Unusable cursors fall back to the tail with reset=true."""
+
+    def test_truncated_in_place(self, tmp_path, log):
+        cursor = _follow(tmp_path)["cursor"]
+        with open(log, "w", encoding="utf-8") as fh:
+            fh.write("after truncate\n")
+        data = _follow(tmp_path, cursor)
+        assert data["reset"] is True
+        assert data["lines"] == ["after truncate"]
+
+    @pytest.mark.parametrize("cursor", ["", "garbage", "12:", ":34", "-1:5"])
+    def test_malformed_cursor(self, tmp_path, log, cursor):
+        data = _follow(tmp_path, cursor, count=2)
+        assert data["reset"] is True
+        assert data["lines"] == ["line 9", "line 10"]
+
+
+class TestB506Bounded:
+    """B-506: A large backlog is bounded by MAX_READ."""
+
+    def test_skips_to_line_boundary(self, tmp_path, log, monkeypatch):
+        cursor = _follow(tmp_path)["cursor"]
+        _append(log, "".join(f"burst {i:04d}\n" for i in range(100)))
+        monkeypatch.setattr(logtail, "MAX_READ", 50)
+        data = _follow(tmp_path, cursor)
+        assert data["lines"] == [f"burst {i:04d}" for i in range(96, 100)]
+        assert data["cursor"].endswith(f":{os.stat(log).st_size}")
+
+
+RNS_LOG = [
+    "[2024-05-01 10:00:00] [Notice]   Started rnsd client",
+    "[2024-05-01 10:00:01] [Debug]    Path request for <a1b2>",
+    "[2024-05-01 10:00:02] [Error]    TCPClientInterface[Backbone] connection refused",
+    "Traceback (most recent call last):",
+    "[2024-05-01 10:00:03] [Extra]    Announce from [3] hops away",
+    "[2024-05-01 10:00:04] [Warning]  Interface Backbone is slow",
+]
+
+
+@pytest.fixture
+def rns_log(tmp_path):
+    path = tmp_path / "rnsd.log"
+    path.write_text("\n".join(RNS_LOG) + "\n")
+    return path
+
+
+class TestB507Levels:
+    """B-507: Severity is read from the line prefix."""
+
+    @pytest.mark.parametrize("line,level", [
+        (RNS_LOG[0], 3),
+        (RNS_LOG[1], 6),
+        (RNS_LOG[2], 1),
+        (RNS_LOG[3], None),
+        (RNS_LOG[4], 7),
+        ("[2] numeric tag", 2),
+    ])
+    def test_line_level(self, line, level):
+        assert logtail.line_level(line) == level
+
+    def test_level_filter_keeps_untagged(self, tmp_path, rns_log):
+        data = _follow(tmp_path, line_filter=logtail.LineFilter(level=2))
+        assert data["lines"] == [RNS_LOG[2], RNS_LOG[3], RNS_LOG[5]]
+
+
+class TestB508Keyword:
+    """B-508: Keyword and regex filters run server-side."""
+
+    def test_keyword_case_insensitive(self, tmp_path, rns_log):
+        data = _follow(tmp_path, line_filter=logtail.LineFilter(pattern="BACKBONE"))
+        assert data["lines"] == [RNS_LOG[2], RNS_LOG[5]]
+
+    def test_regex(self, tmp_path, rns_log):
+        flt = logtail.LineFilter(pattern=r"\[(error|warning)\]", regex=True)
+        assert _follow(tmp_path, line_filter=flt)["lines"] == [RNS_LOG[2], RNS_LOG[5]]
+
+    def test_filter_applies_to_incremental_reads(self, tmp_path, rns_log):
+        flt = logtail.LineFilter(level=1)
+        cursor = _follow(tmp_path, line_filter=flt)["cursor"]
+        _append(rns_log, "[2024-05-01 10:01:00] [Info]     noise\n"
+                         "[2024-05-01 10:01:01] [Critical] disk full\n")
+        data = _follow(tmp_path, cursor, line_filter=flt)
+        assert data["lines"] == ["[2024-05-01 10:01:01] [Critical] disk full"]
+
+    def test_cli_hex_pattern_and_bad_regex(self, tmp_path, rns_log, monkeypatch, capsys):
+        monkeypatch.setattr(logtail, "LOG_DIR", str(tmp_path))
+        logtail.main(["rnsd", "10", "-", "-", "refused".encode().hex(), "text"])
+        assert json.loads(capsys.readouterr().out)["lines"] == [RNS_LOG[2]]
+        logtail.main(["rnsd", "10", "-", "-", "(".encode().hex(), "regex"])
+        assert "invalid regular expression" in json.loads(capsys.readouterr().out)["error"]
+
+    @pytest.mark.parametrize("pattern", [r"(a+)+$", r"(\w+\s?)*x", r"((ab*))+c", "a" * 201])
+    def test_risky_regex_rejected(self, pattern):
+        with pytest.raises(logtail.re.error):
+            logtail.LineFilter(pattern=pattern, regex=True)
+
+    @pytest.mark.parametrize("pattern", [r"(foo+)?bar", r"\(a+\)+", r"(error|warn)\w*"])
+    def test_ordinary_regex_accepted(self, pattern):
+        logtail.LineFilter(pattern=pattern, regex=True)
+
+    def test_backtracking_regex_times_out(self, tmp_path, monkeypatch, capsys):
+        # Overlapping alternation backtracks exponentially without nesting
+        monkeypatch.setattr(logtail, "LOG_DIR", str(tmp_path))
+        monkeypatch.setattr(logtail, "REGEX_SECONDS", 0.2)
+        (tmp_path / "rnsd.log").write_text(("a" * 40 + "\n") * 50)
+        start = time.monotonic()
+        logtail.main(["rnsd", "10", "-", "-", "(a|aa)*b".encode().hex(), "regex"])
+        assert time.monotonic() - start < 2
+        data = json.loads(capsys.readouterr().out)
+        assert data["lines"] == [] and data["error"] == "regular expression took too long"
+        assert logtail.signal.getitimer(logtail.signal.ITIMER_REAL) == (0.0, 0.0)
+
+
+class TestB509BackwardScan:
+    """B-509: Matches are found beyond the last N lines, within a budget."""
+
+    def test_rare_match_far_back(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logtail, "CHUNK", 256)
+        path = tmp_path / "rnsd.log"
+        noise = "".join(f"[Debug] routine {i}\n" for i in range(2000))
+        path.write_text("[Error] rare failure\n" + noise)
+        data = _follow(tmp_path, count=10, line_filter=logtail.LineFilter(pattern="rare"))
+        assert data["lines"] == ["[Error] rare failure"]
+        assert data["partial"] is False
+        assert data["scanned"] == os.stat(path).st_size
+
+    def test_continues_into_rotated_files(self, tmp_path, log):
+        (tmp_path / "rnsd.log.0").write_text("old match\nold other\n")
+        (tmp_path / "rnsd.log.1").write_text("older match\n")
+        data = _follow(tmp_path, line_filter=logtail.LineFilter(pattern="match"))
+        assert data["lines"] == ["older match", "old match"]
+        st = os.stat(log)
+        assert data["cursor"] == f"{st.st_ino}:{st.st_size}:{st.st_size}"
+
+    def test_budget_marks_partial(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(logtail, "CHUNK", 64)
+        monkeypatch.setattr(logtail, "SCAN_BUDGET", 256)
+        path = tmp_path / "rnsd.log"
+        path.write_text("needle\n" + "".join(f"hay {i:04d}\n" for i in range(200)))
+        data = _follow(tmp_path, line_filter=logtail.LineFilter(pattern="needle"))
+        assert data["lines"] == []
+        assert data["partial"] is True
+        assert data["scanned"] <= 256
@@ -0,0 +1,156 @@
+"""
+OpenMetrics Exporter Tests — B-401 through B-405
+
+Covers metrics.py and the collector's metrics file. Pidfiles, the message
+store and the metrics file are redirected to tmp_path; process stats come
+from ps(1) against the test process itself.
+
+Test IDs:
+  B-401  exposition format (TYPE/HELP, _total counters, label escaping, # EOF)
+  B-402  unreachable rnsd exposes service state without interface families
+  B-403  process RSS/CPU via a single ps call; ps CPU time parsing
+  B-404  LXMF message store size
+  B-405  collector renders the metrics file on every sample
+
+Run with: pytest tests/scripts/test_metrics.py -v
+"""
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import collector  # noqa: E402
+import metrics  # noqa: E402
+import rnsrpc  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+STATUS = {
+    "identity": "ab" * 16,
+    "uptime_seconds": 7500,
+    "collected_at": 1700000000,
+    "interfaces": [
+        {"name": "Backbone", "type": "TCPServerInterface", "status": "up",
+         "mode": "full", "tx_bytes": 1234, "rx_bytes": 5678,
+         "announce_queue": 3, "held_announces": 1},
+        {"name": 'LoRa "868"', "type": "RNodeInterface", "status": "down",
+         "mode": "boundary", "tx_bytes": 0, "rx_bytes": 0,
+         "announce_queue": 0, "held_announces": 0},
+    ],
+}
+
+PROCESSES = {
+    "rnsd": {"up": True, "rss": 52428800, "cpu": 12.5},
+    "lxmd": {"up": False, "rss": None, "cpu": None},
+}
+
+
+class TestB401Format:
+    """B-401: Output is valid OpenMetrics text."""
+
+    def test_families_and_samples(self):
+        text = metrics.render(STATUS, PROCESSES, {"bytes": 4096, "messages": 2})
+        assert text.endswith("# EOF\n")
+        assert "# TYPE reticulum_interface_transmit_bytes counter" in text
+        assert 'reticulum_interface_transmit_bytes_total{interface="Backbone"} 1234' in text
+        assert ('reticulum_interface_up{interface="Backbone",'
+                'type="TCPServerInterface",mode="full"} 1') in text
+        assert 'reticulum_interface_announce_queue{interface="Backbone"} 3' in text
+        assert 'reticulum_interface_held_announces{interface="Backbone"} 1' in text
+        assert 'reticulum_up{service="rnsd"} 1' in text
+        assert 'reticulum_up{service="lxmd"} 0' in text
+        assert "reticulum_rnsd_reachable 1" in text
+        assert "reticulum_transport_uptime_seconds 7500" in text
+        assert "reticulum_lxmf_message_store_bytes 4096" in text
+        assert "reticulum_lxmf_message_store_messages 2" in text
+
+    def test_label_values_are_escaped(self):
+        text = metrics.render(STATUS, PROCESSES)
+        assert 'interface="LoRa \\"868\\""' in text
+
+    def test_stopped_process_has_no_resource_samples(self):
+        text = metrics.render(STATUS, PROCESSES)
+        assert 'reticulum_process_resident_memory_bytes{service="rnsd"} 52428800' in text
+        assert 'reticulum_process_cpu_seconds_total{service="rnsd"} 12.5' in text
+        assert 'reticulum_process_resident_memory_bytes{service="lxmd"}' not in text
+        assert 'reticulum_process_cpu_seconds_total{service="lxmd"}' not in text
+
+    def test_each_family_declared_once(self):
+        text = metrics.render(STATUS, PROCESSES)
+        types = [line.split()[2] for line in text.splitlines() if line.startswith("# TYPE")]
+        assert len(types) == len(set(types))
+
+
+class TestB402Unreachable:
+    """B-402: With rnsd down only service-level families are exposed."""
+
+    def test_no_interface_families(self):
+        stopped = {name: {"up": False, "rss": None, "cpu": None} for name in PROCESSES}
+        text = metrics.render(rnsrpc.unreachable(), stopped)
+        assert "reticulum_rnsd_reachable 0" in text
+        assert "reticulum_interface_" not in text
+        assert "reticulum_lxmf_message_store" not in text
+        assert text.endswith("# EOF\n")
+
+
+class TestB403Processes:
+    """B-403: Process stats come from one ps call against the pidfiles."""
+
+    def test_live_pid(self, tmp_path):
+        pidfile = tmp_path / "rnsd.pid"
+        pidfile.write_text(str(os.getpid()))
+        stats = metrics.process_stats({
+            "rnsd": str(pidfile),
+            "lxmd": str(tmp_path / "absent.pid"),
+        })
+        assert stats["rnsd"]["up"] is True
+        assert stats["rnsd"]["rss"] > 0
+        assert stats["rnsd"]["cpu"] >= 0
+        assert stats["lxmd"] == {"up": False, "rss": None, "cpu": None}
+
+    @pytest.mark.parametrize("text,expected", [
+        ("0:01.50", 1.5),
+        ("12:03.00", 723.0),
+        ("01:02:03", 3723.0),
+        ("2-00:00:10", 172810.0),
+    ])
+    def test_parse_cputime(self, text, expected):
+        assert metrics.parse_cputime(text) == expected
+
+
+class TestB404MessageStore:
+    """B-404: Message store size counts files in the lxmd store."""
+
+    def test_store_usage(self, tmp_path):
+        store = tmp_path / "storage" / "lxmf" / "messagestore"
+        store.mkdir(parents=True)
+        (store / "a").write_bytes(b"x" * 100)
+        (store / "b").write_bytes(b"x" * 28)
+        path = metrics.message_store_path(str(tmp_path))
+        assert path == str(store)
+        assert metrics.message_store_usage(path) == {"bytes": 128, "messages": 2}
+
+    def test_missing_store(self, tmp_path):
+        assert metrics.message_store_usage(str(tmp_path / "absent")) is None
+
+
+class TestB405Collector:
+    """B-405: The collector keeps the metrics file next to the snapshot."""
+
+    def test_tick_writes_metrics(self, tmp_path):
+        snapshot = tmp_path / "status.json"
+        prom = tmp_path / "metrics.prom"
+        c = collector.Collector(str(tmp_path), str(snapshot), 5, quiet=True,
+                                metrics_path=str(prom), lxmf_config=str(tmp_path))
+        c.tick()
+        assert snapshot.exists()
+        text = prom.read_text()
+        assert "reticulum_rnsd_reachable 0" in text
+        assert text.endswith("# EOF\n")
+        assert oct(prom.stat().st_mode & 0o777) == "0o644"
@@ -0,0 +1,290 @@
+"""
+Process Watcher Tests — B-1501 through B-1506
+
+Covers procwatch.py, which keeps the compact daemon status file behind the
+service status endpoints: pidfile scans, exits reported by kqueue (with
+their wait status) or noticed by a rescan, the atomic status file and its
+heartbeat, supervised daemons in restart backoff, and the watcher loop
+against a real child process. The kqueue
+path only runs where select.kqueue exists (FreeBSD); elsewhere the loop
+falls back to rescanning the pidfiles.
+
+Test IDs:
+  B-1501  pidfile scan: running/stopped, pid and start time, no-op rescans
+  B-1502  exit noticed by a rescan (no kqueue): last_exit with unknown code
+  B-1503  NOTE_EXIT wait status: exit code, negative signal, foreign pids ignored
+  B-1504  status file written atomically (0644); heartbeat only touches it
+  B-1505  watcher loop follows a daemon start and exit, removes the file on stop
+  B-1506  supervised daemon: backoff/crashloop not running, child pid, stale state ignored
+
+Run with: pytest tests/scripts/test_procwatch.py -v
+"""
+import json
+import os
+import select
+import signal
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import procwatch  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    """ProcWatch over rnsd/lxmd pidfiles in tmp_path; .pid(name, pid) writes one."""
+    pidfiles = {"rnsd": str(tmp_path / "rnsd.pid"), "lxmd": str(tmp_path / "lxmd.pid")}
+    (tmp_path / "supervise").mkdir()
+    w = procwatch.ProcWatch(str(tmp_path / "procs.json"), pidfiles, quiet=True,
+                            supervise_dir=str(tmp_path / "supervise"))
+
+    def pid(name, value):
+        with open(pidfiles[name], "w", encoding="ascii") as fh:
+            fh.write(f"{value}\n")
+    w.pid = pid
+    return w
+
+
+class TestB1501Scan:
+    """B-1501: The scan reflects the pidfiles and reports changes only."""
+
+    def test_running_and_stopped(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        watcher.pid("lxmd", _dead_pid())
+        assert watcher.scan() is True
+        rnsd = watcher.services["rnsd"]
+        assert rnsd["state"] == "running"
+        assert rnsd["pid"] == os.getpid()
+        assert rnsd["started"] == int(os.stat(tmp_path / "rnsd.pid").st_mtime)
+        assert watcher.services["lxmd"] == {"state": "stopped", "pid": None, "started": None,
+                                            "last_exit": None}
+
+    def test_rescan_without_change(self, watcher):
+        watcher.pid("rnsd", os.getpid())
+        watcher.scan()
+        assert watcher.scan() is False
+
+    def test_garbage_pidfile_is_stopped(self, watcher, tmp_path):
+        (tmp_path / "rnsd.pid").write_text("not a pid\n")
+        assert watcher.scan() is False
+        assert watcher.services["rnsd"]["state"] == "stopped"
+
+    def test_default_pidfiles_cover_every_instance(self):
+        assert set(procwatch.PIDFILES) == {"rnsd", "rnsd-1", "rnsd-2", "rnsd-3", "lxmd"}
+        assert procwatch.PIDFILES["rnsd-2"] == "/var/run/rnsd-2.pid"
+
+
+class TestB1502RescanExit:
+    """B-1502: Without a NOTE_EXIT an exit is still noticed, with an unknown code."""
+
+    def test_exit_noticed(self, watcher):
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        watcher.pid("rnsd", proc.pid)
+        watcher.scan()
+        proc.kill()
+        proc.wait()
+        assert watcher.scan(now=1000) is True
+        assert watcher.services["rnsd"]["state"] == "stopped"
+        assert watcher.services["rnsd"]["last_exit"] == {"code": None, "at": 1000}
+
+    def test_restart_with_new_pid(self, watcher):
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            watcher.pid("rnsd", proc.pid)
+            watcher.scan()
+            watcher.pid("rnsd", os.getpid())
+            assert watcher.scan(now=1000) is True
+            assert watcher.services["rnsd"]["pid"] == os.getpid()
+            assert watcher.services["rnsd"]["last_exit"]["at"] == 1000
+        finally:
+            proc.kill()
+            proc.wait()
+
+
+class TestB1503NoteExit:
+    """B-1503: A NOTE_EXIT records the daemon's exit code from its wait status."""
+
+    def test_exit_code(self, watcher):
+        watcher.pid("lxmd", os.getpid())
+        watcher.scan()
+        assert watcher.exited(os.getpid(), 3 << 8, now=500) is True
+        assert watcher.services["lxmd"]["state"] == "stopped"
+        assert watcher.services["lxmd"]["last_exit"] == {"code": 3, "at": 500}
+        assert watcher.services["lxmd"]["pid"] is None
+
+    def test_signal_is_negative(self, watcher):
+        watcher.pid("rnsd", os.getpid())
+        watcher.scan()
+        watcher.exited(os.getpid(), signal.SIGKILL)
+        assert watcher.services["rnsd"]["last_exit"]["code"] == -signal.SIGKILL
+
+    def test_foreign_pid_ignored(self, watcher):
+        watcher.pid("rnsd", os.getpid())
+        watcher.scan()
+        assert watcher.exited(_dead_pid(), 0) is False
+        assert watcher.services["rnsd"]["state"] == "running"
+
+
+class TestB1504StatusFile:
+    """B-1504: The status file is replaced atomically and kept fresh by a heartbeat."""
+
+    def test_write(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        watcher.scan()
+        watcher.write()
+        path = tmp_path / "procs.json"
+        data = json.loads(path.read_text())
+        assert data["rnsd"]["state"] == "running"
+        assert data["lxmd"]["state"] == "stopped"
+        assert isinstance(data["updated_at"], int)
+        assert oct(path.stat().st_mode & 0o777) == oct(0o644)
+        assert [p.name for p in tmp_path.iterdir() if p.name.startswith(".procs.")] == []
+
+    def test_state_comes_first(self, watcher, tmp_path):
+        # rnsd_status.sh/lxmd_status.sh match '"<name>":{"state":"...'
+        watcher.write()
+        text = (tmp_path / "procs.json").read_text()
+        assert '"rnsd":{"state":"stopped"' in text
+        assert '"lxmd":{"state":"stopped"' in text
+
+    def test_heartbeat_touches_only(self, watcher, tmp_path):
+        watcher.write()
+        path = tmp_path / "procs.json"
+        os.utime(path, (1000, 1000))
+        inode = path.stat().st_ino
+        watcher.heartbeat()
+        assert path.stat().st_mtime > 1000
+        assert path.stat().st_ino == inode
+
+    def test_heartbeat_recreates_missing_file(self, watcher, tmp_path):
+        watcher.heartbeat()
+        assert json.loads((tmp_path / "procs.json").read_text())["rnsd"]["state"] == "stopped"
+
+
+class TestB1505Loop:
+    """B-1505: The running watcher follows a daemon's start and exit."""
+
+    @staticmethod
+    def _wait_for(path, predicate, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                data = json.loads(path.read_text())
+                if predicate(data):
+                    return data
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.05)
+        pytest.fail(f"status file never matched: {path.read_text() if path.exists() else None}")
+
+    @pytest.fixture
+    def running(self, watcher, monkeypatch):
+        monkeypatch.setattr(procwatch, "RESCAN", 0.1)
+        # signal.signal only works in the main thread
+        monkeypatch.setattr(procwatch.signal, "signal", lambda *_args: None)
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        yield watcher
+        watcher.stop()
+        thread.join(5)
+
+    def test_start_and_exit(self, running, tmp_path):
+        path = tmp_path / "procs.json"
+        self._wait_for(path, lambda d: d["rnsd"]["state"] == "stopped")
+        proc = subprocess.Popen([sys.executable, "-c", "import sys, time; time.sleep(0.5); sys.exit(7)"])
+        running.pid("rnsd", proc.pid)
+        self._wait_for(path, lambda d: d["rnsd"]["state"] == "running" and d["rnsd"]["pid"] == proc.pid)
+        proc.wait()
+        data = self._wait_for(path, lambda d: d["rnsd"]["state"] == "stopped")
+        if hasattr(select, "kqueue"):
+            # NOTE_EXIT carries the wait status
+            assert data["rnsd"]["last_exit"]["code"] == 7
+        else:
+            assert data["rnsd"]["last_exit"]["code"] is None
+
+    def test_removed_on_stop(self, watcher, tmp_path, monkeypatch):
+        monkeypatch.setattr(procwatch, "RESCAN", 0.1)
+        monkeypatch.setattr(procwatch.signal, "signal", lambda *_args: None)
+        thread = threading.Thread(target=watcher.run)
+        thread.start()
+        self._wait_for(tmp_path / "procs.json", lambda d: "rnsd" in d)
+        watcher.stop()
+        thread.join(5)
+        assert not (tmp_path / "procs.json").exists()
+
+
+class TestB1506Supervised:
+    """B-1506: A live supervisor does not make a crash-looping daemon "running"."""
+
+    @staticmethod
+    def _state(tmp_path, **state):
+        state.setdefault("updated_at", int(time.time()) + 1)
+        (tmp_path / "supervise" / "rnsd.json").write_text(json.dumps(state))
+
+    def test_backoff_is_not_running(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        self._state(tmp_path, state="backoff", pid=None, last_exit_code=1, last_crash=1700000000)
+        assert watcher.scan() is True
+        assert watcher.services["rnsd"] == {"state": "backoff", "pid": None, "started": None,
+                                            "last_exit": {"code": 1, "at": 1700000000}}
+        watcher.write()
+        assert '"rnsd":{"state":"backoff"' in (tmp_path / "procs.json").read_text()
+
+    def test_crashloop(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        self._state(tmp_path, state="crashloop", pid=None, last_exit_code=-9, last_crash=1700000000)
+        watcher.scan()
+        assert watcher.services["rnsd"]["state"] == "crashloop"
+        assert watcher.services["rnsd"]["last_exit"]["code"] == -9
+
+    def test_running_reports_child(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        self._state(tmp_path, state="running", pid=4242, started_at=1700000100)
+        watcher.scan()
+        assert watcher.services["rnsd"]["state"] == "running"
+        assert watcher.services["rnsd"]["pid"] == 4242
+        assert watcher.services["rnsd"]["started"] == 1700000100
+        # NOTE_EXIT is registered on the supervisor named by the pidfile
+        assert watcher.exited(os.getpid(), 0) is True
+        assert watcher.services["rnsd"]["state"] == "stopped"
+
+    def test_restart_after_backoff(self, watcher, tmp_path):
+        watcher.pid("rnsd", os.getpid())
+        self._state(tmp_path, state="backoff", pid=None, last_exit_code=1, last_crash=1700000000)
+        watcher.scan()
+        self._state(tmp_path, state="running", pid=4242, started_at=1700000002,
+                    last_exit_code=1, last_crash=1700000000)
+        assert watcher.scan() is True
+        assert watcher.services["rnsd"]["state"] == "running"
+        assert watcher.services["rnsd"]["last_exit"] == {"code": 1, "at": 1700000000}
+
+    def test_stale_state_ignored(self, watcher, tmp_path):
+        # Left over from an earlier supervised run, older than the pidfile
+        watcher.pid("rnsd", os.getpid())
+        self._state(tmp_path, state="crashloop", pid=None, updated_at=1000)
+        watcher.scan()
+        assert watcher.services["rnsd"]["state"] == "running"
+        assert watcher.services["rnsd"]["pid"] == os.getpid()
+
+    def test_dead_supervisor_is_stopped(self, watcher, tmp_path):
+        watcher.pid("rnsd", _dead_pid())
+        self._state(tmp_path, state="backoff", pid=None)
+        watcher.scan()
+        assert watcher.services["rnsd"]["state"] == "stopped"
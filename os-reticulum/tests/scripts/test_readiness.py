@@ -0,0 +1,254 @@
+"""
+Readiness Probe Tests — B-701 through B-707
+
+Covers readiness.py, which the rc.d scripts run after daemon(8)
+instead of a fixed sleep. Listening sockets on ephemeral ports stand in for
+rnsd; the test process (or a short-lived child) stands in for the daemon.
+
+Test IDs:
+  B-701  shared instance / control ports read from the rnsd config
+  B-702  rnsd is ready once the shared port accepts and the control port answers RPC
+  B-703  an exited daemon fails fast instead of waiting for the deadline
+  B-704  deadline passes while the daemon runs but never becomes ready
+  B-705  lxmd is ready once its process tree holds a shared-instance connection
+  B-706  share_instance disabled: ready after a short liveness grace period
+  B-707  procwatch/collector: ready once the status file is written after the start
+
+Run with: pytest tests/scripts/test_readiness.py -v
+"""
+import multiprocessing.connection
+import os
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import readiness  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+def _listener():
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(8)
+    return sock
+
+
+def _free_port():
+    sock = _listener()
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+
+AUTHKEY = bytes.fromhex("00112233445566778899aabbccddeeff")
+
+
+def _config(tmp_path, shared, control, share="Yes"):
+    (tmp_path / "config").write_text(
+        "[reticulum]\n"
+        f"  share_instance = {share}\n"
+        f"  shared_instance_port = {shared}\n"
+        f"  instance_control_port = {control}\n"
+        f"  rpc_key = {AUTHKEY.hex()}\n"
+        "\n[interfaces]\n"
+    )
+
+
+@pytest.fixture
+def rpc_listener():
+    """rnsd-style RPC listener; yields (port, calls) with the requests it answered."""
+    listener = multiprocessing.connection.Listener(("127.0.0.1", 0), authkey=AUTHKEY)
+    calls = []
+
+    def serve():
+        while True:
+            try:
+                conn = listener.accept()
+            except (OSError, multiprocessing.AuthenticationError):
+                return
+            with conn:
+                calls.append(conn.recv())
+                conn.send({"interfaces": []})
+
+    threading.Thread(target=serve, daemon=True).start()
+    yield listener.address[1], calls
+    listener.close()
+
+
+def _pidfile(tmp_path, pid):
+    path = tmp_path / "daemon.pid"
+    path.write_text(f"{pid}\n")
+    return str(path)
+
+
+class TestB701Ports:
+    """B-701: Probe targets follow the rendered rnsd config."""
+
+    def test_configured_ports(self, tmp_path):
+        _config(tmp_path, 40001, 40002)
+        assert readiness.instance_ports(str(tmp_path)) == (40001, 40002)
+
+    def test_defaults(self, tmp_path):
+        (tmp_path / "config").write_text("[reticulum]\n  share_instance = Yes\n")
+        assert readiness.instance_ports(str(tmp_path)) == (37428, 37429)
+
+    def test_not_shared(self, tmp_path):
+        _config(tmp_path, 40001, 40002, share="No")
+        assert readiness.instance_ports(str(tmp_path)) is None
+
+
+class TestB702RnsdReady:
+    """B-702: rnsd counts as ready when the shared port accepts and RPC answers."""
+
+    def test_ready_when_listening(self, tmp_path, rpc_listener):
+        control, calls = rpc_listener
+        shared = _listener()
+        try:
+            _config(tmp_path, shared.getsockname()[1], control)
+            state, elapsed, pid = readiness.wait_ready(
+                "rnsd", _pidfile(tmp_path, os.getpid()), str(tmp_path), timeout=5)
+        finally:
+            shared.close()
+        assert state == readiness.READY
+        assert pid == os.getpid()
+        assert elapsed < 1
+        # A complete, authenticated query; no bare connect for rnsd to log
+        assert calls == [{"get": "interface_stats"}]
+
+    def test_bare_listener_is_not_ready(self, tmp_path):
+        # Accepting on the control port is not enough: the RPC must answer
+        shared, control = _listener(), _listener()
+        try:
+            _config(tmp_path, shared.getsockname()[1], control.getsockname()[1])
+            state, _, _ = readiness.wait_ready(
+                "rnsd", _pidfile(tmp_path, os.getpid()), str(tmp_path), timeout=0.3)
+        finally:
+            shared.close()
+            control.close()
+        assert state == readiness.TIMEOUT
+
+    def test_control_port_required(self, tmp_path):
+        shared = _listener()
+        try:
+            _config(tmp_path, shared.getsockname()[1], _free_port())
+            state, _, _ = readiness.wait_ready(
+                "rnsd", _pidfile(tmp_path, os.getpid()), str(tmp_path), timeout=0.3)
+        finally:
+            shared.close()
+        assert state == readiness.TIMEOUT
+
+
+class TestB703Exited:
+    """B-703: A daemon that dies is reported without waiting for the deadline."""
+
+    def test_dead_pid(self, tmp_path):
+        child = subprocess.Popen(["true"])
+        child.wait()
+        _config(tmp_path, _free_port(), _free_port())
+        state, elapsed, _ = readiness.wait_ready(
+            "rnsd", _pidfile(tmp_path, child.pid), str(tmp_path), timeout=10)
+        assert state == readiness.EXITED
+        assert elapsed < 1
+
+    def test_cli_exit_code(self, tmp_path, capsys):
+        child = subprocess.Popen(["true"])
+        child.wait()
+        _config(tmp_path, _free_port(), _free_port())
+        code = readiness.main(["rnsd", "--pidfile", _pidfile(tmp_path, child.pid),
+                               "--config", str(tmp_path), "--timeout", "5"])
+        assert code == readiness.EXITED
+        assert "rnsd exited after" in capsys.readouterr().out
+
+
+class TestB704Deadline:
+    """B-704: The deadline bounds the wait for a live but unready daemon."""
+
+    def test_timeout(self, tmp_path, capsys):
+        _config(tmp_path, _free_port(), _free_port())
+        code = readiness.main(["rnsd", "--pidfile", _pidfile(tmp_path, os.getpid()),
+                               "--config", str(tmp_path), "--timeout", "0.3"])
+        assert code == readiness.TIMEOUT
+        assert "not ready after" in capsys.readouterr().out
+
+
+class TestB705Lxmd:
+    """B-705: lxmd readiness looks for its connection to the shared instance."""
+
+    def test_process_tree_includes_children(self):
+        child = subprocess.Popen(["sleep", "5"])
+        try:
+            assert {os.getpid(), child.pid} <= readiness.process_tree(os.getpid())
+        finally:
+            child.kill()
+            child.wait()
+
+    def test_ready_once_attached(self, tmp_path, monkeypatch):
+        _config(tmp_path, 40001, 40002)
+        attached = iter([set(), {99999}, {os.getpid()}])
+        monkeypatch.setattr(readiness, "connected_pids", lambda port: next(attached))
+        monkeypatch.setattr(readiness, "POLL_INTERVAL", 0.01)
+        state, _, _ = readiness.wait_ready(
+            "lxmd", _pidfile(tmp_path, os.getpid()), str(tmp_path), timeout=5)
+        assert state == readiness.READY
+
+
+class TestB706Standalone:
+    """B-706: Without a shared instance, liveness after a grace period suffices."""
+
+    def test_grace_period(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(readiness, "STANDALONE_GRACE", 0.2)
+        _config(tmp_path, 40001, 40002, share="No")
+        code = readiness.main(["rnsd", "--pidfile", _pidfile(tmp_path, os.getpid()),
+                               "--config", str(tmp_path)])
+        assert code == readiness.READY
+        assert "rnsd ready in" in capsys.readouterr().out
+
+
+class TestB707StatusFile:
+    """B-707: The process watcher and collector are ready once they have written their status file."""
+
+    def test_ready_on_fresh_write(self, tmp_path):
+        status = tmp_path / "procs.json"
+        threading.Timer(0.2, status.write_text, args=("{}",)).start()
+        state, elapsed, _ = readiness.wait_ready(
+            "procwatch", _pidfile(tmp_path, os.getpid()), timeout=5, status_file=str(status))
+        assert state == readiness.READY
+        assert 0.1 < elapsed < 2
+
+    def test_stale_file_is_not_ready(self, tmp_path):
+        status = tmp_path / "procs.json"
+        status.write_text("{}")
+        os.utime(status, (1000, 1000))
+        code = readiness.main(["procwatch", "--pidfile", _pidfile(tmp_path, os.getpid()),
+                               "--status-file", str(status), "--timeout", "0.3"])
+        assert code == readiness.TIMEOUT
+
+    def test_collector_snapshot(self, tmp_path, capsys):
+        snapshot = tmp_path / "status.json"
+        threading.Timer(0.2, snapshot.write_text, args=("{}",)).start()
+        code = readiness.main(["collector", "--pidfile", _pidfile(tmp_path, os.getpid()),
+                               "--status-file", str(snapshot), "--timeout", "5"])
+        assert code == readiness.READY
+        assert "collector ready in" in capsys.readouterr().out
+
+    def test_collector_requires_status_file(self, tmp_path):
+        with pytest.raises(SystemExit):
+            readiness.main(["collector", "--pidfile", _pidfile(tmp_path, os.getpid())])
+
+    def test_exited_watcher(self, tmp_path):
+        child = subprocess.Popen(["true"])
+        child.wait()
+        state, _, _ = readiness.wait_ready(
+            "procwatch", _pidfile(tmp_path, child.pid), timeout=5,
+            status_file=str(tmp_path / "procs.json"))
+        assert state == readiness.EXITED
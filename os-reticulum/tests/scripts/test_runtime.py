@@ -0,0 +1,184 @@
+"""
+Runtime Aggregation Tests — B-201 through B-205
+
+Covers runtime.py, the single-pass backend behind service/dashboard. Pidfiles,
+the process watcher's status file, the version record and the collector
+snapshot are redirected to tmp_path so no OPNsense host is needed.
+
+Test IDs:
+  B-201  service status from the process watcher, pidfile fallback
+  B-202  .pkg-versions parsing
+  B-203  snapshot freshness (fresh snapshot served, stale one bypassed)
+  B-204  dashboard payload shape
+  B-205  runtime info (versions, identity, uptime) from one status query
+
+Run with: pytest tests/scripts/test_runtime.py -v
+"""
+import json
+import os
+import sys
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import runtime  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def pidfiles(tmp_path, monkeypatch):
+    paths = {
+        "rnsd": str(tmp_path / "rnsd.pid"),
+        "lxmd": str(tmp_path / "lxmd.pid"),
+    }
+    monkeypatch.setattr(runtime, "PIDFILES", paths)
+    monkeypatch.setattr(runtime, "PROCS", str(tmp_path / "procs.json"))
+    return paths
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = tmp_path / "status.json"
+    path.write_text(json.dumps({
+        "identity": "ab" * 16,
+        "uptime": "2h 5m",
+        "interfaces": [{"name": "A"}],
+    }))
+    return path
+
+
+class TestB201ServiceStatus:
+    """B-201: The watcher's state is used while fresh; otherwise a live pidfile means running."""
+
+    def test_live_pid_is_running(self, pidfiles):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write(f"{os.getpid()}\n")
+        assert runtime.service_status("rnsd") == "running"
+
+    def test_missing_pidfile_is_stopped(self, pidfiles):
+        assert runtime.service_status("lxmd") == "stopped"
+
+    def test_garbage_pidfile_is_stopped(self, pidfiles):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write("not-a-pid")
+        assert runtime.service_status("rnsd") == "stopped"
+
+    def test_watcher_state_wins(self, tmp_path, pidfiles):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write(f"{os.getpid()}\n")
+        (tmp_path / "procs.json").write_text(json.dumps({
+            "rnsd": {"state": "backoff", "pid": None},
+            "lxmd": {"state": "running", "pid": 4242},
+            "rnsd-1": {"state": "running", "pid": 4243},
+        }))
+        assert runtime.service_status("rnsd") == "stopped"
+        assert runtime.service_status("lxmd") == "running"
+        assert runtime.service_status("rnsd-1", pidfile=str(tmp_path / "none.pid")) == "running"
+
+    def test_stale_watcher_falls_back_to_pidfile(self, tmp_path, pidfiles):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write(f"{os.getpid()}\n")
+        path = tmp_path / "procs.json"
+        path.write_text(json.dumps({"rnsd": {"state": "stopped"}}))
+        old = time.time() - runtime.PROCS_MAX_AGE - 5
+        os.utime(path, (old, old))
+        assert runtime.process_states() == {}
+        assert runtime.service_status("rnsd") == "running"
+
+
+class TestB202Versions:
+    """B-202: .pkg-versions is parsed into rns/lxmf versions."""
+
+    def test_reads_both_versions(self, tmp_path):
+        path = tmp_path / ".pkg-versions"
+        path.write_text("rns=0.9.2\nlxmf=0.6.0\n")
+        assert runtime.read_versions(str(path)) == {"rns": "0.9.2", "lxmf": "0.6.0"}
+
+    def test_missing_file_is_unknown(self, tmp_path):
+        assert runtime.read_versions(str(tmp_path / "absent")) == {
+            "rns": "unknown", "lxmf": "unknown",
+        }
+
+
+class TestB203SnapshotFreshness:
+    """B-203: Only a fresh collector snapshot is served."""
+
+    def test_fresh_snapshot_is_used(self, tmp_path, snapshot):
+        data = runtime.load_status(str(tmp_path), str(snapshot), max_age=30)
+        assert data["interfaces"] == [{"name": "A"}]
+
+    def test_stale_snapshot_falls_back_to_query(self, tmp_path, snapshot):
+        old = time.time() - 120
+        os.utime(snapshot, (old, old))
+        # No config / identity in tmp_path: the fallback query fails cleanly.
+        data = runtime.load_status(str(tmp_path), str(snapshot), max_age=30)
+        assert data["error"] == "rnsd not reachable"
+
+
+class TestB204Dashboard:
+    """B-204: The dashboard payload carries every widget section."""
+
+    def test_stopped_rnsd_skips_query(self, tmp_path, pidfiles, monkeypatch):
+        monkeypatch.setattr(runtime, "PKG_VERSIONS", str(tmp_path / "absent"))
+
+        def fail(*_args, **_kwargs):
+            raise AssertionError("status must not be queried while rnsd is stopped")
+
+        monkeypatch.setattr(runtime, "load_status", fail)
+        monkeypatch.setattr(runtime, "RRD_DIR", str(tmp_path / "rrd"))
+        monkeypatch.setattr(runtime, "SUPERVISE_DIR", str(tmp_path / "supervise"))
+        data = runtime.dashboard(str(tmp_path))
+        assert data["rnsd"] == {"status": "stopped", "supervisor": {}}
+        assert data["lxmd"] == {"status": "stopped", "supervisor": {}}
+        assert data["info"]["rns_version"] == "unknown"
+        assert data["rnstatus"]["error"] == "rnsd not reachable"
+        assert data["traffic"] == {}
+
+    def test_running_rnsd_uses_snapshot(self, tmp_path, pidfiles, snapshot, monkeypatch):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write(str(os.getpid()))
+        monkeypatch.setattr(runtime, "SNAPSHOT", str(snapshot))
+        monkeypatch.setattr(runtime, "PKG_VERSIONS", str(tmp_path / "absent"))
+        data = runtime.dashboard(str(tmp_path))
+        assert data["rnsd"]["status"] == "running"
+        assert data["info"]["node_identity"] == "ab" * 16
+        assert data["rnstatus"]["interfaces"] == [{"name": "A"}]
+
+
+class TestB205Info:
+    """B-205: info answers versions, identity and uptime from one query."""
+
+    def test_info_from_single_status_load(self, tmp_path, pidfiles, snapshot, monkeypatch):
+        with open(pidfiles["rnsd"], "w") as fh:
+            fh.write(str(os.getpid()))
+        versions = tmp_path / ".pkg-versions"
+        versions.write_text("rns=0.9.2\nlxmf=0.6.0\n")
+        monkeypatch.setattr(runtime, "PKG_VERSIONS", str(versions))
+        calls = []
+        real_load = runtime.load_status
+
+        def counting_load(*args, **kwargs):
+            calls.append(args)
+            return real_load(*args, snapshot=str(snapshot))
+
+        monkeypatch.setattr(runtime, "load_status", counting_load)
+        assert runtime.info(str(tmp_path)) == {
+            "rns_version": "0.9.2",
+            "lxmf_version": "0.6.0",
+            "node_identity": "ab" * 16,
+            "uptime": "2h 5m",
+        }
+        assert len(calls) == 1
+
+    def test_info_with_rnsd_stopped(self, tmp_path, pidfiles, monkeypatch):
+        monkeypatch.setattr(runtime, "PKG_VERSIONS", str(tmp_path / "absent"))
+        data = runtime.info(str(tmp_path))
+        assert data["node_identity"] == ""
+        assert data["uptime"] == ""
@@ -0,0 +1,232 @@
+"""
+Graceful Stop Tests — B-801 through B-807
+
+Covers stopwait.py, which the rnsd/lxmd/collector rc.d scripts use to stop a daemon
+and make sure it (and its listen sockets) are gone before a restart.
+Child processes of the test stand in for the daemons; each is reaped by a
+background thread so an exited child does not linger as a zombie.
+
+Test IDs:
+  B-801  listen ports read from the rendered rnsd config
+  B-802  port probe: bound sockets are busy, closed ones free
+  B-803  SIGTERM stop of the whole daemon(8) process tree
+  B-804  escalation to SIGKILL after the stop timeout
+  B-805  stop duration is printed and recorded; not-running is not an error
+  B-806  ports-free waits for a lingering listener, fails after the deadline
+  B-807  rc.d stop drops the pidfile of an exited daemon even when stopwait fails
+
+Run with: pytest tests/scripts/test_stopwait.py -v
+"""
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import stopwait  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+RC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "src", "etc", "rc.d"))
+
+
+def _spawn(args, tmp_path):
+    """Start a stand-in daemon, reap it in the background, write its pidfile."""
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE, text=True)
+    threading.Thread(target=proc.wait, daemon=True).start()
+    pidfile = tmp_path / "daemon.pid"
+    pidfile.write_text(f"{proc.pid}\n")
+    return proc, str(pidfile)
+
+
+def _listener(kind=socket.SOCK_STREAM):
+    sock = socket.socket(socket.AF_INET, kind)
+    sock.bind(("127.0.0.1", 0))
+    if kind == socket.SOCK_STREAM:
+        sock.listen(1)
+    return sock
+
+
+def _config(tmp_path, body=""):
+    (tmp_path / "config").write_text(
+        "[reticulum]\n  share_instance = No\n\n[interfaces]\n" + body)
+
+
+class TestB801Ports:
+    """B-801: Ports come from the shared instance and listening interfaces."""
+
+    def test_listen_ports(self, tmp_path):
+        (tmp_path / "config").write_text(
+            "[reticulum]\n"
+            "  share_instance = Yes\n"
+            "  shared_instance_port = 40001\n"
+            "  instance_control_port = 40002\n"
+            "\n[interfaces]\n"
+            "  [[Backbone]]\n"
+            "    type = TCPServerInterface\n"
+            "    listen_ip = 192.0.2.1\n"
+            "    listen_port = 4242\n"
+            "  [[Mesh UDP]]\n"
+            "    type = UDPInterface\n"
+            "    listen_ip = 0.0.0.0\n"
+            "    listen_port = 4243\n"
+            "  [[Upstream]]\n"
+            "    type = TCPClientInterface\n"
+            "    target_port = 4244\n"
+        )
+        assert stopwait.listen_ports(str(tmp_path)) == [
+            ("127.0.0.1", 40001, socket.SOCK_STREAM),
+            ("127.0.0.1", 40002, socket.SOCK_STREAM),
+            ("192.0.2.1", 4242, socket.SOCK_STREAM),
+            ("0.0.0.0", 4243, socket.SOCK_DGRAM),
+        ]
+
+    def test_missing_config(self, tmp_path):
+        assert stopwait.listen_ports(str(tmp_path / "absent")) == [
+            ("127.0.0.1", 37428, socket.SOCK_STREAM),
+            ("127.0.0.1", 37429, socket.SOCK_STREAM),
+        ]
+
+
+class TestB802PortProbe:
+    """B-802: A port is busy only while something is bound to it."""
+
+    @pytest.mark.parametrize("kind", [socket.SOCK_STREAM, socket.SOCK_DGRAM])
+    def test_bound_then_closed(self, kind):
+        sock = _listener(kind)
+        port = sock.getsockname()[1]
+        assert stopwait.port_in_use("127.0.0.1", port, kind) is True
+        sock.close()
+        assert stopwait.port_in_use("127.0.0.1", port, kind) is False
+
+    def test_unavailable_address_is_not_busy(self):
+        assert stopwait.port_in_use("192.0.2.1", 4242) is False
+
+
+class TestB803Terminate:
+    """B-803: SIGTERM reaches every process of the tree."""
+
+    def test_sigterm(self, tmp_path):
+        proc, pidfile = _spawn(["sleep", "30"], tmp_path)
+        seconds, used, alive = stopwait.stop(pidfile, timeout=5)
+        assert (used, alive) == ("SIGTERM", set())
+        assert seconds < 2
+        assert proc.wait(timeout=2) is not None
+
+    def test_wrapper_and_child(self, tmp_path):
+        # Like daemon(8)'s `sh -c "rnsd ... >> log"` when sh does not exec
+        proc, pidfile = _spawn(["sh", "-c", "echo started; sleep 30; true"], tmp_path)
+        proc.stdout.readline()
+        tree = stopwait.readiness.process_tree(proc.pid)
+        assert len(tree) == 2
+        _, used, alive = stopwait.stop(pidfile, timeout=5)
+        assert (used, alive) == ("SIGTERM", set())
+        assert not any(stopwait.readiness.pid_alive(pid) for pid in tree - {proc.pid})
+
+
+class TestB804Escalation:
+    """B-804: A daemon ignoring SIGTERM is killed after the timeout."""
+
+    def test_sigkill(self, tmp_path):
+        proc, pidfile = _spawn([sys.executable, "-c",
+                                "import signal, time\n"
+                                "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+                                "print('ready', flush=True)\n"
+                                "time.sleep(30)\n"], tmp_path)
+        proc.stdout.readline()
+        seconds, used, alive = stopwait.stop(pidfile, timeout=0.3)
+        assert (used, alive) == ("SIGKILL", set())
+        assert 0.3 <= seconds < 3
+
+
+class TestB805Record:
+    """B-805: The CLI reports and records how long the stop took."""
+
+    def test_records_duration(self, tmp_path, monkeypatch, capsys):
+        monkeypatch.setattr(stopwait, "STATE_DIR", str(tmp_path / "run"))
+        _config(tmp_path)
+        _, pidfile = _spawn(["sleep", "30"], tmp_path)
+        code = stopwait.main(["stop", "rnsd", "--pidfile", pidfile,
+                              "--config", str(tmp_path)])
+        assert code == 0
+        assert "rnsd stopped in" in capsys.readouterr().out
+        state = json.loads((tmp_path / "run" / "rnsd.stop.json").read_text())
+        assert state["signal"] == "SIGTERM"
+        assert 0 <= state["seconds"] < 2
+
+    def test_not_running(self, tmp_path, capsys):
+        code = stopwait.main(["stop", "lxmd", "--pidfile", str(tmp_path / "absent.pid")])
+        assert code == 0
+        assert "lxmd was not running" in capsys.readouterr().out
+
+
+class TestB806PortsFree:
+    """B-806: start does not proceed while a listen port is still held."""
+
+    def test_waits_for_release(self, tmp_path):
+        sock = _listener()
+        port = sock.getsockname()[1]
+        threading.Timer(0.3, sock.close).start()
+        ports = [("127.0.0.1", port, socket.SOCK_STREAM)]
+        assert stopwait.wait_ports_free(ports, timeout=5) == []
+
+    def test_busy_after_deadline(self, tmp_path, capsys):
+        sock = _listener()
+        port = sock.getsockname()[1]
+        try:
+            _config(tmp_path, "  [[Backbone]]\n    type = TCPServerInterface\n"
+                              f"    listen_ip = 127.0.0.1\n    listen_port = {port}\n")
+            code = stopwait.main(["ports-free", "--config", str(tmp_path),
+                                  "--timeout", "0.3"])
+        finally:
+            sock.close()
+        assert code == 2
+        assert f"127.0.0.1:{port}/tcp" in capsys.readouterr().out
+
+
+class TestB807RcStopPidfile:
+    """B-807: A failed stop (stop_postcmd skipped) still removes a stale pidfile."""
+
+    @staticmethod
+    def _run(script, function, call, pidfile):
+        with open(os.path.join(RC_DIR, script), encoding="utf-8") as fh:
+            body = re.search(rf"^{function}\(\)\n\{{.*?^\}}\n", fh.read(), re.S | re.M).group(0)
+        # stopwait stands in as `false`: the stop itself failed (e.g. ports busy)
+        shell = (f"name={script}; pidfile={pidfile}; stopwait=false\n{body}"
+                 f"{call}; echo rc=$?")
+        return subprocess.run(["sh", "-c", shell], capture_output=True, text=True,
+                              timeout=10).stdout
+
+    @pytest.mark.parametrize("script,function,call", [
+        ("rnsd", "rnsd_stop_instance", "rnsd_stop_instance $pidfile /nonexistent"),
+        ("lxmd", "lxmd_stop", "lxmd_stop"),
+        ("reticulum_collector", "reticulum_collector_stop", "reticulum_collector_stop"),
+    ])
+    def test_exited_daemon(self, tmp_path, script, function, call):
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        pidfile = tmp_path / "daemon.pid"
+        pidfile.write_text(f"{proc.pid}\n")
+        assert "rc=1" in self._run(script, function, call, pidfile)
+        assert not pidfile.exists()
+
+    @pytest.mark.parametrize("script,function,call", [
+        ("rnsd", "rnsd_stop_instance", "rnsd_stop_instance $pidfile /nonexistent"),
+        ("lxmd", "lxmd_stop", "lxmd_stop"),
+        ("reticulum_collector", "reticulum_collector_stop", "reticulum_collector_stop"),
+    ])
+    def test_live_daemon_keeps_pidfile(self, tmp_path, script, function, call):
+        pidfile = tmp_path / "daemon.pid"
+        pidfile.write_text(f"{os.getpid()}\n")
+        assert "rc=1" in self._run(script, function, call, pidfile)
+        assert pidfile.exists()
@@ -0,0 +1,166 @@
+"""
+Restart Supervisor Tests — B-901 through B-906
+
+Covers supervise.py, which the rnsd/lxmd rc.d scripts run under daemon(8)
+when <svc>_supervise is enabled, plus the readers of its state file
+(runtime.py supervision/dashboard, readiness.py start-up crash check).
+Short-lived Python children stand in for the daemons.
+
+Test IDs:
+  B-901  exponential backoff capped at BACKOFF_MAX
+  B-902  unexpected exit restarts the daemon; counters persist across supervisors
+  B-903  too many exits within the window are flagged as a crash loop
+  B-904  a run longer than STABLE_AFTER resets the backoff
+  B-905  SIGTERM (rc.d stop) stops the daemon without a restart
+  B-906  supervisor state exposed via runtime.py and readiness.py
+
+Run with: pytest tests/scripts/test_supervise.py -v
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import readiness  # noqa: E402
+import runtime  # noqa: E402
+import stopwait  # noqa: E402
+import supervise  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+CRASH = [sys.executable, "-c", "import sys; sys.exit(3)"]
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    monkeypatch.setattr(supervise, "BACKOFF_BASE", 0.05)
+    monkeypatch.setattr(supervise, "SLEEP_STEP", 0.01)
+    # run() installs signal handlers, which only the main thread may do
+    monkeypatch.setattr(supervise.signal, "signal", lambda *args: None)
+
+
+class TestB901Backoff:
+    """B-901: Delay doubles per consecutive crash up to the cap."""
+
+    def test_sequence(self):
+        delays = [supervise.backoff_delay(n) for n in range(1, 11)]
+        assert delays[:4] == [1.0, 2.0, 4.0, 8.0]
+        assert delays[-1] == supervise.BACKOFF_MAX
+        assert delays == sorted(delays)
+
+
+class TestB902Restart:
+    """B-902: A crashing daemon is restarted and the counters are kept."""
+
+    def test_restarts_and_persists(self, tmp_path, fast):
+        log = tmp_path / "rnsd.log"
+        sup = supervise.Supervisor("rnsd", CRASH, str(log), str(tmp_path))
+        thread = threading.Thread(target=sup.run, daemon=True)
+        thread.start()
+        try:
+            assert _wait_for(lambda: supervise.read_state("rnsd", str(tmp_path))
+                             .get("restarts", 0) >= 2)
+        finally:
+            sup.stop()
+            thread.join(timeout=5)
+        state = supervise.read_state("rnsd", str(tmp_path))
+        assert state["state"] == "stopped"
+        assert state["last_exit_code"] == 3
+        assert state["last_crash"] >= int(time.time()) - 5
+        assert "[Error] supervise: rnsd exited with code 3" in log.read_text()
+
+        again = supervise.Supervisor("rnsd", CRASH, str(log), str(tmp_path))
+        assert again.state["restarts"] == state["restarts"]
+        assert again.state["last_exit_code"] == 3
+
+
+class TestB903CrashLoop:
+    """B-903: Repeated exits switch to the crash-loop state and max backoff."""
+
+    def test_flagged(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(supervise, "CRASH_LOOP_LIMIT", 2)
+        sup = supervise.Supervisor("lxmd", CRASH, str(tmp_path / "lxmd.log"), str(tmp_path))
+        assert sup.on_exit(1, 0.5) == 1.0
+        assert sup.on_exit(1, 0.5) == 2.0
+        assert sup.on_exit(1, 0.5) == supervise.BACKOFF_MAX
+        state = supervise.read_state("lxmd", str(tmp_path))
+        assert state["state"] == "crashloop"
+        assert state["consecutive_crashes"] == 3
+        assert state["next_restart_at"] >= int(time.time() + supervise.BACKOFF_MAX) - 1
+
+
+class TestB904StableReset:
+    """B-904: A long enough run starts a new crash streak."""
+
+    def test_reset(self, tmp_path):
+        sup = supervise.Supervisor("rnsd", CRASH, str(tmp_path / "rnsd.log"), str(tmp_path))
+        sup.on_exit(1, 0.5)
+        assert sup.on_exit(1, 0.5) == 2.0
+        assert sup.on_exit(1, supervise.STABLE_AFTER) == supervise.BACKOFF_BASE
+        assert sup.state["consecutive_crashes"] == 1
+        assert sup.state["state"] == "backoff"
+
+
+class TestB905Stop:
+    """B-905: rc.d stop ends supervisor and daemon without a restart."""
+
+    def test_sigterm_via_stopwait(self, tmp_path):
+        proc = subprocess.Popen([sys.executable, os.path.join(SCRIPTS_DIR, "supervise.py"),
+                                 "rnsd", "--log", str(tmp_path / "rnsd.log"),
+                                 "--state-dir", str(tmp_path), "--",
+                                 sys.executable, "-c", "import time; time.sleep(30)"])
+        threading.Thread(target=proc.wait, daemon=True).start()
+        pidfile = tmp_path / "rnsd.pid"
+        pidfile.write_text(f"{proc.pid}\n")
+        assert _wait_for(lambda: supervise.read_state("rnsd", str(tmp_path))
+                         .get("state") == "running")
+        daemon = supervise.read_state("rnsd", str(tmp_path))["pid"]
+
+        seconds, used, alive = stopwait.stop(str(pidfile), timeout=5)
+        assert (used, alive) == ("SIGTERM", set())
+        assert not readiness.pid_alive(daemon)
+        state = supervise.read_state("rnsd", str(tmp_path))
+        assert state["state"] == "stopped"
+        assert state["restarts"] == 0
+        assert state["last_crash"] is None
+
+
+class TestB906Exposed:
+    """B-906: Counters reach the API and fail the readiness probe early."""
+
+    def test_runtime(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(runtime, "SUPERVISE_DIR", str(tmp_path))
+        sup = supervise.Supervisor("rnsd", CRASH, str(tmp_path / "rnsd.log"), str(tmp_path))
+        sup.state["restarts"] = 4
+        sup.on_exit(-9, 2.0)
+        result = runtime.supervision()
+        assert result["lxmd"] == {}
+        assert result["rnsd"]["restarts"] == 4
+        assert result["rnsd"]["last_exit_code"] == -9
+        assert result["rnsd"]["state"] == "backoff"
+
+    def test_readiness_crashed_since(self, tmp_path):
+        sup = supervise.Supervisor("rnsd", CRASH, str(tmp_path / "rnsd.log"), str(tmp_path))
+        path = supervise.state_path("rnsd", str(tmp_path))
+        assert readiness.crashed_since(path, time.time()) is False
+        sup.on_exit(1, 0.1)
+        assert readiness.crashed_since(path, time.time() - 1) is True
+        assert readiness.crashed_since(path, time.time() + 10) is False
@@ -0,0 +1,200 @@
+"""
+Traffic Series Tests — B-301 through B-306
+
+Covers tsdb.py, the fixed-size ring-buffer store the collector feeds with
+per-interface TX/RX counters. All files live under tmp_path and time is
+passed explicitly, so runs are deterministic.
+
+Test IDs:
+  B-301  rate computation from cumulative counters
+  B-302  counter reset (rnsd restart) does not record a spike
+  B-303  per-tier consolidation into averaged bytes/sec slots
+  B-304  bounded storage: fixed file size, ring wrap, series cap, interface churn
+  B-305  pruning of series not updated within the longest tier span
+  B-306  read_series output shape and --points limit
+
+Run with: pytest tests/scripts/test_tsdb.py -v
+"""
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import tsdb  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+T0 = 1_700_000_040  # aligned to a 1-minute boundary
+
+
+def _snap(tx, rx, name="Backbone"):
+    return {"interfaces": [{"name": name, "tx_bytes": tx, "rx_bytes": rx}]}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return tsdb.TrafficStore(str(tmp_path))
+
+
+class TestB301Rates:
+    """B-301: Successive samples yield bytes/sec rates on the snapshot."""
+
+    def test_first_sample_has_no_rate(self, store):
+        snap = _snap(1000, 2000)
+        store.update(snap, now=T0)
+        assert snap["interfaces"][0]["tx_rate"] is None
+
+    def test_second_sample_rate(self, store):
+        store.update(_snap(1000, 2000), now=T0)
+        snap = _snap(1500, 3000)
+        store.update(snap, now=T0 + 5)
+        iface = snap["interfaces"][0]
+        assert iface["tx_rate"] == 100.0
+        assert iface["rx_rate"] == 200.0
+
+
+class TestB302CounterReset:
+    """B-302: A counter going backwards re-primes instead of recording."""
+
+    def test_reset_is_skipped(self, store, tmp_path):
+        store.update(_snap(10_000, 10_000), now=T0)
+        snap = _snap(50, 50)
+        store.update(snap, now=T0 + 5)
+        assert snap["interfaces"][0]["tx_rate"] is None
+        snap = _snap(550, 550)
+        store.update(snap, now=T0 + 10)
+        assert snap["interfaces"][0]["tx_rate"] == 100.0
+
+
+class TestB303Consolidation:
+    """B-303: Buckets are averaged and written when the next bucket starts."""
+
+    def test_one_minute_bucket_average(self, store, tmp_path):
+        total = 0
+        store.update(_snap(0, 0), now=T0)
+        for i in range(1, 12):          # 5 s samples within the first minute
+            total += 600                 # 120 B/s
+            store.update(_snap(total, total * 2), now=T0 + i * 5)
+        # The first sample of the next minute closes the bucket
+        store.update(_snap(total + 600, total * 2 + 1200), now=T0 + 60)
+        data = tsdb.read_series(str(tmp_path), "1m", now=T0 + 70)
+        series = data["interfaces"]["Backbone"]
+        assert series["t"] == [T0]
+        assert series["tx"] == [120.0]
+        assert series["rx"] == [240.0]
+
+    def test_flush_persists_open_bucket(self, store, tmp_path):
+        store.update(_snap(0, 0), now=T0)
+        store.update(_snap(500, 500), now=T0 + 5)
+        store.flush()
+        for tier in tsdb.TIER_NAMES:
+            data = tsdb.read_series(str(tmp_path), tier, now=T0 + 10)
+            assert data["interfaces"]["Backbone"]["tx"] == [100.0]
+
+
+class TestB304Bounded:
+    """B-304: Storage stays bounded however long the node runs."""
+
+    def test_file_size_is_fixed(self, store, tmp_path):
+        store.update(_snap(0, 0), now=T0)
+        counter = 0
+        # Run for longer than the 1m tier span so the ring wraps
+        for minute in range(1, 250):
+            counter += 6000
+            store.update(_snap(counter, counter), now=T0 + minute * 60)
+        files = [e for e in os.scandir(tmp_path) if e.name.endswith(tsdb.SUFFIX)]
+        assert len(files) == 1
+        assert files[0].stat().st_size == tsdb.FILE_SIZE
+        data = tsdb.read_series(str(tmp_path), "1m", now=T0 + 250 * 60)
+        assert len(data["interfaces"]["Backbone"]["t"]) <= 180
+
+    def test_series_cap(self, tmp_path):
+        store = tsdb.TrafficStore(str(tmp_path), max_series=2)
+        snap = {"interfaces": [
+            {"name": f"if{i}", "tx_bytes": 0, "rx_bytes": 0} for i in range(4)
+        ]}
+        store.update(snap, now=T0)
+        for iface in snap["interfaces"]:
+            iface["tx_bytes"] = iface["rx_bytes"] = 100
+        store.update(snap, now=T0 + 5)
+        assert len([e for e in os.scandir(tmp_path) if e.name.endswith(tsdb.SUFFIX)]) == 2
+        # Rates are still reported for interfaces beyond the cap
+        assert all(i["tx_rate"] == 20.0 for i in snap["interfaces"])
+
+
+    def test_churn_past_series_cap(self, tmp_path):
+        # A long-lived interface plus a stream of short-lived spawned ones
+        store = tsdb.TrafficStore(str(tmp_path), max_series=4, evict_after=3)
+        for i in range(1, 300):
+            snap = {"interfaces": [
+                {"name": "Backbone", "tx_bytes": i * 100, "rx_bytes": i * 100},
+                {"name": f"Client on Backbone {i - 1}", "tx_bytes": 200, "rx_bytes": 200},
+                {"name": f"Client on Backbone {i}", "tx_bytes": 100, "rx_bytes": 100},
+            ]}
+            store.update(snap, now=T0 + i * 5)
+            assert len(store._last) <= 3 + store.evict_after
+            assert len(store._series) <= 4
+        files = {e.name for e in os.scandir(tmp_path) if e.name.endswith(tsdb.SUFFIX)}
+        assert len(files) <= 4
+        # The steady interface kept its series; the newest clients still get one
+        assert tsdb.series_filename("Backbone") in files
+        assert tsdb.series_filename("Client on Backbone 298") in files
+        assert snap["interfaces"][1]["tx_rate"] == 20.0
+
+    def test_absent_interface_forgotten(self, tmp_path):
+        store = tsdb.TrafficStore(str(tmp_path), evict_after=2)
+        store.update(_snap(0, 0, name="old"), now=T0)
+        store.update(_snap(100, 100, name="old"), now=T0 + 5)
+        store.update(_snap(0, 0, name="new"), now=T0 + 10)
+        assert "old" in store._last
+        store.update(_snap(0, 0, name="new"), now=T0 + 15)
+        assert "old" not in store._last and "old" not in store._series
+        # Its data was flushed before the series was closed
+        data = tsdb.read_series(str(tmp_path), "1m", now=T0 + 20)
+        assert data["interfaces"]["old"]["tx"] == [20.0]
+
+
+class TestB305Prune:
+    """B-305: Series of removed interfaces are deleted after a week."""
+
+    def test_prune_removes_stale_files(self, tmp_path):
+        stale = tmp_path / tsdb.series_filename("gone")
+        stale.write_bytes(b"\0" * tsdb.FILE_SIZE)
+        week_ago = T0 - 8 * 86400
+        os.utime(stale, (week_ago, week_ago))
+        fresh = tmp_path / tsdb.series_filename("recent")
+        fresh.write_bytes(b"\0" * tsdb.FILE_SIZE)
+        os.utime(fresh, (T0, T0))
+        tsdb.TrafficStore(str(tmp_path)).prune(now=T0)
+        assert not stale.exists()
+        assert fresh.exists()
+
+
+class TestB306Read:
+    """B-306: read_series / CLI output shape."""
+
+    def test_points_limit_and_cli(self, store, tmp_path, capsys):
+        counter = 0
+        store.update(_snap(0, 0), now=T0)
+        for minute in range(1, 11):
+            counter += 600
+            store.update(_snap(counter, counter), now=T0 + minute * 60)
+        data = tsdb.read_series(str(tmp_path), "1m", points=3, now=T0 + 660)
+        assert len(data["interfaces"]["Backbone"]["t"]) == 3
+        assert data["step"] == 60
+
+        assert tsdb.main(["--tier", "5m", "--dir", str(tmp_path)]) == 0
+        out = json.loads(capsys.readouterr().out)
+        assert out["tier"] == "5m"
+        assert "interfaces" in out
+
+    def test_missing_directory(self, tmp_path):
+        data = tsdb.read_series(str(tmp_path / "absent"), "1h")
+        assert data["interfaces"] == {}
@@ -0,0 +1,142 @@
+"""
+Venv Install Fingerprint Tests — B-1001 through B-1005
+
+Covers venvstate.py, which pkg-install uses to skip the venv update when
+the pinned versions, the Python version and the installed files are all
+unchanged. A temporary directory of hand-written dist-info folders stands
+in for the venv's site-packages.
+
+Test IDs:
+  B-1001  fingerprint records pins, Python version and per-package manifests
+  B-1002  unchanged venv: nothing to do
+  B-1003  modified or deleted file: only that package is reported as drifted
+  B-1004  changed pins or Python version: full install
+  B-1005  CLI exit codes and drift output
+
+Run with: pytest tests/scripts/test_venvstate.py -v
+"""
+import base64
+import hashlib
+import json
+import os
+import sys
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import venvstate  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+PINS = {"rns": "1.1.4", "lxmf": "0.9.3", "pyserial": "3.5"}
+
+
+def _dist(site, name, version, files):
+    """Write a minimal installed distribution with a hashed RECORD."""
+    info = site / f"{name}-{version}.dist-info"
+    info.mkdir(parents=True)
+    (info / "METADATA").write_text(f"Metadata-Version: 2.1\nName: {name}\nVersion: {version}\n")
+    rows = []
+    for rel, content in files.items():
+        path = site / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(content)
+        digest = base64.urlsafe_b64encode(hashlib.sha256(content).digest()).rstrip(b"=")
+        rows.append(f"{rel},sha256={digest.decode()},{len(content)}")
+    rows.append(f"{info.name}/RECORD,,")
+    (info / "RECORD").write_text("\n".join(rows) + "\n")
+
+
+@pytest.fixture
+def site(tmp_path):
+    site = tmp_path / "site-packages"
+    _dist(site, "rns", "1.1.4", {"RNS/__init__.py": b"# rns\n", "RNS/Transport.py": b"x = 1\n"})
+    _dist(site, "lxmf", "0.9.3", {"LXMF/__init__.py": b"# lxmf\n"})
+    _dist(site, "pyserial", "3.5", {"serial/__init__.py": b"# serial\n"})
+    return site
+
+
+class TestB1001Fingerprint:
+    """B-1001: The fingerprint captures everything the skip depends on."""
+
+    def test_contents(self, site):
+        data = venvstate.fingerprint(PINS, [str(site)])
+        assert data["pins"] == PINS
+        assert data["python"] == venvstate.platform.python_version()
+        assert set(data["dists"]) == {"rns", "lxmf", "pyserial"}
+        assert data["dists"]["rns"]["version"] == "1.1.4"
+        assert len(data["dists"]["rns"]["manifest"]) == 64
+
+
+class TestB1002Unchanged:
+    """B-1002: A matching venv needs no work at all."""
+
+    def test_unchanged(self, site, tmp_path):
+        path = str(tmp_path / "fingerprint")
+        venvstate.record(path, PINS, [str(site)])
+        assert venvstate.check(venvstate.read_fingerprint(path), PINS, [str(site)]) == \
+            (venvstate.UNCHANGED, [])
+
+
+class TestB1003Drift:
+    """B-1003: Drift is narrowed down to the affected package."""
+
+    def test_modified_file(self, site):
+        recorded = venvstate.fingerprint(PINS, [str(site)])
+        (site / "RNS" / "Transport.py").write_bytes(b"x = 2\n")
+        assert venvstate.check(recorded, PINS, [str(site)]) == (venvstate.DRIFT, ["rns"])
+
+    def test_deleted_file(self, site):
+        recorded = venvstate.fingerprint(PINS, [str(site)])
+        (site / "serial" / "__init__.py").unlink()
+        assert venvstate.check(recorded, PINS, [str(site)]) == (venvstate.DRIFT, ["pyserial"])
+
+    def test_bytecode_is_not_drift(self, site):
+        recorded = venvstate.fingerprint(PINS, [str(site)])
+        (site / "RNS" / "__pycache__").mkdir()
+        (site / "RNS" / "__pycache__" / "Transport.cpython-311.pyc").write_bytes(b"\0")
+        assert venvstate.check(recorded, PINS, [str(site)])[0] == venvstate.UNCHANGED
+
+
+class TestB1004Full:
+    """B-1004: New pins, a new interpreter or no fingerprint mean a full install."""
+
+    def test_pin_change(self, site):
+        recorded = venvstate.fingerprint(PINS, [str(site)])
+        assert venvstate.check(recorded, dict(PINS, rns="1.1.5"), [str(site)]) == \
+            (venvstate.FULL, [])
+
+    def test_python_change(self, site):
+        recorded = venvstate.fingerprint(PINS, [str(site)])
+        recorded["python"] = "3.11.0a0"
+        assert venvstate.check(recorded, PINS, [str(site)])[0] == venvstate.FULL
+
+    def test_no_fingerprint(self, site, tmp_path):
+        recorded = venvstate.read_fingerprint(str(tmp_path / "absent"))
+        assert venvstate.check(recorded, PINS, [str(site)])[0] == venvstate.FULL
+
+
+class TestB1005Cli:
+    """B-1005: pkg-install branches on the exit code and reads the drift list."""
+
+    ARGS = ["--rns", "1.1.4", "--lxmf", "0.9.3", "--pyserial", "3.5"]
+
+    def test_record_then_check(self, site, tmp_path, monkeypatch, capsys):
+        real = venvstate.metadata.distributions
+        monkeypatch.setattr(venvstate.metadata, "distributions",
+                            lambda path=None: real(path=[str(site)]))
+        path = str(tmp_path / "fingerprint")
+        assert venvstate.main(["check", "--fingerprint", path] + self.ARGS) == venvstate.FULL
+        assert venvstate.main(["record", "--fingerprint", path] + self.ARGS) == 0
+        assert json.loads(open(path).read())["pins"] == PINS
+        assert venvstate.main(["check", "--fingerprint", path] + self.ARGS) == 0
+        assert capsys.readouterr().out == ""
+
+        (site / "LXMF" / "__init__.py").write_bytes(b"# changed\n")
+        assert venvstate.main(["check", "--fingerprint", path] + self.ARGS) == venvstate.DRIFT
+        assert capsys.readouterr().out.strip() == "lxmf"
@@ -0,0 +1,324 @@
+"""
+RPC Liveness Watchdog Tests — B-1301 through B-1307
+
+Covers watchdog.py, which tracks rnsd RPC liveness from the collector's
+per-interval queries, the collector's --watchdog report, and how the
+dashboard reports a live but unresponsive rnsd. A listening socket that
+never answers stands in for a hung rnsd; pidfiles name this test process
+(alive) or a reaped child (dead).
+
+Test IDs:
+  B-1301  nearest-rank latency percentiles
+  B-1302  consecutive failures of a live rnsd: failing, then degraded
+  B-1303  stopped rnsd and unusable RPC config are not counted as hangs
+  B-1304  restart kills the supervised daemon once, then waits out the grace period
+  B-1305  collector writes the liveness report for a hung rnsd within the tight timeout
+  B-1306  dashboard reports degraded from a fresh report only
+  B-1307  top-level status follows instance 0 everywhere; instance N>0 only in the list
+
+Run with: pytest tests/scripts/test_watchdog.py -v
+"""
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+SCRIPTS_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(__file__),
+    "..", "..", "src", "opnsense", "scripts", "OPNsense", "Reticulum"
+))
+sys.path.insert(0, SCRIPTS_DIR)
+
+import collector  # noqa: E402
+import instances  # noqa: E402
+import rnsrpc  # noqa: E402
+import runtime  # noqa: E402
+import supervise  # noqa: E402
+import watchdog  # noqa: E402
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def pidfiles(tmp_path, monkeypatch):
+    """Point instance pidfiles at tmp_path; returns a writer for them."""
+    monkeypatch.setattr(instances, "pidfile",
+                        lambda number: str(tmp_path / f"{instances.service_name(number)}.pid"))
+
+    def write(number, pid):
+        (tmp_path / f"{instances.service_name(number)}.pid").write_text(f"{pid}\n")
+    return write
+
+
+def _dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def _ok(ms=2.0):
+    return ({}, ms / 1000, None)
+
+
+def _fail(error=None):
+    return (rnsrpc.unreachable(), 1.0, error or rnsrpc.RpcError("timed out"))
+
+
+class TestB1301Percentiles:
+    """B-1301: Percentiles are real samples, not interpolations."""
+
+    def test_nearest_rank(self):
+        result = watchdog.percentiles(range(1, 101))
+        assert result == {"p50": 50, "p90": 90, "p99": 99, "max": 100, "samples": 100}
+
+    def test_single_and_empty(self):
+        assert watchdog.percentiles([3.25])["p99"] == 3.2
+        assert watchdog.percentiles([]) == {"p50": None, "p90": None, "p99": None,
+                                            "max": None, "samples": 0}
+
+
+class TestB1302Degraded:
+    """B-1302: A live PID that stops answering becomes degraded after N failures."""
+
+    def test_threshold(self, pidfiles):
+        pidfiles(0, os.getpid())
+        logged = []
+        dog = watchdog.Watchdog(failures=3, log=logged.append)
+        assert dog.observe([_ok(4.0)])["state"] == "ok"
+        assert dog.observe([_fail()])["state"] == "failing"
+        assert dog.observe([_fail()])["state"] == "failing"
+        report = dog.observe([_fail()])
+        assert report["state"] == "degraded"
+        assert report["instances"][0]["consecutive_failures"] == 3
+        assert report["instances"][0]["last_error"] == "timed out"
+        # Failed queries are not latency samples
+        assert report["latency_ms"]["samples"] == 1
+        dog.observe([_fail()])
+        assert len(logged) == 1 and "rnsd degraded" in logged[0]
+
+    def test_recovery_resets(self, pidfiles):
+        pidfiles(0, os.getpid())
+        dog = watchdog.Watchdog(failures=1)
+        assert dog.observe([_fail()])["state"] == "degraded"
+        report = dog.observe([_ok()])
+        assert report["state"] == "ok"
+        assert report["instances"][0]["consecutive_failures"] == 0
+
+    def test_worst_instance_wins(self, pidfiles):
+        pidfiles(0, os.getpid())
+        pidfiles(1, os.getpid())
+        dog = watchdog.Watchdog(failures=1)
+        report = dog.observe([_ok(), _fail()])
+        assert report["state"] == "degraded"
+        assert [(i["service"], i["state"]) for i in report["instances"]] == \
+            [("rnsd", "ok"), ("rnsd-1", "degraded")]
+        # An instance that is no longer configured is dropped
+        assert [i["instance"] for i in dog.observe([_ok()])["instances"]] == [0]
+
+    def test_instance_state_follows_service(self, pidfiles):
+        # rnsd_status.sh matches '"instance":0,"service":"rnsd","state":"degraded"'
+        pidfiles(0, os.getpid())
+        report = watchdog.Watchdog(failures=1).observe([_fail()])
+        assert '"instance":0,"service":"rnsd","state":"degraded"' in \
+            json.dumps(report, separators=(",", ":"))
+
+
+class TestB1303NotHung:
+    """B-1303: Only an alive, queryable rnsd can be hung."""
+
+    def test_stopped(self, pidfiles):
+        pidfiles(0, _dead_pid())
+        dog = watchdog.Watchdog(failures=1)
+        report = dog.observe([_fail()])
+        assert report["state"] == "stopped"
+        assert report["instances"][0]["consecutive_failures"] == 0
+
+    def test_missing_pidfile(self, pidfiles):
+        assert watchdog.Watchdog(failures=1).observe([_fail()])["state"] == "stopped"
+
+    def test_rpc_unavailable(self, pidfiles, tmp_path, render_rnsd):
+        pidfiles(0, os.getpid())
+        (tmp_path / "config").write_text(render_rnsd(general={"share_instance": "0"}))
+        with pytest.raises(rnsrpc.RpcUnavailable) as exc:
+            rnsrpc.RpcClient(str(tmp_path)).interface_stats()
+        report = watchdog.Watchdog(failures=1).observe([_fail(exc.value)])
+        assert report["state"] == "unknown"
+
+
+class TestB1304Restart:
+    """B-1304: The supervisor, not the watchdog, brings rnsd back."""
+
+    @pytest.fixture
+    def daemon(self, tmp_path, pidfiles):
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"])
+        pidfiles(0, os.getpid())
+        (tmp_path / "rnsd.json").write_text(json.dumps({"state": "running", "pid": proc.pid}))
+        yield proc
+        proc.kill()
+        proc.wait()
+
+    def test_kills_supervised_child(self, daemon, tmp_path):
+        dog = watchdog.Watchdog(failures=2, restart=True, state_dir=str(tmp_path))
+        dog.observe([_fail()], now=1000)
+        assert daemon.poll() is None
+        report = dog.observe([_fail()], now=1005)
+        assert daemon.wait(timeout=5) == -9
+        assert report["state"] == "restarting"
+        assert report["instances"][0]["restarts"] == 1
+        # Still unanswered while the supervisor backs off: no second kill
+        report = dog.observe([_fail()] , now=1005 + watchdog.RESTART_GRACE - 1)
+        assert report["state"] == "restarting"
+        assert report["instances"][0]["consecutive_failures"] == 0
+        # After the grace period failures count again
+        assert dog.observe([_fail()], now=1005 + watchdog.RESTART_GRACE)["state"] == "failing"
+
+    def test_report_only_by_default(self, daemon, tmp_path):
+        dog = watchdog.Watchdog(failures=1, state_dir=str(tmp_path))
+        assert dog.observe([_fail()])["state"] == "degraded"
+        assert daemon.poll() is None
+
+    def test_unsupervised_not_killed(self, daemon, tmp_path):
+        supervise_dir = tmp_path / "none"
+        supervise_dir.mkdir()
+        logged = []
+        dog = watchdog.Watchdog(failures=1, restart=True, state_dir=str(supervise_dir),
+                                log=logged.append)
+        assert dog.observe([_fail()])["state"] == "degraded"
+        assert daemon.poll() is None
+        assert "not supervised" in logged[-1]
+
+
+class TestB1305Collector:
+    """B-1305: A hung rnsd costs one tight timeout per interval, not the default."""
+
+    @pytest.fixture
+    def hung_rnsd(self, tmp_path):
+        # Accepts connections (kernel backlog) but never answers
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        sock.listen(8)
+        (tmp_path / "config").write_text(
+            "[reticulum]\n  share_instance = True\n"
+            f"  instance_control_port = {sock.getsockname()[1]}\n"
+            f"  rpc_key = {'ab' * 16}\n"
+        )
+        yield str(tmp_path)
+        sock.close()
+
+    def test_liveness_report(self, hung_rnsd, tmp_path, pidfiles, monkeypatch):
+        monkeypatch.setattr(watchdog, "RPC_TIMEOUT", 0.2)
+        pidfiles(0, os.getpid())
+        path = tmp_path / "liveness.json"
+        c = collector.Collector(hung_rnsd, str(tmp_path / "s.json"), 5, quiet=True,
+                                liveness_path=str(path), watchdog_failures=2)
+        assert c.rpc_timeout == 0.2
+        started = time.monotonic()
+        c.tick()
+        c.tick()
+        assert time.monotonic() - started < 2 * rnsrpc.DEFAULT_TIMEOUT
+        report = json.loads(path.read_text())
+        assert report["state"] == "degraded"
+        assert report["threshold"] == 2
+        assert json.loads((tmp_path / "s.json").read_text())["error"]
+
+    def test_disabled_by_default(self, tmp_path):
+        c = collector.Collector(str(tmp_path), str(tmp_path / "s.json"), 5, quiet=True)
+        assert c.watchdog is None
+        assert c.rpc_timeout == rnsrpc.DEFAULT_TIMEOUT
+
+
+class TestB1306Dashboard:
+    """B-1306: The dashboard stops equating a live PID with "running"."""
+
+    @pytest.fixture
+    def report(self, tmp_path, monkeypatch):
+        pid = tmp_path / "rnsd.pid"
+        pid.write_text(f"{os.getpid()}\n")
+        monkeypatch.setitem(runtime.PIDFILES, "rnsd", str(pid))
+        monkeypatch.setattr(instances, "pidfile", lambda number: str(pid))
+        monkeypatch.setattr(runtime, "SUPERVISE_DIR", str(tmp_path))
+        monkeypatch.setattr(runtime, "RRD_DIR", str(tmp_path / "rrd"))
+        monkeypatch.setattr(runtime, "load_status", lambda config_dir: rnsrpc.unreachable())
+        monkeypatch.setattr(runtime, "LIVENESS", str(tmp_path / "liveness.json"))
+        monkeypatch.setattr(runtime, "PROCS", str(tmp_path / "procs.json"))
+        path = tmp_path / "liveness.json"
+        path.write_text(json.dumps({"state": "degraded", "latency_ms": {"p90": 3.0},
+                                    "instances": [{"instance": 0, "state": "degraded"}]}))
+        return path
+
+    def test_degraded(self, report, tmp_path):
+        rnsd = runtime.dashboard(str(tmp_path))["rnsd"]
+        assert rnsd["status"] == "degraded"
+        assert rnsd["liveness"]["latency_ms"] == {"p90": 3.0}
+
+    def test_stale_report_ignored(self, report, tmp_path):
+        old = time.time() - runtime.SNAPSHOT_MAX_AGE - 5
+        os.utime(report, (old, old))
+        rnsd = runtime.dashboard(str(tmp_path))["rnsd"]
+        assert rnsd["status"] == "running"
+        assert "liveness" not in rnsd
+
+
+class TestB1307InstanceRule:
+    """B-1307: Only instance 0 makes rnsd degraded; other instances are degraded in the list."""
+
+    STATUS_SH = os.path.join(SCRIPTS_DIR, "rnsd_status.sh")
+
+    @staticmethod
+    def _liveness(path, degraded):
+        entries = [{"instance": n, "service": instances.service_name(n),
+                    "state": "degraded" if n == degraded else "ok"} for n in range(3)]
+        path.write_text(json.dumps({"state": "degraded", "instances": entries},
+                                   separators=(",", ":")))
+
+    def _status_sh(self, tmp_path):
+        with open(self.STATUS_SH, encoding="utf-8") as fh:
+            script = fh.read()
+        for name, path in (("PIDFILE", tmp_path / "rnsd.pid"), ("PROCS", tmp_path / "procs.json"),
+                           ("LIVENESS", tmp_path / "liveness.json")):
+            script = re.sub(rf'^{name}=".*"$', f'{name}="{path}"', script, flags=re.M)
+        # BSD stat(1) on the firewall; GNU stat on development hosts
+        shim = ('stat -f %m / >/dev/null 2>&1 || '
+                'stat() { command stat -c %Y "$3"; }\n')
+        out = subprocess.run(["sh", "-c", shim + script], capture_output=True, text=True,
+                             timeout=10).stdout
+        return json.loads(out)["status"]
+
+    @pytest.fixture
+    def dashboard(self, tmp_path, monkeypatch):
+        pid = tmp_path / "rnsd.pid"
+        pid.write_text(f"{os.getpid()}\n")
+        monkeypatch.setitem(runtime.PIDFILES, "rnsd", str(pid))
+        monkeypatch.setattr(instances, "pidfile", lambda number: str(pid))
+        monkeypatch.setattr(instances, "config_dirs", lambda config_dir: ["a", "b", "c"])
+        monkeypatch.setattr(runtime, "SUPERVISE_DIR", str(tmp_path))
+        monkeypatch.setattr(runtime, "RRD_DIR", str(tmp_path / "rrd"))
+        monkeypatch.setattr(runtime, "load_status", lambda config_dir: rnsrpc.unreachable())
+        monkeypatch.setattr(runtime, "LIVENESS", str(tmp_path / "liveness.json"))
+        monkeypatch.setattr(runtime, "PROCS", str(tmp_path / "procs.json"))
+        return lambda: runtime.dashboard(str(tmp_path))["rnsd"]
+
+    def test_dashboard_instance_1(self, dashboard, tmp_path):
+        self._liveness(tmp_path / "liveness.json", degraded=1)
+        rnsd = dashboard()
+        assert rnsd["status"] == "running"
+        assert [i["status"] for i in rnsd["instances"]] == ["running", "degraded", "running"]
+
+    def test_dashboard_instance_0(self, dashboard, tmp_path):
+        self._liveness(tmp_path / "liveness.json", degraded=0)
+        assert dashboard()["status"] == "degraded"
+
+    def test_status_sh_instance_1(self, tmp_path):
+        (tmp_path / "rnsd.pid").write_text(f"{os.getpid()}\n")
+        self._liveness(tmp_path / "liveness.json", degraded=1)
+        assert self._status_sh(tmp_path) == "running"
+
+    def test_status_sh_instance_0(self, tmp_path):
+        (tmp_path / "rnsd.pid").write_text(f"{os.getpid()}\n")
+        self._liveness(tmp_path / "liveness.json", degraded=0)
+        assert self._status_sh(tmp_path) == "degraded"
@@ -1,5 +1,5 @@
 #!/bin/sh
-# Service Lifecycle Tests — S-401 through S-407
+# Service Lifecycle Tests — S-401 through S-411
 # Run as root on OPNsense VM AFTER installing and configuring the plugin.
 #
 # Usage: sh test_service_lifecycle.sh [test_id]
@@ -219,6 +219,142 @@ test_S407() {
     fi
 }
 
+# ---------------------------------------------------------------------------
+# S-408: Readiness-based start
+# ---------------------------------------------------------------------------
+
+test_S408() {
+    echo "--- S-408: Readiness-based start ---"
+    if ! service rnsd enabled 2>/dev/null; then
+        err "S-408" "rnsd not enabled — run S-402 first"
+        return
+    fi
+
+    service rnsd stop >/dev/null 2>&1
+    OUT=$(service rnsd start 2>&1)
+    info "start output: $OUT"
+    if echo "$OUT" | grep -q "rnsd ready in"; then
+        ok "S-408a" "start reports time-to-ready"
+    else
+        err "S-408a" "start did not report readiness"
+    fi
+
+    # start returns only once rnsd accepts RPC connections, so no sleep here
+    if nc -z 127.0.0.1 37429 2>/dev/null; then
+        ok "S-408b" "control port accepts connections as soon as start returns"
+    else
+        err "S-408b" "control port not yet accepting after start returned"
+    fi
+}
+
+# ---------------------------------------------------------------------------
+# S-409: Graceful stop and restart
+# ---------------------------------------------------------------------------
+
+test_S409() {
+    echo "--- S-409: Graceful stop and restart ---"
+    if ! service rnsd status 2>&1 | grep -qi "running"; then
+        err "S-409" "rnsd not running — run S-402 first"
+        return
+    fi
+
+    OUT=$(service rnsd stop 2>&1)
+    info "stop output: $OUT"
+    if echo "$OUT" | grep -q "rnsd stopped in"; then
+        ok "S-409a" "stop waited for exit and reported its duration"
+    else
+        err "S-409a" "stop did not report a completed stop"
+    fi
+    if [ -f /var/run/reticulum/rnsd.stop.json ]; then
+        ok "S-409b" "stop duration recorded: $(cat /var/run/reticulum/rnsd.stop.json)"
+    else
+        err "S-409b" "/var/run/reticulum/rnsd.stop.json missing"
+    fi
+    # stop returns only once rnsd's ports are free, so no sleep here
+    if ! nc -z 127.0.0.1 37428 2>/dev/null; then
+        ok "S-409c" "shared instance port released when stop returned"
+    else
+        err "S-409c" "shared instance port still accepting after stop"
+    fi
+
+    # Back-to-back restarts must never hit a bind failure
+    for _i in 1 2 3; do
+        service rnsd onerestart >/dev/null 2>&1
+    done
+    if service rnsd status 2>&1 | grep -qi "running"; then
+        ok "S-409d" "rnsd running after three back-to-back restarts"
+    else
+        err "S-409d" "rnsd not running after back-to-back restarts"
+    fi
+}
+
+# ---------------------------------------------------------------------------
+# S-410: Supervisor restarts a crashed rnsd
+# ---------------------------------------------------------------------------
+
+test_S410() {
+    echo "--- S-410: Supervisor restarts a crashed rnsd ---"
+    STATE=/var/db/reticulum/supervise/rnsd.json
+    if [ ! -f "$STATE" ] || ! grep -q '"state":"running"' "$STATE"; then
+        err "S-410" "rnsd not running under supervise.py — run S-402 first"
+        return
+    fi
+    BEFORE=$(grep -o '"restarts":[0-9]*' "$STATE" | cut -d: -f2)
+    DAEMON=$(grep -o '"pid":[0-9]*' "$STATE" | cut -d: -f2)
+    info "killing rnsd PID $DAEMON (restarts so far: $BEFORE)"
+    kill -9 "$DAEMON"
+
+    # First restart of a streak waits BACKOFF_BASE (1s)
+    sleep 3
+    AFTER=$(grep -o '"restarts":[0-9]*' "$STATE" | cut -d: -f2)
+    if [ "$AFTER" -eq $((BEFORE + 1)) ] && grep -q '"state":"running"' "$STATE"; then
+        ok "S-410a" "rnsd restarted by the supervisor (restarts: $AFTER)"
+    else
+        err "S-410a" "rnsd not restarted: $(cat "$STATE")"
+    fi
+    if grep -q '"last_exit_code":-9' "$STATE"; then
+        ok "S-410b" "last exit code records the SIGKILL"
+    else
+        err "S-410b" "last exit code not recorded"
+    fi
+    if service rnsd status 2>&1 | grep -qi "running"; then
+        ok "S-410c" "rc.d status still reports rnsd running"
+    else
+        err "S-410c" "rc.d status lost track of rnsd"
+    fi
+}
+
+# ---------------------------------------------------------------------------
+# S-411: Extra transport instances start and stop with rnsd
+# ---------------------------------------------------------------------------
+
+test_S411() {
+    echo "--- S-411: Extra transport instances start and stop with rnsd ---"
+    if ! grep -q '^\[reticulum\]' /usr/local/etc/reticulum/instance-1/config 2>/dev/null; then
+        info "S-411 needs Transport Instances >= 2 (General → Transport) and a reconfigure — skipped"
+        return
+    fi
+    service rnsd onerestart >/dev/null 2>&1
+    if ps -p "$(cat /var/run/rnsd-1.pid 2>/dev/null)" >/dev/null 2>&1; then
+        ok "S-411a" "instance 1 running (PID: $(cat /var/run/rnsd-1.pid))"
+    else
+        err "S-411a" "instance 1 not running — check /var/log/reticulum/rnsd-1.log"
+    fi
+    PORT=$(sed -n 's/^ *instance_control_port = //p' /usr/local/etc/reticulum/instance-1/config)
+    if sockstat -4 -l -p "$PORT" | grep -q "$PORT"; then
+        ok "S-411b" "instance 1 control port $PORT listening"
+    else
+        err "S-411b" "instance 1 control port $PORT not listening"
+    fi
+    service rnsd onestop >/dev/null 2>&1
+    if [ ! -f /var/run/rnsd-1.pid ] && ! sockstat -4 -l -p "$PORT" | grep -q "$PORT"; then
+        ok "S-411c" "stop took down instance 1 and released its ports"
+    else
+        err "S-411c" "instance 1 still running after stop"
+    fi
+    service rnsd onestart >/dev/null 2>&1
+}
+
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
@@ -230,19 +366,27 @@ case "${1:-all}" in
     S-405) test_S405 ;;
     S-406) test_S406 ;;
     S-407) test_S407 ;;
+    S-408) test_S408 ;;
+    S-409) test_S409 ;;
+    S-410) test_S410 ;;
+    S-411) test_S411 ;;
     all)
         test_S402
         test_S403
         test_S404
         test_S405
         test_S406
+        test_S408
+        test_S409
+        test_S410
+        test_S411
         if [ "$CI" != "1" ]; then
             test_S407
         else
             printf "${YEL}SKIP${RST}  S-407: clean uninstall — skipped in CI mode\n"
         fi
         ;;
-    *) echo "Unknown test: $1"; echo "Valid: S-402 S-403 S-404 S-405 S-406 S-407 all"; exit 1 ;;
+    *) echo "Unknown test: $1"; echo "Valid: S-402 S-403 S-404 S-405 S-406 S-407 S-408 S-409 S-410 S-411 all"; exit 1 ;;
 esac
 
 echo ""
@@ -1,5 +1,5 @@
 """
-Template Output Validation Tests — T-101 through T-112
+Template Output Validation Tests — T-101 through T-116
 
 Tests render Jinja2 templates with fixture data and compare against expected output.
 Run with: pytest tests/template/
@@ -316,6 +316,12 @@ def test_T112_rnsd_disabled(render_rc_rnsd):
     assert 'rnsd_enable="NO"' in output
 
 
+def test_T112_rnsd_instances(render_rc_rnsd):
+    """T-112: rnsd_instances carries the transport instance count to rc.d."""
+    assert 'rnsd_instances="1"' in render_rc_rnsd()
+    assert 'rnsd_instances="3"' in render_rc_rnsd(general={"transport_instances": "3"})
+
+
 def test_T112_lxmd_enabled_with_rnsd(render_rc_lxmd):
     """T-112: lxmd enabled + rnsd enabled → lxmd_enable=YES."""
     output = render_rc_lxmd(
@@ -365,3 +371,101 @@ def test_disabled_interface_excluded(render_rnsd):
     output = render_rnsd(interfaces=ifaces)
     assert "[[Hidden]]" not in output
     assert "[[Visible]]" in output
+
+
+# ---------------------------------------------------------------------------
+# T-113: Transport instances
+# ---------------------------------------------------------------------------
+
+INSTANCE_IFACES = [
+    {"enabled": "1", "name": "Main", "type": "TCPServerInterface", "listen_port": "4242"},
+    {"enabled": "1", "name": "Second", "type": "TCPServerInterface", "listen_port": "4243", "instance": "1"},
+    {"enabled": "1", "name": "Orphan", "type": "TCPServerInterface", "listen_port": "4244", "instance": "3"},
+]
+MULTI = {"enable_transport": "1", "transport_instances": "2", "interconnect_port": "37430",
+         "logfile": "/var/log/reticulum/rnsd.log"}
+
+
+def test_T113_single_instance_unchanged(render_rnsd):
+    """T-113: One instance renders no interconnect and leaves extra instance configs empty."""
+    output = render_rnsd(interfaces=INSTANCE_IFACES[:2])
+    assert "[[Main]]" in output and "[[Second]]" in output
+    assert "Instance Interconnect" not in output
+    extra = render_rnsd(interfaces=INSTANCE_IFACES[:2], instance=1)
+    assert "[reticulum]" not in extra and "[[" not in extra
+
+
+def test_T113_interfaces_split_by_instance(render_rnsd):
+    """T-113: Each instance gets its own interfaces; unknown instances fall back to 0."""
+    main = render_rnsd(general=MULTI, interfaces=INSTANCE_IFACES)
+    second = render_rnsd(general=MULTI, interfaces=INSTANCE_IFACES, instance=1)
+    assert "[[Main]]" in main and "[[Orphan]]" in main and "[[Second]]" not in main
+    assert "[[Second]]" in second and "[[Main]]" not in second and "[[Orphan]]" not in second
+
+
+def test_T113_instance_ports_and_interconnect(render_rnsd):
+    """T-113: Instance N shares on interconnect_port+2N-1/+2N and connects to instance 0."""
+    main = render_rnsd(general=MULTI, interfaces=[])
+    assert "shared_instance_port = 37428" in main
+    server = main[main.index("[[Instance Interconnect]]"):]
+    assert "type = TCPServerInterface" in server
+    assert "listen_ip = 127.0.0.1" in server and "listen_port = 37430" in server
+
+    second = render_rnsd(general=MULTI, interfaces=[], instance=1)
+    assert "share_instance = True" in second
+    assert "shared_instance_port = 37431" in second
+    assert "instance_control_port = 37432" in second
+    assert "logfile = /var/log/reticulum/rnsd-1.log" in second
+    client = second[second.index("[[Instance Interconnect]]"):]
+    assert "type = TCPClientInterface" in client
+    assert "target_host = 127.0.0.1" in client and "target_port = 37430" in client
+
+
+def test_T113_unused_instance_not_configured(render_rnsd):
+    """T-113: Instance templates beyond transport_instances render no [reticulum] section."""
+    output = render_rnsd(general=MULTI, interfaces=INSTANCE_IFACES, instance=2)
+    assert "[reticulum]" not in output
+    assert "not configured" in output
+
+
+# ---------------------------------------------------------------------------
+# T-114: Collector RPC liveness watchdog settings
+# ---------------------------------------------------------------------------
+
+def test_T114_watchdog_defaults(render_rc_collector):
+    """T-114: Watchdog on, threshold 3, report only."""
+    output = render_rc_collector(general={"enabled": "1"})
+    assert 'reticulum_collector_watchdog_enable="YES"' in output
+    assert 'reticulum_collector_watchdog_failures="3"' in output
+    assert 'reticulum_collector_watchdog_restart="NO"' in output
+
+
+def test_T114_watchdog_settings(render_rc_collector):
+    """T-114: Threshold and restart follow the model; disabling turns the watchdog off."""
+    output = render_rc_collector(general={"watchdog_failures": "5", "watchdog_restart": "1"})
+    assert 'reticulum_collector_watchdog_failures="5"' in output
+    assert 'reticulum_collector_watchdog_restart="YES"' in output
+    output = render_rc_collector(general={"watchdog_enabled": "0"})
+    assert 'reticulum_collector_watchdog_enable="NO"' in output
+
+
+# ---------------------------------------------------------------------------
+# T-115: Status event stream counter interval
+# ---------------------------------------------------------------------------
+
+def test_T115_stream_counter_interval(render_rc_collector):
+    """T-115: Counter events follow the live update interval (default 15 s)."""
+    output = render_rc_collector(general={"enabled": "1"})
+    assert 'reticulum_collector_events_counters="15"' in output
+    output = render_rc_collector(general={"stream_counter_interval": "60"})
+    assert 'reticulum_collector_events_counters="60"' in output
+
+
+# ---------------------------------------------------------------------------
+# T-116: Process watcher service follows the plugin enable flag
+# ---------------------------------------------------------------------------
+
+def test_T116_procwatch_enable(render_rc_procwatch):
+    """T-116: The process watcher runs whenever the plugin is enabled."""
+    assert 'reticulum_procwatch_enable="YES"' in render_rc_procwatch(general={"enabled": "1"})
+    assert 'reticulum_procwatch_enable="NO"' in render_rc_procwatch(general={"enabled": "0"})
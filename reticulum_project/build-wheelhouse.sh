@@ -0,0 +1,68 @@
+#!/bin/sh
+# Build the offline wheelhouse shipped in the os-reticulum package.
+#
+# Builds rns and lxmf wheels from the rns-src / lxmf-src submodules and
+# fetches the pinned pyserial wheel, writes requirements.txt pinning all
+# three and packs them into one archive. pkg-install unpacks it and installs
+# with pip --no-index, so package installs and upgrades need neither git nor
+# internet access. The archive name does not change with the pinned
+# versions, so pkg-plist needs no edits on an RNS/LXMF bump.
+# cryptography comes from the py311-cryptography package (PLUGIN_DEPENDS).
+#
+# All three wheels are pure Python, so any host with python3 and pip can
+# build them. Run before `make package`:
+#
+#   git submodule update --init
+#   sh reticulum_project/build-wheelhouse.sh [DEST]
+#
+# DEST defaults to os-reticulum/src/usr/local/share/os-reticulum/wheelhouse.tar.
+# Without it `make package` ships an empty archive and pkg-install falls
+# back to building from source.
+
+set -eu
+
+PROJECT_DIR=$(cd "$(dirname "$0")" && pwd)
+REPO_ROOT=$(dirname "${PROJECT_DIR}")
+DEST="${1:-${REPO_ROOT}/os-reticulum/src/usr/local/share/os-reticulum/wheelhouse.tar}"
+PYTHON="${PYTHON:-python3}"
+
+# shellcheck source=/dev/null
+. "${PROJECT_DIR}/versions.env"
+
+fail() {
+    echo "[wheelhouse] ERROR: $*" >&2
+    exit 1
+}
+
+# The wheels must be built from exactly the tags pkg-install records
+check_tag() {
+    _dir="${PROJECT_DIR}/$1"
+    _tag="$2"
+    [ -f "${_dir}/setup.py" ] || fail "$1 is not checked out — run: git submodule update --init"
+    _head=$(git -C "${_dir}" describe --tags --exact-match HEAD 2>/dev/null) || _head="untagged"
+    [ "${_head}" = "${_tag}" ] || fail "$1 is at ${_head}, versions.env pins ${_tag}"
+}
+
+check_tag rns-src "${RNS_TAG}"
+check_tag lxmf-src "${LXMF_TAG}"
+
+WORK=$(mktemp -d -t reticulum-wheelhouse)
+trap 'rm -rf "${WORK}"' EXIT
+
+echo "[wheelhouse] Building rns ${RNS_TAG} and lxmf ${LXMF_TAG}..."
+"${PYTHON}" -m pip wheel --quiet --no-deps --wheel-dir "${WORK}" \
+    "${PROJECT_DIR}/rns-src" "${PROJECT_DIR}/lxmf-src"
+
+echo "[wheelhouse] Fetching pyserial ${PYSERIAL_VERSION}..."
+"${PYTHON}" -m pip download --quiet --no-deps --only-binary=:all: --dest "${WORK}" \
+    "pyserial==${PYSERIAL_VERSION}"
+
+printf "rns==%s\nlxmf==%s\npyserial==%s\n" \
+    "${RNS_TAG}" "${LXMF_TAG}" "${PYSERIAL_VERSION}" > "${WORK}/requirements.txt"
+
+mkdir -p "$(dirname "${DEST}")"
+tar -cf "${DEST}.tmp" -C "${WORK}" .
+mv "${DEST}.tmp" "${DEST}"
+
+echo "[wheelhouse] Done: ${DEST}"
+tar -tf "${DEST}"